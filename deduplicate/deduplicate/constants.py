@@ -0,0 +1,32 @@
+"""Deduplicate eSIMs service defines"""
+
+# pylint: disable=too-few-public-methods
+
+
+class DeduplicateConst:
+    """Deduplicate Defines"""
+
+    # Service
+    SERVICE_NAME = "deduplicate"
+
+    # Spans
+    HANDLER_SPAN = "deduplicate.handler"
+    ORIGINAL_SPAN = "deduplicate.original"
+
+    # Metrics
+    SNAPSHOT_METRIC = "inventory_snapshot"
+    GROUP_METRIC = "group_duplicates"
+    VERIFY_METRIC = "airtable_duplicates_verify"
+    FLAG_METRIC = "airtable_donations_flag"
+    DELETE_METRIC = "airtable_assets_delete"
+    SAVE_METRIC = "snapshot_save"
+    DEDUPLICATED_METRIC = "esims_deduplicated"
+
+    # Scheduler items
+    ORIGINAL = "original"
+    ORIGINAL_ESTIMATE_MS = 2000.0
+
+    # Inventory snapshot
+    INVENTORY = "inventory"
+    QR_SHA = "qr_sha"
+    CHECKED_IN = "checked_in"
@@ -1,81 +1,177 @@
 """Deduplicate Esims Linked"""
 
-from typing import List, Dict
-
-from esimslib.util import logger
-from esimslib.airtable import EsimAsset, EsimDonation
-
-
+from typing import Any, List, Dict
+
+import numpy as np
+
+from esimslib.util import (
+    logger,
+    flushes_metrics,
+    Metrics,
+    set_attributes,
+    timed,
+    traced,
+)
+from esimslib.util.profiler import profiled
+from esimslib.util.scheduler import CheckpointStore, WorkScheduler
+from esimslib.airtable import (
+    AirTableSnapshot,
+    EsimAsset,
+    EsimDonation,
+    InventoryRow,
+    TableSnapshot,
+    init_api,
+)
+
+from deduplicate.constants import DeduplicateConst as dd_c
+
+
+@timed(dd_c.GROUP_METRIC)
 def group_duplicates_by_original(
-    esims: List[EsimAsset],
-) -> Dict[EsimAsset, List[EsimAsset]]:
+    inventory: TableSnapshot,
+) -> Dict[InventoryRow, List[InventoryRow]]:
     """Group duplicate esims for each original.
+    The first checked in esim of a qr_sha is its original.
 
     Args:
-        esims (List[EsimAsset]): list of esim records.
+        inventory (TableSnapshot): inventory snapshot.
 
     Returns:
-        Dict[EsimAsset, List[EsimAsset]]: combined duplicates.
+        Dict[InventoryRow, List[InventoryRow]]: combined duplicates.
             {original: [duplicates]}.
     """
-    return {
-        esim: [
-            esim_duplicate
-            for esim_duplicate in esims
-            if esim_duplicate.qr_sha == esim.qr_sha
-            and not esim_duplicate.checked_in
-        ]
-        for esim in esims
-        if esim.checked_in
-    }
+    qr_sha = inventory.column(dd_c.QR_SHA)
+    checked_in = inventory.column(dd_c.CHECKED_IN)
+    originals: Dict[str, InventoryRow] = {}
+    for esim in inventory.rows(InventoryRow, checked_in & (qr_sha != "")):
+        originals.setdefault(esim.qr_sha, esim)
+    combined_duplicates: Dict[InventoryRow, List[InventoryRow]] = {}
+    for esim in inventory.rows(
+        InventoryRow, ~checked_in & np.isin(qr_sha, list(originals))
+    ):
+        combined_duplicates.setdefault(originals[esim.qr_sha], []).append(esim)
+    return combined_duplicates
+
+
+@timed(dd_c.VERIFY_METRIC)
+def verify_duplicates(
+    inventory: TableSnapshot,
+    combined_duplicates: Dict[InventoryRow, List[InventoryRow]],
+) -> Dict[InventoryRow, List[InventoryRow]]:
+    """Refresh originals and duplicates from AirTable and group again.
+    Only rows refreshed are kept, a duplicate deleted or checked in
+    since the snapshot sync is not deleted.
 
+    Args:
+        inventory (TableSnapshot): inventory snapshot.
+        combined_duplicates (Dict[InventoryRow, List[InventoryRow]]):
+            snapshot duplicates by original.
 
+    Returns:
+        Dict[InventoryRow, List[InventoryRow]]: verified duplicates.
+            {original: [duplicates]}.
+    """
+    verified = inventory.refresh(
+        esim.id
+        for original, duplicates in combined_duplicates.items()
+        for esim in [original, *duplicates]
+    )
+    verified_duplicates = {}
+    for original, duplicates in group_duplicates_by_original(
+        inventory
+    ).items():
+        duplicates = [esim for esim in duplicates if esim.id in verified]
+        if original.id in verified and duplicates:
+            verified_duplicates[original] = duplicates
+    return verified_duplicates
+
+
+@timed(dd_c.FLAG_METRIC)
+@traced(dd_c.ORIGINAL_SPAN)
 def mark_duplicate_donation(
-    original_esim: EsimAsset,
-    esim_duplicates: List[EsimAsset],
+    original_esim: InventoryRow,
+    esim_duplicates: List[InventoryRow],
 ) -> None:
     """flag duplicate donation and link to original.
 
     Args:
-        original_esim (EsimAsset): original esim.
-        esim_duplicates (List[EsimAsset]): list of duplicate esims.
+        original_esim (InventoryRow): original esim.
+        esim_duplicates (List[InventoryRow]): list of duplicate esims.
     """
+    set_attributes(
+        qr_sha=original_esim.qr_sha, duplicates=len(esim_duplicates)
+    )
     duplicate_donations = [
-        duplicate.donation
+        duplicate.to_donation()
         for duplicate in esim_duplicates
         if duplicate.donation
     ]
     for duplicate_donation in duplicate_donations:
         duplicate_donation.is_duplicate = True
-        duplicate_donation.duplicate_original = original_esim.donation
+        duplicate_donation.duplicate_original = original_esim.to_donation()
     EsimDonation.batch_save(duplicate_donations)
 
 
-def main() -> None:
-    """Main"""
-    duplicated_esims = EsimAsset().fetch_all()
-    logger.info("Duplicate esims: %s", len(duplicated_esims))
-
-    combined_duplicates = group_duplicates_by_original(duplicated_esims)
-    # pylint: disable=expression-not-assigned
-    [
-        mark_duplicate_donation(  # type: ignore[func-returns-value]
-            original,
-            duplicates,
-        )
-        for original, duplicates in combined_duplicates.items()
-    ]
-    list(map(EsimAsset.batch_delete, combined_duplicates.values()))
+def main(context: Any = None) -> None:
+    """Main
 
+    Args:
+        context (Any): lambda event context. default: None, no time limit.
+    """
+    scheduler = WorkScheduler(
+        context,
+        CheckpointStore.from_env(dd_c.SERVICE_NAME),
+        {dd_c.ORIGINAL: dd_c.ORIGINAL_ESTIMATE_MS},
+    )
+    metrics = Metrics.shared()
+    with metrics.timer(dd_c.SNAPSHOT_METRIC):
+        inventory = AirTableSnapshot().table(dd_c.INVENTORY)
+    combined_duplicates = group_duplicates_by_original(inventory)
+    if combined_duplicates:
+        combined_duplicates = verify_duplicates(inventory, combined_duplicates)
     logger.info(
-        "Deduplicated esims: %s",
-        len(duplicated_esims) - len(combined_duplicates),
+        "Duplicate esims: %s",
+        sum(len(duplicates) for duplicates in combined_duplicates.values()),
+    )
+
+    originals = scheduler.prioritize(
+        dd_c.ORIGINAL,
+        list(combined_duplicates),
+        key=lambda original: original.qr_sha,
     )
+    deduplicated = 0
+    for original in scheduler.iterate(
+        dd_c.ORIGINAL, originals, key=lambda original: original.qr_sha
+    ):
+        mark_duplicate_donation(original, combined_duplicates[original])
+        with metrics.timer(dd_c.DELETE_METRIC):
+            EsimAsset.batch_delete(
+                [
+                    duplicate.to_model()
+                    for duplicate in combined_duplicates[original]
+                ]
+            )
+        inventory.remove(
+            duplicate.id for duplicate in combined_duplicates[original]
+        )
+        deduplicated += len(combined_duplicates[original])
+    scheduler.finish()
+    with metrics.timer(dd_c.SAVE_METRIC):
+        inventory.save()
+    metrics.count(dd_c.DEDUPLICATED_METRIC, deduplicated)
+
+    logger.info("Deduplicated esims: %s", deduplicated)
 
 
 # pylint: disable=unused-argument
+@profiled(dd_c.SERVICE_NAME)
+@flushes_metrics(dd_c.SERVICE_NAME)
+@traced(dd_c.HANDLER_SPAN)
 def handler(event: dict, context: dict) -> None:
     """Lambda Handler
+    Stage metrics are flushed once the handler returns,
+    its spans are children of the handler span.
+    Profiled on demand, see esimslib.util.profiler.
 
     Args:
         event (dict): lambda trigger event.
@@ -84,12 +180,14 @@ def handler(event: dict, context: dict) -> None:
     Raises:
         Exception: if main service failed.
     """
+    init_api()
     try:
-        main()
+        main(context)
     except Exception as exc:
         logger.error("Deduplicate eSIMs Service Error: %s", exc)
         raise exc
 
 
 if __name__ == "__main__":
+    init_api()
     main()
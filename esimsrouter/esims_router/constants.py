@@ -8,16 +8,92 @@ class RouterConst:
 
     # Env Variables
     STATE_KEY = "LAMBDA_STATE_KEY"
+    ARCHIVE_PREFIX = "AWS_ARCHIVE_PREFIX"
+    MODE = "ROUTER_MODE"
+    SHARD_SIZE = "ROUTER_SHARD_SIZE"
 
-    # Lambda states
-    ON = "ON_{count}"
-    OFF = "OFF"
-    DELIMITER = "_"
-    MAX_COUNT = 15
+    # Service
+    SERVICE_NAME = "esims_router"
+
+    # Spans
+    HANDLER_SPAN = "router.handler"
+    PACKAGE_SPAN = "router.route_package"
+    FILE_SPAN = "router.route_file"
+
+    # Metrics
+    ROUTE_FILE_METRIC = "route_file"
+    QR_VALIDATE_METRIC = "qr_validate"
+    DELETE_METRIC = "dropbox_delete"
+    FILES_METRIC = "files_routed"
+    INVALID_TYPE_METRIC = "files_invalid_type"
+    INVALID_FILES_METRIC = "files_invalid"
+    VALID_ESIMS_METRIC = "esims_valid"
+
+    # Run lease
+    REQUEST_ID = "aws_request_id"
+    PACKAGE_LOCK = "{}-{}"
+
+    # Modes
+    SINGLE = "single"
+    COORDINATOR = "coordinator"
+    WORKER = "worker"
+
+    # Shards
+    DEFAULT_SHARD_SIZE = "25"
+    PATHS = "paths"
+    RECORDS = "Records"
+    BODY = "body"
+    LOCKED_RETRY_SECONDS = 60
+    INVALID_FILES = "esims_router_invalid_{}"
+    INVALID = "invalid"
 
     # Root Folder
     DBX_PATH = "/ESims for Gaza/Fresh Sims to Load in Airtable/{}"
 
+    # Scheduler items
+    PACKAGE = "package"
+    FILE = "file"
+    FILE_ESTIMATE_MS = 10000.0
+
+    # Concurrency
+    MAX_LISTINGS_IN_FLIGHT = 16
+    MAX_PACKAGES_IN_FLIGHT = 4
+    MAX_FILES_IN_FLIGHT = 16
+    ESIM_PROVIDER = "esim_provider"
+
     # Image validation
-    ACCEPTED_IMAGE_TYPES = ["png", "jpg", "jpeg"]
     LPA = "LPA:1$"
+
+    # Archive, Dropbox paths are absolute
+    PATH_SEPARATOR = "/"
+
+    # QR Artifact
+    ARTIFACT_KEY = "{}_qr.png"
+    SYMBOL_NAME = "{}_{}"
+    ARTIFACT_CONTENT_TYPE = "image/png"
+
+
+class PriorityConst:
+    """Package Priority Defines"""
+
+    # Priority classes, lower is more urgent
+    OUT_OF_STOCK = 0
+    LOW_STOCK = 1
+    IN_STOCK = 2
+    NAMES = {
+        OUT_OF_STOCK: "out_of_stock",
+        LOW_STOCK: "low_stock",
+        IN_STOCK: "in_stock",
+    }
+
+    # Provider stock
+    OUT_OF_STOCK_STATUSES = ("out of stock", "out", "empty")
+    LOW_STOCK_STATUSES = ("low stock", "low", "running low")
+    LOW_STOCK_THRESHOLD = 10
+
+    # Stats
+    PACKAGES = "packages"
+    FILES = "files"
+    VALID = "valid"
+    STARTED = "started"
+    FINISHED = "finished"
@@ -1,114 +1,177 @@
 """Main Service Driver"""
 
 import os
+import json
 import time
-
-from typing import List
-from functools import partial
-
-from esimslib.util import logger, QRCodeProcessor
-from esimslib.airtable import EsimPackage, EsimAsset
+import threading
+
+from typing import Any, List, Optional, Set, Tuple
+
+from esimslib.util import (
+    logger,
+    flushes_metrics,
+    is_supported_image,
+    Metrics,
+    QRCodeProcessor,
+    set_attributes,
+    timed,
+    traced,
+    ValidationEngine,
+)
+from esimslib.util.lease import LeaseLock
+from esimslib.util.profiler import profiled
+from esimslib.util.scheduler import CheckpointStore, WorkScheduler
+from esimslib.airtable import (
+    CommitLog,
+    EsimPackage,
+    EsimAsset,
+    idempotency_key,
+    init_api,
+)
 from esimslib.connectors import (
-    DropboxConnector,
-    S3Connector,
-    SSMConnector,
+    AsyncDropboxConnector,
+    AsyncRuntime,
+    AsyncS3Connector,
+    WorkQueue,
+    gather_bounded,
+    run_cpu,
+    run_io,
 )
+from esimslib.connectors.http_connector import UnsupportedContentError
 from esims_router.constants import RouterConst as r_c
+from esims_router.priority import PackageQueue, PriorityStats
 
+QRResult = Tuple[Optional[EsimAsset], Optional[bytes]]
 
-class LambdaState:
-    """Manage Lambda State"""
-
-    def __init__(self) -> None:
-        """Initialize LambdaState"""
-        self.ssm = SSMConnector()
-        self.state_key = os.getenv(r_c.STATE_KEY)
-
-    def get_state(self) -> bool:
-        """Get Lambda State parameter in SSM
-
-        Returns:
-            bool: Lambda State.
-        """
-        state = self.ssm.get_parameter(self.state_key)
-        return state == r_c.OFF
-
-    def set_state(self, count: int) -> None:
-        """Set Lambda State parameter in SSM
 
-        Args:
-            count (int): Lambda State count.
-        """
-        self.ssm.update_parameter(self.state_key, r_c.ON.format(count=count))
-        logger.info("Lambda Status Set.")
+@timed(r_c.QR_VALIDATE_METRIC)
+def validate_qr_assets(
+    esim_package: EsimPackage, file_path: str, data: bytes
+) -> List[QRResult]:
+    """Validate every QR symbol of an image and build their artifacts.
+    The image is decoded once for all symbols.
 
-    def audit_state(self) -> None:
-        """Audit current state if state is ON.
-        - Increment by 1 if < 15.
-        - Set to Off if > 15.
-        """
-        current_state = self.ssm.get_parameter(self.state_key)
-        if current_state == r_c.OFF:
-            return
-        count = int(current_state.split(r_c.DELIMITER)[1])
-        if count < r_c.MAX_COUNT:
-            count += 1
-            self.set_state(count)
-        else:
-            self.reset_state()
+    Args:
+        esim_package (EsimPackage): eSIM Package.
+        file_path (str): Dropbox file path.
+        data (bytes): QR Code image content.
 
-    def reset_state(self) -> None:
-        """Reset Lambda State parameter in SSM"""
-        self.ssm.update_parameter(self.state_key, r_c.OFF)
-        logger.info("Lambda Status Reset.")
+    Returns:
+        List[Tuple[EsimAsset | None, bytes | None]]: per QR symbol in
+            reading order, eSIM Asset and QR artifact if valid,
+            None and None otherwise.
+    """
+    provider = esim_package.esim_provider
+    results: List[QRResult] = []
+    with QRCodeProcessor(file_path, data=data) as processor:
+        for failed_rule in ValidationEngine.shared().validate(
+            processor, provider
+        ):
+            if failed_rule:
+                logger.warning(
+                    "Invalid QR symbol %s of %s: %s",
+                    len(results),
+                    file_path,
+                    failed_rule,
+                )
+                results.append((None, None))
+                continue
+            new_asset = EsimAsset()
+            new_asset.esim_package = esim_package
+            new_asset.qr_sha = processor.qr_sha
+            if provider.renewable:
+                new_asset.phone_number = processor.phone_number
+            artifact = processor.build_artifact(
+                include_phone=provider.renewable
+            )
+            results.append((new_asset, artifact))
+    return results
 
 
-def validate_file_type(file_path: str) -> bool:
-    """Validate file type
+@traced(r_c.FILE_SPAN, "file_path")
+async def route_file(
+    esim_package: EsimPackage,
+    dbx_connector: AsyncDropboxConnector,
+    s3_connector: AsyncS3Connector,
+    scheduler: WorkScheduler,
+    file_path: str,
+) -> Tuple[List[EsimAsset], bool]:
+    """Fetch, archive and validate a single Dropbox file.
+    File content is only held while the file is processed.
 
     Args:
+        esim_package (EsimPackage): eSIM Package.
+        dbx_connector (AsyncDropboxConnector): Dropbox Connector.
+        s3_connector (AsyncS3Connector): S3 Connector.
+        scheduler (WorkScheduler): time budget scheduler.
         file_path (str): Dropbox file path.
 
     Returns:
-        bool: True if file is an image.
+        Tuple[List[EsimAsset], bool]: eSIM Assets of the valid QR
+            symbols, and whether every symbol is valid.
+            No assets and False if deferred.
     """
-    if any(
-        file_path.endswith(image_type)
-        for image_type in r_c.ACCEPTED_IMAGE_TYPES
+    if not scheduler.admit_or_defer(r_c.FILE, file_path):
+        return [], False
+    with scheduler.track(r_c.FILE), Metrics.shared().timer(
+        r_c.ROUTE_FILE_METRIC
     ):
-        return True
-    return False
+        return await _route_file(
+            esim_package, dbx_connector, s3_connector, file_path
+        )
 
 
-def validate_qr_asset(esim_package: EsimPackage, image_url: str) -> EsimAsset:
-    """Validate QR Asset.
+async def _route_file(
+    esim_package: EsimPackage,
+    dbx_connector: AsyncDropboxConnector,
+    s3_connector: AsyncS3Connector,
+    file_path: str,
+) -> Tuple[List[EsimAsset], bool]:
+    """Fetch, archive and validate a single Dropbox file.
+    Files that are not a supported image type are rejected
+    from their first bytes, before the full download.
+    Each valid QR symbol artifact is uploaded under its own key,
+    named after the symbol index so keys are stable across runs.
 
     Args:
         esim_package (EsimPackage): eSIM Package.
-        image_url (str): QR Code image URL.
+        dbx_connector (AsyncDropboxConnector): Dropbox Connector.
+        s3_connector (AsyncS3Connector): S3 Connector.
+        file_path (str): Dropbox file path.
 
     Returns:
-        EsimAsset | None: eSIM Asset if valid.
-    """
-    new_asset = EsimAsset()
-    new_asset.esim_package = esim_package
-    new_asset.qr_code_image = image_url
-    processor = QRCodeProcessor(image_url)
-    if not processor.detect_qr():
-        return None
-    if not processor.validate_qr_code_protocol():
-        return None
-    if esim_package.esim_provider.smdp_domain:
-        if not processor.validate_smdp_domain(
-            esim_package.esim_provider.smdp_domain
-        ):
-            return None
-    new_asset.qr_sha = processor.qr_sha
-    if esim_package.esim_provider.renewable:
-        if not processor.detect_phone_number():
-            return None
-        new_asset.phone_number = processor.phone_number
-    return new_asset
+        Tuple[List[EsimAsset], bool]: eSIM Assets of the valid QR
+            symbols, and whether every symbol is valid.
+    """
+    try:
+        data = await dbx_connector.get_file(file_path, is_supported_image)
+    except UnsupportedContentError as exc:
+        logger.warning("Invalid file type %s: %s", file_path, exc)
+        Metrics.shared().count(r_c.INVALID_TYPE_METRIC)
+        return [], False
+    archive_prefix = os.getenv(r_c.ARCHIVE_PREFIX)
+    if archive_prefix:
+        archive_prefix = archive_prefix.rstrip(r_c.PATH_SEPARATOR)
+        await s3_connector.load_data(data, f"{archive_prefix}{file_path}")
+    results = await run_cpu(validate_qr_assets, esim_package, file_path, data)
+    artifact_name = os.path.splitext(file_path)[0]
+    valid_assets = []
+    for index, (new_asset, artifact) in enumerate(results):
+        if new_asset is None or artifact is None:
+            continue
+        # first symbol keeps the single QR artifact key
+        name = (
+            r_c.SYMBOL_NAME.format(artifact_name, index)
+            if index
+            else artifact_name
+        )
+        new_asset.qr_code_image = await s3_connector.load_data(
+            artifact,
+            r_c.ARTIFACT_KEY.format(name),
+            r_c.ARTIFACT_CONTENT_TYPE,
+        )
+        valid_assets.append(new_asset)
+    return valid_assets, len(valid_assets) == len(results)
 
 
 def deduplicate_assets(assets: List[EsimAsset]) -> List[EsimAsset]:
@@ -130,77 +193,450 @@ def deduplicate_assets(assets: List[EsimAsset]) -> List[EsimAsset]:
     return unique_esims
 
 
-def main() -> None:
-    """Main Service Driver."""
-    logger.info("Starting e-sims transport service")
-    esim_packages: List[EsimPackage] = EsimPackage.fetch_all()
+async def list_package(
+    esim_package: EsimPackage, dbx_connector: AsyncDropboxConnector
+) -> List[str]:
+    """List eSIM Package pending Dropbox files.
+
+    Args:
+        esim_package (EsimPackage): eSIM Package.
+        dbx_connector (AsyncDropboxConnector): Dropbox Connector.
+
+    Returns:
+        List[str]: pending Dropbox file paths.
+    """
+    folder = r_c.DBX_PATH.format(esim_package.name)
+    path_list = await dbx_connector.list_files(folder)
+    logger.info("Available Sims %s: %s", esim_package.name, len(path_list))
+    if path_list:
+        # fetch linked provider used for priority and validation
+        await run_io(getattr, esim_package, r_c.ESIM_PROVIDER)
+    return path_list
+
+
+@traced(r_c.PACKAGE_SPAN)
+async def route_package(
+    esim_package: EsimPackage,
+    path_list: List[str],
+    dbx_connector: AsyncDropboxConnector,
+    s3_connector: AsyncS3Connector,
+    scheduler: WorkScheduler,
+) -> Tuple[int, int, Optional[Set[str]]]:
+    """Route eSIM Package Dropbox files to AirTable.
+    Files left once the time budget runs low stay in Dropbox
+    and the package is deferred to the next invocation.
+    The stocking error flag is left to the caller, the files may be
+    a shard of the package.
+    Valid symbols of a file with invalid ones are routed too, the file
+    is kept in Dropbox for the stocking error flag and its routed
+    symbols are skipped by their idempotency keys on the next run.
+
+    Args:
+        esim_package (EsimPackage): eSIM Package.
+        path_list (List[str]): pending Dropbox file paths.
+        dbx_connector (AsyncDropboxConnector): Dropbox Connector.
+        s3_connector (AsyncS3Connector): S3 Connector.
+        scheduler (WorkScheduler): time budget scheduler.
+
+    Returns:
+        Tuple[int, int, Set[str] | None]: routed files and valid eSIMs
+            count, and invalid files. None if the package was deferred.
+    """
+    set_attributes(package=esim_package.name, files=len(path_list))
+    # a package needs the budget of at least one file
+    if not scheduler.admit(r_c.FILE):
+        scheduler.defer(r_c.PACKAGE, esim_package.id)
+        return 0, 0, None
+
+    # fetch, archive and validate dropbox files
+    routed_files = await gather_bounded(
+        r_c.MAX_FILES_IN_FLIGHT,
+        (
+            route_file(
+                esim_package, dbx_connector, s3_connector, scheduler, path
+            )
+            for path in path_list
+        ),
+    )
+    logger.info("Fetched Sims: %s", len(routed_files))
+    asset_keys = {
+        asset: idempotency_key(asset.qr_sha, path)
+        for path, (assets, _) in zip(path_list, routed_files)
+        for asset in assets
+    }
+    valid_esim_assets = deduplicate_assets(list(asset_keys))
+    logger.info("Valid Sims: %s", len(valid_esim_assets))
+
+    # upload to AirTable, skipping assets inserted by a failed run
+    await run_io(
+        CommitLog.shared(r_c.SERVICE_NAME).load_assets,
+        valid_esim_assets,
+        [asset_keys[asset] for asset in valid_esim_assets],
+    )
+    logger.info("Uploaded to AirTable: %s", esim_package.name)
+
+    # delete from Dropbox files with only valid symbols
+    valid_list = [
+        path for path, (_, valid) in zip(path_list, routed_files) if valid
+    ]
+
+    with Metrics.shared().timer(r_c.DELETE_METRIC):
+        job_id = await dbx_connector.delete_batch(valid_list)
+        await dbx_connector.wait_delete_job(job_id)
+
+    # Check if invalid, deferred files are checked next invocation
+    deferred_list = set(path_list) & set(scheduler.deferred(r_c.FILE))
+    if deferred_list:
+        scheduler.defer(r_c.PACKAGE, esim_package.id)
+    invalid_list = set(path_list) - set(valid_list) - deferred_list
+    metrics = Metrics.shared()
+    metrics.count(r_c.FILES_METRIC, len(path_list) - len(deferred_list))
+    metrics.count(r_c.INVALID_FILES_METRIC, len(invalid_list))
+    metrics.count(r_c.VALID_ESIMS_METRIC, len(valid_esim_assets))
+    logger.info("Esims Uploaded Successfully: %s", esim_package.name)
+    return (
+        len(path_list) - len(deferred_list),
+        len(valid_esim_assets),
+        invalid_list,
+    )
+
+
+async def update_stock_err(
+    esim_package: EsimPackage, invalid_list: Optional[Set[str]]
+) -> None:
+    """Set stocking error flag if the package has invalid files,
+    reset it otherwise.
+
+    Args:
+        esim_package (EsimPackage): eSIM Package.
+        invalid_list (Set[str] | None): package invalid files.
+            None to leave the flag as is.
+    """
+    if invalid_list is None:
+        return
+    if invalid_list:
+        await run_io(esim_package.set_stock_err)
+    else:
+        await run_io(esim_package.reset_stock_err)
+
+
+def merge_invalid_files(
+    package_id: str,
+    pending: Set[str],
+    routed_list: Set[str],
+    invalid_list: Set[str],
+) -> Set[str]:
+    """Merge shard invalid files into the package invalid files.
+    Shards of a package are routed one at a time under its lock, so
+    invalid files recorded by earlier shards, still in the package
+    folder and not routed again, are kept.
+
+    Args:
+        package_id (str): eSIM Package ID.
+        pending (Set[str]): package folder files.
+        routed_list (Set[str]): shard files routed.
+        invalid_list (Set[str]): shard invalid files.
+
+    Returns:
+        Set[str]: package invalid files.
+    """
+    store = CheckpointStore.from_env(r_c.INVALID_FILES.format(package_id))
+    recorded = set(store.load().get(r_c.INVALID, []))
+    package_invalid = ((recorded & pending) - routed_list) | invalid_list
+    store.save({r_c.INVALID: sorted(package_invalid)})
+    return package_invalid
+
+
+async def route_queued_package(
+    entry: Tuple[EsimPackage, List[str], int],
+    dbx_connector: AsyncDropboxConnector,
+    s3_connector: AsyncS3Connector,
+    scheduler: WorkScheduler,
+    stats: PriorityStats,
+) -> None:
+    """Route queued eSIM Package and record its priority class stats.
+
+    Args:
+        entry (Tuple[EsimPackage, List[str], int]): package, pending
+            files and priority class.
+        dbx_connector (AsyncDropboxConnector): Dropbox Connector.
+        s3_connector (AsyncS3Connector): S3 Connector.
+        scheduler (WorkScheduler): time budget scheduler.
+        stats (PriorityStats): priority classes stats.
+    """
+    esim_package, path_list, priority = entry
+    started = time.monotonic()
+    files, valid, invalid_list = await route_package(
+        esim_package, path_list, dbx_connector, s3_connector, scheduler
+    )
+    await update_stock_err(esim_package, invalid_list)
+    stats.record(priority, files, valid, started)
+
+
+async def route_packages(
+    esim_packages: List[EsimPackage], scheduler: WorkScheduler
+) -> None:
+    """Route all eSIM Packages overlapping their network waits.
+    Packages are routed by stock priority, out of stock first.
+
+    Args:
+        esim_packages (List[EsimPackage]): eSIM Packages.
+        scheduler (WorkScheduler): time budget scheduler.
+    """
     # load connectors
-    dbx_connector = DropboxConnector()
-    s3_connector = S3Connector()
-    # iterate over esims
-    for esim_package in esim_packages:
-        logger.info("Processing: %s", esim_package.name)
+    dbx_connector = AsyncDropboxConnector()
+    s3_connector = AsyncS3Connector()
+
+    path_lists = await gather_bounded(
+        r_c.MAX_LISTINGS_IN_FLIGHT,
+        (
+            list_package(esim_package, dbx_connector)
+            for esim_package in esim_packages
+        ),
+    )
+    queue = PackageQueue(scheduler.resumed(r_c.PACKAGE))
+    for esim_package, path_list in zip(esim_packages, path_lists):
+        if path_list:
+            queue.push(esim_package, path_list)
+    logger.info("Packages with pending Sims: %s", len(queue))
+
+    stats = PriorityStats()
+    await gather_bounded(
+        r_c.MAX_PACKAGES_IN_FLIGHT,
+        (
+            route_queued_package(
+                entry, dbx_connector, s3_connector, scheduler, stats
+            )
+            for entry in queue.drain()
+        ),
+    )
+    stats.report()
+    ValidationEngine.shared().stats.report()
 
-        folder = r_c.DBX_PATH.format(esim_package.name)
-        path_list = dbx_connector.list_files(folder)
-        logger.info("Available Sims %s", len(path_list))
 
-        if not path_list:
-            continue
+def build_shards(
+    esim_package: EsimPackage, path_list: List[str], shard_size: int
+) -> List[dict]:
+    """Split package pending files into shards.
+
+    Args:
+        esim_package (EsimPackage): eSIM Package.
+        path_list (List[str]): pending Dropbox file paths.
+        shard_size (int): files per shard.
+
+    Returns:
+        List[dict]: shards of package ID and file paths.
+    """
+    return [
+        {
+            r_c.PACKAGE: esim_package.id,
+            r_c.PATHS: path_list[start : start + shard_size],
+        }
+        for start in range(0, len(path_list), shard_size)
+    ]
+
+
+async def enqueue_shards(
+    esim_packages: List[EsimPackage], queue: WorkQueue
+) -> None:
+    """List all package folders and queue shards of pending files
+    in stock priority order.
 
-        # validate file types
-        valid_types_list = list(filter(validate_file_type, path_list))
-
-        # fetch dropbox files' content
-        objects = [dbx_connector.get_file(path) for path in valid_types_list]
-        logger.info("Fetched Sims: %s", len(objects))
-
-        # load objects to S3
-        urls = [
-            s3_connector.load_data(obj, key)
-            for obj, key in zip(objects, valid_types_list)
-        ]
-        logger.info("S3 Loaded Sims: %s", len(urls))
-
-        # validate qr codes
-        partial_validate_qr_code = partial(validate_qr_asset, esim_package)
-        validated_assets = list(map(partial_validate_qr_code, urls))
-        valid_esim_assets = deduplicate_assets(
-            list(filter(None, validated_assets))
+    Args:
+        esim_packages (List[EsimPackage]): eSIM Packages.
+        queue (WorkQueue): shards work queue.
+    """
+    dbx_connector = AsyncDropboxConnector()
+    path_lists = await gather_bounded(
+        r_c.MAX_LISTINGS_IN_FLIGHT,
+        (
+            list_package(esim_package, dbx_connector)
+            for esim_package in esim_packages
+        ),
+    )
+    package_queue = PackageQueue()
+    for esim_package, path_list in zip(esim_packages, path_lists):
+        if path_list:
+            package_queue.push(esim_package, path_list)
+
+    shard_size = int(os.getenv(r_c.SHARD_SIZE, r_c.DEFAULT_SHARD_SIZE))
+    shards = [
+        shard
+        for esim_package, path_list, _ in package_queue.drain()
+        for shard in build_shards(esim_package, path_list, shard_size)
+    ]
+    await run_io(queue.send, shards)
+    logger.info("Shards queued: %s", len(shards))
+
+
+async def route_shard(
+    shard: dict,
+    dbx_connector: AsyncDropboxConnector,
+    s3_connector: AsyncS3Connector,
+    scheduler: WorkScheduler,
+) -> Tuple[Optional[dict], int]:
+    """Route a shard of package files under a per-package lock.
+    Files already routed by an earlier shard are skipped, and the
+    stocking error flag follows the invalid files of all its shards.
+
+    Args:
+        shard (dict): package ID and file paths.
+        dbx_connector (AsyncDropboxConnector): Dropbox Connector.
+        s3_connector (AsyncS3Connector): S3 Connector.
+        scheduler (WorkScheduler): time budget scheduler.
+
+    Returns:
+        Tuple[dict | None, int]: shard of files left to route and
+            its requeue delay in seconds. None if all routed.
+    """
+    if not scheduler.admit(r_c.FILE):
+        return shard, 0
+    lease = LeaseLock.from_env(
+        r_c.PACKAGE_LOCK.format(os.getenv(r_c.STATE_KEY), shard[r_c.PACKAGE])
+    )
+    if not await run_io(lease.acquire):
+        return shard, r_c.LOCKED_RETRY_SECONDS
+    lease.start_heartbeat()
+    try:
+        esim_package = await run_io(EsimPackage.from_id, shard[r_c.PACKAGE])
+        pending = set(await list_package(esim_package, dbx_connector))
+        path_list = [path for path in shard[r_c.PATHS] if path in pending]
+        if not path_list:
+            return None, 0
+        files, _, invalid_list = await route_package(
+            esim_package, path_list, dbx_connector, s3_connector, scheduler
         )
-        logger.info("Valid Sims: %s", len(valid_esim_assets))
-
-        # upload to AirTable
-        EsimAsset.load_records(valid_esim_assets)
-        logger.info("Uploaded to AirTable: %s", esim_package.name)
-
-        # delete from Dropbox
-        valid_list = [
-            valid_types_list[i]
-            for i, asset in enumerate(validated_assets)
-            if asset is not None
-        ]
-
-        job_id = dbx_connector.delete_batch(valid_list)
-        while not dbx_connector.check_delete_job_status(job_id):
-            time.sleep(3)
-            logger.info(
-                "Waiting for Dropbox delete job to finish...: %s",
-                esim_package.name,
+        deferred = set(scheduler.deferred(r_c.FILE))
+        # the package record is only shared under the package lock
+        if lease.lost.is_set():
+            invalid_list = None
+        if invalid_list is not None:
+            invalid_list = await run_io(
+                merge_invalid_files,
+                esim_package.id,
+                pending,
+                set(path_list) - deferred,
+                invalid_list,
             )
+        await update_stock_err(esim_package, invalid_list)
+    finally:
+        await run_io(lease.release)
 
-        # Check if invalid
-        invalid_list = bool(set(path_list) - set(valid_list))
-        if invalid_list:
-            esim_package.set_stock_err()
-        else:
-            esim_package.reset_stock_err()
-        logger.info("Esims Uploaded Successfully: %s", esim_package.name)
+    remaining = [path for path in path_list if not files or path in deferred]
+    if not remaining:
+        return None, 0
+    return {r_c.PACKAGE: esim_package.id, r_c.PATHS: remaining}, 0
+
+
+async def route_shards(
+    shards: List[dict], queue: WorkQueue, scheduler: WorkScheduler
+) -> None:
+    """Route shards and requeue the files left in them.
+
+    Args:
+        shards (List[dict]): shards of package ID and file paths.
+        queue (WorkQueue): shards work queue.
+        scheduler (WorkScheduler): time budget scheduler.
+    """
+    dbx_connector = AsyncDropboxConnector()
+    s3_connector = AsyncS3Connector()
+    results = await gather_bounded(
+        r_c.MAX_PACKAGES_IN_FLIGHT,
+        (
+            route_shard(shard, dbx_connector, s3_connector, scheduler)
+            for shard in shards
+        ),
+    )
+    for remainder, delay_seconds in results:
+        if remainder:
+            await run_io(queue.send, [remainder], delay_seconds)
+
+
+async def poll_shards(queue: WorkQueue, scheduler: WorkScheduler) -> None:
+    """Route shards received from the queue while the budget allows.
 
+    Args:
+        queue (WorkQueue): shards work queue.
+        scheduler (WorkScheduler): time budget scheduler.
+    """
+    while scheduler.admit(r_c.FILE):
+        messages = await run_io(queue.receive)
+        if not messages:
+            return
+        await route_shards(
+            [message for _, message in messages], queue, scheduler
+        )
+        for receipt, _ in messages:
+            await run_io(queue.ack, receipt)
+
+
+def work_queue() -> WorkQueue:
+    """Shards work queue, in memory only in the in-process mode.
+
+    Returns:
+        WorkQueue: shards work queue.
+    """
+    return WorkQueue.from_env(os.getenv(r_c.MODE, r_c.SINGLE) == r_c.SINGLE)
+
+
+def coordinate() -> None:
+    """Coordinator Driver, queues shards of pending files."""
+    logger.info("Starting e-sims transport coordinator")
+    esim_packages: List[EsimPackage] = EsimPackage.fetch_all()
+    AsyncRuntime.run(enqueue_shards(esim_packages, work_queue()))
+
+
+def work(event: Optional[dict] = None, context: Any = None) -> None:
+    """Worker Driver, routes shards from the trigger event
+    or polled from the queue.
 
-# pylint: disable=unused-argument
+    Args:
+        event (dict | None): queue trigger event. default: None, poll.
+        context (Any): lambda event context. default: None, no time limit.
+    """
+    logger.info("Starting e-sims transport worker")
+    scheduler = WorkScheduler(
+        context, estimates_ms={r_c.FILE: r_c.FILE_ESTIMATE_MS}
+    )
+    queue = work_queue()
+    records = (event or {}).get(r_c.RECORDS)
+    if records:
+        shards = [json.loads(record[r_c.BODY]) for record in records]
+        AsyncRuntime.run(route_shards(shards, queue, scheduler))
+    else:
+        AsyncRuntime.run(poll_shards(queue, scheduler))
+
+
+def main(
+    context: Any = None, cancelled: Optional[threading.Event] = None
+) -> None:
+    """Main Service Driver.
+    Routing stops between files once cancelled, e.g. run lease lost.
+
+    Args:
+        context (Any): lambda event context. default: None, no time limit.
+        cancelled (threading.Event | None): cancel event. default: None.
+    """
+    logger.info("Starting e-sims transport service")
+    scheduler = WorkScheduler(
+        context,
+        CheckpointStore.from_env(r_c.SERVICE_NAME),
+        {r_c.FILE: r_c.FILE_ESTIMATE_MS},
+        cancelled,
+    )
+    esim_packages: List[EsimPackage] = EsimPackage.fetch_all()
+    AsyncRuntime.run(route_packages(esim_packages, scheduler))
+    scheduler.finish()
+
+
+@profiled(r_c.SERVICE_NAME)
+@flushes_metrics(r_c.SERVICE_NAME)
+@traced(r_c.HANDLER_SPAN)
 def handler(event: dict, context: dict) -> None:
     """Lambda Handler
+    Stage metrics are flushed once the handler returns,
+    its spans are children of the handler span.
+    Profiled on demand, see esimslib.util.profiler.
 
     Args:
         event (dict): lambda trigger event.
@@ -209,21 +645,32 @@ def handler(event: dict, context: dict) -> None:
     Raises:
         Exception: if main service failed.
     """
-    state = LambdaState()
-    if state.get_state():
-        try:
-            state.set_state(0)
-            main()
-            logger.info("Finished main service driver")
-            state.reset_state()
-        except Exception as exc:
-            logger.error("Main Service Driver Error: %s", exc)
-            state.reset_state()
-            raise exc
-    else:
-        state.audit_state()
+    init_api()
+    mode = os.getenv(r_c.MODE, r_c.SINGLE)
+    set_attributes(mode=mode)
+    if mode == r_c.WORKER:
+        work(event, context)
+        return
+    lease = LeaseLock.from_env(
+        os.getenv(r_c.STATE_KEY), getattr(context, r_c.REQUEST_ID, None)
+    )
+    if not lease.acquire():
         logger.info("Esims Router already running. Skipping ...")
+        return
+    lease.start_heartbeat()
+    try:
+        if mode == r_c.COORDINATOR:
+            coordinate()
+        else:
+            main(context, lease.lost)
+        logger.info("Finished main service driver")
+    except Exception as exc:
+        logger.error("Main Service Driver Error: %s", exc)
+        raise exc
+    finally:
+        lease.release()
 
 
 if __name__ == "__main__":
+    init_api()
     main()
@@ -0,0 +1,140 @@
+"""Stock-aware Package Priority"""
+
+import heapq
+import itertools
+import time
+from typing import Dict, Iterator, List, Set, Tuple
+
+from esimslib.util import logger
+from esimslib.airtable import EsimPackage, EsimProvider
+
+from esims_router.constants import PriorityConst as pr_c
+
+
+def classify_provider(esim_provider: EsimProvider) -> int:
+    """Classify provider stock into a priority class.
+
+    Args:
+        esim_provider (EsimProvider): eSIM Provider.
+
+    Returns:
+        int: priority class, lower is more urgent.
+    """
+    stock_status = (esim_provider.stock_status or "").strip().lower()
+    in_stock = esim_provider.in_stock or 0
+    if in_stock == 0 or stock_status in pr_c.OUT_OF_STOCK_STATUSES:
+        return pr_c.OUT_OF_STOCK
+    if in_stock < pr_c.LOW_STOCK_THRESHOLD or (
+        stock_status in pr_c.LOW_STOCK_STATUSES
+    ):
+        return pr_c.LOW_STOCK
+    return pr_c.IN_STOCK
+
+
+class PackageQueue:
+    """Priority queue of packages with pending Dropbox files.
+    Ordered by stock priority class, then packages resumed from a
+    checkpoint, automatic restock providers and pending files count.
+    """
+
+    def __init__(self, resumed: Set[str] = None) -> None:
+        """Initialize PackageQueue.
+
+        Args:
+            resumed (Set[str]): package ids deferred by the previous
+                invocation. default: None.
+        """
+        self.resumed = resumed or set()
+        self._heap: list = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Number of queued packages.
+
+        Returns:
+            int: queued packages count.
+        """
+        return len(self._heap)
+
+    def push(self, esim_package: EsimPackage, path_list: List[str]) -> None:
+        """Queue package with its pending files.
+
+        Args:
+            esim_package (EsimPackage): eSIM Package.
+            path_list (List[str]): pending Dropbox file paths.
+        """
+        esim_provider = esim_package.esim_provider
+        priority = classify_provider(esim_provider)
+        heapq.heappush(
+            self._heap,
+            (
+                priority,
+                esim_package.id not in self.resumed,
+                not esim_provider.automatic_restock,
+                -len(path_list),
+                next(self._counter),
+                esim_package,
+                path_list,
+            ),
+        )
+
+    def drain(self) -> Iterator[Tuple[EsimPackage, List[str], int]]:
+        """Pop packages in priority order.
+
+        Yields:
+            Tuple[EsimPackage, List[str], int]: package, pending files
+                and priority class.
+        """
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            yield entry[-2], entry[-1], entry[0]
+
+
+class PriorityStats:
+    """Routing throughput per priority class."""
+
+    def __init__(self) -> None:
+        """Initialize PriorityStats."""
+        self._stats: Dict[int, Dict[str, float]] = {}
+
+    def record(
+        self, priority: int, files: int, valid: int, started: float
+    ) -> None:
+        """Record a routed package.
+
+        Args:
+            priority (int): package priority class.
+            files (int): files routed.
+            valid (int): valid eSIMs loaded.
+            started (float): package start monotonic time.
+        """
+        stats = self._stats.setdefault(
+            priority,
+            {
+                pr_c.PACKAGES: 0,
+                pr_c.FILES: 0,
+                pr_c.VALID: 0,
+                pr_c.STARTED: started,
+                pr_c.FINISHED: started,
+            },
+        )
+        stats[pr_c.PACKAGES] += 1
+        stats[pr_c.FILES] += files
+        stats[pr_c.VALID] += valid
+        stats[pr_c.STARTED] = min(stats[pr_c.STARTED], started)
+        stats[pr_c.FINISHED] = max(stats[pr_c.FINISHED], time.monotonic())
+
+    def report(self) -> None:
+        """Log throughput per priority class."""
+        for priority, stats in sorted(self._stats.items()):
+            elapsed = max(stats[pr_c.FINISHED] - stats[pr_c.STARTED], 1e-3)
+            logger.info(
+                "Priority %s: packages %d, files %d, valid %d, "
+                "%.1fs, %.2f files/s",
+                pr_c.NAMES[priority],
+                stats[pr_c.PACKAGES],
+                stats[pr_c.FILES],
+                stats[pr_c.VALID],
+                elapsed,
+                stats[pr_c.FILES] / elapsed,
+            )
@@ -0,0 +1 @@
+"""eSIMs Router Tests"""
@@ -0,0 +1,19 @@
+"""Tests setup
+
+AirTable models read their base and API key from the environment and
+SSM once imported, they are imported here with a placeholder key so
+tests run without AWS access. API calls are stubbed by each test.
+"""
+
+import os
+import importlib
+from unittest import mock
+
+from esimslib.connectors.aws_connector import SSMConnector
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AIRTABLE_BASE_ID", "appTests")
+os.environ.setdefault("AIRTABLE_API_KEY", "/tests/airtable")  # nosec
+
+with mock.patch.object(SSMConnector, "get_parameter", return_value="key"):
+    importlib.import_module("esimslib.airtable")
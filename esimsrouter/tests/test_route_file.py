@@ -0,0 +1,158 @@
+"""Router File Routing tests"""
+
+import os
+import asyncio
+import unittest
+from typing import Iterator, List, Optional
+from unittest import mock
+
+from esims_router import main
+from esims_router.constants import RouterConst as r_c
+
+FILE_PATH = "/pkg/sheet.png"
+
+
+class ProcessorStub:
+    """QRCodeProcessor stub over the symbols of a sheet."""
+
+    def __init__(self, symbols: List[Optional[str]]) -> None:
+        """Initialize ProcessorStub.
+
+        Args:
+            symbols (List[str | None]): failed rule per symbol,
+                None if valid.
+        """
+        self.symbols = symbols
+        self.index = 0
+
+    def __enter__(self) -> "ProcessorStub":
+        """Enter processor context.
+
+        Returns:
+            ProcessorStub: processor.
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Exit processor context."""
+
+    @property
+    def qr_sha(self) -> str:
+        """Selected symbol QR SHA.
+
+        Returns:
+            str: QR SHA.
+        """
+        return f"sha{self.index}"
+
+    def build_artifact(self, include_phone: bool = False) -> bytes:
+        """Build selected symbol artifact.
+
+        Args:
+            include_phone (bool): include phone number.
+
+        Returns:
+            bytes: QR artifact.
+        """
+        return f"artifact{self.index}{include_phone}".encode()
+
+    def validate(self) -> Iterator[Optional[str]]:
+        """Validate sheet symbols, selecting each in turn.
+
+        Yields:
+            str | None: failed rule per symbol, None if valid.
+        """
+        for index, failed_rule in enumerate(self.symbols):
+            self.index = index
+            yield failed_rule
+
+
+class TestRouteFile(unittest.TestCase):
+    """validate_qr_assets and _route_file tests."""
+
+    def route(self, symbols: List[Optional[str]]) -> tuple:
+        """Route a sheet with stubbed fetch, validation and upload.
+
+        Args:
+            symbols (List[str | None]): failed rule per symbol,
+                None if valid.
+
+        Returns:
+            tuple: routed assets, file valid and uploaded keys.
+        """
+        processor = ProcessorStub(symbols)
+        esim_package = main.EsimPackage(id="recPackage")
+        dbx_connector = mock.Mock(get_file=mock.AsyncMock(return_value=b""))
+        s3_connector = mock.Mock(
+            load_data=mock.AsyncMock(side_effect=lambda *args: args[1])
+        )
+        with mock.patch.object(
+            main, "QRCodeProcessor", return_value=processor
+        ), mock.patch.object(
+            main.ValidationEngine,
+            "shared",
+            return_value=mock.Mock(
+                validate=mock.Mock(side_effect=lambda *_: processor.validate())
+            ),
+        ), mock.patch.object(
+            main, "run_cpu", side_effect=self.run_inline
+        ), mock.patch.object(
+            main.EsimPackage,
+            "esim_provider",
+            new_callable=mock.PropertyMock,
+            return_value=mock.Mock(renewable=False),
+        ):
+            assets, valid = asyncio.run(
+                main._route_file(  # pylint: disable=protected-access
+                    esim_package, dbx_connector, s3_connector, FILE_PATH
+                )
+            )
+        keys = [call.args[1] for call in s3_connector.load_data.call_args_list]
+        return assets, valid, keys
+
+    @staticmethod
+    async def run_inline(func: object, *args: object) -> object:
+        """Run CPU work inline.
+
+        Args:
+            func (object): function.
+            args (object): function arguments.
+
+        Returns:
+            object: function result.
+        """
+        return func(*args)  # type: ignore
+
+    def test_valid_sheet(self) -> None:
+        """Every symbol of a valid sheet is routed and the file valid."""
+        assets, valid, keys = self.route([None, None])
+        self.assertTrue(valid)
+        self.assertEqual([asset.qr_sha for asset in assets], ["sha0", "sha1"])
+        self.assertEqual(
+            keys,
+            [r_c.ARTIFACT_KEY.format("/pkg/sheet"), "/pkg/sheet_1_qr.png"],
+        )
+
+    def test_invalid_symbol(self) -> None:
+        """Valid symbols of a sheet with an invalid one are routed, keep
+        their symbol index key, and the file is not valid.
+        """
+        assets, valid, keys = self.route([None, "smdp_domain", None])
+        self.assertFalse(valid)
+        self.assertEqual([asset.qr_sha for asset in assets], ["sha0", "sha2"])
+        self.assertEqual(keys, ["/pkg/sheet_qr.png", "/pkg/sheet_2_qr.png"])
+
+    def test_archive(self) -> None:
+        """Files are archived under the prefix with a single separator."""
+        for prefix in ("archive", "archive/"):
+            with self.subTest(prefix), mock.patch.dict(
+                os.environ, {r_c.ARCHIVE_PREFIX: prefix}
+            ):
+                _, _, keys = self.route([None])
+            self.assertEqual(
+                keys, ["archive/pkg/sheet.png", "/pkg/sheet_qr.png"]
+            )
+
+    def test_no_symbol(self) -> None:
+        """A sheet without symbols is not valid."""
+        self.assertEqual(self.route(["qr_detected"]), ([], False, []))
@@ -0,0 +1,318 @@
+"""Router Shards tests"""
+
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import unittest
+from typing import Dict, List, Optional, Set, Tuple, cast
+from unittest import mock
+
+from esimslib.connectors import LocalDirQueue
+from esimslib.util.constants import LeaseConst as ls_c
+from esimslib.util.constants import SchedulerConst as sch_c
+from esimslib.util.lease import LeaseLock
+from esimslib.util.scheduler import WorkScheduler
+from esimslib.connectors.constants import QueueConst as q_c
+
+from esims_router import main
+from esims_router.constants import RouterConst as r_c
+
+STATE_KEY = "/esims/router"
+
+
+def package(package_id: str, in_stock: int) -> mock.Mock:
+    """Build an eSIM Package with its provider stock.
+
+    Args:
+        package_id (str): package ID.
+        in_stock (int): provider eSIMs in stock.
+
+    Returns:
+        mock.Mock: eSIM Package.
+    """
+    return mock.Mock(
+        id=package_id,
+        esim_provider=mock.Mock(
+            stock_status="", in_stock=in_stock, automatic_restock=False
+        ),
+    )
+
+
+class DropboxStub:
+    """Package folders listing and routing stub."""
+
+    def __init__(self, folders: Dict[str, List[str]]) -> None:
+        """Initialize DropboxStub.
+
+        Args:
+            folders (Dict[str, List[str]]): pending files by package ID.
+        """
+        self.folders = folders
+        self.invalid: Set[str] = set()
+        self.deferred: Set[str] = set()
+        self.routed: List[List[str]] = []
+
+    async def list_package(self, esim_package: mock.Mock, _: object) -> list:
+        """List package pending files.
+
+        Args:
+            esim_package (mock.Mock): eSIM Package.
+
+        Returns:
+            list: pending file paths.
+        """
+        return list(self.folders.get(esim_package.id, []))
+
+    async def route_package(
+        self,
+        esim_package: mock.Mock,
+        path_list: List[str],
+        *args: object,
+    ) -> Tuple[int, int, Optional[Set[str]]]:
+        """Route package files, leaving the invalid and deferred ones.
+
+        Args:
+            esim_package (mock.Mock): eSIM Package.
+            path_list (List[str]): file paths to route.
+            args (object): connectors and scheduler.
+
+        Returns:
+            Tuple[int, int, Set[str] | None]: routed files and valid
+                eSIMs count, and invalid files.
+        """
+        scheduler = cast(WorkScheduler, args[-1])
+        self.routed.append(path_list)
+        folder = self.folders[esim_package.id]
+        for path in path_list:
+            if path in self.deferred:
+                scheduler.defer(r_c.FILE, path)
+            elif path not in self.invalid:
+                folder.remove(path)
+        routed = [path for path in path_list if path not in self.deferred]
+        invalid = set(routed) & self.invalid
+        return len(routed), len(routed) - len(invalid), invalid
+
+
+class TestShards(unittest.TestCase):
+    """Coordinator and worker shards tests."""
+
+    def setUp(self) -> None:
+        """Create lease, checkpoint and queue directories and stub
+        the package listing, routing and records.
+        """
+        self.state_dir = tempfile.mkdtemp()
+        self.queue_dir = os.path.join(self.state_dir, "queue")
+        self.dropbox = DropboxStub({"pkgA": ["/a0.png", "/a1.png"]})
+        self.stock_err: List[Optional[Set[str]]] = []
+
+        async def update_stock_err(
+            _: mock.Mock, invalid_list: Optional[Set[str]]
+        ) -> None:
+            """Record the stocking error update.
+
+            Args:
+                invalid_list (Set[str] | None): package invalid files.
+            """
+            self.stock_err.append(invalid_list)
+
+        patches = [
+            mock.patch.dict(
+                os.environ,
+                {
+                    ls_c.LEASE_DIR: self.state_dir,
+                    sch_c.CHECKPOINT_DIR: self.state_dir,
+                    q_c.QUEUE_DIR: self.queue_dir,
+                    r_c.STATE_KEY: STATE_KEY,
+                    r_c.MODE: "worker",
+                    r_c.SHARD_SIZE: "1",
+                },
+            ),
+            mock.patch.object(main, "list_package", self.dropbox.list_package),
+            mock.patch.object(
+                main, "route_package", self.dropbox.route_package
+            ),
+            mock.patch.object(main, "update_stock_err", update_stock_err),
+            mock.patch.object(
+                main.EsimPackage, "from_id", side_effect=self.package
+            ),
+            mock.patch.object(main, "AsyncDropboxConnector"),
+            mock.patch.object(main, "AsyncS3Connector"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self) -> None:
+        """Remove state directories."""
+        shutil.rmtree(self.state_dir)
+
+    @staticmethod
+    def package(package_id: str) -> mock.Mock:
+        """Fetch an in stock eSIM Package.
+
+        Args:
+            package_id (str): package ID.
+
+        Returns:
+            mock.Mock: eSIM Package.
+        """
+        return package(package_id, in_stock=100)
+
+    @staticmethod
+    def lease(package_id: str, owner: str) -> LeaseLock:
+        """Package lease lock of another owner.
+
+        Args:
+            package_id (str): package ID.
+            owner (str): owner ID.
+
+        Returns:
+            LeaseLock: package lease lock.
+        """
+        return LeaseLock.from_env(
+            r_c.PACKAGE_LOCK.format(STATE_KEY, package_id), owner=owner
+        )
+
+    def route_shard(
+        self, paths: List[str], package_id: str = "pkgA"
+    ) -> Tuple[Optional[dict], int]:
+        """Route a shard of package files.
+
+        Args:
+            paths (List[str]): shard file paths.
+            package_id (str): package ID.
+
+        Returns:
+            Tuple[dict | None, int]: shard left and requeue delay.
+        """
+        return asyncio.run(
+            main.route_shard(
+                {r_c.PACKAGE: package_id, r_c.PATHS: paths},
+                mock.Mock(),
+                mock.Mock(),
+                WorkScheduler(),
+            )
+        )
+
+    def queued(self) -> List[dict]:
+        """Receive and acknowledge all queued shards.
+
+        Returns:
+            List[dict]: queued shards.
+        """
+        queue = LocalDirQueue(self.queue_dir)
+        received = queue.receive()
+        for receipt, _ in received:
+            queue.ack(receipt)
+        return [shard for _, shard in received]
+
+    def test_route_shard(self) -> None:
+        """A routed shard is done, its lease released and the stocking
+        error flag follows its invalid files.
+        """
+        self.dropbox.invalid = {"/a1.png"}
+        self.assertEqual(self.route_shard(["/a0.png", "/a1.png"]), (None, 0))
+        self.assertEqual(self.stock_err, [{"/a1.png"}])
+        self.assertTrue(self.lease("pkgA", "other").acquire())
+
+    def test_skip_routed_files(self) -> None:
+        """Files no longer in the package folder are skipped."""
+        self.assertEqual(self.route_shard(["/a0.png", "/gone.png"]), (None, 0))
+        self.assertEqual(self.dropbox.routed, [["/a0.png"]])
+        self.assertEqual(self.route_shard(["/a0.png"]), (None, 0))
+        self.assertEqual(self.dropbox.routed, [["/a0.png"]])
+
+    def test_package_locked(self) -> None:
+        """A shard of a package locked by another worker is requeued
+        after the lock retry delay.
+        """
+        self.assertTrue(self.lease("pkgA", "other").acquire())
+        shard = {r_c.PACKAGE: "pkgA", r_c.PATHS: ["/a0.png"]}
+        self.assertEqual(
+            self.route_shard(["/a0.png"]), (shard, r_c.LOCKED_RETRY_SECONDS)
+        )
+        self.assertEqual(self.dropbox.routed, [])
+
+    def test_deferred_files(self) -> None:
+        """Deferred files are left in the shard."""
+        self.dropbox.deferred = {"/a1.png"}
+        self.assertEqual(
+            self.route_shard(["/a0.png", "/a1.png"]),
+            ({r_c.PACKAGE: "pkgA", r_c.PATHS: ["/a1.png"]}, 0),
+        )
+        self.assertEqual(self.stock_err, [set()])
+
+    def test_invalid_files_across_shards(self) -> None:
+        """Invalid files of earlier shards keep the stocking error flag
+        until they leave the package folder.
+        """
+        self.dropbox.invalid = {"/a0.png"}
+        self.route_shard(["/a0.png"])
+        self.route_shard(["/a1.png"])
+        self.dropbox.folders["pkgA"].remove("/a0.png")
+        self.dropbox.folders["pkgA"].append("/a2.png")
+        self.route_shard(["/a2.png"])
+        self.assertEqual(self.stock_err, [{"/a0.png"}, {"/a0.png"}, set()])
+
+    def test_coordinate(self) -> None:
+        """Shards of pending files are queued in stock priority order."""
+        self.dropbox.folders = {
+            "pkgA": ["/a0.png"],
+            "pkgB": ["/b0.png", "/b1.png"],
+            "pkgC": [],
+        }
+        packages = [
+            package("pkgA", in_stock=100),
+            package("pkgB", in_stock=0),
+            package("pkgC", in_stock=0),
+        ]
+        with mock.patch.object(
+            main.EsimPackage, "fetch_all", return_value=packages
+        ):
+            main.coordinate()
+        self.assertEqual(
+            sorted(
+                (shard[r_c.PACKAGE], shard[r_c.PATHS])
+                for shard in self.queued()
+            ),
+            [
+                ("pkgA", ["/a0.png"]),
+                ("pkgB", ["/b0.png"]),
+                ("pkgB", ["/b1.png"]),
+            ],
+        )
+
+    def test_work_event(self) -> None:
+        """Shards of the trigger event are routed and the files left
+        requeued.
+        """
+        self.dropbox.deferred = {"/a1.png"}
+        shard = {r_c.PACKAGE: "pkgA", r_c.PATHS: ["/a0.png", "/a1.png"]}
+        main.work({r_c.RECORDS: [{r_c.BODY: json.dumps(shard)}]})
+        self.assertEqual(
+            self.queued(), [{r_c.PACKAGE: "pkgA", r_c.PATHS: ["/a1.png"]}]
+        )
+
+    def test_work_poll(self) -> None:
+        """Queued shards are polled, routed and acknowledged, a shard
+        of a package locked by a concurrent shard is requeued.
+        """
+        self.dropbox.folders["pkgB"] = ["/b0.png"]
+        LocalDirQueue(self.queue_dir).send(
+            [
+                {r_c.PACKAGE: "pkgA", r_c.PATHS: ["/a0.png"]},
+                {r_c.PACKAGE: "pkgA", r_c.PATHS: ["/a1.png"]},
+                {r_c.PACKAGE: "pkgB", r_c.PATHS: ["/b0.png"]},
+            ]
+        )
+        main.work()
+        self.assertEqual(len(self.dropbox.folders["pkgA"]), 1)
+        self.assertEqual(self.dropbox.folders["pkgB"], [])
+        self.assertEqual(
+            os.listdir(os.path.join(self.queue_dir, q_c.CLAIMED)), []
+        )
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.queue_dir, q_c.PENDING))), 1
+        )
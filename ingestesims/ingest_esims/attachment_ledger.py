@@ -0,0 +1,121 @@
+"""Attachment Ledger"""
+
+import os
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from esimslib.util import Journal
+from esimslib.util.s3_journal import S3Journal
+from esimslib.airtable import EsimAsset
+from esimslib.connectors import S3Connector
+
+from ingest_esims.constants import (
+    IngestSimsConst as is_c,
+    LedgerConst as lg_c,
+)
+
+
+def attachment_key(attachment_: dict) -> str:
+    """Ledger key of an attachment, its ID, size and filename.
+
+    Args:
+        attachment_ (dict): AirTable attachment.
+
+    Returns:
+        str: attachment key.
+    """
+    return lg_c.KEY_FORMAT.format(
+        attachment_.get(lg_c.ID),
+        attachment_.get(lg_c.SIZE),
+        attachment_.get(lg_c.FILENAME),
+    )
+
+
+def attachments_signature(attachments: List[dict]) -> str:
+    """Signature of a donation attachments set.
+
+    Args:
+        attachments (List[dict]): AirTable attachments.
+
+    Returns:
+        str: attachments signature.
+    """
+    keys = sorted(attachment_key(attachment_) for attachment_ in attachments)
+    return hashlib.sha256(
+        lg_c.SIGNATURE_SEPARATOR.join(keys).encode(lg_c.UTF8)
+    ).hexdigest()[: lg_c.SIGNATURE_LENGTH]
+
+
+class AttachmentLedger:
+    """Validation outcomes of processed attachments.
+    Re-ingested donations only download and decode new attachments.
+    """
+
+    def __init__(self, journal: Journal) -> None:
+        """Initialize AttachmentLedger.
+
+        Args:
+            journal (Journal): outcomes journal.
+        """
+        self.journal = journal
+
+    @classmethod
+    def from_env(cls) -> "AttachmentLedger":
+        """Create ledger.
+        Stored in S3 if INGEST_LEDGER_PREFIX is set, on local disk otherwise.
+
+        Returns:
+            AttachmentLedger: attachment ledger.
+        """
+        prefix = os.getenv(is_c.LEDGER_PREFIX)
+        if prefix:
+            return cls(S3Journal(S3Connector(), prefix))
+        return cls(
+            Journal(os.getenv(is_c.LEDGER_PATH, is_c.DEFAULT_LEDGER_PATH))
+        )
+
+    def get(self, attachment_: dict) -> Optional[List[dict]]:
+        """Get stored attachment outcomes.
+
+        Args:
+            attachment_ (dict): AirTable attachment.
+
+        Returns:
+            List[dict] | None: outcome per QR symbol,
+                None if not processed.
+        """
+        outcomes = self.journal.get(attachment_key(attachment_))
+        # single QR outcomes were stored before multi-QR extraction
+        if isinstance(outcomes, dict):
+            return [outcomes]
+        return outcomes
+
+    def record(
+        self,
+        attachments: List[dict],
+        results: List[List[Tuple[Optional[EsimAsset], Optional[str]]]],
+    ) -> None:
+        """Store donation attachments outcomes.
+
+        Args:
+            attachments (List[dict]): AirTable attachments.
+            results (List[List[Tuple[EsimAsset | None, str | None]]]):
+                symbols validation results in attachments order.
+        """
+        outcomes: Dict[str, List[dict]] = {}
+        for attachment_, symbols in zip(attachments, results):
+            key = attachment_key(attachment_)
+            if key in self.journal:
+                continue
+            outcomes[key] = [
+                (
+                    {lg_c.FLAG: flag}
+                    if qr_asset is None
+                    else {
+                        lg_c.QR_SHA: qr_asset.qr_sha,
+                        lg_c.PHONE: qr_asset.phone_number,
+                    }
+                )
+                for qr_asset, flag in symbols
+            ]
+        self.journal.add_many(outcomes)
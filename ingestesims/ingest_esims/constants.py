@@ -2,6 +2,8 @@
 
 # pylint: disable=too-few-public-methods
 
+from esimslib.util.constants import ValidationConst as val_c
+
 
 class IngestSimsConst:
     """Ingest Sims Defines"""
@@ -9,13 +11,113 @@ class IngestSimsConst:
     # Root Folder
     DBX_PATH = "/ESims for Gaza/Fresh Sims to Load in Airtable/{}"
 
+    # Env Variables
+    JOURNAL_PATH = "INGEST_JOURNAL_PATH"
+    LEDGER_PATH = "INGEST_LEDGER_PATH"
+    LEDGER_PREFIX = "INGEST_LEDGER_PREFIX"
+    COMMIT_BATCH_SIZE = "INGEST_COMMIT_BATCH_SIZE"
+
+    # Service
+    SERVICE_NAME = "ingest_esims"
+
+    # Spans
+    HANDLER_SPAN = "ingest.handler"
+    DONATION_SPAN = "ingest.donation"
+    ATTACHMENT_SPAN = "ingest.attachment"
+
+    # Metrics
+    DONATION_METRIC = "ingest_donation"
+    QR_VALIDATE_METRIC = "qr_validate"
+    DONATIONS_WRITE_METRIC = "airtable_donations_write"
+    RESTORED_METRIC = "attachments_restored"
+    INVALID_TYPE_METRIC = "attachments_invalid_type"
+    DONATIONS_METRIC = "donations_committed"
+    VALID_ESIMS_METRIC = "esims_valid"
+
+    # Scheduler items
+    DONATION = "donation"
+    DONATION_ESTIMATE_MS = 15000.0
+
+    # Streaming Commit
+    DEFAULT_JOURNAL_PATH = "/tmp/ingest_esims/donations.jsonl"  # nosec
+    DEFAULT_COMMIT_BATCH_SIZE = "10"
+    DONATIONS_WRITE_ATTEMPTS = 3
+    RETRY_SECONDS = 1.0
+
+    # Attachment Ledger
+    DEFAULT_LEDGER_PATH = "/tmp/ingest_esims/attachments.jsonl"  # nosec
+
+    # Concurrency
+    MAX_DONATIONS_IN_FLIGHT = 8
+    MAX_ATTACHMENTS_IN_FLIGHT = 32
+
+
+class WebhookConst:
+    """AirTable Webhook Defines"""
+
+    # Env Variables
+    WEBHOOK_SECRET = "AIRTABLE_WEBHOOK_SECRET"  # nosec
+    REPLAY_FILE = "INGEST_REPLAY_FILE"
+
+    # Cursor checkpoint
+    CURSOR_NAME = "ingest_esims_webhook"
+    CURSOR = "cursor"
+
+    # Payloads lease
+    LEASE_KEY = "INGEST_WEBHOOK_LEASE_KEY"
+    DEFAULT_LEASE_KEY = "ingest_esims_webhook_lease"
+    LEASE_WAIT_SECONDS = 10.0
+    REQUEST_ID = "aws_request_id"
+
+    # Notification event
+    BODY = "body"
+    HEADERS = "headers"
+    MAC_HEADER = "x-airtable-content-mac"
+    IS_BASE64 = "isBase64Encoded"
+    REPLAY = "replay"
+    PAYLOADS = "payloads"
+    UTF8 = "utf-8"
+
+
+class LedgerConst:
+    """Attachment Ledger Defines"""
+
+    # Attachment keys
+    ID = "id"
+    SIZE = "size"
+    FILENAME = "filename"
+    KEY_FORMAT = "{}:{}:{}"
+
+    # Outcomes
+    FLAG = "flag"
+    QR_SHA = "qr_sha"
+    PHONE = "phone"
+
+    # Donation signature
+    UTF8 = "utf-8"
+    SIGNATURE_SEPARATOR = "\n"
+    SIGNATURE_LENGTH = 16
+
 
 class ValidateDonationConst:
     """Validate Donation Defines"""
 
     # QR Codes Keys
-    TYPE = "type"
     URL = "url"
+    ID = "id"
+
+    # Donation Flags
+    INVALID_TYPE_FLAG = "is_of_invalid_type"
+    MISSING_QR_FLAG = "is_missing_qr"
+    NOT_ESIM_FLAG = "is_not_esim"
+    PROVIDER_MISMATCH_FLAG = "is_of_provider_mismatch"
+    MISSING_PHONE_FLAG = "is_missing_phone"
 
-    # Accepted Types
-    IMAGE = "image"
+    # Validation rule flags
+    RULE_FLAGS = {
+        val_c.QR_PREFLIGHT: MISSING_QR_FLAG,
+        val_c.QR_DETECTED: MISSING_QR_FLAG,
+        val_c.LPA_PROTOCOL: NOT_ESIM_FLAG,
+        val_c.SMDP_DOMAIN: PROVIDER_MISMATCH_FLAG,
+        val_c.PHONE_NUMBER: MISSING_PHONE_FLAG,
+    }
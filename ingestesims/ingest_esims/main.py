@@ -1,61 +1,378 @@
 """Ingest Esims From AirTable to Dropbox"""
 
-from typing import List
+import os
+import asyncio
+from typing import Any, List, Optional
 
-from esimslib.util import logger
-from esimslib.airtable import EsimDonation, EsimAsset
+from esimslib.util import (
+    logger,
+    flushes_metrics,
+    is_supported_image,
+    Journal,
+    Metrics,
+    set_attributes,
+    traced,
+    ValidationEngine,
+)
+from esimslib.util.lease import LeaseLock
+from esimslib.util.profiler import profiled
+from esimslib.util.scheduler import CheckpointStore, WorkScheduler
+from esimslib.airtable import CommitLog, EsimDonation, init_api
+from esimslib.connectors import (
+    AsyncHTTPConnector,
+    AsyncRuntime,
+    gather_bounded,
+    run_cpu,
+    run_io,
+)
+from esimslib.connectors.http_connector import (
+    ContentTooLargeError,
+    UnsupportedContentError,
+)
 
-from ingest_esims.validate_donation import ValidateDonation
+from ingest_esims.constants import (
+    IngestSimsConst as is_c,
+    ValidateDonationConst as vd_c,
+    WebhookConst as wh_c,
+)
+from ingest_esims.validate_donation import QRResult, ValidateDonation
+from ingest_esims.streaming_commit import StreamingCommit
+from ingest_esims.attachment_ledger import AttachmentLedger
+from ingest_esims.webhook import read_changes
 
 
-def validate_donation(donation_record: EsimDonation) -> List[EsimAsset]:
-    """Validate Donation Record.
+async def fetch_attachment(
+    http_connector: AsyncHTTPConnector, attachment_: dict
+) -> Optional[bytes]:
+    """Fetch attachment content.
+    Attachments that are not a supported image type are rejected
+    from their first bytes, before the full download.
+
+    Args:
+        http_connector (AsyncHTTPConnector): HTTP Connector.
+        attachment_ (dict): AirTable attachment.
+
+    Returns:
+        bytes | None: attachment content. Empty if too large,
+            None if not a supported image type.
+    """
+    try:
+        return await http_connector.get_file(
+            attachment_.get(vd_c.URL),
+            attachment_.get(vd_c.ID),
+            is_supported_image,
+        )
+    except ContentTooLargeError as exc:
+        logger.warning("Attachment too large: %s", exc)
+        return b""
+    except UnsupportedContentError as exc:
+        logger.warning("Invalid attachment type: %s", exc)
+        Metrics.shared().count(is_c.INVALID_TYPE_METRIC)
+        return None
+
+
+def prefetch_links(donation_record: EsimDonation) -> None:
+    """Fetch linked eSIM package and provider records
+    not linked by EsimDonation.link_packages.
 
     Args:
         donation_record (EsimDonation): EsimDonation record.
+    """
+    _ = donation_record.esim_package.esim_provider
+
+
+@traced(is_c.ATTACHMENT_SPAN)
+async def validate_attachment(
+    validator: ValidateDonation,
+    attachment_: dict,
+    http_connector: AsyncHTTPConnector,
+    semaphore: asyncio.Semaphore,
+    ledger: AttachmentLedger,
+) -> List[QRResult]:
+    """Fetch and validate every QR symbol of a donation attachment.
+    Attachments processed by a previous run are restored from the ledger.
+
+    Args:
+        validator (ValidateDonation): attachment donation validator.
+        attachment_ (dict): AirTable attachment.
+        http_connector (AsyncHTTPConnector): HTTP Connector.
+        semaphore (asyncio.Semaphore): attachments in flight limit
+            shared across donations.
+        ledger (AttachmentLedger): processed attachments ledger.
 
     Returns:
-        List[EsimAsset]: Validated eSIMs.
+        List[Tuple[EsimAsset | None, str | None]]: per QR symbol,
+            eSIM Asset if valid, donation flag to set otherwise.
     """
-    validator = ValidateDonation(donation_record)
-    validator.validate_attachments_type()
-    validator.validate_attachments_qr_code()
+    set_attributes(attachment=attachment_.get(vd_c.ID))
+    outcomes = ledger.get(attachment_)
+    if outcomes is not None:
+        set_attributes(restored=True)
+        Metrics.shared().count(is_c.RESTORED_METRIC)
+        return validator.restore_qr_assets(attachment_, outcomes)
+    async with semaphore:
+        data = await fetch_attachment(http_connector, attachment_)
+        if data is None:
+            return [(None, vd_c.INVALID_TYPE_FLAG)]
+        return await run_cpu(validator.validate_qr_assets, attachment_, data)
+
+
+def finalize_donation(
+    validator: ValidateDonation,
+    results: List[List[QRResult]],
+) -> None:
+    """Aggregate attachments results and flag the donation.
+
+    Args:
+        validator (ValidateDonation): donation validator.
+        results (List[List[Tuple[EsimAsset | None, str | None]]]):
+            attachments symbols results in attachments order.
+    """
+    validator.apply_results(results)
     validator.deduplicate_attachments()
+    donation_record = validator.donation
     if validator.rejected:
         donation_record.is_rejected = True
         donation_record.send_error_email = True
     donation_record.is_ingested = True
-    return validator.valid_esims
 
 
-def main() -> None:
-    """Main"""
-    logger.info("Ingesting Donated eSIMs.")
+@traced(is_c.DONATION_SPAN)
+async def ingest_donation(
+    donation_record: EsimDonation,
+    http_connector: AsyncHTTPConnector,
+    semaphore: asyncio.Semaphore,
+    committer: StreamingCommit,
+    scheduler: WorkScheduler,
+) -> None:
+    """Validate Donation Record and queue it for commit.
+    Attachments results are aggregated in attachments order
+    so in-donation dedupe does not depend on completion order.
+    Donations left once the time budget runs low are deferred.
+
+    Args:
+        donation_record (EsimDonation): EsimDonation record.
+        http_connector (AsyncHTTPConnector): HTTP Connector.
+        semaphore (asyncio.Semaphore): attachments in flight limit.
+        committer (StreamingCommit): batches committer.
+        scheduler (WorkScheduler): time budget scheduler.
+    """
+    set_attributes(donation=donation_record.id)
+    if not scheduler.admit_or_defer(is_c.DONATION, donation_record.id):
+        return
+    with scheduler.track(is_c.DONATION), Metrics.shared().timer(
+        is_c.DONATION_METRIC
+    ):
+        await _ingest_donation(
+            donation_record, http_connector, semaphore, committer
+        )
+
+
+async def _ingest_donation(
+    donation_record: EsimDonation,
+    http_connector: AsyncHTTPConnector,
+    semaphore: asyncio.Semaphore,
+    committer: StreamingCommit,
+) -> None:
+    """Validate Donation Record and queue it for commit.
 
-    new_donations = EsimDonation.fetch_all()
+    Args:
+        donation_record (EsimDonation): EsimDonation record.
+        http_connector (AsyncHTTPConnector): HTTP Connector.
+        semaphore (asyncio.Semaphore): attachments in flight limit.
+        committer (StreamingCommit): batches committer.
+    """
+    validator = ValidateDonation(donation_record)
+    validator.validate_attachments_type()
+    # fetch linked records once before validating attachments
+    await run_io(prefetch_links, donation_record)
+    ledger = committer.ledger
+    results = list(
+        await asyncio.gather(
+            *(
+                validate_attachment(
+                    validator, attachment_, http_connector, semaphore, ledger
+                )
+                for attachment_ in validator.attachments
+            )
+        )
+    )
+    await run_io(ledger.record, validator.attachments, results)
+    finalize_donation(validator, results)
+    await committer.add(
+        donation_record, validator.valid_esims, validator.valid_esim_keys
+    )
+
+
+async def ingest_donations(
+    new_donations: List[EsimDonation],
+    committer: StreamingCommit,
+    scheduler: WorkScheduler,
+) -> None:
+    """Validate and commit Donation Records.
+    Attachments of all donations in flight share one limit, and each
+    donation is committed in the next batch once validated.
+
+    Args:
+        new_donations (List[EsimDonation]): EsimDonation records.
+        committer (StreamingCommit): batches committer.
+        scheduler (WorkScheduler): time budget scheduler.
+    """
+    http_connector = AsyncHTTPConnector()
+    semaphore = asyncio.Semaphore(is_c.MAX_ATTACHMENTS_IN_FLIGHT)
+    await gather_bounded(
+        is_c.MAX_DONATIONS_IN_FLIGHT,
+        (
+            ingest_donation(
+                donation, http_connector, semaphore, committer, scheduler
+            )
+            for donation in new_donations
+        ),
+    )
+    await committer.flush()
+
+
+def build_committer() -> StreamingCommit:
+    """Build donations committer with its journal and attachment ledger.
+
+    Returns:
+        StreamingCommit: batches committer.
+    """
+    return StreamingCommit(
+        Journal(os.getenv(is_c.JOURNAL_PATH, is_c.DEFAULT_JOURNAL_PATH)),
+        CommitLog.from_env(is_c.SERVICE_NAME),
+        int(os.getenv(is_c.COMMIT_BATCH_SIZE, is_c.DEFAULT_COMMIT_BATCH_SIZE)),
+        AttachmentLedger.from_env(),
+    )
+
+
+def run_ingest(
+    donations: List[EsimDonation],
+    committer: StreamingCommit,
+    scheduler: WorkScheduler,
+) -> None:
+    """Ingest donations not committed yet, resumed ones first.
+
+    Args:
+        donations (List[EsimDonation]): EsimDonation records.
+        committer (StreamingCommit): batches committer.
+        scheduler (WorkScheduler): time budget scheduler.
+    """
+    new_donations = scheduler.prioritize(
+        is_c.DONATION,
+        [
+            donation
+            for donation in donations
+            if not committer.is_committed(donation)
+        ],
+        key=lambda donation: donation.id,
+    )
     logger.info("Donated eSIMs records: %s", len(new_donations))
     logger.info(
         "Total number of Attachments in records: %s",
         sum(len(donation.qr_codes_att) for donation in new_donations),
     )
 
-    valid_esims_by_donation = list(
-        filter(None, map(validate_donation, new_donations))
+    if new_donations:
+        EsimDonation.link_packages(new_donations)
+    AsyncRuntime.run(ingest_donations(new_donations, committer, scheduler))
+    ValidationEngine.shared().stats.report()
+    scheduler.finish()
+    logger.info("Validated Donated eSIMs: %s", committer.committed_esims)
+    logger.info("Donated eSIMs Ingested: %s", committer.committed_donations)
+
+
+def main(context: Any = None) -> None:
+    """Main
+
+    Args:
+        context (Any): lambda event context. default: None, no time limit.
+    """
+    logger.info("Ingesting Donated eSIMs.")
+    scheduler = WorkScheduler(
+        context,
+        CheckpointStore.from_env(is_c.SERVICE_NAME),
+        {is_c.DONATION: is_c.DONATION_ESTIMATE_MS},
+    )
+    run_ingest(EsimDonation.fetch_all(), build_committer(), scheduler)
+
+
+def ingest_changes(event: dict, context: Any = None) -> bool:
+    """Ingest donations changed since the stored webhook cursor.
+    Donations deferred by the previous invocation are ingested too.
+
+    Args:
+        event (dict): webhook notification or replay event.
+        context (Any): lambda event context. default: None, no time limit.
+
+    Returns:
+        bool: True if the cursor moved and no donation was deferred,
+            newer payloads may be waiting.
+    """
+    scheduler = WorkScheduler(
+        context,
+        CheckpointStore.from_env(is_c.SERVICE_NAME),
+        {is_c.DONATION: is_c.DONATION_ESTIMATE_MS},
     )
-    all_valid_esims = [
-        esim for esims in valid_esims_by_donation for esim in esims
-    ]
-    logger.info("Validated Donated eSIMs: %s", len(all_valid_esims))
+    cursor_store = CheckpointStore.from_env(wh_c.CURSOR_NAME)
+    record_ids, cursor = read_changes(event, cursor_store)
+    record_ids = list(
+        dict.fromkeys([*scheduler.resumed(is_c.DONATION), *record_ids])
+    )
+    logger.info("Changed donation records: %s", len(record_ids))
+    if record_ids:
+        run_ingest(
+            EsimDonation.fetch_by_ids(record_ids), build_committer(), scheduler
+        )
+    else:
+        scheduler.finish()
+    # stored once committed so a failed run replays its payloads,
+    # and never moved backwards
+    if cursor is None or cursor <= cursor_store.load().get(wh_c.CURSOR, 0):
+        return False
+    cursor_store.save({wh_c.CURSOR: cursor})
+    return not scheduler.deferred(is_c.DONATION)
 
-    EsimAsset.load_records(all_valid_esims)
-    logger.info("QR Codes Loaded to Airtable")
-    EsimDonation.load_records(new_donations)
-    logger.info("Donated eSIMs Ingested.")
 
+def main_changes(event: dict, context: Any = None) -> None:
+    """Ingest only donations changed since the last webhook payload.
+    Notifications are processed one invocation at a time under a lease,
+    the holder reads payloads until none is left, so a notification
+    that cannot get the lease is covered by the holder.
 
-# pylint: disable=unused-argument
+    Args:
+        event (dict): webhook notification or replay event.
+        context (Any): lambda event context. default: None, no time limit.
+    """
+    logger.info("Ingesting changed Donated eSIMs.")
+    if event.get(wh_c.REPLAY) or os.getenv(wh_c.REPLAY_FILE):
+        ingest_changes(event, context)
+        return
+    lease = LeaseLock.from_env(
+        os.getenv(wh_c.LEASE_KEY, wh_c.DEFAULT_LEASE_KEY),
+        getattr(context, wh_c.REQUEST_ID, None),
+    )
+    if not lease.acquire_within(wh_c.LEASE_WAIT_SECONDS):
+        logger.info("Webhook payloads read by another invocation.")
+        return
+    lease.start_heartbeat()
+    try:
+        while ingest_changes(event, context) and not lease.lost.is_set():
+            logger.info("Reading newer webhook payloads.")
+    finally:
+        lease.release()
+
+
+@profiled(is_c.SERVICE_NAME)
+@flushes_metrics(is_c.SERVICE_NAME)
+@traced(is_c.HANDLER_SPAN)
 def handler(event: dict, context: dict) -> None:
     """Lambda Handler
+    Webhook notifications and replays ingest changed donations,
+    scheduled events poll the whole view.
+    Stage metrics are flushed once the handler returns,
+    its spans are children of the handler span.
+    Profiled on demand, see esimslib.util.profiler.
 
     Args:
         event (dict): lambda trigger event.
@@ -64,12 +381,21 @@ def handler(event: dict, context: dict) -> None:
     Raises:
         Exception: if main service failed.
     """
+    init_api()
+    event = event or {}
     try:
-        main()
+        if wh_c.BODY in event or wh_c.REPLAY in event:
+            main_changes(event, context)
+        else:
+            main(context)
     except Exception as exc:
         logger.error("Ingest eSIMs Router Error: %s", exc)
         raise exc
 
 
 if __name__ == "__main__":
-    main()
+    init_api()
+    if os.getenv(wh_c.REPLAY_FILE):
+        main_changes({})
+    else:
+        main()
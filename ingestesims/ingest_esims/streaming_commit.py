@@ -0,0 +1,154 @@
+"""Streaming Commit"""
+
+import time
+import asyncio
+from typing import List, Optional
+
+from esimslib.util import logger, Journal, Metrics
+from esimslib.airtable import CommitLog, EsimDonation, EsimAsset
+from esimslib.connectors import run_io
+
+from ingest_esims.attachment_ledger import (
+    AttachmentLedger,
+    attachments_signature,
+)
+from ingest_esims.constants import IngestSimsConst as is_c
+
+
+# pylint: disable=too-many-instance-attributes
+class StreamingCommit:
+    """Write validated donations and their eSIMs in small batches.
+    Committed donation IDs are recorded in a journal with their
+    attachments signature so a retried run skips them unless
+    attachments were added, and eSIMs go through the commit log so a
+    retry after a partial commit does not insert them again.
+    """
+
+    def __init__(
+        self,
+        journal: Journal,
+        commit_log: CommitLog,
+        batch_size: int,
+        ledger: AttachmentLedger,
+    ) -> None:
+        """Initialize StreamingCommit.
+
+        Args:
+            journal (Journal): committed donations journal.
+            commit_log (CommitLog): inserted eSIMs commit log.
+            batch_size (int): donations per batch.
+            ledger (AttachmentLedger): processed attachments ledger.
+        """
+        self.journal = journal
+        self.commit_log = commit_log
+        self.batch_size = batch_size
+        self.ledger = ledger
+        self.donations: List[EsimDonation] = []
+        self.esims: List[EsimAsset] = []
+        self.esim_keys: List[str] = []
+        self.committed_donations = 0
+        self.committed_esims = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def is_committed(self, donation_record: EsimDonation) -> bool:
+        """Check if donation was committed by a previous run
+        with the same attachments.
+
+        Args:
+            donation_record (EsimDonation): EsimDonation record.
+
+        Returns:
+            bool: True if committed.
+        """
+        if donation_record.id not in self.journal:
+            return False
+        signature = self.journal.get(donation_record.id)
+        # entries journaled before signatures were recorded have none
+        return signature is None or signature == attachments_signature(
+            donation_record.qr_codes_att
+        )
+
+    def _commit(
+        self,
+        donations: List[EsimDonation],
+        esims: List[EsimAsset],
+        esim_keys: List[str],
+    ) -> None:
+        """Write batch to AirTable and journal the donations.
+
+        Args:
+            donations (List[EsimDonation]): validated donations.
+            esims (List[EsimAsset]): donations valid eSIMs.
+            esim_keys (List[str]): eSIMs idempotency keys.
+        """
+        # assets first, an ingested donation leaves the view so its
+        # assets are never retried, and a rerun after a failed donations
+        # write skips the inserted assets through the commit log
+        self.commit_log.load_assets(esims, esim_keys)
+        with Metrics.shared().timer(is_c.DONATIONS_WRITE_METRIC):
+            self._load_donations(donations)
+        self.journal.add_many(
+            {
+                donation.id: attachments_signature(donation.qr_codes_att)
+                for donation in donations
+            }
+        )
+        self.committed_donations += len(donations)
+        self.committed_esims += len(esims)
+        metrics = Metrics.shared()
+        metrics.count(is_c.DONATIONS_METRIC, len(donations))
+        metrics.count(is_c.VALID_ESIMS_METRIC, len(esims))
+        logger.info(
+            "Committed donations: %s, eSIMs: %s", len(donations), len(esims)
+        )
+
+    @staticmethod
+    def _load_donations(donations: List[EsimDonation]) -> None:
+        """Write donations, retried once their assets are inserted.
+
+        Args:
+            donations (List[EsimDonation]): validated donations.
+
+        Raises:
+            Exception: if the last attempt failed.
+        """
+        for attempt in range(1, is_c.DONATIONS_WRITE_ATTEMPTS + 1):
+            try:
+                EsimDonation.load_records(donations)
+                return
+            except Exception:  # pylint: disable=broad-except
+                if attempt == is_c.DONATIONS_WRITE_ATTEMPTS:
+                    raise
+                logger.warning("Retrying donations write: %s", attempt)
+                time.sleep(is_c.RETRY_SECONDS * attempt)
+
+    async def add(
+        self,
+        donation_record: EsimDonation,
+        esims: List[EsimAsset],
+        esim_keys: List[str],
+    ) -> None:
+        """Queue validated donation and commit once the batch is full.
+
+        Args:
+            donation_record (EsimDonation): validated donation.
+            esims (List[EsimAsset]): donation valid eSIMs.
+            esim_keys (List[str]): eSIMs idempotency keys.
+        """
+        self.donations.append(donation_record)
+        self.esims.extend(esims)
+        self.esim_keys.extend(esim_keys)
+        if len(self.donations) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Commit queued donations."""
+        # lock is created lazily to bind to the running loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            donations, self.donations = self.donations, []
+            esims, self.esims = self.esims, []
+            esim_keys, self.esim_keys = self.esim_keys, []
+            if donations:
+                await run_io(self._commit, donations, esims, esim_keys)
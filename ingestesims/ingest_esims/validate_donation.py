@@ -1,11 +1,17 @@
 """Validate Donation"""
 
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-from esimslib.airtable import EsimDonation, EsimAsset
-from esimslib.util import QRCodeProcessor
+from esimslib.airtable import EsimDonation, EsimAsset, idempotency_key
+from esimslib.util import QRCodeProcessor, ValidationEngine, timed
 
-from ingest_esims.constants import ValidateDonationConst as vd_c
+from ingest_esims.constants import (
+    IngestSimsConst as is_c,
+    LedgerConst as lg_c,
+    ValidateDonationConst as vd_c,
+)
+
+QRResult = Tuple[Optional[EsimAsset], Optional[str]]
 
 
 class ValidateDonation:
@@ -20,6 +26,7 @@ class ValidateDonation:
         self.donation = donation_record
         self.attachments: List[dict] = []
         self.valid_esims: List[EsimAsset] = []
+        self.esim_keys: Dict[EsimAsset, str] = {}
 
     @property
     def rejected(self) -> bool:
@@ -31,58 +38,129 @@ class ValidateDonation:
         return len(self.valid_esims) == 0
 
     def validate_attachments_type(self) -> None:
-        """Check if attachment type is image."""
-        for attachment_ in self.donation.qr_codes_att:
-            if vd_c.IMAGE in attachment_.get(vd_c.TYPE):
-                self.attachments.append(attachment_)
-            else:
-                self.donation.is_of_invalid_type = True
+        """Collect attachments to validate.
+        Declared MIME types are not trusted, attachment types are
+        sniffed from their first bytes when fetched.
+        """
+        self.attachments.extend(self.donation.qr_codes_att)
 
-    def _validate_qr_asset(self, image_url: str) -> EsimAsset:
-        """Run QR Code validations.
+    def _new_asset(self, image_url: str) -> EsimAsset:
+        """Create donation eSIM Asset.
 
         Args:
-            image_url (str): QR Code Image URL.
+            image_url (str): attachment url.
 
         Returns:
-            EsimAsset | None: eSIM Asset if valid.
+            EsimAsset: eSIM Asset linked to the donation.
         """
         new_asset = EsimAsset()
         new_asset.esim_package = self.donation.esim_package
         new_asset.donation = self.donation
         new_asset.qr_code_image = image_url
-        processer = QRCodeProcessor(image_url)
-        if not processer.detect_qr():
-            self.donation.is_missing_qr = True
-            return None
-        if not processer.validate_qr_code_protocol():
-            self.donation.is_not_esim = True
-            return None
-        if self.donation.esim_package.esim_provider.smdp_domain:
-            if not processer.validate_smdp_domain(
-                self.donation.esim_package.esim_provider.smdp_domain
-            ):
-                self.donation.is_of_provider_mismatch = True
-                return None
-        new_asset.qr_sha = processer.qr_sha
-        if self.donation.esim_package.esim_provider.renewable:
-            if not processer.detect_phone_number():
-                self.donation.is_missing_phone = True
-                return None
-            new_asset.phone_number = processer.phone_number
         return new_asset
 
-    def validate_attachments_qr_code(self) -> None:
-        """Validate QR Codes.
+    @timed(is_c.QR_VALIDATE_METRIC)
+    def validate_qr_assets(
+        self, attachment_: dict, data: bytes = None
+    ) -> List[QRResult]:
+        """Run QR Code validations on every symbol of an attachment.
         - Checks it has a QR code.
         - Checks QR Code content is an eSIM.
         - Checks QR Code matches the eSIM package.
-        - Checks contains phone number if renewable.
+        - Checks contains phone number if renewable,
+          the closest one to each QR Code.
+
+        Donation flags are not set here so attachments can be
+        validated concurrently. See apply_results.
+
+        Args:
+            attachment_ (dict): AirTable attachment.
+            data (bytes): prefetched image content.
+                default: None, fetched from attachment url.
+
+        Returns:
+            List[Tuple[EsimAsset | None, str | None]]: per QR symbol,
+                eSIM Asset if valid, donation flag to set otherwise.
+        """
+        image_url = attachment_.get(vd_c.URL)
+        provider = self.donation.esim_package.esim_provider
+        results: List[QRResult] = []
+        with QRCodeProcessor(
+            image_url, data=data, cache_key=attachment_.get(vd_c.ID)
+        ) as processer:
+            for failed_rule in ValidationEngine.shared().validate(
+                processer, provider
+            ):
+                if failed_rule:
+                    results.append((None, vd_c.RULE_FLAGS[failed_rule]))
+                    continue
+                new_asset = self._new_asset(image_url)
+                new_asset.qr_sha = processer.qr_sha
+                if provider.renewable:
+                    new_asset.phone_number = processer.phone_number
+                results.append((new_asset, None))
+        return results
+
+    def restore_qr_assets(
+        self, attachment_: dict, outcomes: List[dict]
+    ) -> List[QRResult]:
+        """Rebuild validation results from stored attachment outcomes.
+        The attachment is not downloaded nor decoded again.
+
+        Args:
+            attachment_ (dict): AirTable attachment.
+            outcomes (List[dict]): attachment ledger outcomes.
+
+        Returns:
+            List[Tuple[EsimAsset | None, str | None]]: per QR symbol,
+                eSIM Asset if valid, donation flag to set otherwise.
+        """
+        results: List[QRResult] = []
+        for outcome in outcomes:
+            if outcome.get(lg_c.FLAG):
+                results.append((None, outcome[lg_c.FLAG]))
+                continue
+            new_asset = self._new_asset(attachment_.get(vd_c.URL))
+            new_asset.qr_sha = outcome.get(lg_c.QR_SHA)
+            if outcome.get(lg_c.PHONE):
+                new_asset.phone_number = outcome[lg_c.PHONE]
+            results.append((new_asset, None))
+        return results
+
+    def apply_results(self, results: List[List[QRResult]]) -> None:
+        """Aggregate attachments validation results into the donation.
+
+        Args:
+            results (List[List[Tuple[EsimAsset | None, str | None]]]):
+                validate_qr_assets results in attachments order.
         """
-        for attachment_ in self.attachments:
-            qr_asset = self._validate_qr_asset(attachment_.get(vd_c.URL))
-            if qr_asset is not None:
-                self.valid_esims.append(qr_asset)
+        for attachment_, symbols in zip(self.attachments, results):
+            for qr_asset, flag in symbols:
+                if qr_asset is not None:
+                    self.valid_esims.append(qr_asset)
+                    self.esim_keys[qr_asset] = idempotency_key(
+                        qr_asset.qr_sha, attachment_.get(vd_c.ID)
+                    )
+                else:
+                    setattr(self.donation, flag, True)
+
+    @property
+    def valid_esim_keys(self) -> List[str]:
+        """Idempotency keys of the valid eSIMs.
+
+        Returns:
+            List[str]: keys in valid eSIMs order.
+        """
+        return [self.esim_keys[esim] for esim in self.valid_esims]
+
+    def validate_attachments_qr_code(self) -> None:
+        """Validate QR Codes of all attachments sequentially."""
+        self.apply_results(
+            [
+                self.validate_qr_assets(attachment_)
+                for attachment_ in self.attachments
+            ]
+        )
 
     def deduplicate_attachments(self) -> None:
         """Remove duplicate QR Codes."""
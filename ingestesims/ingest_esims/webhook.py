@@ -0,0 +1,125 @@
+"""AirTable Webhook Changes"""
+
+import os
+import json
+import base64
+from typing import List, Optional, Tuple
+
+from pyairtable.models import WebhookNotification, WebhookPayload
+
+from esimslib.util import logger
+from esimslib.util.scheduler import CheckpointStore
+from esimslib.airtable import EsimDonation
+from esimslib.connectors import SSMConnector
+
+from ingest_esims.constants import WebhookConst as wh_c
+
+
+def parse_notification(event: dict) -> WebhookNotification:
+    """Parse webhook notification from an HTTP trigger event.
+    The request MAC is verified if a webhook secret is configured.
+
+    Args:
+        event (dict): HTTP trigger event.
+
+    Raises:
+        ValueError: if the request MAC does not match.
+
+    Returns:
+        WebhookNotification: notified base and webhook IDs.
+    """
+    body = event[wh_c.BODY]
+    if event.get(wh_c.IS_BASE64):
+        body = base64.b64decode(body).decode(wh_c.UTF8)
+    secret_key = os.getenv(wh_c.WEBHOOK_SECRET)
+    if not secret_key:
+        return WebhookNotification.parse_raw(body)
+    headers = {
+        name.lower(): value
+        for name, value in (event.get(wh_c.HEADERS) or {}).items()
+    }
+    return WebhookNotification.from_request(
+        body,
+        headers.get(wh_c.MAC_HEADER, ""),
+        SSMConnector().get_parameter(secret_key),
+    )
+
+
+def fetch_payloads(
+    notification: WebhookNotification, cursor: int
+) -> List[WebhookPayload]:
+    """Fetch webhook payloads after the cursor.
+
+    Args:
+        notification (WebhookNotification): webhook notification.
+        cursor (int): last processed payload cursor, 0 if none.
+
+    Returns:
+        List[WebhookPayload]: new payloads.
+    """
+    webhook = (
+        EsimDonation.get_api()
+        .base(notification.base.id)
+        .webhook(notification.webhook.id)
+    )
+    return list(webhook.payloads(cursor=cursor + 1))
+
+
+def load_replay(path: str) -> List[WebhookPayload]:
+    """Load webhook payloads from a local replay file.
+    Either a payloads list or a list payloads API response.
+
+    Args:
+        path (str): replay file path.
+
+    Returns:
+        List[WebhookPayload]: replayed payloads.
+    """
+    with open(path, encoding=wh_c.UTF8) as replay_file:
+        payloads = json.load(replay_file)
+    if isinstance(payloads, dict):
+        payloads = payloads.get(wh_c.PAYLOADS, [])
+    return [WebhookPayload.parse_obj(payload) for payload in payloads]
+
+
+def changed_record_ids(payloads: List[WebhookPayload]) -> List[str]:
+    """Collect created and changed record IDs.
+    The webhook is expected to be scoped to the donations table.
+
+    Args:
+        payloads (List[WebhookPayload]): webhook payloads.
+
+    Returns:
+        List[str]: unique record IDs in change order.
+    """
+    record_ids: dict = {}
+    for payload in payloads:
+        for table in payload.changed_tables_by_id.values():
+            record_ids.update(dict.fromkeys(table.created_records_by_id))
+            record_ids.update(dict.fromkeys(table.changed_records_by_id))
+    return list(record_ids)
+
+
+def read_changes(
+    event: dict, cursor_store: CheckpointStore
+) -> Tuple[List[str], Optional[int]]:
+    """Read changed donation IDs from a notification or replay file.
+
+    Args:
+        event (dict): HTTP trigger or replay event.
+        cursor_store (CheckpointStore): webhook cursor store.
+
+    Returns:
+        Tuple[List[str], int | None]: changed record IDs and the cursor
+            to store once committed. None if the cursor is unchanged.
+    """
+    replay_path = event.get(wh_c.REPLAY) or os.getenv(wh_c.REPLAY_FILE)
+    if replay_path:
+        logger.info("Replaying webhook payloads: %s", replay_path)
+        return changed_record_ids(load_replay(replay_path)), None
+    cursor = cursor_store.load().get(wh_c.CURSOR, 0)
+    payloads = fetch_payloads(parse_notification(event), cursor)
+    logger.info("Webhook payloads after cursor %s: %s", cursor, len(payloads))
+    if not payloads:
+        return [], None
+    return changed_record_ids(payloads), payloads[-1].cursor
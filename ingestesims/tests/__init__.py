@@ -0,0 +1 @@
+"""Ingest eSIMs Tests"""
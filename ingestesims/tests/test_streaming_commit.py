@@ -0,0 +1,209 @@
+"""Streaming Commit tests"""
+
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+from typing import List, Tuple
+from unittest import mock
+
+from esimslib.util import Journal
+from esimslib.airtable import CommitLog, EsimAsset, EsimDonation
+from esimslib.airtable.constants import EsimDonationConst as don_c
+
+from ingest_esims.attachment_ledger import AttachmentLedger
+from ingest_esims.constants import IngestSimsConst as is_c
+from ingest_esims.streaming_commit import StreamingCommit
+
+BATCH_SIZE = 2
+
+
+def donation(record_id: str, attachments: int = 1) -> EsimDonation:
+    """Build a donation record with attachments.
+
+    Args:
+        record_id (str): record ID.
+        attachments (int): attachments count.
+
+    Returns:
+        EsimDonation: donation record.
+    """
+    return EsimDonation.from_record(
+        {
+            "id": record_id,
+            "createdTime": "2024-01-01T00:00:00.000Z",
+            "fields": {
+                don_c.QR_CODES: [
+                    {
+                        "id": f"att{record_id}{index}",
+                        "url": f"https://example.com/{index}.png",
+                        "filename": f"{index}.png",
+                        "size": 100 + index,
+                    }
+                    for index in range(attachments)
+                ]
+            },
+        }
+    )
+
+
+class AirTableStub:
+    """AirTable writes stub recording the writes order."""
+
+    def __init__(self, donation_failures: int = 0) -> None:
+        """Initialize AirTableStub.
+
+        Args:
+            donation_failures (int): donations writes failing first.
+        """
+        self.writes: List[Tuple[str, List[str]]] = []
+        self.donation_failures = donation_failures
+
+    def load_assets(self, records: list) -> None:
+        """Save eSIM assets.
+
+        Args:
+            records (list): eSIM assets.
+        """
+        for record in records:
+            record.id = f"rec{record.qr_sha}"
+        self.writes.append(("assets", [record.qr_sha for record in records]))
+
+    def load_donations(self, records: list) -> None:
+        """Save donations, failing the first writes.
+
+        Args:
+            records (list): donations.
+
+        Raises:
+            ConnectionError: while failures are left.
+        """
+        if self.donation_failures:
+            self.donation_failures -= 1
+            raise ConnectionError("AirTable unavailable")
+        self.writes.append(("donations", [record.id for record in records]))
+
+
+class TestStreamingCommit(unittest.TestCase):
+    """StreamingCommit tests."""
+
+    def setUp(self) -> None:
+        """Create journals directory and stub AirTable writes."""
+        self.journal_dir = tempfile.mkdtemp()
+        self.airtable = AirTableStub()
+        patches = [
+            mock.patch.object(
+                EsimAsset, "load_records", self.airtable.load_assets
+            ),
+            mock.patch.object(
+                EsimDonation, "load_records", self.airtable.load_donations
+            ),
+            mock.patch("ingest_esims.streaming_commit.time.sleep"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self) -> None:
+        """Remove journals directory."""
+        shutil.rmtree(self.journal_dir)
+
+    def committer(self) -> StreamingCommit:
+        """Create a committer over the journals, reloaded as a
+        retried run does.
+
+        Returns:
+            StreamingCommit: streaming committer.
+        """
+        return StreamingCommit(
+            Journal(os.path.join(self.journal_dir, "donations.jsonl")),
+            CommitLog(Journal(os.path.join(self.journal_dir, "assets.jsonl"))),
+            BATCH_SIZE,
+            AttachmentLedger(
+                Journal(os.path.join(self.journal_dir, "ledger.jsonl"))
+            ),
+        )
+
+    @staticmethod
+    def add(committer: StreamingCommit, donations: List[EsimDonation]) -> None:
+        """Add donations with one eSIM each, then flush.
+
+        Args:
+            committer (StreamingCommit): streaming committer.
+            donations (List[EsimDonation]): donations.
+        """
+
+        async def run() -> None:
+            """Add donations and flush the last batch."""
+            for donation_record in donations:
+                await committer.add(
+                    donation_record,
+                    [EsimAsset(qr_sha=f"sha{donation_record.id}")],
+                    [f"key{donation_record.id}"],
+                )
+            await committer.flush()
+
+        asyncio.run(run())
+
+    def test_batches(self) -> None:
+        """Donations are committed in batches, assets first."""
+        committer = self.committer()
+        self.add(committer, [donation("a"), donation("b"), donation("c")])
+        self.assertEqual(
+            self.airtable.writes,
+            [
+                ("assets", ["shaa", "shab"]),
+                ("donations", ["a", "b"]),
+                ("assets", ["shac"]),
+                ("donations", ["c"]),
+            ],
+        )
+        self.assertEqual(committer.committed_donations, 3)
+        self.assertEqual(committer.committed_esims, 3)
+
+    def test_skip_committed(self) -> None:
+        """A retried run skips donations with the same attachments."""
+        self.add(self.committer(), [donation("a"), donation("b")])
+        committer = self.committer()
+        self.assertTrue(committer.is_committed(donation("a")))
+        self.assertFalse(committer.is_committed(donation("c")))
+
+    def test_attachments_changed(self) -> None:
+        """Donations with new attachments are not skipped."""
+        self.add(self.committer(), [donation("a")])
+        self.assertFalse(
+            self.committer().is_committed(donation("a", attachments=2))
+        )
+
+    def test_legacy_entry(self) -> None:
+        """Donations journaled without a signature are skipped."""
+        committer = self.committer()
+        committer.journal.add("a")
+        self.assertTrue(committer.is_committed(donation("a", attachments=2)))
+
+    def test_donations_write_retried(self) -> None:
+        """A failed donations write is retried."""
+        self.airtable.donation_failures = 1
+        committer = self.committer()
+        self.add(committer, [donation("a")])
+        self.assertEqual(
+            self.airtable.writes,
+            [("assets", ["shaa"]), ("donations", ["a"])],
+        )
+        self.assertTrue(committer.is_committed(donation("a")))
+
+    def test_donations_write_failed(self) -> None:
+        """Donations failing every write are not journaled, and their
+        assets are not inserted again by the retried run.
+        """
+        self.airtable.donation_failures = is_c.DONATIONS_WRITE_ATTEMPTS
+        with self.assertRaises(ConnectionError):
+            self.add(self.committer(), [donation("a")])
+        committer = self.committer()
+        self.assertFalse(committer.is_committed(donation("a")))
+        self.add(committer, [donation("a")])
+        self.assertEqual(
+            self.airtable.writes,
+            [("assets", ["shaa"]), ("donations", ["a"])],
+        )
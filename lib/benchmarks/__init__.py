@@ -0,0 +1 @@
+"""QR Code Processor Benchmarks"""
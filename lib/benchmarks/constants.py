@@ -0,0 +1,366 @@
+"""Benchmarks Defines"""
+
+# pylint: disable=too-few-public-methods
+
+
+class CorpusConst:
+    """Synthetic Corpus Defines"""
+
+    SEED = 20240101
+
+    # Variations
+    QR_SIDES = (120, 240, 480)
+    ROTATIONS = (0, 12, 90)
+    BLUR_SIGMAS = (0.0, 1.5)
+    JPEG_QUALITIES = (0, 85, 40)  # 0 for PNG
+    PHONES = (False, True)
+    BACKGROUNDS = ("clean", "photo")
+    CLEAN = "clean"
+    PHOTO = "photo"
+
+    # Payloads
+    LPA_FORMAT = "LPA:1${}${}"
+    SMDP_FORMAT = "smdp{}.example.com"
+    PHONE_PREFIXES = ("055", "051", "053")
+    PHONE_FORMAT = "{}{:07d}"
+    MATCHING_ID_BYTES = 12
+
+    # Layout
+    MARGIN_RATIO = 0.25
+    TEXT_GAP_RATIO = 0.08
+    TEXT_HEIGHT_RATIO = 0.16
+    FONT_THICKNESS_RATIO = 0.08
+    PAGE_COLOR = 255
+    INK_COLOR = 0
+
+    # Photographed style
+    PAPER_COLOR = 225
+    TEXTURE_SIGMA = 12.0
+    TEXTURE_BLUR = 3.0
+    LIGHT_MIN = 0.65
+    PERSPECTIVE_JITTER = 0.04
+    SENSOR_NOISE = 6.0
+
+    # Encoding
+    PNG = ".png"
+    JPEG = ".jpg"
+    NAME_FORMAT = "qr{}_rot{}_blur{}_q{}_{}_{}"
+    WITH_PHONE = "phone"
+    WITHOUT_PHONE = "nophone"
+
+
+class BenchmarkConst:
+    """QR Benchmark Defines"""
+
+    # Stages
+    DETECT_QR = "detect_qr"
+    DETECT_PHONE = "detect_phone_number"
+    STAGES = (DETECT_QR, DETECT_PHONE)
+
+    # Results
+    CORPUS = "corpus"
+    IMAGES = "images"
+    FINGERPRINT = "fingerprint"
+    RESULTS = "results"
+    THROUGHPUT = "throughput_per_s"
+    P50 = "p50_ms"
+    P90 = "p90_ms"
+    P99 = "p99_ms"
+    PEAK_RSS = "peak_rss_kb"
+    ACCURACY = "accuracy"
+    FALSE_POSITIVES = "false_positives"
+    MISSES = "misses"
+    SEED = "seed"
+    PERCENTILES = ((P50, 50), (P90, 90), (P99, 99))
+    MS_PER_SECOND = 1000
+    DIGITS = 3
+
+    # Regression tolerances, relative to baseline
+    HIGHER_IS_WORSE = {
+        P50: 1.3,
+        P90: 1.3,
+        P99: 1.5,
+        PEAK_RSS: 1.2,
+        FALSE_POSITIVES: 1.0,
+    }
+    LOWER_IS_WORSE = {THROUGHPUT: 0.8, ACCURACY: 1.0}
+
+    # Files
+    DEFAULT_BASELINE = "benchmarks/baseline.json"
+    FILE_NAME_FORMAT = "{}.{}"
+    UTF8 = "utf-8"
+
+
+class FakeConst:
+    """Fake Services Defines"""
+
+    HOST = "127.0.0.1"
+    URL_FORMAT = "http://{}:{}"
+    JITTER = 0.5
+    BYTES_PER_MB = 1024 * 1024
+    CONTENT_LENGTH = "Content-Length"
+    CONTENT_TYPE = "Content-Type"
+    JSON_TYPE = "application/json"
+    BINARY_TYPE = "application/octet-stream"
+    RETRY_AFTER = "Retry-After"
+    UTF8 = "utf-8"
+
+    # Stats
+    REQUESTS = "requests"
+    THROTTLED = "throttled"
+    ROUTES = "routes"
+    BYTES_SENT = "bytes_sent"
+
+
+class AWSFakeConst:
+    """AWS Fake Services Defines"""
+
+    # S3
+    XML_TYPE = "application/xml"
+    ETAG = "ETag"
+    LAST_MODIFIED = "Last-Modified"
+    ETAG_LENGTH = 32
+    DEFAULT_MAX_KEYS = "1000"
+    PREFIX = "prefix"
+    MAX_KEYS = "max-keys"
+    CONTINUATION_TOKEN = "continuation-token"  # nosec
+    START_AFTER = "start-after"
+    HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+    ISO_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+    XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>'
+    LIST_RESULT = (
+        XML_HEADER + '<ListBucketResult xmlns="http://s3.amazonaws.com/'
+        'doc/2006-03-01/"><Name>{}</Name><Prefix>{}</Prefix>'
+        "<KeyCount>{}</KeyCount><MaxKeys>{}</MaxKeys>"
+        "<IsTruncated>{}</IsTruncated>{}{}</ListBucketResult>"
+    )
+    NEXT_TOKEN = "<NextContinuationToken>{}</NextContinuationToken>"  # nosec
+    CONTENTS = (
+        "<Contents><Key>{}</Key><LastModified>{}</LastModified>"
+        "<ETag>&quot;{}&quot;</ETag><Size>{}</Size>"
+        "<StorageClass>STANDARD</StorageClass></Contents>"
+    )
+    ERROR = XML_HEADER + "<Error><Code>{}</Code><Message>{}</Message></Error>"
+    NO_SUCH_KEY = "NoSuchKey"
+    SLOW_DOWN = "SlowDown"
+
+    # SSM
+    TARGET = "x-amz-target"
+    TARGET_SEPARATOR = "."
+    AMZ_JSON_TYPE = "application/x-amz-json-1.1"
+    ERROR_TYPE = "__type"
+    MESSAGE = "message"
+    PARAMETER_NOT_FOUND = "ParameterNotFound"
+    PARAMETER_ALREADY_EXISTS = "ParameterAlreadyExists"
+    INVALID_ACTION = "InvalidAction"
+    THROTTLING = "ThrottlingException"
+    STRING_TYPE = "String"
+
+
+class DropboxFakeConst:
+    """Dropbox Fake Service Defines"""
+
+    API_HOST = "api.dropboxapi.com"
+    CONTENT_HOST = "content.dropboxapi.com"
+    API_ARG = "dropbox-api-arg"
+    API_RESULT = "Dropbox-API-Result"
+    TAG = ".tag"
+    PAGE_SIZE = 2000
+    CURSOR_SEPARATOR = "|"
+    JOB_ID_FORMAT = "dbjid:{:08d}"
+    FILE_ID_FORMAT = "id:{:012d}"
+    REV_FORMAT = "{:016x}"
+    TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+    RETRY_AFTER_SECONDS = 1
+
+
+class TransportConst:
+    """Fake Services Transport Defines"""
+
+    SEND = "send"
+    HTTP = "http"
+
+
+class AirTableFakeConst:
+    """AirTable Fake Service Defines"""
+
+    API_HOST = "api.airtable.com"
+    CONTENT_HOST = "v5.airtableusercontent.com"
+    ATTACHMENT_URL_FORMAT = "https://" + CONTENT_HOST + "/{}/{}"
+    RECORD_ID_FORMAT = "rec{:014d}"
+    ATTACHMENT_ID_FORMAT = "att{:014d}"
+    WRITTEN_ATTACHMENT_START = 10**12
+    OFFSET_FORMAT = "itr{}"
+    OFFSET_PREFIX = "itr"
+    TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+    PAGE_SIZE = 100
+    MAX_BATCH = 10
+
+    # Options
+    VIEW = "view"
+    FORMULA = "filterByFormula"
+    FIELDS = "fields"
+    FIELDS_PARAM = "fields[]"
+    PAGE_SIZE_PARAM = "pageSize"
+    OFFSET = "offset"
+    RECORDS = "records"
+    RECORDS_PARAM = "records[]"
+
+    # Formulas
+    RECORD_ID_PATTERN = r"RECORD_ID\(\)='([^']+)'"
+    MODIFIED_PATTERN = (
+        r"IS_AFTER\(LAST_MODIFIED_TIME\(\), DATETIME_PARSE\('([^']+)'\)\)"
+    )
+
+    # Errors
+    RATE_LIMIT = "RATE_LIMIT_REACHED"
+    INVALID_FORMULA = "INVALID_FILTER_BY_FORMULA"
+    INVALID_VIEW = "VIEW_NAME_NOT_FOUND"
+    INVALID_REQUEST = "INVALID_REQUEST_UNKNOWN"
+    NOT_FOUND = "NOT_FOUND"
+
+    # Attachments
+    IF_NONE_MATCH = "if-none-match"
+    ETAG = "ETag"
+    ETAG_LENGTH = 16
+
+
+class ScaleConst:
+    """Scale Data Defines"""
+
+    # Records
+    BASE_ID = "appBenchmark0001"
+    PROVIDER_FORMAT = "Provider {:03d}"
+    GEO = "Gaza"
+    PACKAGE_FORMAT = "Package {:04d}"
+    PACKAGES_PER_PROVIDER = 4
+    STOCK_STATUSES = ("out of stock", "low stock", "in stock")
+    IN_STOCK = (0, 5, 50)
+    SMDP_FORMAT = "smdp{}.example.com"
+    MISMATCH_SMDP = "smdp.other.example.com"
+
+    # Files
+    # router Dropbox folder, ``esims_router.constants.RouterConst.DBX_PATH``
+    DBX_PATH = "/ESims for Gaza/Fresh Sims to Load in Airtable/{}"
+    FILE_FORMAT = "{}/esim_{:05d}.jpg"
+    INVALID_FILE_FORMAT = "{}/esim_{:05d}.pdf"
+    ATTACHMENT_FORMAT = "donation_{:05d}.jpg"
+    INVALID_ATTACHMENT_FORMAT = "donation_{:05d}.pdf"
+    INVALID_CONTENT = b"%PDF-1.4\n%benchmark\n"
+    INVALID_EVERY = 10
+    MISMATCH_EVERY = 7
+    DUPLICATE_EVERY = 2
+
+    # Images, readable QR Codes without phone numbers
+    QR_SIDE = 240
+    ROTATION = 0
+    BLUR = 0.0
+    QUALITY = 85
+    BACKGROUND = "clean"
+    MATCHING_ID_BYTES = 12
+    UTF8 = "utf-8"
+
+    # Summary
+    PACKAGES = "packages"
+    DONATIONS = "donations"
+    IMAGES = "images"
+    INVENTORY = "inventory"
+    INVALID = "invalid"
+    MISMATCHED = "mismatched"
+    DUPLICATES = "duplicates"
+    DROPBOX_FILES = "dropbox_files"
+    INGESTED = "ingested"
+
+
+class E2EConst:
+    """End-to-End Benchmark Defines"""
+
+    # Services, run in this order on the same data
+    ROUTER = "router"
+    INGEST = "ingest"
+    DEDUPLICATE = "deduplicate"
+    SERVICES = (ROUTER, INGEST, DEDUPLICATE)
+    SERVICE_DIRS = {
+        ROUTER: "esimsrouter",
+        INGEST: "ingestesims",
+        DEDUPLICATE: "deduplicate",
+    }
+    SERVICE_MODULES = {
+        ROUTER: "esims_router.main",
+        INGEST: "ingest_esims.main",
+        DEDUPLICATE: "deduplicate.main",
+    }
+    SCALE_DATA_MODULE = "benchmarks.scale_data"
+    AIRTABLE_MODULE = "esimslib.airtable"
+    DEFAULT_SCALES = ("4:20:40", "8:40:80", "16:80:160")
+    SCALE_SEPARATOR = ":"
+
+    # Fakes
+    AIRTABLE = "airtable"
+    ATTACHMENTS = "attachments"
+    DROPBOX = "dropbox"
+    S3 = "s3"
+    SSM = "ssm"
+    # latency ms, rate per second, burst and bandwidth Mbps,
+    # AirTable allows 5 requests per second per base
+    PROFILES = {
+        AIRTABLE: (150.0, 5.0, 5, None),
+        ATTACHMENTS: (40.0, None, 1, 50.0),
+        DROPBOX: (120.0, 20.0, 20, 50.0),
+        S3: (20.0, None, 1, 100.0),
+        SSM: (15.0, 40.0, 40, None),
+    }
+
+    # Service settings, named here since the service constants
+    # connect to AirTable once imported
+    AIRTABLE_API_KEY = "AIRTABLE_API_KEY"  # nosec
+    AIRTABLE_BASE_ID = "AIRTABLE_BASE_ID"
+    DROPBOX_TOKEN = "DROPBOX_TOKEN"  # nosec
+    AIRTABLE_KEY_PARAMETER = "/benchmark/airtable_api_key"  # nosec
+    DROPBOX_TOKEN_PARAMETER = "/benchmark/dropbox_token"  # nosec
+    FAKE_SECRET = "benchmark"  # nosec
+    BUCKET = "esims-benchmark"
+    AWS_ENV = {
+        "AWS_ACCESS_KEY_ID": FAKE_SECRET,
+        "AWS_SECRET_ACCESS_KEY": FAKE_SECRET,
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_EC2_METADATA_DISABLED": "true",
+        "AWS_BUCKET": BUCKET,
+    }
+    S3_ENDPOINT = "AWS_ENDPOINT_URL_S3"
+    SSM_ENDPOINT = "AWS_ENDPOINT_URL_SSM"
+    S3_PREFIXES = {
+        "AWS_ARCHIVE_PREFIX": "archive",
+        "COMMIT_LOG_PREFIX": "commit_logs",
+        "INGEST_LEDGER_PREFIX": "ledgers",
+        "CHECKPOINT_PREFIX": "checkpoints",
+        "SNAPSHOT_PREFIX": "snapshots",
+    }
+    WORK_FILES = {
+        "INGEST_JOURNAL_PATH": "donations.jsonl",
+        "HTTP_CACHE_DIR": "http_cache",
+    }
+    HOSTS = "BENCHMARK_HOSTS"
+
+    # Results
+    SCALE = "scale"
+    SERVICE = "service"
+    STATUS = "status"
+    OK = "ok"
+    FAILED = "failed"
+    ERROR = "error"
+    STARTUP_SECONDS = "startup_s"
+    WALL_SECONDS = "wall_s"
+    IMPORT_RSS = "import_rss_mb"
+    PEAK_RSS = "peak_rss_mb"
+    REQUESTS = "requests"
+    OUTCOME = "outcome"
+    S3_OBJECTS = "s3_objects"
+    RESULTS = "results"
+    RUNS = "runs"
+    SEED = "seed"
+    LATENCY_SCALE = "latency_scale"
+    RATE_SCALE = "rate_scale"
+    KB_PER_MB = 1024
+    DIGITS = 3
+    UTF8 = "utf-8"
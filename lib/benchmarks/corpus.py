@@ -0,0 +1,282 @@
+"""Synthetic QR Code Corpus"""
+
+import hashlib
+import itertools
+from typing import Iterator, List, NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+from benchmarks.constants import CorpusConst as cp_c
+
+# pylint: disable=no-member
+
+
+class CorpusCase(NamedTuple):
+    """Corpus image and its expected detections."""
+
+    name: str
+    data: bytes
+    qr_code: str
+    phone_number: str
+
+
+class CaseSpec(NamedTuple):
+    """Corpus image variation."""
+
+    qr_side: int
+    rotation: int
+    blur: float
+    quality: int
+    phone: bool
+    background: str
+
+    @property
+    def name(self) -> str:
+        """Case name.
+
+        Returns:
+            str: name listing the variation values.
+        """
+        return cp_c.NAME_FORMAT.format(
+            self.qr_side,
+            self.rotation,
+            self.blur,
+            self.quality,
+            cp_c.WITH_PHONE if self.phone else cp_c.WITHOUT_PHONE,
+            self.background,
+        )
+
+
+def case_specs() -> Iterator[CaseSpec]:
+    """Enumerate every corpus variation in a stable order.
+
+    Yields:
+        CaseSpec: corpus image variation.
+    """
+    for values in itertools.product(
+        cp_c.QR_SIDES,
+        cp_c.ROTATIONS,
+        cp_c.BLUR_SIGMAS,
+        cp_c.JPEG_QUALITIES,
+        cp_c.PHONES,
+        cp_c.BACKGROUNDS,
+    ):
+        yield CaseSpec(*values)
+
+
+def _payloads(rng: np.random.Generator, index: int) -> Tuple[str, str]:
+    """Generate the LPA string and phone number of a case.
+
+    Args:
+        rng (np.random.Generator): corpus random generator.
+        index (int): case index.
+
+    Returns:
+        Tuple[str, str]: LPA string and phone number.
+    """
+    matching_id = rng.bytes(cp_c.MATCHING_ID_BYTES).hex().upper()
+    qr_code = cp_c.LPA_FORMAT.format(
+        cp_c.SMDP_FORMAT.format(index), matching_id
+    )
+    prefix = cp_c.PHONE_PREFIXES[index % len(cp_c.PHONE_PREFIXES)]
+    phone_number = cp_c.PHONE_FORMAT.format(
+        prefix, int(rng.integers(0, 10**7))
+    )
+    return qr_code, phone_number
+
+
+def _render_qr(qr_code: str, side: int) -> np.ndarray:
+    """Render a QR Code with square modules.
+
+    Args:
+        qr_code (str): QR Code content.
+        side (int): approximate QR Code side in pixels.
+
+    Returns:
+        np.ndarray: grayscale QR Code image.
+    """
+    modules = cv2.QRCodeEncoder.create().encode(qr_code)
+    scale = max(side // modules.shape[0], 1)
+    return cv2.resize(
+        modules,
+        None,
+        fx=scale,
+        fy=scale,
+        interpolation=cv2.INTER_NEAREST,
+    )
+
+
+def _compose_page(qr_image: np.ndarray, phone_number: str) -> np.ndarray:
+    """Place the QR Code on a page, the phone number printed below.
+
+    Args:
+        qr_image (np.ndarray): grayscale QR Code image.
+        phone_number (str): phone number to print, empty for none.
+
+    Returns:
+        np.ndarray: grayscale page image.
+    """
+    side = qr_image.shape[0]
+    margin = int(side * cp_c.MARGIN_RATIO)
+    text_height = int(side * cp_c.TEXT_HEIGHT_RATIO)
+    gap = int(side * cp_c.TEXT_GAP_RATIO)
+    page = np.full(
+        (side + 2 * margin + gap + text_height, side + 2 * margin),
+        cp_c.PAGE_COLOR,
+        dtype=np.uint8,
+    )
+    page[margin : margin + side, margin : margin + side] = qr_image
+    if phone_number:
+        thickness = max(int(text_height * cp_c.FONT_THICKNESS_RATIO), 1)
+        (width, height), _ = cv2.getTextSize(
+            phone_number, cv2.FONT_HERSHEY_SIMPLEX, 1.0, thickness
+        )
+        font_scale = min(side / width, text_height / height)
+        cv2.putText(
+            page,
+            phone_number,
+            (margin, margin + side + gap + int(height * font_scale)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            font_scale,
+            cp_c.INK_COLOR,
+            thickness,
+            cv2.LINE_AA,
+        )
+    return page
+
+
+def _rotate(page: np.ndarray, angle: int, fill: int) -> np.ndarray:
+    """Rotate a page keeping all of its content.
+
+    Args:
+        page (np.ndarray): grayscale page image.
+        angle (int): counter clockwise rotation in degrees.
+        fill (int): border color.
+
+    Returns:
+        np.ndarray: rotated page image.
+    """
+    if not angle:
+        return page
+    height, width = page.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_width = int(height * sin + width * cos)
+    new_height = int(height * cos + width * sin)
+    matrix[0, 2] += (new_width - width) / 2
+    matrix[1, 2] += (new_height - height) / 2
+    return cv2.warpAffine(
+        page,
+        matrix,
+        (new_width, new_height),
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=fill,
+    )
+
+
+def _photograph(page: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Make a page look photographed, paper texture, uneven lighting,
+    a slight perspective and sensor noise.
+
+    Args:
+        page (np.ndarray): grayscale page image.
+        rng (np.random.Generator): corpus random generator.
+
+    Returns:
+        np.ndarray: photographed style image.
+    """
+    height, width = page.shape
+    texture = cv2.GaussianBlur(
+        rng.normal(0, cp_c.TEXTURE_SIGMA, page.shape),
+        (0, 0),
+        cp_c.TEXTURE_BLUR,
+    )
+    # dark ink on paper, the page white is replaced by the paper color
+    image = page.astype(np.float64) * cp_c.PAPER_COLOR / cp_c.PAGE_COLOR
+    image += texture
+    light = np.linspace(cp_c.LIGHT_MIN, 1.0, width)[np.newaxis, :]
+    image *= np.repeat(light, height, axis=0)
+    jitter = cp_c.PERSPECTIVE_JITTER * min(height, width)
+    corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    moved = corners + rng.uniform(0, jitter, corners.shape).astype(
+        np.float32
+    ) * np.float32([[1, 1], [-1, 1], [-1, -1], [1, -1]])
+    image = cv2.warpPerspective(
+        image,
+        cv2.getPerspectiveTransform(corners, moved),
+        (width, height),
+        borderMode=cv2.BORDER_REPLICATE,
+    )
+    image += rng.normal(0, cp_c.SENSOR_NOISE, image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def render_case(
+    spec: CaseSpec, qr_code: str, phone_number: str, rng: np.random.Generator
+) -> bytes:
+    """Render a corpus image.
+
+    Args:
+        spec (CaseSpec): image variation.
+        qr_code (str): QR Code content.
+        phone_number (str): phone number to print, empty for none.
+        rng (np.random.Generator): corpus random generator.
+
+    Returns:
+        bytes: encoded PNG or JPEG image.
+    """
+    page = _compose_page(_render_qr(qr_code, spec.qr_side), phone_number)
+    page = _rotate(page, spec.rotation, cp_c.PAGE_COLOR)
+    if spec.background == cp_c.PHOTO:
+        page = _photograph(page, rng)
+    if spec.blur:
+        page = cv2.GaussianBlur(page, (0, 0), spec.blur)
+    if spec.quality:
+        _, encoded = cv2.imencode(
+            cp_c.JPEG, page, [cv2.IMWRITE_JPEG_QUALITY, spec.quality]
+        )
+    else:
+        _, encoded = cv2.imencode(cp_c.PNG, page)
+    return encoded.tobytes()
+
+
+def build_corpus(seed: int = cp_c.SEED) -> List[CorpusCase]:
+    """Generate the corpus.
+    Same seed and OpenCV version generate the same images.
+
+    Args:
+        seed (int): random seed. default: CorpusConst.SEED.
+
+    Returns:
+        List[CorpusCase]: corpus images and expected detections.
+    """
+    rng = np.random.default_rng(seed)
+    cases = []
+    for index, spec in enumerate(case_specs()):
+        qr_code, phone_number = _payloads(rng, index)
+        phone_number = phone_number if spec.phone else ""
+        cases.append(
+            CorpusCase(
+                spec.name,
+                render_case(spec, qr_code, phone_number, rng),
+                qr_code,
+                phone_number,
+            )
+        )
+    return cases
+
+
+def fingerprint(cases: List[CorpusCase]) -> str:
+    """Corpus content hash, results are only comparable on equal hashes.
+
+    Args:
+        cases (List[CorpusCase]): corpus images.
+
+    Returns:
+        str: SHA256 of the images content.
+    """
+    digest = hashlib.sha256()
+    for case in cases:
+        digest.update(case.data)
+    return digest.hexdigest()
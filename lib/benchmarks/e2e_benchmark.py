@@ -0,0 +1,351 @@
+"""End-to-End Scaling Benchmark
+
+Runs the router, ingest and deduplicate services against local fake
+AirTable, Dropbox, S3 and SSM services as N packages, M donations and
+K Dropbox images grow. Run from the lib directory:
+    python -m benchmarks.e2e_benchmark --scales 4:20:40 16:80:160
+
+Fakes default to the real services rate limits, a service run failing
+on them is reported as failed. --rate-scale relaxes the limits to
+measure past them.
+
+Recorded with the default latency and rate limits, AirTable requests
+spaced by init_api, wall seconds and AirTable requests per service
+(QR decoding without libzbar, through an OpenCV stand-in):
+    scale       router        ingest       deduplicate
+    4:20:40     4.2 s, 13     2.2 s, 7     5.5 s, 22
+    16:80:160   14.2 s, 49    6.0 s, 23    21.3 s, 85
+Every run completed with no AirTable 429, only Dropbox downloads were
+throttled and retried by the router, 13 and 33 times.
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import importlib
+import tempfile
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional
+
+from esimslib.util import logger
+from esimslib.util.constants import (
+    MetricsConst as mt_c,
+    TracingConst as tr_c,
+)
+
+from benchmarks.constants import (
+    AirTableFakeConst as at_c,
+    CorpusConst as cp_c,
+    DropboxFakeConst as dbx_c,
+    E2EConst as e2e_c,
+    ScaleConst as sc_c,
+)
+from benchmarks.fakes.airtable import AirTableFake, AttachmentsFake
+from benchmarks.fakes.aws import S3Fake, SSMFake
+from benchmarks.fakes.base import FakeService, Profile
+from benchmarks.fakes.dropbox import DropboxFake
+from benchmarks.transport import redirect_hosts
+
+FAKES = {
+    e2e_c.AIRTABLE: AirTableFake,
+    e2e_c.ATTACHMENTS: AttachmentsFake,
+    e2e_c.DROPBOX: DropboxFake,
+    e2e_c.S3: S3Fake,
+    e2e_c.SSM: SSMFake,
+}
+
+
+def start_fakes(
+    latency_scale: float, rate_scale: float, seed: int
+) -> Dict[str, FakeService]:
+    """Start the fake services.
+
+    Args:
+        latency_scale (float): latency factor of the service profiles.
+        rate_scale (float): rate limit factor of the service profiles,
+            0 for no rate limits.
+        seed (int): latency jitter random seed.
+
+    Returns:
+        Dict[str, FakeService]: started fake services by name.
+    """
+    fakes = {}
+    for name, fake_type in FAKES.items():
+        profile = Profile(*e2e_c.PROFILES[name])
+        profile = profile._replace(
+            latency_ms=profile.latency_ms * latency_scale,
+            rate_per_s=(profile.rate_per_s or 0) * rate_scale or None,
+        )
+        fakes[name] = fake_type(profile, seed).start()
+    return fakes
+
+
+def service_env(fakes: Dict[str, FakeService], work_dir: str) -> dict:
+    """Service settings pointing at the fake services.
+
+    Args:
+        fakes (Dict[str, FakeService]): fake services by name.
+        work_dir (str): run local files directory.
+
+    Returns:
+        dict: environment variables.
+    """
+    hosts = {
+        at_c.API_HOST: fakes[e2e_c.AIRTABLE].address,
+        at_c.CONTENT_HOST: fakes[e2e_c.ATTACHMENTS].address,
+        dbx_c.API_HOST: fakes[e2e_c.DROPBOX].address,
+        dbx_c.CONTENT_HOST: fakes[e2e_c.DROPBOX].address,
+    }
+    return {
+        **e2e_c.AWS_ENV,
+        **e2e_c.S3_PREFIXES,
+        **{
+            name: os.path.join(work_dir, path)
+            for name, path in e2e_c.WORK_FILES.items()
+        },
+        e2e_c.S3_ENDPOINT: fakes[e2e_c.S3].url,
+        e2e_c.SSM_ENDPOINT: fakes[e2e_c.SSM].url,
+        e2e_c.AIRTABLE_API_KEY: e2e_c.AIRTABLE_KEY_PARAMETER,
+        e2e_c.DROPBOX_TOKEN: e2e_c.DROPBOX_TOKEN_PARAMETER,
+        e2e_c.AIRTABLE_BASE_ID: sc_c.BASE_ID,
+        e2e_c.HOSTS: json.dumps(hosts),
+        mt_c.ENABLED: mt_c.DISABLED,
+        tr_c.EXPORTER: tr_c.NONE,
+    }
+
+
+def rss_mb() -> float:
+    """Peak resident memory of the process.
+
+    Returns:
+        float: peak RSS in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / e2e_c.KB_PER_MB, e2e_c.DIGITS)
+
+
+def run_service(service: str, env: dict, connection: Connection) -> None:
+    """Run a service main in a fresh process and send its measures.
+    Services read their settings and connect once imported.
+
+    Args:
+        service (str): service name.
+        env (dict): service environment variables.
+        connection (Connection): parent connection.
+    """
+    os.environ.update(env)
+    redirect_hosts(json.loads(env[e2e_c.HOSTS]))
+    repo_dir = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    sys.path.insert(0, os.path.join(repo_dir, e2e_c.SERVICE_DIRS[service]))
+    result = {e2e_c.STATUS: e2e_c.OK}
+    started = time.perf_counter()
+    try:
+        module = importlib.import_module(e2e_c.SERVICE_MODULES[service])
+        result[e2e_c.STARTUP_SECONDS] = time.perf_counter() - started
+        result[e2e_c.IMPORT_RSS] = rss_mb()
+        started = time.perf_counter()
+        # as the service handlers do
+        importlib.import_module(e2e_c.AIRTABLE_MODULE).init_api()
+        module.main()
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("Service %s failed: %s", service, exc)
+        result.update({e2e_c.STATUS: e2e_c.FAILED, e2e_c.ERROR: repr(exc)})
+    result[e2e_c.WALL_SECONDS] = time.perf_counter() - started
+    result[e2e_c.PEAK_RSS] = rss_mb()
+    connection.send(result)
+    connection.close()
+
+
+def measure_service(
+    service: str, env: dict, fakes: Dict[str, FakeService]
+) -> dict:
+    """Measure a service run and its requests to each fake service.
+
+    Args:
+        service (str): service name.
+        env (dict): service environment variables.
+        fakes (Dict[str, FakeService]): fake services by name.
+
+    Returns:
+        dict: service measures.
+    """
+    for fake in fakes.values():
+        fake.reset_stats()
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_service, args=(service, env, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {e2e_c.STATUS: e2e_c.FAILED}
+    process.join()
+    result = {
+        key: round(value, e2e_c.DIGITS) if isinstance(value, float) else value
+        for key, value in result.items()
+    }
+    result[e2e_c.REQUESTS] = {
+        name: fake.stats() for name, fake in fakes.items()
+    }
+    return result
+
+
+def parse_scale(value: str) -> List[int]:
+    """Parse a N:M:K scale.
+
+    Args:
+        value (str): packages, donations and images count.
+
+    Raises:
+        argparse.ArgumentTypeError: if not three positive counts.
+
+    Returns:
+        List[int]: packages, donations and images count.
+    """
+    try:
+        counts = [int(count) for count in value.split(e2e_c.SCALE_SEPARATOR)]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(value) from exc
+    if len(counts) != 3 or min(counts) < 1:
+        raise argparse.ArgumentTypeError(value)
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv (List[str]): arguments. default: None, sys.argv.
+
+    Returns:
+        argparse.Namespace: parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=parse_scale,
+        default=[parse_scale(scale) for scale in e2e_c.DEFAULT_SCALES],
+        help="N:M:K packages, donations and Dropbox images",
+    )
+    parser.add_argument(
+        "--services",
+        nargs="+",
+        choices=e2e_c.SERVICES,
+        default=list(e2e_c.SERVICES),
+        help="services to run, in pipeline order on the same data",
+    )
+    parser.add_argument("--seed", type=int, default=cp_c.SEED)
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="fake services latency factor, 0 for no latency",
+    )
+    parser.add_argument(
+        "--rate-scale",
+        type=float,
+        default=1.0,
+        help="fake services rate limit factor, 0 for no rate limits",
+    )
+    parser.add_argument("--output", help="report file, stdout if not set")
+    return parser.parse_args(argv)
+
+
+def run_scale(
+    fakes: Dict[str, FakeService], counts: List[int], args: argparse.Namespace
+) -> dict:
+    """Seed the fake services and run the services on the data.
+
+    Args:
+        fakes (Dict[str, FakeService]): fake services by name.
+        counts (List[int]): packages, donations and images count.
+        args (argparse.Namespace): parsed arguments.
+
+    Returns:
+        dict: seeded data, service measures and data left.
+    """
+    scale_data = importlib.import_module(e2e_c.SCALE_DATA_MODULE)
+    fakes[e2e_c.S3].reset()  # type: ignore
+    data = scale_data.seed(
+        fakes[e2e_c.AIRTABLE],
+        fakes[e2e_c.ATTACHMENTS],
+        fakes[e2e_c.DROPBOX],
+        scale_data.ScaleSpec(*counts),
+        args.seed,
+    )
+    logger.info("Seeded scale %s", data)
+    runs = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = service_env(fakes, work_dir)
+        for service in args.services:
+            runs[service] = measure_service(service, env, fakes)
+            logger.info(
+                "%s %s: %s s, %s",
+                e2e_c.SCALE_SEPARATOR.join(map(str, counts)),
+                service,
+                runs[service].get(e2e_c.WALL_SECONDS),
+                runs[service][e2e_c.STATUS],
+            )
+    left = scale_data.summarize(fakes[e2e_c.AIRTABLE], fakes[e2e_c.DROPBOX])
+    left[e2e_c.S3_OBJECTS] = len(
+        fakes[e2e_c.S3].keys(e2e_c.BUCKET)  # type: ignore
+    )
+    return {e2e_c.SCALE: data, e2e_c.RUNS: runs, e2e_c.OUTCOME: left}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the services at every scale.
+
+    Args:
+        argv (List[str]): arguments. default: None, sys.argv.
+
+    Returns:
+        int: exit code, 1 if a service run failed.
+    """
+    args = parse_args(argv)
+    fakes = start_fakes(args.latency_scale, args.rate_scale, args.seed)
+    fakes[e2e_c.SSM].load(  # type: ignore
+        {
+            e2e_c.AIRTABLE_KEY_PARAMETER: e2e_c.FAKE_SECRET,
+            e2e_c.DROPBOX_TOKEN_PARAMETER: e2e_c.FAKE_SECRET,
+        }
+    )
+    # the data generator imports the AirTable models, which read
+    # their settings and API key on import
+    os.environ.update(service_env(fakes, tempfile.gettempdir()))
+    report: dict = {
+        e2e_c.SEED: args.seed,
+        e2e_c.LATENCY_SCALE: args.latency_scale,
+        e2e_c.RATE_SCALE: args.rate_scale,
+        e2e_c.RESULTS: [],
+    }
+    try:
+        for counts in args.scales:
+            report[e2e_c.RESULTS].append(run_scale(fakes, counts, args))
+    finally:
+        for fake in fakes.values():
+            fake.stop()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding=e2e_c.UTF8) as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+    failed = any(
+        run[e2e_c.STATUS] != e2e_c.OK
+        for result in report[e2e_c.RESULTS]
+        for run in result[e2e_c.RUNS].values()
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
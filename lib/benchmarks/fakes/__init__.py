@@ -0,0 +1 @@
+"""Fake Services"""
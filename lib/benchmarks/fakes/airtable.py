@@ -0,0 +1,483 @@
+"""Fake AirTable REST API and Attachments Host
+
+Only the list formulas issued by esimslib are understood, record ID
+lists and the snapshot modified time filter, others are rejected
+as invalid like an unsupported formula would be.
+"""
+
+import re
+import time
+import hashlib
+import calendar
+import itertools
+import posixpath
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.constants import AirTableFakeConst as at_c, FakeConst as fk_c
+from benchmarks.fakes.base import (
+    FakeService,
+    Profile,
+    Reply,
+    Request,
+    Route,
+    json_reply,
+)
+
+View = Callable[[dict], bool]
+RecordFilter = Callable[[dict, float], bool]
+
+
+def api_error(status: int, error: str, message: str = "") -> Reply:
+    """Build an AirTable error reply.
+
+    Args:
+        status (int): HTTP status.
+        error (str): error type.
+        message (str): error message. default: "".
+
+    Returns:
+        Reply: error reply.
+    """
+    return json_reply({"error": {"type": error, "message": message}}, status)
+
+
+def parse_formula(formula: Optional[str]) -> RecordFilter:
+    """Build a record filter of a list formula.
+
+    Args:
+        formula (str | None): filterByFormula value.
+
+    Raises:
+        ValueError: if the formula is not supported.
+
+    Returns:
+        Callable[[dict, float], bool]: filter of a record
+            and its modified time.
+    """
+    if not formula:
+        return lambda record, modified: True
+    record_ids = set(re.findall(at_c.RECORD_ID_PATTERN, formula))
+    if record_ids:
+        return lambda record, modified: record["id"] in record_ids
+    match = re.fullmatch(at_c.MODIFIED_PATTERN, formula)
+    if match:
+        after = calendar.timegm(
+            time.strptime(match.group(1), at_c.TIME_FORMAT)
+        )
+        return lambda record, modified: modified > after
+    raise ValueError(formula)
+
+
+class AirTableFake(FakeService):
+    """AirTable records API of a single base.
+    Table views are record filters registered with the tables.
+    """
+
+    def __init__(self, profile: Profile, seed: int = 0) -> None:
+        """Initialize AirTableFake.
+
+        Args:
+            profile (Profile): latency and rate limit profile.
+            seed (int): latency jitter random seed. default: 0.
+        """
+        self.tables: Dict[str, Dict[str, dict]] = {}
+        self.modified: Dict[str, float] = {}
+        self.views: Dict[Tuple[str, str], View] = {}
+        self._ids = itertools.count()
+        # written attachment IDs apart from the hosted ones
+        self._attachment_ids = itertools.count(at_c.WRITTEN_ATTACHMENT_START)
+        super().__init__(profile, seed)
+
+    def routes(self) -> List[Route]:
+        """AirTable records routes.
+
+        Returns:
+            List[Tuple[str, str, Callable]]: AirTable routes.
+        """
+        table = r"/v0/[^/]+/([^/]+)"
+        return [
+            ("GET", table, self.list_records),
+            ("POST", table + r"/listRecords", self.list_records),
+            ("GET", table + r"/(rec\w+)", self.get_record),
+            ("POST", table, self.create_records),
+            ("PATCH", table, self.update_records),
+            ("PATCH", table + r"/(rec\w+)", self.update_record),
+            ("DELETE", table, self.delete_records),
+        ]
+
+    def label(self, request: Request, handler: Callable) -> str:
+        """Name requests by handler and table.
+
+        Args:
+            request (Request): service request.
+            handler (Callable): route handler.
+
+        Returns:
+            str: handler and table name.
+        """
+        return f"{handler.__name__} {request.path.split('/')[3]}"
+
+    def throttle_reply(self) -> Reply:
+        """Reply to throttled requests.
+
+        Returns:
+            Reply: rate limit error.
+        """
+        return api_error(
+            429,
+            at_c.RATE_LIMIT,
+            "Rate limit exceeded. Please try again later",
+        )
+
+    def reset(self) -> None:
+        """Remove all tables and views."""
+        with self.lock:
+            self.tables = {}
+            self.modified = {}
+            self.views = {}
+
+    def add_view(self, table: str, view: str, keep: View) -> None:
+        """Register a table view.
+
+        Args:
+            table (str): table name.
+            view (str): view name.
+            keep (Callable[[dict], bool]): filter of record fields.
+        """
+        with self.lock:
+            self.views[table, view] = keep
+
+    def add(self, table: str, fields: dict) -> str:
+        """Add a record.
+
+        Args:
+            table (str): table name.
+            fields (dict): record fields.
+
+        Returns:
+            str: record ID.
+        """
+        with self.lock:
+            return self._create(table, fields)["id"]
+
+    def records(self, table: str) -> List[dict]:
+        """Table records.
+
+        Args:
+            table (str): table name.
+
+        Returns:
+            List[dict]: records in creation order.
+        """
+        with self.lock:
+            return list(self.tables.get(table, {}).values())
+
+    def _store_fields(self, fields: dict) -> dict:
+        """Stored record fields, AirTable drops empty values
+        and names the written attachments.
+
+        Args:
+            fields (dict): written fields.
+
+        Returns:
+            dict: stored fields.
+        """
+        stored = {}
+        for name, value in fields.items():
+            if value is None or value is False or value in ("", []):
+                continue
+            if isinstance(value, list) and isinstance(value[0], dict):
+                value = [
+                    {
+                        "id": at_c.ATTACHMENT_ID_FORMAT.format(
+                            next(self._attachment_ids)
+                        ),
+                        "filename": posixpath.basename(
+                            urlsplit(item["url"]).path
+                        ),
+                        **item,
+                    }
+                    for item in value
+                ]
+            stored[name] = value
+        return stored
+
+    def _create(self, table: str, fields: dict) -> dict:
+        """Create a record, lock held by the caller.
+
+        Args:
+            table (str): table name.
+            fields (dict): record fields.
+
+        Returns:
+            dict: created record.
+        """
+        now = time.time()
+        record = {
+            "id": at_c.RECORD_ID_FORMAT.format(next(self._ids)),
+            "createdTime": time.strftime(at_c.TIME_FORMAT, time.gmtime(now)),
+            "fields": self._store_fields(fields),
+        }
+        self.tables.setdefault(table, {})[record["id"]] = record
+        self.modified[record["id"]] = now
+        return record
+
+    def _update(self, table: str, record_id: str, fields: dict) -> dict:
+        """Update record fields, lock held by the caller.
+
+        Args:
+            table (str): table name.
+            record_id (str): record ID.
+            fields (dict): updated fields.
+
+        Raises:
+            KeyError: if no such record.
+
+        Returns:
+            dict: updated record.
+        """
+        record = self.tables[table][record_id]
+        merged = {**record["fields"], **fields}
+        record["fields"] = self._store_fields(merged)
+        self.modified[record_id] = time.time()
+        return record
+
+    @staticmethod
+    def _project(record: dict, fields: List[str]) -> dict:
+        """Record with only the requested fields.
+
+        Args:
+            record (dict): stored record.
+            fields (List[str]): field names, all if empty.
+
+        Returns:
+            dict: record copy.
+        """
+        return {
+            **record,
+            "fields": {
+                name: value
+                for name, value in record["fields"].items()
+                if not fields or name in fields
+            },
+        }
+
+    def list_records(self, request: Request) -> Reply:
+        """List a page of table records.
+        Options are query arguments, or the JSON body of POST requests
+        whose formula is too long for a url.
+
+        Args:
+            request (Request): list records request.
+
+        Returns:
+            Reply: records page and next page offset if any,
+                invalid request error for unknown views and formulas.
+        """
+        options = request.json()
+        table = request.params[0]
+        view = options.get(at_c.VIEW, request.arg(at_c.VIEW))
+        fields = options.get(at_c.FIELDS) or request.query.get(
+            at_c.FIELDS_PARAM, []
+        )
+        page_size = int(
+            options.get(at_c.PAGE_SIZE_PARAM)
+            or request.arg(at_c.PAGE_SIZE_PARAM, str(at_c.PAGE_SIZE))
+        )
+        offset = options.get(at_c.OFFSET) or request.arg(at_c.OFFSET, "")
+        start = int(offset[len(at_c.OFFSET_PREFIX) :] or 0)
+        try:
+            keep = parse_formula(
+                options.get(at_c.FORMULA, request.arg(at_c.FORMULA))
+            )
+        except ValueError as exc:
+            return api_error(422, at_c.INVALID_FORMULA, str(exc))
+        with self.lock:
+            in_view = self.views.get((table, view)) if view else None
+            if view and in_view is None:
+                return api_error(422, at_c.INVALID_VIEW, view)
+            matching = [
+                self._project(record, fields)
+                for record in self.tables.get(table, {}).values()
+                if keep(record, self.modified[record["id"]])
+                and (in_view is None or in_view(record["fields"]))
+            ]
+        end = start + min(page_size, at_c.PAGE_SIZE)
+        page: dict = {"records": matching[start:end]}
+        if end < len(matching):
+            page[at_c.OFFSET] = at_c.OFFSET_FORMAT.format(end)
+        return json_reply(page)
+
+    def get_record(self, request: Request) -> Reply:
+        """Read a record.
+
+        Args:
+            request (Request): get record request.
+
+        Returns:
+            Reply: record, not found error if missing.
+        """
+        table, record_id = request.params
+        with self.lock:
+            record = self.tables.get(table, {}).get(record_id)
+            if record is None:
+                return api_error(404, at_c.NOT_FOUND, record_id)
+            return json_reply(self._project(record, []))
+
+    def create_records(self, request: Request) -> Reply:
+        """Create a record or a batch of records.
+
+        Args:
+            request (Request): create records request.
+
+        Returns:
+            Reply: created records, invalid request error
+                past the batch limit.
+        """
+        payload = request.json()
+        table = request.params[0]
+        if at_c.RECORDS not in payload:
+            with self.lock:
+                return json_reply(self._create(table, payload["fields"]))
+        if len(payload[at_c.RECORDS]) > at_c.MAX_BATCH:
+            return api_error(422, at_c.INVALID_REQUEST, "too many records")
+        with self.lock:
+            return json_reply(
+                {
+                    at_c.RECORDS: [
+                        self._create(table, record["fields"])
+                        for record in payload[at_c.RECORDS]
+                    ]
+                }
+            )
+
+    def update_records(self, request: Request) -> Reply:
+        """Update a batch of records.
+
+        Args:
+            request (Request): update records request.
+
+        Returns:
+            Reply: updated records, invalid request error
+                past the batch limit.
+        """
+        records = request.json()[at_c.RECORDS]
+        if len(records) > at_c.MAX_BATCH:
+            return api_error(422, at_c.INVALID_REQUEST, "too many records")
+        with self.lock:
+            updated = [
+                self._update(request.params[0], record["id"], record["fields"])
+                for record in records
+            ]
+        return json_reply({at_c.RECORDS: updated})
+
+    def update_record(self, request: Request) -> Reply:
+        """Update a record.
+
+        Args:
+            request (Request): update record request.
+
+        Returns:
+            Reply: updated record.
+        """
+        table, record_id = request.params
+        with self.lock:
+            return json_reply(
+                self._update(table, record_id, request.json()["fields"])
+            )
+
+    def delete_records(self, request: Request) -> Reply:
+        """Delete a batch of records.
+
+        Args:
+            request (Request): delete records request.
+
+        Returns:
+            Reply: deleted records, invalid request error
+                past the batch limit.
+        """
+        record_ids = request.query.get(at_c.RECORDS_PARAM, [])
+        if len(record_ids) > at_c.MAX_BATCH:
+            return api_error(422, at_c.INVALID_REQUEST, "too many records")
+        with self.lock:
+            for record_id in record_ids:
+                del self.tables[request.params[0]][record_id]
+                self.modified.pop(record_id)
+        return json_reply(
+            {
+                at_c.RECORDS: [
+                    {"id": record_id, "deleted": True}
+                    for record_id in record_ids
+                ]
+            }
+        )
+
+
+class AttachmentsFake(FakeService):
+    """AirTable attachments content host."""
+
+    def __init__(self, profile: Profile, seed: int = 0) -> None:
+        """Initialize AttachmentsFake.
+
+        Args:
+            profile (Profile): latency and rate limit profile.
+            seed (int): latency jitter random seed. default: 0.
+        """
+        self.files: Dict[str, Tuple[bytes, str]] = {}
+        self._ids = itertools.count()
+        super().__init__(profile, seed)
+
+    def routes(self) -> List[Route]:
+        """Attachment content routes.
+
+        Returns:
+            List[Tuple[str, str, Callable]]: attachment routes.
+        """
+        return [("GET", r"/([^/]+)/[^/]+", self.download)]
+
+    def reset(self) -> None:
+        """Remove all attachments."""
+        with self.lock:
+            self.files = {}
+
+    def add(self, filename: str, data: bytes) -> dict:
+        """Host an attachment.
+
+        Args:
+            filename (str): attachment file name.
+            data (bytes): attachment content.
+
+        Returns:
+            dict: AirTable attachment.
+        """
+        with self.lock:
+            key = at_c.ATTACHMENT_ID_FORMAT.format(next(self._ids))
+            etag = hashlib.sha256(data).hexdigest()[: at_c.ETAG_LENGTH]
+            self.files[key] = (data, f'"{etag}"')
+        return {
+            "id": key,
+            "url": at_c.ATTACHMENT_URL_FORMAT.format(key, filename),
+            "filename": filename,
+            "size": len(data),
+            "type": fk_c.BINARY_TYPE,
+        }
+
+    def download(self, request: Request) -> Reply:
+        """Download an attachment, not modified if the ETag matches.
+
+        Args:
+            request (Request): attachment request.
+
+        Returns:
+            Reply: attachment content.
+        """
+        with self.lock:
+            data, etag = self.files[request.params[0]]
+        if request.headers.get(at_c.IF_NONE_MATCH) == etag:
+            return Reply(304, headers={at_c.ETAG: etag})
+        return Reply(
+            200,
+            data,
+            {fk_c.CONTENT_TYPE: fk_c.BINARY_TYPE, at_c.ETAG: etag},
+        )
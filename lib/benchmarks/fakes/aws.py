@@ -0,0 +1,358 @@
+"""Fake AWS S3 and SSM Services"""
+
+import time
+import hashlib
+from typing import Callable, Dict, List, NamedTuple
+from html import escape
+
+from benchmarks.constants import AWSFakeConst as aws_c, FakeConst as fk_c
+from benchmarks.fakes.base import (
+    FakeService,
+    Profile,
+    Reply,
+    Request,
+    Route,
+    json_reply,
+)
+
+
+class S3Object(NamedTuple):
+    """Stored S3 object."""
+
+    data: bytes
+    content_type: str
+    etag: str
+    modified: float
+
+
+def xml_error(status: int, code: str, message: str = "") -> Reply:
+    """Build an S3 XML error reply.
+
+    Args:
+        status (int): HTTP status.
+        code (str): S3 error code.
+        message (str): error message. default: "".
+
+    Returns:
+        Reply: error reply.
+    """
+    return Reply(
+        status,
+        aws_c.ERROR.format(code, escape(message)).encode(fk_c.UTF8),
+        {fk_c.CONTENT_TYPE: aws_c.XML_TYPE},
+    )
+
+
+class S3Fake(FakeService):
+    """S3 REST API with path style bucket addressing."""
+
+    def __init__(self, profile: Profile, seed: int = 0) -> None:
+        """Initialize S3Fake.
+
+        Args:
+            profile (Profile): latency and rate limit profile.
+            seed (int): latency jitter random seed. default: 0.
+        """
+        self.buckets: Dict[str, Dict[str, S3Object]] = {}
+        super().__init__(profile, seed)
+
+    def routes(self) -> List[Route]:
+        """S3 object routes.
+
+        Returns:
+            List[Tuple[str, str, Callable]]: S3 routes.
+        """
+        return [
+            ("GET", r"/([^/]+)/?", self.list_objects),
+            ("PUT", r"/([^/]+)/(.+)", self.put_object),
+            ("GET", r"/([^/]+)/(.+)", self.get_object),
+            ("HEAD", r"/([^/]+)/(.+)", self.get_object),
+            ("DELETE", r"/([^/]+)/(.+)", self.delete_object),
+        ]
+
+    def throttle_reply(self) -> Reply:
+        """Reply to throttled requests.
+
+        Returns:
+            Reply: SlowDown error.
+        """
+        return xml_error(503, aws_c.SLOW_DOWN, "Please reduce your rate.")
+
+    def reset(self) -> None:
+        """Remove all objects."""
+        with self.lock:
+            self.buckets.clear()
+
+    def keys(self, bucket: str) -> List[str]:
+        """Bucket object keys.
+
+        Args:
+            bucket (str): bucket name.
+
+        Returns:
+            List[str]: keys in key order.
+        """
+        with self.lock:
+            return sorted(self.buckets.get(bucket, {}))
+
+    def put_object(self, request: Request) -> Reply:
+        """Store an object.
+
+        Args:
+            request (Request): PutObject request.
+
+        Returns:
+            Reply: object ETag.
+        """
+        bucket, key = request.params
+        etag = hashlib.sha256(request.body).hexdigest()[: aws_c.ETAG_LENGTH]
+        with self.lock:
+            self.buckets.setdefault(bucket, {})[key] = S3Object(
+                request.body,
+                request.headers.get(
+                    fk_c.CONTENT_TYPE.lower(), fk_c.BINARY_TYPE
+                ),
+                etag,
+                time.time(),
+            )
+        return Reply(200, headers={aws_c.ETAG: f'"{etag}"'})
+
+    def get_object(self, request: Request) -> Reply:
+        """Read an object.
+
+        Args:
+            request (Request): GetObject or HeadObject request.
+
+        Returns:
+            Reply: object content, NoSuchKey error if missing.
+        """
+        bucket, key = request.params
+        with self.lock:
+            stored = self.buckets.get(bucket, {}).get(key)
+        if stored is None:
+            return xml_error(404, aws_c.NO_SUCH_KEY, key)
+        return Reply(
+            200,
+            stored.data,
+            {
+                fk_c.CONTENT_TYPE: stored.content_type,
+                aws_c.ETAG: f'"{stored.etag}"',
+                aws_c.LAST_MODIFIED: time.strftime(
+                    aws_c.HTTP_DATE_FORMAT, time.gmtime(stored.modified)
+                ),
+            },
+        )
+
+    def delete_object(self, request: Request) -> Reply:
+        """Delete an object, missing objects are not an error.
+
+        Args:
+            request (Request): DeleteObject request.
+
+        Returns:
+            Reply: empty reply.
+        """
+        bucket, key = request.params
+        with self.lock:
+            self.buckets.get(bucket, {}).pop(key, None)
+        return Reply(204)
+
+    def list_objects(self, request: Request) -> Reply:
+        """List objects under a prefix, a page at a time.
+
+        Args:
+            request (Request): ListObjectsV2 request.
+
+        Returns:
+            Reply: XML page of objects.
+        """
+        bucket = request.params[0]
+        prefix = request.arg(aws_c.PREFIX, "")
+        max_keys = int(request.arg(aws_c.MAX_KEYS, aws_c.DEFAULT_MAX_KEYS))
+        after = request.arg(aws_c.CONTINUATION_TOKEN) or request.arg(
+            aws_c.START_AFTER, ""
+        )
+        with self.lock:
+            objects = self.buckets.get(bucket, {})
+            matching = [
+                (key, objects[key])
+                for key in sorted(objects)
+                if key.startswith(prefix) and key > after
+            ]
+        page = matching[:max_keys]
+        truncated = len(matching) > max_keys
+        contents = "".join(
+            aws_c.CONTENTS.format(
+                escape(key),
+                time.strftime(
+                    aws_c.ISO_DATE_FORMAT, time.gmtime(stored.modified)
+                ),
+                stored.etag,
+                len(stored.data),
+            )
+            for key, stored in page
+        )
+        body = aws_c.LIST_RESULT.format(
+            escape(bucket),
+            escape(prefix),
+            len(page),
+            max_keys,
+            str(truncated).lower(),
+            aws_c.NEXT_TOKEN.format(escape(page[-1][0])) if truncated else "",
+            contents,
+        )
+        return Reply(
+            200, body.encode(fk_c.UTF8), {fk_c.CONTENT_TYPE: aws_c.XML_TYPE}
+        )
+
+
+def json_error(code: str, message: str = "") -> Reply:
+    """Build an AWS JSON protocol error reply.
+
+    Args:
+        code (str): error type.
+        message (str): error message. default: "".
+
+    Returns:
+        Reply: error reply.
+    """
+    return json_reply(
+        {aws_c.ERROR_TYPE: code, aws_c.MESSAGE: message},
+        400,
+        {fk_c.CONTENT_TYPE: aws_c.AMZ_JSON_TYPE},
+    )
+
+
+class SSMFake(FakeService):
+    """SSM Parameter Store JSON API."""
+
+    def __init__(self, profile: Profile, seed: int = 0) -> None:
+        """Initialize SSMFake.
+
+        Args:
+            profile (Profile): latency and rate limit profile.
+            seed (int): latency jitter random seed. default: 0.
+        """
+        self.parameters: Dict[str, str] = {}
+        self.versions: Dict[str, int] = {}
+        self.actions: Dict[str, Callable[[dict], Reply]] = {
+            "GetParameter": self.get_parameter,
+            "PutParameter": self.put_parameter,
+        }
+        super().__init__(profile, seed)
+
+    def routes(self) -> List[Route]:
+        """SSM routes, actions are named by the target header.
+
+        Returns:
+            List[Tuple[str, str, Callable]]: SSM routes.
+        """
+        return [("POST", r"/", self.call)]
+
+    def label(self, request: Request, handler: Callable) -> str:
+        """Name requests by their action.
+
+        Args:
+            request (Request): service request.
+            handler (Callable): route handler.
+
+        Returns:
+            str: action name.
+        """
+        return self._action(request)
+
+    def throttle_reply(self) -> Reply:
+        """Reply to throttled requests.
+
+        Returns:
+            Reply: ThrottlingException error.
+        """
+        return json_error(aws_c.THROTTLING, "Rate exceeded")
+
+    @staticmethod
+    def _action(request: Request) -> str:
+        """Requested action.
+
+        Args:
+            request (Request): service request.
+
+        Returns:
+            str: action name.
+        """
+        return request.headers.get(aws_c.TARGET, "").rpartition(
+            aws_c.TARGET_SEPARATOR
+        )[2]
+
+    def load(self, parameters: Dict[str, str]) -> None:
+        """Replace stored parameters.
+
+        Args:
+            parameters (Dict[str, str]): values by name.
+        """
+        with self.lock:
+            self.parameters = dict(parameters)
+            self.versions = dict.fromkeys(parameters, 1)
+
+    def call(self, request: Request) -> Reply:
+        """Run the requested action.
+
+        Args:
+            request (Request): SSM request.
+
+        Returns:
+            Reply: action reply, InvalidAction error if unknown.
+        """
+        action = self.actions.get(self._action(request))
+        if action is None:
+            return json_error(aws_c.INVALID_ACTION, self._action(request))
+        return action(request.json())
+
+    def get_parameter(self, payload: dict) -> Reply:
+        """Read a parameter.
+
+        Args:
+            payload (dict): GetParameter payload.
+
+        Returns:
+            Reply: parameter, ParameterNotFound error if missing.
+        """
+        name = payload["Name"]
+        with self.lock:
+            value = self.parameters.get(name)
+            version = self.versions.get(name)
+        if value is None:
+            return json_error(aws_c.PARAMETER_NOT_FOUND, name)
+        return json_reply(
+            {
+                "Parameter": {
+                    "Name": name,
+                    "Type": aws_c.STRING_TYPE,
+                    "Value": value,
+                    "Version": version,
+                }
+            },
+            headers={fk_c.CONTENT_TYPE: aws_c.AMZ_JSON_TYPE},
+        )
+
+    def put_parameter(self, payload: dict) -> Reply:
+        """Write a parameter.
+
+        Args:
+            payload (dict): PutParameter payload.
+
+        Returns:
+            Reply: parameter version, ParameterAlreadyExists error
+                if it exists and is not overwritten.
+        """
+        name = payload["Name"]
+        with self.lock:
+            if name in self.parameters and not payload.get("Overwrite"):
+                return json_error(aws_c.PARAMETER_ALREADY_EXISTS, name)
+            self.parameters[name] = payload["Value"]
+            # versions count the overwrites, as conditional writes rely on
+            version = self.versions.get(name, 0) + 1
+            self.versions[name] = version
+        return json_reply(
+            {"Version": version},
+            headers={fk_c.CONTENT_TYPE: aws_c.AMZ_JSON_TYPE},
+        )
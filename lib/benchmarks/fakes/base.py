@@ -0,0 +1,362 @@
+"""Fake HTTP Service
+
+Fake services run in process on a local port, each request waits
+the service latency and is throttled past the service rate limit,
+so clients exercise their real HTTP, retry and backoff paths.
+"""
+
+import re
+import json
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+)
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from benchmarks.constants import FakeConst as fk_c
+
+
+class Request(NamedTuple):
+    """Fake service request."""
+
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes
+    params: Tuple[str, ...] = ()
+
+    def json(self) -> dict:
+        """Decode JSON body.
+
+        Returns:
+            dict: body, empty if none.
+        """
+        return json.loads(self.body) if self.body else {}
+
+    def arg(self, name: str, default: str = None) -> Optional[str]:
+        """Get first query argument value.
+
+        Args:
+            name (str): argument name.
+            default (str): value if missing. default: None.
+
+        Returns:
+            str | None: argument value.
+        """
+        return self.query.get(name, [default])[0]
+
+
+class Reply(NamedTuple):
+    """Fake service reply."""
+
+    status: int
+    body: bytes = b""
+    headers: Optional[Dict[str, str]] = None
+
+
+def json_reply(
+    payload: object, status: int = 200, headers: Dict[str, str] = None
+) -> Reply:
+    """Build a JSON reply.
+
+    Args:
+        payload (object): JSON payload.
+        status (int): HTTP status. default: 200.
+        headers (Dict[str, str]): extra headers. default: None.
+
+    Returns:
+        Reply: JSON reply.
+    """
+    return Reply(
+        status,
+        json.dumps(payload).encode(fk_c.UTF8),
+        {fk_c.CONTENT_TYPE: fk_c.JSON_TYPE, **(headers or {})},
+    )
+
+
+class Profile(NamedTuple):
+    """Service latency and rate limit profile."""
+
+    latency_ms: float
+    rate_per_s: Optional[float] = None
+    burst: int = 1
+    bandwidth_mbps: Optional[float] = None
+
+
+class RateLimiter:
+    """Token bucket rate limiter."""
+
+    def __init__(self, rate_per_s: float, burst: int) -> None:
+        """Initialize RateLimiter.
+
+        Args:
+            rate_per_s (float): refilled tokens per second.
+            burst (int): bucket size.
+        """
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Take a token if available.
+
+        Returns:
+            bool: True if allowed, False if throttled.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate_per_s,
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+Route = Tuple[str, str, Callable[[Request], Reply]]
+
+
+class FakeServer(ThreadingHTTPServer):
+    """HTTP server of a fake service."""
+
+    daemon_threads = True
+    service: "FakeService"
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Forward HTTP requests to the fake service."""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body in one segment, no delayed ACK stalls
+    disable_nagle_algorithm = True
+    wbufsize = -1
+    server: FakeServer
+
+    def handle_request(self) -> None:
+        """Read request, dispatch it and write its reply."""
+        parts = urlsplit(self.path)
+        length = int(self.headers.get(fk_c.CONTENT_LENGTH, 0))
+        request = Request(
+            self.command,
+            unquote(parts.path),
+            parse_qs(parts.query, keep_blank_values=True),
+            {key.lower(): value for key, value in self.headers.items()},
+            self.rfile.read(length) if length else b"",
+        )
+        reply = self.server.service.dispatch(request)
+        self.send_response(reply.status)
+        for header, value in (reply.headers or {}).items():
+            self.send_header(header, value)
+        self.send_header(fk_c.CONTENT_LENGTH, str(len(reply.body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(reply.body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = handle_request
+
+    def handle_expect_100(self) -> bool:
+        """Send the interim reply at once, writes are buffered.
+
+        Returns:
+            bool: True, request body is read.
+        """
+        accepted = super().handle_expect_100()
+        self.wfile.flush()
+        return accepted
+
+    def log_message(
+        self, format: str, *args: Any  # pylint: disable=redefined-builtin
+    ) -> None:
+        """Silence request logs, requests are counted instead.
+
+        Args:
+            format (str): log format.
+            args (Any): log values.
+        """
+
+
+# pylint: disable=too-many-instance-attributes
+class FakeService:
+    """Fake HTTP service base.
+    Subclasses declare their routes and hold the service state.
+    """
+
+    def __init__(self, profile: Profile, seed: int = 0) -> None:
+        """Initialize FakeService.
+
+        Args:
+            profile (Profile): latency and rate limit profile.
+            seed (int): latency jitter random seed. default: 0.
+        """
+        self.profile = profile
+        self.limiter = (
+            RateLimiter(profile.rate_per_s, profile.burst)
+            if profile.rate_per_s
+            else None
+        )
+        self.counts: Counter = Counter()
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self._routes: List[Tuple[str, Pattern, Callable]] = [
+            (method, re.compile(pattern), handler)
+            for method, pattern, handler in self.routes()
+        ]
+        self.server = FakeServer((fk_c.HOST, 0), FakeHandler)
+        self.server.service = self
+        self._thread: Optional[threading.Thread] = None
+
+    def routes(self) -> List[Route]:
+        """Service routes.
+
+        Raises:
+            NotImplementedError: if not implemented by subclass.
+
+        Returns:
+            List[Tuple[str, str, Callable]]: method, path pattern
+                and handler of each route.
+        """
+        raise NotImplementedError
+
+    def label(
+        self,
+        request: Request,  # pylint: disable=unused-argument
+        handler: Callable,
+    ) -> str:
+        """Name of a request in the counters.
+
+        Args:
+            request (Request): service request.
+            handler (Callable): route handler.
+
+        Returns:
+            str: route name, the handler name by default.
+        """
+        return handler.__name__
+
+    def throttle_reply(self) -> Reply:
+        """Reply to throttled requests.
+
+        Returns:
+            Reply: rate limit error.
+        """
+        return json_reply({}, 429)
+
+    @property
+    def url(self) -> str:
+        """Service base url.
+
+        Returns:
+            str: local url.
+        """
+        return fk_c.URL_FORMAT.format(*self.server.server_address[:2])
+
+    @property
+    def address(self) -> str:
+        """Service host and port.
+
+        Returns:
+            str: local address.
+        """
+        return urlsplit(self.url).netloc
+
+    def start(self) -> "FakeService":
+        """Serve requests in a background thread.
+
+        Returns:
+            FakeService: started service.
+        """
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving requests."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self) -> None:
+        """Reset request counters."""
+        with self.lock:
+            self.counts.clear()
+            self.throttled = 0
+            self.bytes_sent = 0
+
+    def stats(self) -> dict:
+        """Request counters.
+
+        Returns:
+            dict: requests by route, throttled requests and bytes sent.
+        """
+        with self.lock:
+            return {
+                fk_c.REQUESTS: sum(self.counts.values()),
+                fk_c.THROTTLED: self.throttled,
+                fk_c.BYTES_SENT: self.bytes_sent,
+                fk_c.ROUTES: dict(sorted(self.counts.items())),
+            }
+
+    def _wait(self, size: int) -> None:
+        """Wait the request latency and the reply transfer time.
+
+        Args:
+            size (int): reply body size in bytes.
+        """
+        with self.lock:
+            jitter = self._rng.uniform(1 - fk_c.JITTER, 1 + fk_c.JITTER)
+        seconds = self.profile.latency_ms * jitter / 1000
+        if self.profile.bandwidth_mbps:
+            seconds += size / (self.profile.bandwidth_mbps * fk_c.BYTES_PER_MB)
+        time.sleep(seconds)
+
+    def dispatch(self, request: Request) -> Reply:
+        """Route a request to its handler.
+
+        Args:
+            request (Request): service request.
+
+        Returns:
+            Reply: handler reply, 404 if no route or resource.
+        """
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if method == request.method and match:
+                break
+        else:
+            return json_reply({}, 404)
+        with self.lock:
+            self.counts[self.label(request, handler)] += 1
+        if self.limiter and not self.limiter.acquire():
+            with self.lock:
+                self.throttled += 1
+            self._wait(0)
+            return self.throttle_reply()
+        try:
+            reply = handler(request._replace(params=match.groups()))
+        except KeyError:
+            reply = json_reply({}, 404)
+        self._wait(len(reply.body))
+        with self.lock:
+            self.bytes_sent += len(reply.body)
+        return reply
@@ -0,0 +1,281 @@
+"""Fake Dropbox Files API"""
+
+import json
+import time
+import itertools
+import posixpath
+from typing import Dict, List, NamedTuple
+
+from benchmarks.constants import DropboxFakeConst as dbx_c, FakeConst as fk_c
+from benchmarks.fakes.base import (
+    FakeService,
+    Profile,
+    Reply,
+    Request,
+    Route,
+    json_reply,
+)
+
+
+class DropboxFile(NamedTuple):
+    """Stored Dropbox file."""
+
+    path_display: str
+    data: bytes
+    file_id: str
+    rev: str
+    modified: float
+
+
+def api_error(summary: str, error: dict) -> Reply:
+    """Build a Dropbox endpoint error reply.
+
+    Args:
+        summary (str): error summary.
+        error (dict): tagged error.
+
+    Returns:
+        Reply: 409 error reply.
+    """
+    return json_reply({"error_summary": summary, "error": error}, 409)
+
+
+def not_found() -> Reply:
+    """Path not found error reply.
+
+    Returns:
+        Reply: 409 error reply.
+    """
+    return api_error(
+        "path/not_found/",
+        {dbx_c.TAG: "path", "path": {dbx_c.TAG: "not_found"}},
+    )
+
+
+class DropboxFake(FakeService):
+    """Dropbox files API, RPC and content endpoints on one service."""
+
+    def __init__(self, profile: Profile, seed: int = 0) -> None:
+        """Initialize DropboxFake.
+
+        Args:
+            profile (Profile): latency and rate limit profile.
+            seed (int): latency jitter random seed. default: 0.
+        """
+        self.files: Dict[str, DropboxFile] = {}
+        self.jobs: Dict[str, List[dict]] = {}
+        self._ids = itertools.count()
+        super().__init__(profile, seed)
+
+    def routes(self) -> List[Route]:
+        """Dropbox files routes.
+
+        Returns:
+            List[Tuple[str, str, Callable]]: Dropbox routes.
+        """
+        return [
+            ("POST", r"/2/files/list_folder", self.list_folder),
+            ("POST", r"/2/files/list_folder/continue", self.list_continue),
+            ("POST", r"/2/files/download", self.download),
+            ("POST", r"/2/files/delete_batch", self.delete_batch),
+            ("POST", r"/2/files/delete_batch/check", self.delete_check),
+        ]
+
+    def throttle_reply(self) -> Reply:
+        """Reply to throttled requests.
+
+        Returns:
+            Reply: too many requests error with its backoff.
+        """
+        return json_reply(
+            {
+                "error_summary": "too_many_requests/",
+                "error": {
+                    "reason": {dbx_c.TAG: "too_many_requests"},
+                    "retry_after": dbx_c.RETRY_AFTER_SECONDS,
+                },
+            },
+            429,
+            {fk_c.RETRY_AFTER: str(dbx_c.RETRY_AFTER_SECONDS)},
+        )
+
+    def load(self, files: Dict[str, bytes]) -> None:
+        """Replace stored files.
+
+        Args:
+            files (Dict[str, bytes]): content by path.
+        """
+        now = time.time()
+        with self.lock:
+            self.files = {}
+            self.jobs = {}
+            for path, data in files.items():
+                index = next(self._ids)
+                self.files[path.lower()] = DropboxFile(
+                    path,
+                    data,
+                    dbx_c.FILE_ID_FORMAT.format(index),
+                    dbx_c.REV_FORMAT.format(index + 1),
+                    now,
+                )
+
+    def paths(self) -> List[str]:
+        """Stored file paths.
+
+        Returns:
+            List[str]: display paths in path order.
+        """
+        with self.lock:
+            return sorted(
+                stored.path_display for stored in self.files.values()
+            )
+
+    @staticmethod
+    def metadata(stored: DropboxFile) -> dict:
+        """File metadata.
+
+        Args:
+            stored (DropboxFile): stored file.
+
+        Returns:
+            dict: file metadata.
+        """
+        modified = time.strftime(
+            dbx_c.TIME_FORMAT, time.gmtime(stored.modified)
+        )
+        return {
+            dbx_c.TAG: "file",
+            "name": posixpath.basename(stored.path_display),
+            "id": stored.file_id,
+            "client_modified": modified,
+            "server_modified": modified,
+            "rev": stored.rev,
+            "size": len(stored.data),
+            "path_lower": stored.path_display.lower(),
+            "path_display": stored.path_display,
+            "is_downloadable": True,
+        }
+
+    def _page(self, folder: str, offset: int) -> Reply:
+        """List a page of folder files.
+
+        Args:
+            folder (str): lower case folder path.
+            offset (int): first entry index.
+
+        Returns:
+            Reply: entries page, not found error if no such folder.
+        """
+        with self.lock:
+            entries = [
+                self.metadata(stored)
+                for path, stored in sorted(self.files.items())
+                if posixpath.dirname(path) == folder
+            ]
+            exists = entries or any(
+                path.startswith(folder + "/") for path in self.files
+            )
+        if not exists:
+            return not_found()
+        end = offset + dbx_c.PAGE_SIZE
+        return json_reply(
+            {
+                "entries": entries[offset:end],
+                "cursor": f"{folder}{dbx_c.CURSOR_SEPARATOR}{end}",
+                "has_more": end < len(entries),
+            }
+        )
+
+    def list_folder(self, request: Request) -> Reply:
+        """List folder files.
+
+        Args:
+            request (Request): list_folder request.
+
+        Returns:
+            Reply: first entries page.
+        """
+        return self._page(request.json()["path"].lower().rstrip("/"), 0)
+
+    def list_continue(self, request: Request) -> Reply:
+        """List next folder files page.
+
+        Args:
+            request (Request): list_folder/continue request.
+
+        Returns:
+            Reply: next entries page.
+        """
+        folder, _, offset = request.json()["cursor"].rpartition(
+            dbx_c.CURSOR_SEPARATOR
+        )
+        return self._page(folder, int(offset))
+
+    def download(self, request: Request) -> Reply:
+        """Download a file.
+
+        Args:
+            request (Request): download request, path in its API header.
+
+        Returns:
+            Reply: file content and metadata, not found error if missing.
+        """
+        path = json.loads(request.headers[dbx_c.API_ARG])["path"]
+        with self.lock:
+            stored = self.files.get(path.lower())
+        if stored is None:
+            return not_found()
+        return Reply(
+            200,
+            stored.data,
+            {
+                fk_c.CONTENT_TYPE: fk_c.BINARY_TYPE,
+                dbx_c.API_RESULT: json.dumps(self.metadata(stored)),
+            },
+        )
+
+    def delete_batch(self, request: Request) -> Reply:
+        """Delete files, the job is complete once started.
+
+        Args:
+            request (Request): delete_batch request.
+
+        Returns:
+            Reply: async job ID.
+        """
+        results = []
+        with self.lock:
+            for entry in request.json()["entries"]:
+                stored = self.files.pop(entry["path"].lower(), None)
+                results.append(
+                    {dbx_c.TAG: "success", "metadata": self.metadata(stored)}
+                    if stored
+                    else {
+                        dbx_c.TAG: "failure",
+                        "failure": {
+                            dbx_c.TAG: "path_lookup",
+                            "path_lookup": {dbx_c.TAG: "not_found"},
+                        },
+                    }
+                )
+            job_id = dbx_c.JOB_ID_FORMAT.format(len(self.jobs))
+            self.jobs[job_id] = results
+        return json_reply({dbx_c.TAG: "async_job_id", "async_job_id": job_id})
+
+    def delete_check(self, request: Request) -> Reply:
+        """Check a delete job.
+
+        Args:
+            request (Request): delete_batch/check request.
+
+        Returns:
+            Reply: job entries, error if unknown job.
+        """
+        with self.lock:
+            results = self.jobs.get(request.json()["async_job_id"])
+        if results is None:
+            return api_error(
+                "invalid_async_job_id/",
+                {dbx_c.TAG: "invalid_async_job_id"},
+            )
+        return json_reply({dbx_c.TAG: "complete", "entries": results})
@@ -0,0 +1,333 @@
+"""QR Code and Phone Number Detection Benchmark
+
+Run from the lib directory:
+    python -m benchmarks.qr_benchmark --stages detect_qr
+
+Record the baseline where libzbar and tesseract are installed, e.g. the
+service image, detections and timings depend on both:
+    python -m benchmarks.qr_benchmark --update-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from esimslib.util import QRCodeProcessor, logger, sniff_type
+from esimslib.util.constants import (
+    MetricsConst as mt_c,
+    TracingConst as tr_c,
+)
+
+from benchmarks.corpus import CorpusCase, build_corpus, fingerprint
+from benchmarks.constants import (
+    BenchmarkConst as bm_c,
+    CorpusConst as cp_c,
+)
+
+StageResult = Dict[str, float]
+
+
+def run_case(stage: str, case: CorpusCase) -> Tuple[float, str]:
+    """Run a detection stage on a corpus image.
+    Phone number detection is timed alone, QR Codes are detected first.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        case (CorpusCase): corpus image.
+
+    Returns:
+        Tuple[float, str]: stage seconds and detected value,
+            empty if not detected.
+    """
+    with QRCodeProcessor(case.name, data=case.data) as processor:
+        if stage == bm_c.DETECT_QR:
+            start = time.perf_counter()
+            detected = processor.detect_qr()
+            elapsed = time.perf_counter() - start
+            return elapsed, processor.qr_code if detected else ""
+        processor.detect_qr()
+        start = time.perf_counter()
+        detected = processor.detect_phone_number()
+        elapsed = time.perf_counter() - start
+        return elapsed, processor.phone_number if detected else ""
+
+
+def expected_value(stage: str, case: CorpusCase) -> str:
+    """Expected stage detection.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        case (CorpusCase): corpus image.
+
+    Returns:
+        str: expected value, empty if nothing should be detected.
+    """
+    if stage == bm_c.DETECT_QR:
+        return case.qr_code
+    return case.phone_number
+
+
+def run_stage_pass(stage: str, seed: int, connection: Connection) -> None:
+    """Run a stage pass over the corpus and send the process peak RSS.
+    Run in a fresh process so the peak is the corpus and the stage alone,
+    including native allocations of the decoders.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        seed (int): corpus seed.
+        connection (Connection): parent connection.
+    """
+    for case in build_corpus(seed):
+        run_case(stage, case)
+    # KB on Linux
+    connection.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    connection.close()
+
+
+def peak_rss(stage: str, seed: int) -> float:
+    """Peak resident memory of a stage pass over the corpus.
+    Run apart from the timed passes, in a fresh process per stage.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        seed (int): corpus seed.
+
+    Returns:
+        float: peak RSS in KB.
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=run_stage_pass, args=(stage, seed, sender)
+    )
+    process.start()
+    sender.close()
+    try:
+        peak = float(receiver.recv())
+    finally:
+        process.join()
+    return peak
+
+
+def time_stage(
+    stage: str, cases: List[CorpusCase], repeat: int
+) -> Tuple[np.ndarray, List[str]]:
+    """Time a detection stage over the corpus.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        cases (List[CorpusCase]): corpus images.
+        repeat (int): timed passes over the corpus.
+
+    Returns:
+        Tuple[np.ndarray, List[str]]: stage seconds by pass and image,
+            detected values of the first pass.
+    """
+    # warm up lazy imports and library initialization
+    run_case(stage, cases[0])
+    latencies = np.zeros((repeat, len(cases)))
+    values = []
+    for pass_ in range(repeat):
+        for index, case in enumerate(cases):
+            latencies[pass_, index], value = run_case(stage, case)
+            if not pass_:
+                values.append(value)
+    return latencies, values
+
+
+def score(
+    stage: str, cases: List[CorpusCase], values: List[str]
+) -> Tuple[float, int, List[str]]:
+    """Score stage detections against the expected values.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        cases (List[CorpusCase]): corpus images.
+        values (List[str]): detected values in corpus order.
+
+    Returns:
+        Tuple[float, int, List[str]]: accuracy on images with an
+            expected value, detections on images without one and
+            names of the images with a wrong detection.
+    """
+    misses = []
+    expected = false_positives = 0
+    for case, value in zip(cases, values):
+        target = expected_value(stage, case)
+        if not target:
+            false_positives += bool(value)
+            continue
+        expected += 1
+        if value != target:
+            misses.append(case.name)
+    accuracy = 1 - len(misses) / expected if expected else 1.0
+    return accuracy, false_positives, misses
+
+
+def measure_stage(
+    stage: str, cases: List[CorpusCase], repeat: int, seed: int
+) -> Tuple[StageResult, List[str]]:
+    """Measure a detection stage over the corpus.
+
+    Args:
+        stage (str): detect_qr or detect_phone_number.
+        cases (List[CorpusCase]): corpus images.
+        repeat (int): timed passes over the corpus.
+        seed (int): corpus seed.
+
+    Returns:
+        Tuple[Dict[str, float], List[str]]: stage measures and
+            names of the images with a wrong detection.
+    """
+    latencies, values = time_stage(stage, cases, repeat)
+    accuracy, false_positives, misses = score(stage, cases, values)
+    # per image median across passes, steady against host noise
+    latencies_ms = np.median(latencies, axis=0) * bm_c.MS_PER_SECOND
+    result = {
+        bm_c.IMAGES: len(cases),
+        bm_c.THROUGHPUT: latencies.size / latencies.sum(),
+        bm_c.PEAK_RSS: peak_rss(stage, seed),
+        bm_c.ACCURACY: accuracy,
+        bm_c.FALSE_POSITIVES: false_positives,
+    }
+    for key, percentile in bm_c.PERCENTILES:
+        result[key] = float(np.percentile(latencies_ms, percentile))
+    return {
+        key: round(value, bm_c.DIGITS) for key, value in result.items()
+    }, misses
+
+
+def compare(report: dict, baseline: dict) -> List[str]:
+    """Compare a report against the baseline.
+
+    Args:
+        report (dict): benchmark report.
+        baseline (dict): baseline report.
+
+    Returns:
+        List[str]: regressions found, empty if none.
+    """
+    if report[bm_c.FINGERPRINT] != baseline[bm_c.FINGERPRINT]:
+        return ["corpus differs from the baseline corpus"]
+    regressions = []
+    for stage, result in report[bm_c.RESULTS].items():
+        reference = baseline[bm_c.RESULTS].get(stage)
+        if reference is None:
+            continue
+        for key, limit in bm_c.HIGHER_IS_WORSE.items():
+            if result[key] > reference[key] * limit:
+                regressions.append(
+                    f"{stage} {key}: {result[key]} > {reference[key]}"
+                )
+        for key, limit in bm_c.LOWER_IS_WORSE.items():
+            if result[key] < reference[key] * limit:
+                regressions.append(
+                    f"{stage} {key}: {result[key]} < {reference[key]}"
+                )
+    return regressions
+
+
+def write_corpus(cases: List[CorpusCase], corpus_dir: str) -> None:
+    """Write corpus images for inspection.
+
+    Args:
+        cases (List[CorpusCase]): corpus images.
+        corpus_dir (str): output directory.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    for case in cases:
+        file_name = bm_c.FILE_NAME_FORMAT.format(
+            case.name, sniff_type(case.data)
+        )
+        with open(os.path.join(corpus_dir, file_name), "wb") as file:
+            file.write(case.data)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv (List[str]): arguments. default: None, sys.argv.
+
+    Returns:
+        argparse.Namespace: parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=bm_c.STAGES,
+        default=list(bm_c.STAGES),
+        help="stages to measure, phone detection requires tesseract",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=cp_c.SEED)
+    parser.add_argument("--baseline", default=bm_c.DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    parser.add_argument("--output", help="report file, stdout if not set")
+    parser.add_argument("--corpus-dir", help="write corpus images here")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and compare it against the baseline.
+
+    Args:
+        argv (List[str]): arguments. default: None, sys.argv.
+
+    Returns:
+        int: exit code, 1 if a regression is found.
+    """
+    args = parse_args(argv)
+    # stage metrics and spans would be measured with the stages
+    os.environ.setdefault(mt_c.ENABLED, mt_c.DISABLED)
+    os.environ.setdefault(tr_c.EXPORTER, tr_c.NONE)
+    cases = build_corpus(args.seed)
+    if args.corpus_dir:
+        write_corpus(cases, args.corpus_dir)
+    report: dict = {
+        bm_c.CORPUS: {bm_c.IMAGES: len(cases), bm_c.SEED: args.seed},
+        bm_c.FINGERPRINT: fingerprint(cases),
+        bm_c.RESULTS: {},
+        bm_c.MISSES: {},
+    }
+    for stage in args.stages:
+        logger.info("Measuring %s on %d images", stage, len(cases))
+        result, misses = measure_stage(stage, cases, args.repeat, args.seed)
+        report[bm_c.RESULTS][stage] = result
+        report[bm_c.MISSES][stage] = misses
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding=bm_c.UTF8) as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding=bm_c.UTF8) as file:
+            file.write(output)
+        logger.info("Baseline updated: %s", args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        logger.warning("No baseline to compare: %s", args.baseline)
+        return 0
+    with open(args.baseline, encoding=bm_c.UTF8) as file:
+        regressions = compare(report, json.load(file))
+    for regression in regressions:
+        logger.error("Regression: %s", regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
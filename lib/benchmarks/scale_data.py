@@ -0,0 +1,290 @@
+"""Scale Data Generator
+
+Seeds the fake services with N packages, M donations and K Dropbox
+images. Import once the fake services and the service settings are in
+place, the AirTable constants connect to AirTable once imported.
+"""
+
+import hashlib
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from esimslib.airtable.constants import (
+    AirTableConst as air_c,
+    EsimProviderConst as prov_c,
+    EsimPackageConst as pack_c,
+    EsimAssetConst as esim_c,
+    EsimDonationConst as don_c,
+)
+
+from benchmarks.corpus import CaseSpec, render_case
+from benchmarks.constants import CorpusConst as cp_c, ScaleConst as sc_c
+from benchmarks.fakes.airtable import AirTableFake, AttachmentsFake
+from benchmarks.fakes.dropbox import DropboxFake
+
+IMAGE_SPEC = CaseSpec(
+    sc_c.QR_SIDE,
+    sc_c.ROTATION,
+    sc_c.BLUR,
+    sc_c.QUALITY,
+    False,
+    sc_c.BACKGROUND,
+)
+
+
+class ScaleSpec(NamedTuple):
+    """Data scale, N packages, M donations and K Dropbox images."""
+
+    packages: int
+    donations: int
+    images: int
+
+
+class SeededPackage(NamedTuple):
+    """Seeded eSIM Package."""
+
+    record_id: str
+    name: str
+    smdp_domain: str
+
+
+def qr_code(rng: np.random.Generator, smdp_domain: str) -> str:
+    """Generate an eSIM LPA string.
+
+    Args:
+        rng (np.random.Generator): data random generator.
+        smdp_domain (str): SM-DP+ address.
+
+    Returns:
+        str: LPA string.
+    """
+    matching_id = rng.bytes(sc_c.MATCHING_ID_BYTES).hex().upper()
+    return cp_c.LPA_FORMAT.format(smdp_domain, matching_id)
+
+
+def qr_image(rng: np.random.Generator, code: str) -> bytes:
+    """Render a readable QR Code image.
+
+    Args:
+        rng (np.random.Generator): data random generator.
+        code (str): QR Code content.
+
+    Returns:
+        bytes: JPEG image.
+    """
+    return render_case(IMAGE_SPEC, code, "", rng)
+
+
+def seed_packages(airtable: AirTableFake, count: int) -> List[SeededPackage]:
+    """Add eSIM Providers and their eSIM Packages.
+    Providers cycle through the stock statuses.
+
+    Args:
+        airtable (AirTableFake): AirTable fake.
+        count (int): eSIM Packages count.
+
+    Returns:
+        List[SeededPackage]: eSIM Packages.
+    """
+    packages = []
+    providers: Dict[int, str] = {}
+    for index in range(count):
+        provider = index // sc_c.PACKAGES_PER_PROVIDER
+        smdp_domain = sc_c.SMDP_FORMAT.format(provider)
+        if provider not in providers:
+            status = provider % len(sc_c.STOCK_STATUSES)
+            providers[provider] = airtable.add(
+                prov_c.TABLE_NAME,
+                {
+                    prov_c.PROVIDER_GEO: sc_c.PROVIDER_FORMAT.format(provider),
+                    prov_c.PROVIDER: sc_c.PROVIDER_FORMAT.format(provider),
+                    prov_c.GEO: sc_c.GEO,
+                    prov_c.STOCK_STATUS: sc_c.STOCK_STATUSES[status],
+                    prov_c.IN_STOCK: sc_c.IN_STOCK[status],
+                    prov_c.SMDP_DOMAIN: [smdp_domain],
+                },
+            )
+        name = sc_c.PACKAGE_FORMAT.format(index)
+        record_id = airtable.add(
+            pack_c.TABLE_NAME,
+            {
+                pack_c.PACKAGE: name,
+                pack_c.ESIM_PROVIDER: [providers[provider]],
+            },
+        )
+        packages.append(SeededPackage(record_id, name, smdp_domain))
+    return packages
+
+
+def seed_files(
+    dropbox: DropboxFake,
+    packages: List[SeededPackage],
+    count: int,
+    rng: np.random.Generator,
+) -> Dict[str, int]:
+    """Add Dropbox images spread across the package folders.
+    Some files are not images, some belong to another provider.
+
+    Args:
+        dropbox (DropboxFake): Dropbox fake.
+        packages (List[SeededPackage]): eSIM Packages.
+        count (int): Dropbox files count.
+        rng (np.random.Generator): data random generator.
+
+    Returns:
+        Dict[str, int]: invalid and mismatched files count.
+    """
+    files = {}
+    counts = {sc_c.INVALID: 0, sc_c.MISMATCHED: 0}
+    for index in range(count):
+        package = packages[index % len(packages)]
+        folder = sc_c.DBX_PATH.format(package.name)
+        if index % sc_c.INVALID_EVERY == sc_c.INVALID_EVERY - 1:
+            path = sc_c.INVALID_FILE_FORMAT.format(folder, index)
+            files[path] = sc_c.INVALID_CONTENT
+            counts[sc_c.INVALID] += 1
+            continue
+        smdp_domain = package.smdp_domain
+        if index % sc_c.MISMATCH_EVERY == sc_c.MISMATCH_EVERY - 1:
+            smdp_domain = sc_c.MISMATCH_SMDP
+            counts[sc_c.MISMATCHED] += 1
+        path = sc_c.FILE_FORMAT.format(folder, index)
+        files[path] = qr_image(rng, qr_code(rng, smdp_domain))
+    dropbox.load(files)
+    return counts
+
+
+def seed_donations(
+    airtable: AirTableFake,
+    attachments: AttachmentsFake,
+    packages: List[SeededPackage],
+    count: int,
+    rng: np.random.Generator,
+) -> Dict[str, int]:
+    """Add donations of a QR Code image each.
+    Some attachments are not images, some QR Codes are already
+    checked in the inventory and are found duplicate once ingested.
+
+    Args:
+        airtable (AirTableFake): AirTable fake.
+        attachments (AttachmentsFake): attachments host fake.
+        packages (List[SeededPackage]): eSIM Packages.
+        count (int): donations count.
+        rng (np.random.Generator): data random generator.
+
+    Returns:
+        Dict[str, int]: invalid and duplicate donations count.
+    """
+    counts = {sc_c.INVALID: 0, sc_c.DUPLICATES: 0}
+    for index in range(count):
+        package = packages[index % len(packages)]
+        if index % sc_c.INVALID_EVERY == sc_c.INVALID_EVERY - 1:
+            attachment = attachments.add(
+                sc_c.INVALID_ATTACHMENT_FORMAT.format(index),
+                sc_c.INVALID_CONTENT,
+            )
+            counts[sc_c.INVALID] += 1
+        else:
+            code = qr_code(rng, package.smdp_domain)
+            attachment = attachments.add(
+                sc_c.ATTACHMENT_FORMAT.format(index), qr_image(rng, code)
+            )
+            if index % sc_c.DUPLICATE_EVERY == 0:
+                airtable.add(
+                    esim_c.TABLE_NAME,
+                    {
+                        esim_c.ESIM_PACKAGE: [package.record_id],
+                        esim_c.QR_SHA: hashlib.sha256(
+                            code.encode(sc_c.UTF8)
+                        ).hexdigest(),
+                        esim_c.CHECKED_IN: True,
+                    },
+                )
+                counts[sc_c.DUPLICATES] += 1
+        airtable.add(
+            don_c.TABLE_NAME,
+            {
+                don_c.ESIM_PACKAGE: [package.record_id],
+                don_c.QR_CODES: [attachment],
+            },
+        )
+    return counts
+
+
+def seed(
+    airtable: AirTableFake,
+    attachments: AttachmentsFake,
+    dropbox: DropboxFake,
+    spec: ScaleSpec,
+    seed_: int,
+) -> Dict[str, int]:
+    """Replace the fake services data with generated data.
+    Same seed and scale generate the same data.
+
+    Args:
+        airtable (AirTableFake): AirTable fake.
+        attachments (AttachmentsFake): attachments host fake.
+        dropbox (DropboxFake): Dropbox fake.
+        spec (ScaleSpec): data scale.
+        seed_ (int): random seed.
+
+    Returns:
+        Dict[str, int]: generated records and files count.
+    """
+    rng = np.random.default_rng(seed_)
+    airtable.reset()
+    attachments.reset()
+    for table in (
+        prov_c.TABLE_NAME,
+        pack_c.TABLE_NAME,
+        esim_c.TABLE_NAME,
+    ):
+        airtable.add_view(table, air_c.DEFAULT_VIEW, lambda fields: True)
+    airtable.add_view(
+        don_c.TABLE_NAME,
+        air_c.DEFAULT_VIEW,
+        lambda fields: not fields.get(don_c.INGESTED_FLAG),
+    )
+    packages = seed_packages(airtable, spec.packages)
+    files = seed_files(dropbox, packages, spec.images, rng)
+    donations = seed_donations(
+        airtable, attachments, packages, spec.donations, rng
+    )
+    return {
+        sc_c.PACKAGES: spec.packages,
+        sc_c.IMAGES: spec.images,
+        sc_c.DONATIONS: spec.donations,
+        sc_c.INVENTORY: len(airtable.records(esim_c.TABLE_NAME)),
+        **{f"{sc_c.IMAGES}_{key}": value for key, value in files.items()},
+        **{
+            f"{sc_c.DONATIONS}_{key}": value
+            for key, value in donations.items()
+        },
+    }
+
+
+def summarize(airtable: AirTableFake, dropbox: DropboxFake) -> Dict[str, int]:
+    """Count the data left once the services ran.
+
+    Args:
+        airtable (AirTableFake): AirTable fake.
+        dropbox (DropboxFake): Dropbox fake.
+
+    Returns:
+        Dict[str, int]: Dropbox files, inventory records,
+            ingested and duplicate donations count.
+    """
+    donations = [
+        record["fields"] for record in airtable.records(don_c.TABLE_NAME)
+    ]
+    return {
+        sc_c.DROPBOX_FILES: len(dropbox.paths()),
+        sc_c.INVENTORY: len(airtable.records(esim_c.TABLE_NAME)),
+        sc_c.INGESTED: sum(
+            bool(fields.get(don_c.INGESTED_FLAG)) for fields in donations
+        ),
+        sc_c.DUPLICATES: sum(
+            bool(fields.get(don_c.IS_DUPLICATE)) for fields in donations
+        ),
+    }
@@ -0,0 +1,62 @@
+"""Fake Services Transport
+
+Requests to the real service hosts are sent to the local fake services.
+Redirection happens in HTTPAdapter.send so sessions created inside
+client libraries keep their own adapters, retries and connection pools.
+AWS clients are pointed at their fakes with endpoint variables instead.
+"""
+
+from functools import wraps
+from typing import Callable, Dict
+from urllib.parse import urlsplit, urlunsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+from benchmarks.constants import TransportConst as tp_c
+
+_send: Dict[str, Callable] = {}
+
+
+def redirect_hosts(hosts: Dict[str, str]) -> None:
+    """Send HTTP requests of the given hosts to local addresses.
+
+    Args:
+        hosts (Dict[str, str]): local host and port by service host.
+    """
+    send = _send.setdefault(tp_c.SEND, HTTPAdapter.send)
+
+    @wraps(send)
+    def redirected(
+        adapter: HTTPAdapter,
+        request: PreparedRequest,
+        *args: tuple,
+        **kwargs: dict,
+    ) -> Response:
+        """Rewrite the request url of a redirected host.
+
+        Args:
+            adapter (HTTPAdapter): session adapter.
+            request (PreparedRequest): request to send.
+            args (tuple): send arguments.
+            kwargs (dict): send keyword arguments.
+
+        Returns:
+            Response: service response.
+        """
+        parts = urlsplit(request.url)
+        address = hosts.get(parts.hostname or "")
+        if address:
+            request.url = urlunsplit(
+                (tp_c.HTTP, address, parts.path, parts.query, "")
+            )
+        return send(adapter, request, *args, **kwargs)
+
+    HTTPAdapter.send = redirected  # type: ignore
+
+
+def restore_hosts() -> None:
+    """Send HTTP requests to their real hosts again."""
+    send = _send.pop(tp_c.SEND, None)
+    if send is not None:
+        HTTPAdapter.send = send  # type: ignore
@@ -5,4 +5,13 @@ from esimslib.airtable.models import (
     EsimPackage,
     EsimDonation,
     EsimAsset,
+    init_api,
 )
+from esimslib.airtable.snapshot import (
+    AirTableSnapshot,
+    TableSnapshot,
+    SnapshotStore,
+    S3SnapshotStore,
+)
+from esimslib.airtable.projections import InventoryRow
+from esimslib.airtable.commit_log import CommitLog, idempotency_key
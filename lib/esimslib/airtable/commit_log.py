@@ -0,0 +1,143 @@
+"""Assets Commit Log
+
+Exactly-once eSIM asset insertion across retries. Each asset gets an
+idempotency key from its qr_sha and source, e.g. Dropbox path or
+donation attachment ID. Assets are saved in AirTable batch sized chunks
+and each chunk keys are journaled once saved, so a retried run skips
+the assets that were already inserted.
+
+Insertion is exactly-once except for a chunk saved by a run that died
+before journaling it, e.g. timed out between the two writes. A retry
+inserts that chunk again, at most CHUNK_SIZE assets, which are then
+caught by their qr_sha in the deduplicate service.
+"""
+
+import os
+import hashlib
+from typing import Dict, List
+
+from esimslib.connectors.aws_connector import S3Connector
+from esimslib.util.journal import Journal
+from esimslib.util.s3_journal import S3Journal
+from esimslib.util.logger import logger
+from esimslib.util.metrics import timed
+from esimslib.util.constants import MetricsConst as mt_c
+from esimslib.airtable.models import EsimAsset
+from esimslib.airtable.constants import CommitLogConst as cl_c
+
+
+def idempotency_key(qr_sha: str, source: str) -> str:
+    """Deterministic asset key.
+
+    Args:
+        qr_sha (str): QR code content sha.
+        source (str): asset source, Dropbox path or attachment ID.
+
+    Returns:
+        str: idempotency key.
+    """
+    return hashlib.sha256(
+        f"{qr_sha}{cl_c.KEY_SEPARATOR}{source}".encode(cl_c.UTF8)
+    ).hexdigest()
+
+
+class CommitLog:
+    """Journal of inserted assets idempotency keys."""
+
+    _shared: Dict[str, "CommitLog"] = {}
+
+    def __init__(self, journal: Journal) -> None:
+        """Initialize CommitLog.
+
+        Args:
+            journal (Journal): committed keys journal.
+        """
+        self.journal = journal
+
+    @classmethod
+    def from_env(cls, name: str) -> "CommitLog":
+        """Create commit log for a service.
+        Stored in S3 if COMMIT_LOG_PREFIX is set, on local disk otherwise.
+        Required in Lambda, where local disk does not outlive the
+        execution environment a retry may not run in.
+
+        Args:
+            name (str): commit log name, e.g. service name.
+
+        Raises:
+            ValueError: if COMMIT_LOG_PREFIX is not set in Lambda.
+
+        Returns:
+            CommitLog: commit log.
+        """
+        prefix = os.getenv(cl_c.COMMIT_LOG_PREFIX)
+        if not prefix and os.getenv(cl_c.LAMBDA_FUNCTION):
+            raise ValueError(f"{cl_c.COMMIT_LOG_PREFIX} is required in Lambda")
+        if prefix:
+            return cls(
+                S3Journal(
+                    S3Connector(), cl_c.COMMIT_LOG_KEY.format(prefix, name)
+                )
+            )
+        return cls(
+            Journal(
+                os.path.join(
+                    os.getenv(
+                        cl_c.COMMIT_LOG_DIR, cl_c.DEFAULT_COMMIT_LOG_DIR
+                    ),
+                    cl_c.COMMIT_LOG_FILE.format(name),
+                )
+            )
+        )
+
+    @classmethod
+    def shared(cls, name: str) -> "CommitLog":
+        """Get commit log shared across the process.
+
+        Args:
+            name (str): commit log name, e.g. service name.
+
+        Returns:
+            CommitLog: shared commit log.
+        """
+        if name not in cls._shared:
+            cls._shared[name] = cls.from_env(name)
+        return cls._shared[name]
+
+    def is_committed(self, key: str) -> bool:
+        """Check if asset was inserted.
+
+        Args:
+            key (str): asset idempotency key.
+
+        Returns:
+            bool: True if inserted.
+        """
+        return key in self.journal
+
+    @timed(mt_c.AIRTABLE_ASSETS_WRITE)
+    def load_assets(self, assets: List[EsimAsset], keys: List[str]) -> int:
+        """Insert assets not inserted yet.
+        A chunk is journaled once saved, see the module docstring for
+        the chunk saved but not journaled before a crash.
+
+        Args:
+            assets (List[EsimAsset]): eSIM assets.
+            keys (List[str]): assets idempotency keys, in assets order.
+
+        Returns:
+            int: inserted assets count.
+        """
+        pending: Dict[str, EsimAsset] = {}
+        for asset, key in zip(assets, keys):
+            if key not in self.journal:
+                pending.setdefault(key, asset)
+        skipped = len(assets) - len(pending)
+        if skipped:
+            logger.info("Assets already inserted, skipped: %s", skipped)
+        chunks = list(pending.items())
+        for start in range(0, len(chunks), cl_c.CHUNK_SIZE):
+            chunk = chunks[start : start + cl_c.CHUNK_SIZE]
+            EsimAsset.load_records([asset for _, asset in chunk])
+            self.journal.add_many({key: asset.id for key, asset in chunk})
+        return len(pending)
@@ -10,10 +10,28 @@ class AirTableConst:
     AIRTABLE_API_KEY = "AIRTABLE_API_KEY"  # nosec
     AIRTABLE_BASE_ID = "AIRTABLE_BASE_ID"
     AIRTABLE_TABLE_NAME = "AIRTABLE_TABLE_NAME"
+    MAX_REQUESTS_PER_S = "AIRTABLE_MAX_REQUESTS_PER_S"
 
     # View Name
     DEFAULT_VIEW = "backend_service"
 
+    # Spans
+    FETCH_ALL_SPAN = "airtable.fetch_all"
+    FETCH_BY_IDS_SPAN = "airtable.fetch_by_ids"
+    LOAD_RECORDS_SPAN = "airtable.load_records"
+    SAVE_SPAN = "airtable.save"
+    LINK_RECORDS_SPAN = "airtable.link_records"
+    RESPONSE_HOOK = "response"
+
+    # Formulas
+    RECORD_ID_FORMULA = "RECORD_ID()={}"
+    MAX_IDS_PER_FORMULA = 50
+
+    # Rate limit, below the 5 requests per second limit of a base,
+    # 0 disables it
+    DEFAULT_MAX_REQUESTS_PER_S = "4"
+    URL_PREFIXES = ("https://", "http://")
+
 
 class EsimProviderConst:
     """eSIM Providers Constants."""
@@ -74,3 +92,64 @@ class EsimDonationConst:
     MISSING_PHONE_NUMBER = "Missing Phone Number"
     ORIGINAL_DONATION = "Original Donation"
     SEND_ERROR_EMAIL = "Send Error Email"
+
+
+class SnapshotConst:
+    """Tables Snapshot Constants"""
+
+    # Env Variables
+    SNAPSHOT_PREFIX = "SNAPSHOT_PREFIX"
+    SNAPSHOT_DIR = "SNAPSHOT_DIR"
+    FULL_SYNC_HOURS = "SNAPSHOT_FULL_SYNC_HOURS"
+
+    # Store
+    DEFAULT_SNAPSHOT_DIR = "/tmp/snapshots"  # nosec
+    DEFAULT_FULL_SYNC_HOURS = "24"
+    SNAPSHOT_KEY = "{}/{}.npz"
+    SNAPSHOT_FILE = "{}.npz"
+    TEMP_SUFFIX = ".tmp"
+
+    # Tables
+    PROVIDERS = "providers"
+    PACKAGES = "packages"
+    DONATIONS = "donations"
+    INVENTORY = "inventory"
+
+    # Columns
+    ID = "id"
+    FIELDS = "fields"
+    WATERMARK = "__watermark__"
+    SYNCED_AT = "__synced_at__"
+    TEXT = "text"
+    BOOL = "bool"
+    LINK = "link"
+    NUMBER = "number"
+    LIST = "list"
+    LIST_SEPARATOR = "\x1f"
+
+    # Incremental sync
+    MODIFIED_FORMULA = "IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{}'))"
+    WATERMARK_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+    SKEW_SECONDS = 60
+    SECONDS_PER_HOUR = 3600
+
+
+class CommitLogConst:
+    """Assets Commit Log Constants"""
+
+    # Env Variables
+    COMMIT_LOG_PREFIX = "COMMIT_LOG_PREFIX"
+    COMMIT_LOG_DIR = "COMMIT_LOG_DIR"
+    LAMBDA_FUNCTION = "AWS_LAMBDA_FUNCTION_NAME"
+
+    # Store
+    DEFAULT_COMMIT_LOG_DIR = "/tmp/commit_logs"  # nosec
+    COMMIT_LOG_KEY = "{}/{}"
+    COMMIT_LOG_FILE = "{}.jsonl"
+
+    # Keys
+    UTF8 = "utf-8"
+    KEY_SEPARATOR = "\n"
+
+    # AirTable batch size
+    CHUNK_SIZE = 10
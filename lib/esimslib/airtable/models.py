@@ -2,15 +2,18 @@
 
 import os
 
-from typing import List
+from typing import List, Type
 
 from pyairtable.utils import attachment
+from pyairtable.formulas import OR, STR_VALUE
 from pyairtable.orm import Model, fields
 from pyairtable.api.types import AttachmentDict
 
 
 from esimslib.connectors import SSMConnector as ssm
-from esimslib.util import logger
+from esimslib.util import logger, traced
+from esimslib.util.tracing import trace_response
+from esimslib.airtable.rate_limit import LimitedAdapter, RequestLimiter
 from esimslib.airtable.constants import (
     AirTableConst as air_c,
     EsimProviderConst as prov_c,
@@ -19,7 +22,6 @@ from esimslib.airtable.constants import (
     EsimDonationConst as don_c,
 )
 
-
 # pylint: disable=too-few-public-methods
 
 
@@ -38,6 +40,7 @@ class EsimProvider(Model):
     renewable = fields.CheckboxField(prov_c.RENEWABLE, readonly=True)
 
     @classmethod
+    @traced(air_c.FETCH_ALL_SPAN)
     def fetch_all(cls) -> List["EsimProvider"]:
         """Fetch all ID, Names from table.
 
@@ -73,6 +76,7 @@ class EsimPackage(Model):
         return self._esim_provider[0]
 
     @classmethod
+    @traced(air_c.FETCH_ALL_SPAN)
     def fetch_all(cls) -> List["EsimPackage"]:
         """Fetch all ID, Names from table.
 
@@ -81,11 +85,13 @@ class EsimPackage(Model):
         """
         return cls.all(view=air_c.DEFAULT_VIEW)
 
+    @traced(air_c.SAVE_SPAN)
     def set_stock_err(self) -> None:
         """Set stocking error flag."""
         if not self.stock_err:
             EsimPackage(id=self.id, stock_err=True).save()
 
+    @traced(air_c.SAVE_SPAN)
     def reset_stock_err(self) -> None:
         """Reset stocking error flag."""
         if self.stock_err:
@@ -152,6 +158,7 @@ class EsimDonation(Model):
         )
 
     @classmethod
+    @traced(air_c.FETCH_ALL_SPAN)
     def fetch_all(cls) -> list:
         """Fetch all new donations.
 
@@ -161,6 +168,45 @@ class EsimDonation(Model):
         return cls.all(view=air_c.DEFAULT_VIEW)
 
     @classmethod
+    @traced(air_c.FETCH_BY_IDS_SPAN)
+    def fetch_by_ids(cls, record_ids: List[str]) -> list:
+        """Fetch new donations among the given records.
+
+        Args:
+            record_ids (List[str]): donation records IDs.
+
+        Returns:
+            list: list of donation records.
+        """
+        donations = []
+        for start in range(0, len(record_ids), air_c.MAX_IDS_PER_FORMULA):
+            formula = OR(
+                *(
+                    air_c.RECORD_ID_FORMULA.format(STR_VALUE(record_id))
+                    for record_id in record_ids[
+                        start : start + air_c.MAX_IDS_PER_FORMULA
+                    ]
+                )
+            )
+            donations.extend(cls.all(view=air_c.DEFAULT_VIEW, formula=formula))
+        return donations
+
+    @classmethod
+    @traced(air_c.LINK_RECORDS_SPAN)
+    def link_packages(cls, donations: List["EsimDonation"]) -> None:
+        """Link donations to their eSIM Packages and eSIM Providers
+        fetched once, instead of fetching them donation by donation.
+        Records missing from the views are still fetched once read.
+
+        Args:
+            donations (List[EsimDonation]): donation records.
+        """
+        packages = EsimPackage.fetch_all()
+        link_records(packages, pack_c.ESIM_PROVIDER, EsimProvider.fetch_all())
+        link_records(donations, don_c.ESIM_PACKAGE, packages)
+
+    @classmethod
+    @traced(air_c.LOAD_RECORDS_SPAN)
     def load_records(cls, records: list) -> None:
         """Load records to AirTable
 
@@ -255,6 +301,7 @@ class EsimAsset(Model):
         self._qr_code_image = [attachment(url=image_url)]  # type: ignore
 
     @classmethod
+    @traced(air_c.FETCH_ALL_SPAN)
     def fetch_all(cls) -> List["EsimAsset"]:
         """Fetch all duplicated eSIMs.
 
@@ -264,6 +311,7 @@ class EsimAsset(Model):
         return cls.all(view=air_c.DEFAULT_VIEW)
 
     @classmethod
+    @traced(air_c.LOAD_RECORDS_SPAN)
     def load_records(cls, records: list) -> None:
         """Load records to AirTable
 
@@ -293,3 +341,79 @@ class EsimAsset(Model):
         table_name = esim_c.TABLE_NAME
         base_id = os.getenv(air_c.AIRTABLE_BASE_ID)
         api_key = ssm().get_parameter(os.getenv(air_c.AIRTABLE_API_KEY))
+
+
+def link_records(records: List[Model], field_name: str, linked: list) -> None:
+    """Replace link field records IDs by already fetched records.
+
+    Args:
+        records (List[Model]): records holding the link field.
+        field_name (str): link field name.
+        linked (list): linked records.
+    """
+    linked_by_id = {record.id: record for record in linked}
+    for record in records:
+        # link fields keep the IDs list until read, then fetch the records
+        values = record._fields.get(  # pylint: disable=protected-access
+            field_name
+        )
+        if values:
+            values[:] = [
+                (
+                    linked_by_id.get(value, value)
+                    if isinstance(value, str)
+                    else value
+                )
+                for value in values
+            ]
+
+
+MODELS: List[Type[Model]] = [
+    EsimProvider,
+    EsimPackage,
+    EsimDonation,
+    EsimAsset,
+]
+
+
+def trace_api_requests() -> None:
+    """Export a span per AirTable API request of every model,
+    e.g. each page of a fetch and its retries.
+    """
+    for model in MODELS:
+        hooks = model.get_api().session.hooks[air_c.RESPONSE_HOOK]
+        if trace_response not in hooks:
+            hooks.append(trace_response)
+
+
+def limit_api_requests(max_requests_per_s: float) -> None:
+    """Space AirTable API requests of every model under the base rate
+    limit.
+
+    Args:
+        max_requests_per_s (float): requests per second in total.
+    """
+    limiter = RequestLimiter(max_requests_per_s)
+    for model in MODELS:
+        session = model.get_api().session
+        for prefix in air_c.URL_PREFIXES:
+            adapter = session.get_adapter(prefix)
+            if not isinstance(adapter, LimitedAdapter):
+                session.mount(
+                    prefix, LimitedAdapter(limiter, adapter.max_retries)
+                )
+
+
+def init_api() -> None:
+    """Instrument the AirTable API sessions of every model.
+    Called by service entry points before their first request, so
+    importing the models leaves the sessions as they are.
+    Requests are traced, and spaced to AIRTABLE_MAX_REQUESTS_PER_S
+    requests per second unless it is 0. Sessions are instrumented once.
+    """
+    trace_api_requests()
+    max_requests_per_s = float(
+        os.getenv(air_c.MAX_REQUESTS_PER_S, air_c.DEFAULT_MAX_REQUESTS_PER_S)
+    )
+    if max_requests_per_s > 0:
+        limit_api_requests(max_requests_per_s)
@@ -0,0 +1,43 @@
+"""AirTable Record Projections
+
+Lightweight tuple rows for bulk reads, built from snapshot columns.
+Only the fields services compare are kept, so 100k rows cost a fraction
+of the ORM models. Rows convert back to models for the few records
+written.
+"""
+
+from typing import NamedTuple, Optional
+
+from esimslib.airtable.models import EsimDonation, EsimAsset
+
+
+class InventoryRow(NamedTuple):
+    """eSIM Inventory projection, fields match the inventory snapshot."""
+
+    id: str
+    esim_package: str
+    qr_sha: str
+    donation: str
+    phone_number: str
+    checked_in: bool
+
+    def to_donation(self) -> Optional[EsimDonation]:
+        """Linked donation model for writes.
+
+        Returns:
+            EsimDonation | None: donation with ID only, None if unlinked.
+        """
+        return EsimDonation(id=self.donation) if self.donation else None
+
+    def to_model(self) -> EsimAsset:
+        """eSIM model for writes.
+
+        Returns:
+            EsimAsset: eSIM with ID, qr_sha and links only.
+        """
+        esim = EsimAsset(id=self.id, qr_sha=self.qr_sha or None)
+        if self.esim_package:
+            esim.set_esim_package_from_id(self.esim_package)
+        if self.donation:
+            esim.donation = EsimDonation(id=self.donation)
+        return esim
@@ -0,0 +1,69 @@
+"""AirTable Requests Rate Limit
+
+AirTable limits each base to 5 requests per second and answers 429
+past it. Every model has its own API session, so requests of all the
+models and of all the threads in flight are spaced by one limiter to
+stay under the base limit.
+"""
+
+import time
+import threading
+from typing import Any
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+
+class RequestLimiter:
+    """Space requests at a fixed rate across threads."""
+
+    def __init__(self, rate_per_s: float) -> None:
+        """Initialize RequestLimiter.
+
+        Args:
+            rate_per_s (float): maximum requests per second.
+        """
+        self.interval = 1.0 / rate_per_s
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Wait for the next request slot."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class LimitedAdapter(HTTPAdapter):
+    """HTTP adapter waiting for a limiter slot before each request.
+    Retries of a request are done by the adapter and keep their backoff.
+    """
+
+    def __init__(self, limiter: RequestLimiter, max_retries: Any) -> None:
+        """Initialize LimitedAdapter.
+
+        Args:
+            limiter (RequestLimiter): shared requests limiter.
+            max_retries (Any): retries of the replaced adapter.
+        """
+        super().__init__(max_retries=max_retries)
+        self.limiter = limiter
+
+    def send(  # type: ignore # pylint: disable=arguments-differ
+        self, request: PreparedRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        """Send request once a limiter slot is free.
+
+        Args:
+            request (PreparedRequest): request to send.
+            args (Any): send arguments.
+            kwargs (Any): send keyword arguments.
+
+        Returns:
+            Response: response.
+        """
+        self.limiter.wait()
+        return super().send(request, *args, **kwargs)
@@ -0,0 +1,503 @@
+"""AirTable Tables Snapshot
+
+Column arrays of AirTable tables persisted as compressed numpy files,
+locally or in S3, and synced incrementally by last modified time.
+A full sync runs periodically to drop records deleted in AirTable,
+and records a service is about to act on are refreshed by ID first.
+"""
+
+import io
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
+
+import numpy as np
+from pyairtable.formulas import OR, STR_VALUE
+from pyairtable.orm import Model
+
+from esimslib.connectors.aws_connector import S3Connector
+from esimslib.util.logger import logger
+from esimslib.airtable.models import (
+    EsimProvider,
+    EsimPackage,
+    EsimDonation,
+    EsimAsset,
+)
+from esimslib.airtable.constants import (
+    AirTableConst as air_c,
+    SnapshotConst as snap_c,
+    EsimProviderConst as prov_c,
+    EsimPackageConst as pack_c,
+    EsimAssetConst as esim_c,
+    EsimDonationConst as don_c,
+)
+
+# table name: (model, {column: (field name, column kind)})
+SCHEMAS: Dict[str, Tuple[Type[Model], Dict[str, Tuple[str, str]]]] = {
+    snap_c.PROVIDERS: (
+        EsimProvider,
+        {
+            "provider_geo": (prov_c.PROVIDER_GEO, snap_c.TEXT),
+            "stock_status": (prov_c.STOCK_STATUS, snap_c.TEXT),
+            "in_stock": (prov_c.IN_STOCK, snap_c.NUMBER),
+            "smdp_domain": (prov_c.SMDP_DOMAIN, snap_c.LIST),
+            "automatic_restock": (prov_c.AUTOMATIC_RESTOCK, snap_c.BOOL),
+            "renewable": (prov_c.RENEWABLE, snap_c.BOOL),
+        },
+    ),
+    snap_c.PACKAGES: (
+        EsimPackage,
+        {
+            "name": (pack_c.PACKAGE, snap_c.TEXT),
+            "esim_provider": (pack_c.ESIM_PROVIDER, snap_c.LINK),
+            "stock_err": (pack_c.STOCK_ERR, snap_c.BOOL),
+        },
+    ),
+    snap_c.DONATIONS: (
+        EsimDonation,
+        {
+            "esim_package": (don_c.ESIM_PACKAGE, snap_c.LINK),
+            "is_ingested": (don_c.INGESTED_FLAG, snap_c.BOOL),
+            "is_rejected": (don_c.REJECTED_FLAG, snap_c.BOOL),
+            "is_duplicate": (don_c.IS_DUPLICATE, snap_c.BOOL),
+        },
+    ),
+    snap_c.INVENTORY: (
+        EsimAsset,
+        {
+            "esim_package": (esim_c.ESIM_PACKAGE, snap_c.LINK),
+            "qr_sha": (esim_c.QR_SHA, snap_c.TEXT),
+            "donation": (esim_c.DONATION, snap_c.LINK),
+            "phone_number": (esim_c.PHONE_NUMBER, snap_c.TEXT),
+            "checked_in": (esim_c.CHECKED_IN, snap_c.BOOL),
+        },
+    ),
+}
+
+
+def build_column(values: list, kind: str) -> np.ndarray:
+    """Build column array from AirTable field values.
+
+    Args:
+        values (list): field values, None if empty.
+        kind (str): column kind.
+
+    Returns:
+        np.ndarray: column array.
+    """
+    if kind == snap_c.BOOL:
+        return np.array([bool(value) for value in values], dtype=bool)
+    if kind == snap_c.NUMBER:
+        return np.array(
+            [np.nan if value is None else value for value in values],
+            dtype=np.float64,
+        )
+    if kind == snap_c.LINK:
+        values = [value[0] if value else "" for value in values]
+    elif kind == snap_c.LIST:
+        values = [snap_c.LIST_SEPARATOR.join(value or []) for value in values]
+    else:
+        values = ["" if value is None else str(value) for value in values]
+    return np.array(values, dtype=str)
+
+
+class SnapshotStore:
+    """Snapshot files stored in a local directory."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize SnapshotStore.
+
+        Args:
+            path (str): snapshots directory.
+        """
+        self.path = path
+
+    @classmethod
+    def from_env(cls) -> "SnapshotStore":
+        """Create snapshot store.
+        Stored in S3 if SNAPSHOT_PREFIX is set, on local disk otherwise.
+
+        Returns:
+            SnapshotStore: snapshot store.
+        """
+        prefix = os.getenv(snap_c.SNAPSHOT_PREFIX)
+        if prefix:
+            return S3SnapshotStore(S3Connector(), prefix)
+        return cls(os.getenv(snap_c.SNAPSHOT_DIR, snap_c.DEFAULT_SNAPSHOT_DIR))
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Read table snapshot.
+
+        Args:
+            name (str): table name.
+
+        Returns:
+            bytes | None: snapshot content, None if missing.
+        """
+        try:
+            with open(
+                os.path.join(self.path, snap_c.SNAPSHOT_FILE.format(name)),
+                "rb",
+            ) as snapshot_file:
+                return snapshot_file.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name: str, data: bytes) -> None:
+        """Write table snapshot.
+
+        Args:
+            name (str): table name.
+            data (bytes): snapshot content.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, snap_c.SNAPSHOT_FILE.format(name))
+        temp_path = f"{path}{snap_c.TEMP_SUFFIX}"
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(data)
+        os.replace(temp_path, path)
+
+
+class S3SnapshotStore(SnapshotStore):
+    """Snapshot files stored as S3 objects."""
+
+    def __init__(self, s3_connector: S3Connector, prefix: str) -> None:
+        """Initialize S3SnapshotStore.
+
+        Args:
+            s3_connector (S3Connector): S3 Connector.
+            prefix (str): snapshots key prefix.
+        """
+        super().__init__(prefix)
+        self.s3_connector = s3_connector
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Read table snapshot.
+
+        Args:
+            name (str): table name.
+
+        Returns:
+            bytes | None: snapshot content, None if missing.
+        """
+        return self.s3_connector.get_data(
+            snap_c.SNAPSHOT_KEY.format(self.path, name)
+        )
+
+    def write(self, name: str, data: bytes) -> None:
+        """Write table snapshot.
+
+        Args:
+            name (str): table name.
+            data (bytes): snapshot content.
+        """
+        self.s3_connector.put_data(
+            data, snap_c.SNAPSHOT_KEY.format(self.path, name)
+        )
+
+
+class TableSnapshot:
+    """Column arrays of an AirTable table, one row per record."""
+
+    def __init__(self, name: str, store: SnapshotStore) -> None:
+        """Initialize TableSnapshot and load the stored snapshot.
+
+        Args:
+            name (str): table name, one of SCHEMAS.
+            store (SnapshotStore): snapshot store.
+        """
+        self.name = name
+        self.store = store
+        self.model, self.schema = SCHEMAS[name]
+        self.watermark = ""
+        self.synced_at = 0.0
+        self.columns: Dict[str, np.ndarray] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load stored snapshot, empty if missing."""
+        self.columns = self._build_columns([])
+        data = self.store.read(self.name)
+        if not data:
+            return
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            # schema changed, rebuilt by a full sync
+            if not set(self.columns) <= set(arrays.files):
+                return
+            for column in self.columns:
+                self.columns[column] = arrays[column]
+            self.watermark = str(arrays[snap_c.WATERMARK])
+            self.synced_at = float(arrays[snap_c.SYNCED_AT])
+        logger.info("Snapshot %s loaded: %s rows", self.name, len(self))
+
+    def save(self) -> None:
+        """Store snapshot."""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            **self.columns,
+            **{
+                snap_c.WATERMARK: np.array(self.watermark),
+                snap_c.SYNCED_AT: np.array(self.synced_at),
+            },
+        )
+        self.store.write(self.name, buffer.getvalue())
+
+    def __len__(self) -> int:
+        """Number of rows.
+
+        Returns:
+            int: rows count.
+        """
+        return len(self.columns[snap_c.ID])
+
+    def sync(self, full: bool = False) -> int:
+        """Fetch records modified since the last sync and merge them.
+        Full sync if forced, never synced or the full sync interval
+        has passed.
+
+        Args:
+            full (bool): force full sync. default: False.
+
+        Returns:
+            int: fetched records count.
+        """
+        started = time.time()
+        full_sync_seconds = snap_c.SECONDS_PER_HOUR * float(
+            os.getenv(snap_c.FULL_SYNC_HOURS, snap_c.DEFAULT_FULL_SYNC_HOURS)
+        )
+        full = (
+            full
+            or not self.watermark
+            or started - self.synced_at > full_sync_seconds
+        )
+        formula = (
+            None if full else snap_c.MODIFIED_FORMULA.format(self.watermark)
+        )
+        records = self.model.get_table().all(formula=formula)
+        if full:
+            self.columns = self._build_columns([])
+            self.synced_at = started
+        self._merge(records)
+        self.watermark = time.strftime(
+            snap_c.WATERMARK_FORMAT,
+            time.gmtime(started - snap_c.SKEW_SECONDS),
+        )
+        self.save()
+        logger.info(
+            "Snapshot %s synced, %s: %s fetched, %s rows",
+            self.name,
+            "full" if full else "incremental",
+            len(records),
+            len(self),
+        )
+        return len(records)
+
+    def refresh(self, record_ids: Iterable[str]) -> Set[str]:
+        """Fetch the given records again and merge them.
+        Incremental syncs miss records deleted in AirTable and computed
+        fields changes, records deleted since are removed.
+
+        Args:
+            record_ids (Iterable[str]): records IDs.
+
+        Returns:
+            Set[str]: IDs of the records still in AirTable.
+        """
+        record_ids = list(dict.fromkeys(record_ids))
+        table = self.model.get_table()
+        records: List[dict] = []
+        for start in range(0, len(record_ids), air_c.MAX_IDS_PER_FORMULA):
+            formula = OR(
+                *(
+                    air_c.RECORD_ID_FORMULA.format(STR_VALUE(record_id))
+                    for record_id in record_ids[
+                        start : start + air_c.MAX_IDS_PER_FORMULA
+                    ]
+                )
+            )
+            records.extend(table.all(formula=formula))
+        self._merge(records)
+        found = {record[snap_c.ID] for record in records}
+        deleted = set(record_ids) - found
+        if deleted:
+            self.remove(deleted)
+        logger.info(
+            "Snapshot %s refreshed: %s fetched, %s deleted",
+            self.name,
+            len(found),
+            len(deleted),
+        )
+        return found
+
+    def _build_columns(self, records: List[dict]) -> Dict[str, np.ndarray]:
+        """Build columns of records.
+
+        Args:
+            records (List[dict]): AirTable records.
+
+        Returns:
+            Dict[str, np.ndarray]: columns of the records.
+        """
+        columns = {
+            column: build_column(
+                [record[snap_c.FIELDS].get(field) for record in records], kind
+            )
+            for column, (field, kind) in self.schema.items()
+        }
+        columns[snap_c.ID] = build_column(
+            [record[snap_c.ID] for record in records], snap_c.TEXT
+        )
+        return columns
+
+    def _merge(self, records: List[dict]) -> None:
+        """Update existing rows and append new ones.
+
+        Args:
+            records (List[dict]): AirTable records.
+        """
+        if not records:
+            return
+        current = self.columns
+        index = {
+            record_id: row
+            for row, record_id in enumerate(current[snap_c.ID].tolist())
+        }
+        updated = self._build_columns(
+            [record for record in records if record[snap_c.ID] in index]
+        )
+        rows = np.array(
+            [index[record_id] for record_id in updated[snap_c.ID].tolist()],
+            dtype=np.int64,
+        )
+        added = self._build_columns(
+            [record for record in records if record[snap_c.ID] not in index]
+        )
+        merged = {}
+        for column, values in current.items():
+            # widen text columns so longer values are not truncated
+            values = values.astype(
+                np.result_type(values, updated[column], added[column])
+            )
+            values[rows] = updated[column]
+            merged[column] = np.concatenate([values, added[column]])
+        self.columns = merged
+
+    def remove(self, record_ids: Iterable[str]) -> None:
+        """Remove rows deleted by the service.
+
+        Args:
+            record_ids (Iterable[str]): deleted records IDs.
+        """
+        keep = ~np.isin(self.columns[snap_c.ID], list(record_ids))
+        self.columns = {
+            column: values[keep] for column, values in self.columns.items()
+        }
+
+    def column(self, column: str) -> np.ndarray:
+        """Get column array.
+
+        Args:
+            column (str): column name, or id.
+
+        Returns:
+            np.ndarray: column values by row.
+        """
+        return self.columns[column]
+
+    def rows(
+        self, row_type: Type[Tuple], rows: Optional[np.ndarray] = None
+    ) -> List[Tuple]:
+        """Project rows into tuples, link IDs interned.
+
+        Args:
+            row_type (Type[Tuple]): NamedTuple with fields named after
+                the snapshot columns.
+            rows (np.ndarray | None): boolean mask or row indexes.
+                default: all.
+
+        Returns:
+            List[Tuple]: projected rows.
+        """
+        values = []
+        for field in row_type._fields:  # type: ignore
+            column = self.columns[field]
+            column = (column if rows is None else column[rows]).tolist()
+            if self.schema.get(field, ("", ""))[1] == snap_c.LINK:
+                column = [sys.intern(value) for value in column]
+            values.append(column)
+        return [row_type(*row) for row in zip(*values)]
+
+    def mask(self, **equals: object) -> np.ndarray:
+        """Rows where all given columns equal the given values.
+
+        Args:
+            equals (object): column names and values.
+
+        Returns:
+            np.ndarray: boolean rows mask.
+        """
+        rows = np.ones(len(self), dtype=bool)
+        for column, value in equals.items():
+            rows &= self.columns[column] == value
+        return rows
+
+    def count_by(
+        self, column: str, rows: Optional[np.ndarray] = None
+    ) -> Dict[str, int]:
+        """Count rows by column value.
+
+        Args:
+            column (str): column name.
+            rows (np.ndarray | None): boolean rows mask. default: all.
+
+        Returns:
+            Dict[str, int]: rows count by value.
+        """
+        values = self.columns[column]
+        if rows is not None:
+            values = values[rows]
+        keys, counts = np.unique(values, return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+
+class AirTableSnapshot:
+    """Snapshots of the service tables."""
+
+    def __init__(self, store: SnapshotStore = None) -> None:
+        """Initialize AirTableSnapshot.
+
+        Args:
+            store (SnapshotStore): snapshot store.
+                default: store from environment.
+        """
+        self.store = store or SnapshotStore.from_env()
+        self._tables: Dict[str, TableSnapshot] = {}
+
+    def table(self, name: str, sync: bool = True) -> TableSnapshot:
+        """Get table snapshot, synced once per instance.
+
+        Args:
+            name (str): table name.
+            sync (bool): sync with AirTable first. default: True.
+
+        Returns:
+            TableSnapshot: table snapshot.
+        """
+        if name not in self._tables:
+            self._tables[name] = TableSnapshot(name, self.store)
+            if sync:
+                self._tables[name].sync()
+        return self._tables[name]
+
+    def available_stock(self) -> Dict[str, int]:
+        """Count eSIMs not checked in by package.
+
+        Returns:
+            Dict[str, int]: available eSIMs by package ID.
+        """
+        inventory = self.table(snap_c.INVENTORY)
+        return inventory.count_by(
+            "esim_package", inventory.mask(checked_in=False)
+        )
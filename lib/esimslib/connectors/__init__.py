@@ -2,3 +2,20 @@
 
 from esimslib.connectors.aws_connector import SSMConnector, S3Connector
 from esimslib.connectors.dropbox_connector import DropboxConnector
+from esimslib.connectors.http_connector import HTTPConnector
+from esimslib.connectors.queue_connector import (
+    WorkQueue,
+    MemoryQueue,
+    LocalDirQueue,
+    SQSQueue,
+    QueueSendError,
+)
+from esimslib.connectors.async_connector import (
+    AsyncRuntime,
+    AsyncDropboxConnector,
+    AsyncS3Connector,
+    AsyncHTTPConnector,
+    run_io,
+    run_cpu,
+    gather_bounded,
+)
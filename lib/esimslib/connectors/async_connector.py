@@ -0,0 +1,308 @@
+"""Async Connectors
+
+Async variants of the blocking connectors. Blocking calls run on a
+shared I/O thread pool under per-connector semaphores so network waits
+overlap on one event loop, while CPU work goes to a separate executor.
+"""
+
+import os
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from esimslib.connectors.aws_connector import S3Connector
+from esimslib.connectors.dropbox_connector import DropboxConnector
+from esimslib.connectors.http_connector import HTTPConnector, HeadCheck
+from esimslib.connectors.constants import AsyncConst as async_c
+
+
+class AsyncRuntime:
+    """Event loop and executors shared across the process.
+    Kept alive between warm Lambda invocations.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    io_executor = ThreadPoolExecutor(
+        max_workers=int(
+            os.getenv(async_c.ASYNC_IO_WORKERS, async_c.DEFAULT_IO_WORKERS)
+        ),
+        thread_name_prefix=async_c.IO_THREAD_PREFIX,
+    )
+    cpu_executor = ThreadPoolExecutor(
+        max_workers=int(
+            os.getenv(
+                async_c.ASYNC_CPU_WORKERS,
+                str(os.cpu_count() or async_c.DEFAULT_CPU_WORKERS),
+            )
+        ),
+        thread_name_prefix=async_c.CPU_THREAD_PREFIX,
+    )
+
+    @classmethod
+    def loop(cls) -> asyncio.AbstractEventLoop:
+        """Get shared event loop.
+
+        Returns:
+            asyncio.AbstractEventLoop: event loop.
+        """
+        if cls._loop is None or cls._loop.is_closed():
+            cls._loop = asyncio.new_event_loop()
+        return cls._loop
+
+    @classmethod
+    def run(cls, coroutine: Awaitable) -> Any:
+        """Run coroutine to completion on the shared event loop.
+
+        Args:
+            coroutine (Awaitable): coroutine to run.
+
+        Returns:
+            Any: coroutine result.
+        """
+        return cls.loop().run_until_complete(coroutine)
+
+
+async def run_io(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run blocking I/O call on the shared I/O executor.
+    The call runs in a copy of the caller context, e.g. its span.
+
+    Args:
+        func (Callable): blocking function.
+        args (Any): positional arguments.
+        kwargs (Any): keyword arguments.
+
+    Returns:
+        Any: function result.
+    """
+    return await asyncio.get_event_loop().run_in_executor(
+        AsyncRuntime.io_executor,
+        partial(contextvars.copy_context().run, func, *args, **kwargs),
+    )
+
+
+async def run_cpu(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run CPU bound call on the shared CPU executor.
+    The call runs in a copy of the caller context, e.g. its span.
+
+    Args:
+        func (Callable): CPU bound function.
+        args (Any): positional arguments.
+        kwargs (Any): keyword arguments.
+
+    Returns:
+        Any: function result.
+    """
+    return await asyncio.get_event_loop().run_in_executor(
+        AsyncRuntime.cpu_executor,
+        partial(contextvars.copy_context().run, func, *args, **kwargs),
+    )
+
+
+async def gather_bounded(
+    limit: int, coroutines: Iterable[Awaitable]
+) -> List[Any]:
+    """Gather coroutines with at most limit of them in flight.
+    Results keep the input order. Once one raises, the others are
+    cancelled and awaited before its exception is raised, so none is
+    left on the shared loop to resume in the next invocation.
+
+    Args:
+        limit (int): maximum coroutines in flight.
+        coroutines (Iterable[Awaitable]): coroutines to run.
+
+    Raises:
+        Exception: first exception raised by a coroutine.
+
+    Returns:
+        List[Any]: coroutines results.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coroutine: Awaitable) -> Any:
+        """Run coroutine once the semaphore is acquired.
+
+        Args:
+            coroutine (Awaitable): coroutine to run.
+
+        Returns:
+            Any: coroutine result.
+        """
+        async with semaphore:
+            return await coroutine
+
+    tasks = [asyncio.ensure_future(bounded(c)) for c in coroutines]
+    if not tasks:
+        return []
+    done: set = set()
+    try:
+        done, _ = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_EXCEPTION
+        )
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    for task in tasks:
+        exception = task.exception() if task in done else None
+        if exception is not None:
+            raise exception
+    return [task.result() for task in tasks]
+
+
+# pylint: disable=too-few-public-methods
+class AsyncConnector:
+    """Run blocking connector calls with bounded concurrency."""
+
+    def __init__(self, connector: Any, max_concurrency: int) -> None:
+        """Initialize AsyncConnector.
+
+        Args:
+            connector (Any): blocking connector.
+            max_concurrency (int): maximum calls in flight.
+        """
+        self.connector = connector
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run connector method on the I/O executor.
+
+        Args:
+            method (str): connector method name.
+            args (Any): positional arguments.
+            kwargs (Any): keyword arguments.
+
+        Returns:
+            Any: method result.
+        """
+        # semaphore is created lazily to bind to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await run_io(
+                getattr(self.connector, method), *args, **kwargs
+            )
+
+
+class AsyncDropboxConnector(AsyncConnector):
+    """Async Dropbox Connector."""
+
+    def __init__(self, connector: DropboxConnector = None) -> None:
+        """Initialize AsyncDropboxConnector.
+
+        Args:
+            connector (DropboxConnector): blocking connector.
+                default: new DropboxConnector.
+        """
+        super().__init__(
+            connector or DropboxConnector(), async_c.DROPBOX_CONCURRENCY
+        )
+
+    async def list_files(self, root_folder: str) -> list:
+        """List all files in the root folder.
+
+        Args:
+            root_folder (str): Root folder path.
+
+        Returns:
+            list: list of file paths.
+        """
+        return await self._run("list_files", root_folder)
+
+    async def get_file(
+        self, file_path: str, accept: HeadCheck = None
+    ) -> bytes:
+        """Get file from Dropbox.
+
+        Args:
+            file_path (str): Path to file.
+            accept (Callable[[bytes], bool]): file head check.
+                default: None, no check.
+
+        Returns:
+            bytes: File content.
+        """
+        return await self._run("get_file", file_path, accept)
+
+    async def delete_batch(self, entries: list) -> str:
+        """Delete batch of files.
+
+        Args:
+            entries (list): List of files pathes.
+
+        Returns:
+            str: Delete Job Id
+        """
+        return await self._run("delete_batch", entries)
+
+    async def wait_delete_job(self, job_id: str) -> None:
+        """Wait for delete job to finish.
+
+        Args:
+            job_id (str): Delete Job ID.
+        """
+        while not await self._run("check_delete_job_status", job_id):
+            await asyncio.sleep(async_c.DELETE_JOB_POLL_SECONDS)
+
+
+class AsyncS3Connector(AsyncConnector):
+    """Async S3 Connector."""
+
+    def __init__(self, connector: S3Connector = None) -> None:
+        """Initialize AsyncS3Connector.
+
+        Args:
+            connector (S3Connector): blocking connector.
+                default: new S3Connector.
+        """
+        super().__init__(connector or S3Connector(), async_c.S3_CONCURRENCY)
+
+    async def load_data(
+        self, data: bytes, key: str, content_type: str = None
+    ) -> str:
+        """Loads bytes object to S3
+
+        Args:
+            data (bytes): Bytes object to load.
+            key (str): key to load.
+            content_type (str): object content type.
+                default: None.
+
+        Returns:
+            str: S3 object URL.
+        """
+        return await self._run("load_data", data, key, content_type)
+
+
+class AsyncHTTPConnector(AsyncConnector):
+    """Async HTTP Connector."""
+
+    def __init__(self, connector: HTTPConnector = None) -> None:
+        """Initialize AsyncHTTPConnector.
+
+        Args:
+            connector (HTTPConnector): blocking connector.
+                default: shared HTTPConnector.
+        """
+        super().__init__(
+            connector or HTTPConnector.shared(), async_c.HTTP_CONCURRENCY
+        )
+
+    async def get_file(
+        self, url: str, cache_key: str = None, accept: HeadCheck = None
+    ) -> bytes:
+        """Get file from url.
+
+        Args:
+            url (str): file url.
+            cache_key (str): stable cache key. default: url.
+            accept (Callable[[bytes], bool]): file head check.
+                default: None, no check.
+
+        Returns:
+            bytes: file content.
+        """
+        return await self._run("get_file", url, cache_key, accept)
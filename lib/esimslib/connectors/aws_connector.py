@@ -1,10 +1,16 @@
 """AWS Services Connectors"""
 
 import os
+from typing import List, Optional, Tuple
+
 import boto3
+from botocore.exceptions import ClientError
 
 from esimslib.connectors.constants import AWSConst as aws_c
+from esimslib.util.constants import MetricsConst as mt_c
 from esimslib.util.logger import logger
+from esimslib.util.metrics import timed
+from esimslib.util.tracing import set_attributes, traced
 
 
 class S3Connector:
@@ -15,22 +21,107 @@ class S3Connector:
         self.bucket = os.getenv(aws_c.AWS_BUCKET)
         self.s3 = boto3.client(aws_c.S3)
 
-    def load_data(self, data: bytes, key: str) -> str:
-        """Loads bytes object to S3
+    def _key(self, key: str) -> str:
+        """Format object key.
 
         Args:
-            data (bytes): Bytes object to load.
-            key (str): key to load.
+            key (str): object key or Dropbox path.
 
         Returns:
-            str: S3 object URL.
+            str: S3 object key.
+        """
+        return key[1:] if key.startswith(aws_c.SKIP_CHARACHTER) else key
+
+    @traced(aws_c.PUT_SPAN, "key")
+    def put_data(
+        self, data: bytes, key: str, content_type: str = None
+    ) -> None:
+        """Put bytes object to S3
+
+        Args:
+            data (bytes): Bytes object to load.
+            key (str): key to load.
+            content_type (str): object content type.
+                default: None.
         """
-        key = key[1:] if key.startswith(aws_c.SKIP_CHARACHTER) else key
+        set_attributes(bytes=len(data))
+        extra_args = {aws_c.CONTENT_TYPE: content_type} if content_type else {}
         self.s3.put_object(
             Bucket=self.bucket,
-            Key=key,
+            Key=self._key(key),
             Body=data,
+            **extra_args,
         )
+
+    @traced(aws_c.GET_SPAN, "key")
+    def get_data(self, key: str) -> bytes:
+        """Get bytes object from S3
+
+        Args:
+            key (str): key to get.
+
+        Raises:
+            ClientError: if S3 request failed.
+
+        Returns:
+            bytes | None: object content, None if not found.
+        """
+        try:
+            response = self.s3.get_object(
+                Bucket=self.bucket, Key=self._key(key)
+            )
+        except ClientError as exc:
+            if exc.response[aws_c.ERROR][aws_c.CODE] == aws_c.NO_SUCH_KEY:
+                return None
+            raise exc
+        return response[aws_c.BODY].read()
+
+    @traced(aws_c.LIST_SPAN, "prefix")
+    def list_keys(self, prefix: str) -> List[str]:
+        """List object keys under a prefix
+
+        Args:
+            prefix (str): key prefix.
+
+        Returns:
+            List[str]: object keys in key order.
+        """
+        paginator = self.s3.get_paginator(aws_c.LIST_OBJECTS)
+        return [
+            content[aws_c.KEY]
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=self._key(prefix)
+            )
+            for content in page.get(aws_c.CONTENTS, [])
+        ]
+
+    @traced(aws_c.DELETE_SPAN, "key")
+    def delete_data(self, key: str) -> None:
+        """Delete object from S3
+
+        Args:
+            key (str): key to delete.
+        """
+        self.s3.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    @timed(mt_c.S3_UPLOAD)
+    @traced(aws_c.LOAD_SPAN, "key")
+    def load_data(
+        self, data: bytes, key: str, content_type: str = None
+    ) -> str:
+        """Loads bytes object to S3
+
+        Args:
+            data (bytes): Bytes object to load.
+            key (str): key to load.
+            content_type (str): object content type.
+                default: None.
+
+        Returns:
+            str: S3 object URL.
+        """
+        key = self._key(key)
+        self.put_data(data, key, content_type)
         logger.info("Data loaded to S3: %s", key)
         return self.s3.generate_presigned_url(
             ClientMethod=aws_c.CLIENT_METHOD,
@@ -61,9 +152,79 @@ class SSMConnector:
         response = self.ssm.get_parameter(Name=key, WithDecryption=True)
         return response.get(aws_c.PARAMETER).get(aws_c.VALUE)
 
+    def find_parameter(self, key: str) -> Optional[str]:
+        """Get parameter from SSM if it exists
+
+        Args:
+            key (str): key to get.
+
+        Raises:
+            ClientError: if SSM request failed.
+
+        Returns:
+            str | None: parameter value, None if not found.
+        """
+        try:
+            return self.get_parameter(key)
+        except ClientError as exc:
+            code = exc.response[aws_c.ERROR][aws_c.CODE]
+            if code == aws_c.PARAMETER_NOT_FOUND:
+                return None
+            raise exc
+
+    def find_parameter_version(self, key: str) -> Tuple[Optional[str], int]:
+        """Get parameter and its version from SSM if it exists
+
+        Args:
+            key (str): key to get.
+
+        Raises:
+            ClientError: if SSM request failed.
+
+        Returns:
+            Tuple[str | None, int]: parameter value and version,
+                None and 0 if not found.
+        """
+        try:
+            response = self.ssm.get_parameter(Name=key, WithDecryption=True)
+        except ClientError as exc:
+            code = exc.response[aws_c.ERROR][aws_c.CODE]
+            if code == aws_c.PARAMETER_NOT_FOUND:
+                return None, 0
+            raise exc
+        parameter = response.get(aws_c.PARAMETER)
+        return parameter.get(aws_c.VALUE), int(parameter.get(aws_c.VERSION))
+
+    def create_parameter(self, key: str, value: str) -> bool:
+        """Create parameter in SSM only if it does not exist
+
+        Args:
+            key (str): key to create.
+            value (str): value to set.
+
+        Raises:
+            ClientError: if SSM request failed.
+
+        Returns:
+            bool: True if created, False if it already exists.
+        """
+        try:
+            self.ssm.put_parameter(
+                Name=key,
+                Value=value,
+                Type=aws_c.STRING_TYPE,
+                Overwrite=False,
+            )
+        except ClientError as exc:
+            code = exc.response[aws_c.ERROR][aws_c.CODE]
+            if code == aws_c.PARAMETER_ALREADY_EXISTS:
+                return False
+            raise exc
+        return True
+
     def update_parameter(
         self, key: str, value: str, secure: bool = False
-    ) -> None:
+    ) -> int:
         """Set parameter in SSM
 
         Args:
@@ -71,10 +232,14 @@ class SSMConnector:
             value (str): value to set.
             secure (bool): Keeps parameter secure if set to True.
                 default: False.
+
+        Returns:
+            int: parameter version written.
         """
-        self.ssm.put_parameter(
+        response = self.ssm.put_parameter(
             Name=key,
             Value=value,
             Type=aws_c.SECURE_STRING_TYPE if secure else aws_c.STRING_TYPE,
             Overwrite=True,
         )
+        return int(response[aws_c.VERSION])
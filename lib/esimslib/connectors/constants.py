@@ -9,10 +9,131 @@ class DropBoxConst:
     # Env Variables
     DROPBOX_TOKEN = "DROPBOX_TOKEN"  # nosec
 
+    # Downloads
+    CHUNK_SIZE = 64 * 1024
+
+    # Spans
+    LIST_SPAN = "dropbox.list_files"
+    DOWNLOAD_SPAN = "dropbox.get_file"
+    DELETE_SPAN = "dropbox.delete_batch"
+    DELETE_CHECK_SPAN = "dropbox.check_delete_job"
+    WRITE_SPAN = "dropbox.write_files"
+
+
+class HTTPConst:
+    """HTTP Connector Defines"""
+
+    # Spans
+    GET_SPAN = "http.get_file"
+
+    # Env Variables
+    HTTP_MAX_BYTES = "HTTP_MAX_BYTES"
+    HTTP_CACHE_DIR = "HTTP_CACHE_DIR"
+    HTTP_CACHE_MAX_BYTES = "HTTP_CACHE_MAX_BYTES"
+
+    # Defaults
+    DEFAULT_MAX_BYTES = str(20 * 1024 * 1024)
+    DEFAULT_CACHE_MAX_BYTES = str(256 * 1024 * 1024)
+
+    # Session
+    HTTP = "http://"
+    HTTPS = "https://"
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 32
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    RETRY_STATUSES = [429, 500, 502, 503, 504]
+    TIMEOUT = 30
+    CHUNK_SIZE = 64 * 1024
+
+    # Headers
+    CONTENT_LENGTH = "Content-Length"
+    NOT_MODIFIED = 304
+    VALIDATOR_HEADERS = (
+        ("etag", "ETag"),
+        ("last_modified", "Last-Modified"),
+    )
+    CONDITIONAL_HEADERS = (
+        ("etag", "If-None-Match"),
+        ("last_modified", "If-Modified-Since"),
+    )
+
+    # Disk Cache
+    UTF8 = "utf-8"
+    DATA_EXTENSION = ".bin"
+    META_EXTENSION = ".json"
+    TEMP_EXTENSION = ".tmp"
+    DIGEST = "sha256"
+
+
+class AsyncConst:
+    """Async Connectors Defines"""
+
+    # Env Variables
+    ASYNC_IO_WORKERS = "ASYNC_IO_WORKERS"
+    ASYNC_CPU_WORKERS = "ASYNC_CPU_WORKERS"
+
+    # Executors
+    DEFAULT_IO_WORKERS = "64"
+    DEFAULT_CPU_WORKERS = 2
+    IO_THREAD_PREFIX = "esims-io"
+    CPU_THREAD_PREFIX = "esims-cpu"
+
+    # Concurrency per connector
+    DROPBOX_CONCURRENCY = 16
+    S3_CONCURRENCY = 32
+    HTTP_CONCURRENCY = 32
+
+    # Dropbox
+    DELETE_JOB_POLL_SECONDS = 3
+
+
+class QueueConst:
+    """Work Queue Defines"""
+
+    # Env Variables
+    QUEUE_URL = "WORK_QUEUE_URL"
+    QUEUE_DIR = "WORK_QUEUE_DIR"
+
+    # Services
+    SQS = "sqs"
+
+    # Messages
+    UTF8 = "utf-8"
+    MAX_BATCH = 10
+    WAIT_TIME_SECONDS = 1
+    MESSAGES = "Messages"
+    BODY = "Body"
+    RECEIPT_HANDLE = "ReceiptHandle"
+    ID = "Id"
+    MESSAGE_BODY = "MessageBody"
+    DELAY_SECONDS = "DelaySeconds"
+    FAILED = "Failed"
+    CODE = "Code"
+    SENDER_FAULT = "SenderFault"
+
+    # Send retries
+    SEND_ATTEMPTS = 3
+    RETRY_SECONDS = 0.5
+
+    # Local queue
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    MESSAGE_FILE = "{:015d}-{}.json"
+    TEMP_SUFFIX = ".tmp"
+    NAME_SEPARATOR = "-"
+
 
 class AWSConst:
     """AWS S3 Defines"""
 
+    # Spans
+    PUT_SPAN = "s3.put_data"
+    GET_SPAN = "s3.get_data"
+    LIST_SPAN = "s3.list_keys"
+    DELETE_SPAN = "s3.delete_data"
+    LOAD_SPAN = "s3.load_data"
+
     # Env Variables
     AWS_BUCKET = "AWS_BUCKET"
 
@@ -24,10 +145,22 @@ class AWSConst:
     CLIENT_METHOD = "get_object"
     BUCKET = "Bucket"
     KEY = "Key"
+    CONTENT_TYPE = "ContentType"
     SKIP_CHARACHTER = "/"
 
+    # Objects
+    BODY = "Body"
+    ERROR = "Error"
+    CODE = "Code"
+    NO_SUCH_KEY = "NoSuchKey"
+    LIST_OBJECTS = "list_objects_v2"
+    CONTENTS = "Contents"
+
     # SSM
     PARAMETER = "Parameter"
     VALUE = "Value"
+    VERSION = "Version"
     SECURE_STRING_TYPE = "SecureString"
     STRING_TYPE = "String"
+    PARAMETER_NOT_FOUND = "ParameterNotFound"
+    PARAMETER_ALREADY_EXISTS = "ParameterAlreadyExists"
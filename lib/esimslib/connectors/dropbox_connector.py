@@ -12,7 +12,11 @@ from dropbox.files import DeleteArg
 
 from esimslib.connectors.aws_connector import SSMConnector as ssm
 from esimslib.connectors.constants import DropBoxConst as dbx_c
+from esimslib.connectors.http_connector import HeadCheck, accept_head
+from esimslib.util.constants import MetricsConst as mt_c
 from esimslib.util.logger import logger
+from esimslib.util.metrics import timed
+from esimslib.util.tracing import set_attributes, traced
 
 
 def handle_dpx_error(func: Callable) -> Callable:
@@ -56,6 +60,8 @@ class DropboxConnector:
         """Initialize DropboxConnector."""
         self.dbx = Dropbox(ssm().get_parameter(os.getenv(dbx_c.DROPBOX_TOKEN)))
 
+    @timed(mt_c.DROPBOX_LIST)
+    @traced(dbx_c.LIST_SPAN, "root_folder")
     @handle_dpx_error
     def list_files(self, root_folder: str) -> list:
         """List all files in the root folder.
@@ -74,20 +80,36 @@ class DropboxConnector:
             logger.warning("Folder Not Found: %s", root_folder)
             return []
 
+    @timed(mt_c.DROPBOX_DOWNLOAD)
+    @traced(dbx_c.DOWNLOAD_SPAN, "file_path")
     @handle_dpx_error
-    def get_file(self, file_path: str) -> bytes:
+    def get_file(self, file_path: str, accept: HeadCheck = None) -> bytes:
         """Get file from Dropbox.
+        Rejected files are not downloaded past their first bytes.
 
         Args:
             file_path (str): Path to file.
+            accept (Callable[[bytes], bool]): file head check.
+                default: None, no check.
+
+        Raises:
+            UnsupportedContentError: if file head is not accepted.
 
         Returns:
             object: File content.
         """
         metadata, file = self.dbx.files_download(file_path)
+        with file:
+            content = b"".join(
+                accept_head(
+                    file.iter_content(chunk_size=dbx_c.CHUNK_SIZE), accept
+                )
+            )
+        set_attributes(bytes=len(content))
         logger.info("Downloaded: %s", metadata.name)
-        return file.content
+        return content
 
+    @traced(dbx_c.DELETE_SPAN)
     @handle_dpx_error
     def delete_batch(self, entries: list) -> str:
         """Delete batch of files.
@@ -99,10 +121,12 @@ class DropboxConnector:
             str: Delete Job Id
         """
         delete_args = [DeleteArg(path) for path in entries]
+        set_attributes(files=len(delete_args))
         deleted = self.dbx.files_delete_batch(delete_args)
         logger.info("Deleted Files Initiated: %s", len(delete_args))
         return deleted.get_async_job_id()
 
+    @traced(dbx_c.DELETE_CHECK_SPAN, "job_id")
     @handle_dpx_error
     def check_delete_job_status(self, job_id: str) -> bool:
         """Check delete job status.
@@ -116,6 +140,7 @@ class DropboxConnector:
         deleted = self.dbx.files_delete_batch_check(job_id)
         return deleted.is_complete()
 
+    @traced(dbx_c.WRITE_SPAN, "parent_folder")
     @handle_dpx_error
     def write_files(self, parent_folder: str, urls: list) -> None:
         """Load QR Codes in urls to Dropbox.
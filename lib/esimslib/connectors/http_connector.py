@@ -0,0 +1,355 @@
+"""HTTP Connector to Fetch files."""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from esimslib.connectors.constants import HTTPConst as http_c
+from esimslib.util.constants import (
+    FileTypeConst as ft_c,
+    MetricsConst as mt_c,
+)
+from esimslib.util.logger import logger
+from esimslib.util.metrics import timed
+from esimslib.util.tracing import set_attributes, traced
+
+HeadCheck = Callable[[bytes], bool]
+
+
+class ContentTooLargeError(requests.exceptions.RequestException):
+    """Raised when a response body exceeds the maximum allowed size."""
+
+
+class UnsupportedContentError(requests.exceptions.RequestException):
+    """Raised when a response body head is not of an accepted type."""
+
+
+def accept_head(
+    chunks: Iterator[bytes], accept: Optional[HeadCheck]
+) -> Iterator[bytes]:
+    """Check streamed content head before the rest is downloaded.
+
+    Args:
+        chunks (Iterator[bytes]): streamed content chunks.
+        accept (Callable[[bytes], bool] | None): content head check,
+            e.g. magic bytes sniffing. default: None, no check.
+
+    Raises:
+        UnsupportedContentError: if content head is not accepted.
+
+    Yields:
+        bytes: content chunks.
+    """
+    if accept is None:
+        yield from chunks
+        return
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= ft_c.SNIFF_BYTES:
+            break
+    if not accept(head[: ft_c.SNIFF_BYTES]):
+        raise UnsupportedContentError(
+            f"Unsupported content: {head[: ft_c.SNIFF_BYTES]!r}"
+        )
+    yield head
+    yield from chunks
+
+
+class DiskCache:
+    """LRU cache of fetched files on local disk.
+
+    Entries are stored as a content file and a metadata file holding
+    the content digest, each replaced atomically, content first.
+    Entries whose content does not match their metadata are misses.
+    Least recently used entries are evicted once the cache
+    exceeds its maximum size.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        """Initialize DiskCache.
+
+        Args:
+            cache_dir (str): cache directory.
+            max_bytes (int): maximum cache size in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str, extension: str) -> str:
+        """Get entry file path.
+
+        Args:
+            key (str): cache key.
+            extension (str): entry file extension.
+
+        Returns:
+            str: entry file path.
+        """
+        digest = hashlib.sha256(key.encode(http_c.UTF8)).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}{extension}")
+
+    def get(self, key: str) -> Tuple[Optional[bytes], dict]:
+        """Get cached content and metadata.
+
+        Args:
+            key (str): cache key.
+
+        Returns:
+            Tuple[bytes | None, dict]: content and metadata.
+                (None, {}) if not cached.
+        """
+        data_path = self._path(key, http_c.DATA_EXTENSION)
+        try:
+            with open(
+                self._path(key, http_c.META_EXTENSION), encoding=http_c.UTF8
+            ) as meta_file:
+                metadata = json.load(meta_file)
+            with open(data_path, "rb") as data_file:
+                data = data_file.read()
+        except (OSError, ValueError):
+            return None, {}
+        if metadata.pop(http_c.DIGEST, None) != self._digest(data):
+            return None, {}
+        # mark entry as recently used, unless evicted meanwhile
+        try:
+            os.utime(data_path)
+        except OSError:
+            pass
+        return data, metadata
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        """Content digest stored with the metadata.
+
+        Args:
+            data (bytes): content.
+
+        Returns:
+            str: SHA256 hex digest.
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def _write(self, path: str, content: bytes) -> None:
+        """Replace a file atomically.
+
+        Args:
+            path (str): file path.
+            content (bytes): file content.
+        """
+        descriptor, temp_path = tempfile.mkstemp(
+            suffix=http_c.TEMP_EXTENSION, dir=self.cache_dir
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def put(self, key: str, data: bytes, metadata: dict) -> None:
+        """Cache content and metadata.
+
+        Args:
+            key (str): cache key.
+            data (bytes): content.
+            metadata (dict): content metadata.
+        """
+        if len(data) > self.max_bytes:
+            return
+        metadata = {**metadata, http_c.DIGEST: self._digest(data)}
+        with self._lock:
+            self._write(self._path(key, http_c.DATA_EXTENSION), data)
+            self._write(
+                self._path(key, http_c.META_EXTENSION),
+                json.dumps(metadata).encode(http_c.UTF8),
+            )
+            self._evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries above the maximum size."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries, lock held."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(http_c.DATA_EXTENSION):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            base = os.path.join(self.cache_dir, name)[
+                : -len(http_c.DATA_EXTENSION)
+            ]
+            for extension in (http_c.DATA_EXTENSION, http_c.META_EXTENSION):
+                try:
+                    os.remove(f"{base}{extension}")
+                except OSError:
+                    pass
+            total -= size
+
+
+class HTTPConnector:
+    """Fetch files over HTTP with a pooled keep-alive session.
+    - Streams downloads and rejects bodies above a maximum size.
+    - Revalidates cached files with conditional requests.
+    """
+
+    _shared: Optional["HTTPConnector"] = None
+
+    def __init__(self) -> None:
+        """Initialize HTTPConnector."""
+        self.max_bytes = int(
+            os.getenv(http_c.HTTP_MAX_BYTES, http_c.DEFAULT_MAX_BYTES)
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=http_c.POOL_CONNECTIONS,
+            pool_maxsize=http_c.POOL_MAXSIZE,
+            max_retries=Retry(
+                total=http_c.RETRIES,
+                backoff_factor=http_c.BACKOFF_FACTOR,
+                status_forcelist=http_c.RETRY_STATUSES,
+            ),
+        )
+        self.session.mount(http_c.HTTPS, adapter)
+        self.session.mount(http_c.HTTP, adapter)
+        cache_dir = os.getenv(http_c.HTTP_CACHE_DIR)
+        self.cache = (
+            DiskCache(
+                cache_dir,
+                int(
+                    os.getenv(
+                        http_c.HTTP_CACHE_MAX_BYTES,
+                        http_c.DEFAULT_CACHE_MAX_BYTES,
+                    )
+                ),
+            )
+            if cache_dir
+            else None
+        )
+
+    @classmethod
+    def shared(cls) -> "HTTPConnector":
+        """Get connector shared across the process.
+        Kept alive between warm Lambda invocations.
+
+        Returns:
+            HTTPConnector: shared connector.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _read_body(
+        self, response: requests.Response, accept: HeadCheck = None
+    ) -> bytes:
+        """Read streamed response body within the maximum size.
+
+        Args:
+            response (requests.Response): streamed response.
+            accept (Callable[[bytes], bool]): body head check.
+                default: None, no check.
+
+        Raises:
+            ContentTooLargeError: if body exceeds the maximum size.
+            UnsupportedContentError: if body head is not accepted.
+
+        Returns:
+            bytes: response body.
+        """
+        content_length = int(response.headers.get(http_c.CONTENT_LENGTH, 0))
+        if content_length > self.max_bytes:
+            raise ContentTooLargeError(
+                f"Content length {content_length} exceeds {self.max_bytes}"
+            )
+        chunks = []
+        size = 0
+        for chunk in accept_head(
+            response.iter_content(chunk_size=http_c.CHUNK_SIZE), accept
+        ):
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise ContentTooLargeError(
+                    f"Content exceeds {self.max_bytes} bytes"
+                )
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    @timed(mt_c.HTTP_DOWNLOAD)
+    @traced(http_c.GET_SPAN, "cache_key")
+    def get_file(
+        self, url: str, cache_key: str = None, accept: HeadCheck = None
+    ) -> bytes:
+        """Get file from url.
+        Rejected files are not downloaded past their first bytes.
+
+        Args:
+            url (str): file url.
+            cache_key (str): stable cache key for urls that change
+                between requests e.g. signed urls. default: url.
+            accept (Callable[[bytes], bool]): file head check,
+                cached files were accepted before. default: None.
+
+        Raises:
+            ContentTooLargeError: if file exceeds the maximum size.
+            UnsupportedContentError: if file head is not accepted.
+            RequestException: if request failed.
+
+        Returns:
+            bytes: file content.
+        """
+        cache_key = cache_key or url
+        cached, metadata = (
+            self.cache.get(cache_key) if self.cache else (None, {})
+        )
+        headers = {
+            header: metadata[field]
+            for field, header in http_c.CONDITIONAL_HEADERS
+            if cached is not None and metadata.get(field)
+        }
+        try:
+            with self.session.get(
+                url, headers=headers, stream=True, timeout=http_c.TIMEOUT
+            ) as response:
+                set_attributes(
+                    host=urlparse(url).netloc, status=response.status_code
+                )
+                if response.status_code == http_c.NOT_MODIFIED:
+                    logger.debug("Not modified: %s", cache_key)
+                    return cached
+                response.raise_for_status()
+                data = self._read_body(response, accept)
+                validators = {
+                    field: response.headers.get(header)
+                    for field, header in http_c.VALIDATOR_HEADERS
+                }
+        except (ContentTooLargeError, UnsupportedContentError):
+            # rejected files are logged by the caller
+            raise
+        except requests.exceptions.RequestException as exc:
+            logger.error("Failed to fetch file: %s", exc)
+            raise exc
+        if self.cache and any(validators.values()):
+            self.cache.put(cache_key, data, validators)
+        set_attributes(bytes=len(data))
+        return data
@@ -0,0 +1,314 @@
+"""Work Queue Connectors
+
+JSON message queues used to fan work out to parallel workers.
+- MemoryQueue for a single process.
+- LocalDirQueue for processes sharing a directory.
+- SQSQueue for Lambda workers.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+import boto3
+
+from esimslib.connectors.constants import QueueConst as q_c
+from esimslib.util.logger import logger
+
+
+class QueueSendError(Exception):
+    """Raised when messages are rejected by the queue."""
+
+
+class WorkQueue(ABC):
+    """Work queue backend interface."""
+
+    @classmethod
+    def from_env(cls, in_process: bool = False) -> "WorkQueue":
+        """Create work queue from environment.
+        SQS if WORK_QUEUE_URL is set, local directory if WORK_QUEUE_DIR
+        is set, in memory for in-process work only, as messages sent to
+        a memory queue never reach another process.
+
+        Args:
+            in_process (bool): producers and consumers share the
+                process. default: False.
+
+        Raises:
+            ValueError: if no queue is set and work is not in-process.
+
+        Returns:
+            WorkQueue: work queue.
+        """
+        queue_url = os.getenv(q_c.QUEUE_URL)
+        if queue_url:
+            return SQSQueue(queue_url)
+        queue_dir = os.getenv(q_c.QUEUE_DIR)
+        if queue_dir:
+            return LocalDirQueue(queue_dir)
+        if not in_process:
+            raise ValueError(
+                f"{q_c.QUEUE_URL} or {q_c.QUEUE_DIR} is required "
+                "to share work across processes"
+            )
+        return MemoryQueue()
+
+    @abstractmethod
+    def send(self, messages: List[dict], delay_seconds: int = 0) -> None:
+        """Send messages.
+
+        Args:
+            messages (List[dict]): JSON serializable messages.
+            delay_seconds (int): delay before messages are visible.
+                default: 0.
+        """
+
+    @abstractmethod
+    def receive(
+        self, max_messages: int = q_c.MAX_BATCH
+    ) -> List[Tuple[str, dict]]:
+        """Receive visible messages.
+        Received messages stay hidden until acknowledged.
+
+        Args:
+            max_messages (int): maximum messages to receive.
+
+        Returns:
+            List[Tuple[str, dict]]: receipts and messages.
+        """
+
+    @abstractmethod
+    def ack(self, receipt: str) -> None:
+        """Remove processed message.
+
+        Args:
+            receipt (str): message receipt.
+        """
+
+
+class MemoryQueue(WorkQueue):
+    """In memory work queue."""
+
+    def __init__(self) -> None:
+        """Initialize MemoryQueue."""
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[float, str]] = []
+        self._claimed: Dict[str, str] = {}
+
+    def send(self, messages: List[dict], delay_seconds: int = 0) -> None:
+        """Send messages.
+
+        Args:
+            messages (List[dict]): JSON serializable messages.
+            delay_seconds (int): delay before messages are visible.
+                default: 0.
+        """
+        visible_at = time.time() + delay_seconds
+        with self._lock:
+            self._pending.extend(
+                (visible_at, json.dumps(message)) for message in messages
+            )
+
+    def receive(
+        self, max_messages: int = q_c.MAX_BATCH
+    ) -> List[Tuple[str, dict]]:
+        """Receive visible messages.
+
+        Args:
+            max_messages (int): maximum messages to receive.
+
+        Returns:
+            List[Tuple[str, dict]]: receipts and messages.
+        """
+        now = time.time()
+        received = []
+        with self._lock:
+            for entry in list(self._pending):
+                if len(received) >= max_messages:
+                    break
+                if entry[0] > now:
+                    continue
+                self._pending.remove(entry)
+                receipt = uuid.uuid4().hex
+                self._claimed[receipt] = entry[1]
+                received.append((receipt, json.loads(entry[1])))
+        return received
+
+    def ack(self, receipt: str) -> None:
+        """Remove processed message.
+
+        Args:
+            receipt (str): message receipt.
+        """
+        with self._lock:
+            self._claimed.pop(receipt, None)
+
+
+class LocalDirQueue(WorkQueue):
+    """Work queue of JSON files in a local directory.
+    Messages are claimed by an atomic rename so each is received once.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize LocalDirQueue.
+
+        Args:
+            path (str): queue directory.
+        """
+        self.pending_dir = os.path.join(path, q_c.PENDING)
+        self.claimed_dir = os.path.join(path, q_c.CLAIMED)
+        os.makedirs(self.pending_dir, exist_ok=True)
+        os.makedirs(self.claimed_dir, exist_ok=True)
+
+    def send(self, messages: List[dict], delay_seconds: int = 0) -> None:
+        """Send messages.
+
+        Args:
+            messages (List[dict]): JSON serializable messages.
+            delay_seconds (int): delay before messages are visible.
+                default: 0.
+        """
+        visible_at = int((time.time() + delay_seconds) * 1000)
+        for message in messages:
+            name = q_c.MESSAGE_FILE.format(visible_at, uuid.uuid4().hex)
+            temp_path = os.path.join(self.claimed_dir, name + q_c.TEMP_SUFFIX)
+            with open(temp_path, "w", encoding=q_c.UTF8) as message_file:
+                json.dump(message, message_file)
+            os.replace(temp_path, os.path.join(self.pending_dir, name))
+
+    def receive(
+        self, max_messages: int = q_c.MAX_BATCH
+    ) -> List[Tuple[str, dict]]:
+        """Receive visible messages.
+
+        Args:
+            max_messages (int): maximum messages to receive.
+
+        Returns:
+            List[Tuple[str, dict]]: receipts and messages.
+        """
+        now = int(time.time() * 1000)
+        received: List[Tuple[str, dict]] = []
+        for name in sorted(os.listdir(self.pending_dir)):
+            if len(received) >= max_messages:
+                break
+            if int(name.split(q_c.NAME_SEPARATOR)[0]) > now:
+                break
+            claimed_path = os.path.join(self.claimed_dir, name)
+            try:
+                os.rename(os.path.join(self.pending_dir, name), claimed_path)
+            except FileNotFoundError:
+                continue
+            with open(claimed_path, encoding=q_c.UTF8) as message_file:
+                received.append((claimed_path, json.load(message_file)))
+        return received
+
+    def ack(self, receipt: str) -> None:
+        """Remove processed message.
+
+        Args:
+            receipt (str): message receipt.
+        """
+        try:
+            os.remove(receipt)
+        except FileNotFoundError:
+            pass
+
+
+class SQSQueue(WorkQueue):
+    """AWS SQS work queue."""
+
+    def __init__(self, queue_url: str) -> None:
+        """Initialize SQSQueue.
+
+        Args:
+            queue_url (str): SQS queue URL.
+        """
+        self.queue_url = queue_url
+        self.sqs = boto3.client(q_c.SQS)
+
+    def send(self, messages: List[dict], delay_seconds: int = 0) -> None:
+        """Send messages in batches.
+
+        Args:
+            messages (List[dict]): JSON serializable messages.
+            delay_seconds (int): delay before messages are visible.
+                default: 0.
+        """
+        for start in range(0, len(messages), q_c.MAX_BATCH):
+            self._send_batch(
+                {
+                    str(index): {
+                        q_c.ID: str(index),
+                        q_c.MESSAGE_BODY: json.dumps(message),
+                        q_c.DELAY_SECONDS: delay_seconds,
+                    }
+                    for index, message in enumerate(
+                        messages[start : start + q_c.MAX_BATCH]
+                    )
+                }
+            )
+        logger.info("Messages sent to queue: %s", len(messages))
+
+    def _send_batch(self, entries: Dict[str, dict]) -> None:
+        """Send a batch of entries, retrying the entries that failed.
+
+        Args:
+            entries (Dict[str, dict]): batch entries by ID.
+
+        Raises:
+            QueueSendError: if entries failed on a sender fault,
+                or still failed once retried.
+        """
+        for attempt in range(q_c.SEND_ATTEMPTS):
+            if attempt:
+                time.sleep(q_c.RETRY_SECONDS * 2 ** (attempt - 1))
+            response = self.sqs.send_message_batch(
+                QueueUrl=self.queue_url, Entries=list(entries.values())
+            )
+            failed = response.get(q_c.FAILED, [])
+            if not failed:
+                return
+            logger.warning(
+                "Queue rejected messages: %s",
+                [entry.get(q_c.CODE) for entry in failed],
+            )
+            if any(entry.get(q_c.SENDER_FAULT) for entry in failed):
+                raise QueueSendError(failed)
+            entries = {
+                entry[q_c.ID]: entries[entry[q_c.ID]] for entry in failed
+            }
+        raise QueueSendError(failed)
+
+    def receive(
+        self, max_messages: int = q_c.MAX_BATCH
+    ) -> List[Tuple[str, dict]]:
+        """Receive visible messages.
+
+        Args:
+            max_messages (int): maximum messages to receive.
+
+        Returns:
+            List[Tuple[str, dict]]: receipts and messages.
+        """
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, q_c.MAX_BATCH),
+            WaitTimeSeconds=q_c.WAIT_TIME_SECONDS,
+        )
+        return [
+            (message[q_c.RECEIPT_HANDLE], json.loads(message[q_c.BODY]))
+            for message in response.get(q_c.MESSAGES, [])
+        ]
+
+    def ack(self, receipt: str) -> None:
+        """Remove processed message.
+
+        Args:
+            receipt (str): message receipt.
+        """
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=receipt)
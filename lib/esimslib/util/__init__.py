@@ -1,4 +1,14 @@
 """Util Module"""
 
 from esimslib.util.logger import logger
+from esimslib.util.metrics import Metrics, flushes_metrics, timed
+from esimslib.util.tracing import Tracer, set_attributes, traced
 from esimslib.util.qr_code_processor import QRCodeProcessor
+from esimslib.util.journal import Journal
+from esimslib.util.file_type import is_supported_image, sniff_type
+from esimslib.util.validation import (
+    Rule,
+    ValidationEngine,
+    ValidationStats,
+)
+from esimslib.util.smdp_matcher import SMDPMatcher
@@ -2,7 +2,9 @@
 
 import re
 
-# pylint: disable=too-few-public-methods
+import cv2
+
+# pylint: disable=too-few-public-methods, no-member
 
 
 class QRCodeConst:
@@ -11,5 +13,322 @@ class QRCodeConst:
     UTF8 = "utf-8"
     UINT8 = "uint8"
     PSM = "--psm 11"
+
+    # Spans
+    DECODE_SPAN = "qr.decode"
+    OCR_SPAN = "qr.ocr"
+    ARTIFACT_SPAN = "qr.build_artifact"
     PHONE_PATTERN = re.compile(r"\b(?:055|051|053)\d{7}\b")
     LPA = "LPA:1$"
+
+    # Image Decoding
+    IMAGE_ATTR = "image"
+    PNG_HEADER_SIZE = 24
+    PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    JPEG_SIGNATURE = b"\xff\xd8"
+    JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+    MIN_DECODE_SIDE = 1000
+    REDUCED_GRAYSCALE_FLAGS = (
+        (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+        (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+        (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+    )
+
+    # OCR Data Keys
+    TEXT = "text"
+    BOX_KEYS = ("left", "top", "width", "height")
+
+    # Artifact
+    PNG = ".png"
+    PNG_PARAMS = [
+        cv2.IMWRITE_PNG_COMPRESSION,
+        9,
+        cv2.IMWRITE_PNG_BILEVEL,
+        1,
+    ]
+    QUIET_ZONE_RATIO = 0.1
+    PHONE_PADDING = 10
+
+    # Preflight
+    PREFLIGHT_SIDE = 500
+    MIN_IMAGE_SIDE = 64
+    MIN_SHARPNESS = 10.0
+    FINDER_RATIOS = (1, 1, 3, 1, 1)
+    FINDER_TOLERANCE = 0.5
+    FINDER_KERNEL = (3, 3)
+    MIN_MODULE_SIZE = 1e-3
+    MAX_MODULE_RATIO = 1.5
+    MIN_FINDER_DISTANCE = 12
+    MAX_FINDER_COSINE = 0.3
+    MAX_SIDE_RATIO = 1.25
+    MAX_FINDER_CANDIDATES = 400
+    TOO_SMALL = "too_small"
+    UNREADABLE = "unreadable"
+    BLURRY = "blurry"
+    NO_FINDER_PATTERNS = "no_finder_patterns"
+
+
+class JournalConst:
+    """Journal constants."""
+
+    UTF8 = "utf-8"
+    KEY = "key"
+    VALUE = "value"
+    COMMITTED_AT = "ts"
+    TEMP_SUFFIX = ".tmp"
+
+    # Retention
+    RETENTION_DAYS = "JOURNAL_RETENTION_DAYS"
+    DEFAULT_RETENTION_DAYS = "30"
+    SECONDS_PER_DAY = 86400
+
+    # S3 segments
+    SEGMENT_KEY = "{}/{:015d}-{}.jsonl"
+    COMPACT_SEGMENTS = 50
+
+
+class SchedulerConst:
+    """Work Scheduler constants."""
+
+    # Env Variables
+    SAFETY_MARGIN_MS = "SCHEDULER_SAFETY_MARGIN_MS"
+    CHECKPOINT_PREFIX = "CHECKPOINT_PREFIX"
+    CHECKPOINT_DIR = "CHECKPOINT_DIR"
+
+    # Budget
+    DEFAULT_SAFETY_MARGIN_MS = "30000"
+    DEFAULT_ESTIMATE_MS = 5000.0
+    ESTIMATE_FACTOR = 1.5
+    EWMA_ALPHA = 0.3
+
+    # Checkpoint
+    UTF8 = "utf-8"
+    CHECKPOINT_KEY = "{}/{}.json"
+    CHECKPOINT_FILE = "{}.json"
+    DEFAULT_CHECKPOINT_DIR = "/tmp/checkpoints"  # nosec
+    TEMP_SUFFIX = ".tmp"
+
+
+class LeaseConst:
+    """Lease Lock constants."""
+
+    # Env Variables
+    LEASE_TTL_SECONDS = "LEASE_TTL_SECONDS"
+    LEASE_DIR = "LEASE_DIR"
+
+    # Lease
+    DEFAULT_TTL_SECONDS = "300"
+    HEARTBEAT_DIVISOR = 3
+    POLL_SECONDS = 1.0
+    OWNER = "owner"
+    EXPIRES = "expires"
+    RELEASED = 0.0
+    OWNER_FORMAT = "{}-{}-{}"
+    PATH_SEPARATOR = "/"
+    NAME_SEPARATOR = "_"
+
+    # Local lease
+    UTF8 = "utf-8"
+    LEASE_FILE = "{}.json"
+    LOCK_SUFFIX = ".lock"
+    TEMP_SUFFIX = ".tmp"
+
+
+class ValidationConst:
+    """QR Validation Engine constants."""
+
+    # Env Variables
+    PREFLIGHT = "QR_PREFLIGHT"
+    DEFAULT_PREFLIGHT = "1"
+
+    # Rules
+    QR_PREFLIGHT = "qr_preflight"
+    QR_DETECTED = "qr_detected"
+    LPA_PROTOCOL = "lpa_protocol"
+    SMDP_DOMAIN = "smdp_domain"
+    PHONE_NUMBER = "phone_number"
+
+    # Rule scopes
+    IMAGE_SCOPE = "image"
+    SYMBOL_SCOPE = "symbol"
+
+    # Artifacts, relative cost of producing them
+    PAYLOAD = "payload"
+    BYTES = "bytes"
+    IMAGE = "image"
+    OCR_TEXT = "ocr_text"
+    ARTIFACT_COSTS = {
+        PAYLOAD: 0.0,
+        BYTES: 1.0,
+        IMAGE: 10.0,
+        OCR_TEXT: 1000.0,
+    }
+
+    # Spans
+    RULE_SPAN = "qr.{}"
+
+    # Stats
+    RUNS = "runs"
+    REJECTED = "rejected"
+    SECONDS = "seconds"
+    MS_PER_SECOND = 1000
+
+
+class SMDPConst:
+    """SM-DP+ Matcher constants."""
+
+    LPA = "LPA:1$"
+    FIELD_SEPARATOR = "$"
+    ADDRESS_FIELD = 1
+    LABEL_SEPARATOR = "."
+    PORT_SEPARATOR = ":"
+    SCHEME_SEPARATOR = "://"
+    PATH_SEPARATOR = "/"
+    WILDCARD = "*."
+
+
+class FileTypeConst:
+    """File Type Sniffing constants."""
+
+    SNIFF_BYTES = 16
+
+    # Types
+    PNG = "png"
+    JPEG = "jpeg"
+    WEBP = "webp"
+    HEIF = "heif"
+    BMP = "bmp"
+    TIFF = "tiff"
+    GIF = "gif"
+    PDF = "pdf"
+    DECODED_TYPES = frozenset({PNG, JPEG, WEBP, BMP, TIFF})
+
+    # Signatures
+    PREFIX_SIGNATURES = (
+        (QRCodeConst.PNG_SIGNATURE, PNG),
+        (b"\xff\xd8\xff", JPEG),
+        (b"BM", BMP),
+        (b"II*\x00", TIFF),
+        (b"MM\x00*", TIFF),
+        (b"GIF87a", GIF),
+        (b"GIF89a", GIF),
+        (b"%PDF-", PDF),
+    )
+    RIFF = b"RIFF"
+    WEBP_FORMAT = b"WEBP"
+    FTYP = b"ftyp"
+    HEIF_BRANDS = frozenset(
+        {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1"}
+    )
+
+
+class MetricsConst:
+    """Stage Metrics constants."""
+
+    # Env Variables
+    NAMESPACE = "METRICS_NAMESPACE"
+    DEFAULT_NAMESPACE = "eSIMs"
+    ENABLED = "METRICS"
+    DEFAULT_ENABLED = "1"
+    DISABLED = "0"
+
+    # Units
+    COUNT = "Count"
+    MILLISECONDS = "Milliseconds"
+    MS_PER_SECOND = 1000
+    SIGNIFICANT_DIGITS = 3
+
+    # CloudWatch Embedded Metric Format
+    AWS = "_aws"
+    TIMESTAMP = "Timestamp"
+    CLOUDWATCH_METRICS = "CloudWatchMetrics"
+    NAMESPACE_KEY = "Namespace"
+    DIMENSIONS = "Dimensions"
+    METRICS = "Metrics"
+    NAME = "Name"
+    UNIT = "Unit"
+    VALUES = "Values"
+    COUNTS = "Counts"
+    SERVICE = "Service"
+    MAX_METRICS = 100
+    MAX_VALUES = 100
+
+    # Library stages
+    DROPBOX_LIST = "dropbox_list"
+    DROPBOX_DOWNLOAD = "dropbox_download"
+    HTTP_DOWNLOAD = "http_download"
+    S3_UPLOAD = "s3_upload"
+    AIRTABLE_ASSETS_WRITE = "airtable_assets_write"
+    QR_DECODE = "qr_decode"
+    OCR = "ocr"
+
+
+class TracingConst:
+    """Tracing constants."""
+
+    # Env Variables
+    EXPORTER = "TRACE_EXPORTER"
+    TRACE_FILE = "TRACE_FILE"
+    DEFAULT_TRACE_FILE = "/tmp/esims_traces.jsonl"  # nosec
+    LAMBDA_FUNCTION = "AWS_LAMBDA_FUNCTION_NAME"
+    UTF8 = "utf-8"
+
+    # Exporters
+    STDOUT = "stdout"
+    FILE = "file"
+    NONE = "none"
+
+    # Span records
+    CURRENT_SPAN = "esims_span"
+    TRACE_ID_BYTES = 16
+    SPAN_ID_BYTES = 8
+    TRACE_ID = "trace_id"
+    SPAN_ID = "span_id"
+    PARENT_ID = "parent_id"
+    NAME = "name"
+    START = "start"
+    DURATION_MS = "duration_ms"
+    ATTRIBUTES = "attributes"
+    ERROR = "error"
+    MS_PER_SECOND = 1000
+
+    # HTTP spans
+    HTTP_SPAN = "http.{}"
+    HOST = "host"
+    PATH = "path"
+    STATUS = "status"
+    RETRIES = "retries"
+
+
+class ProfilerConst:
+    """Handler Profiler constants."""
+
+    # Env Variables
+    PROFILE = "PROFILE"
+    PROFILE_RATE = "PROFILE_RATE"
+    DEFAULT_RATE = "0"
+    PROFILE_INTERVAL_MS = "PROFILE_INTERVAL_MS"
+    DEFAULT_INTERVAL_MS = "10"
+    PROFILE_DIR = "PROFILE_DIR"
+    DEFAULT_DIR = "/tmp"  # nosec
+    PROFILE_PREFIX = "PROFILE_PREFIX"
+    DEFAULT_PREFIX = "profiles/"
+
+    # Event flag
+    EVENT_FLAG = "profile"
+
+    # Modes
+    SAMPLING = "sampling"
+    DETERMINISTIC = "cprofile"
+    OFF = ("", "0", "off", "false")
+    EXTENSIONS = {SAMPLING: "collapsed", DETERMINISTIC: "pstats"}
+
+    # Output
+    REQUEST_ID = "aws_request_id"
+    FILE_NAME = "{}-{}-{}.{}"
+    KEY_FORMAT = "{}{}/{}"
+    FRAME_FORMAT = "{} ({}:{})"
+    STACK_SEPARATOR = ";"
+    LINE_FORMAT = "{} {}\n"
+    MS_PER_SECOND = 1000
+    UTF8 = "utf-8"
@@ -0,0 +1,74 @@
+"""File Type Sniffing
+
+Detects image types from the first bytes of a file instead of trusting
+file extensions or declared MIME types. HEIF images are supported if
+the optional pillow-heif package is installed.
+"""
+
+import cv2
+import numpy as np
+
+from esimslib.util.constants import FileTypeConst as ft_c
+
+try:
+    import pillow_heif  # pylint: disable=import-error
+except ImportError:
+    pillow_heif = None
+
+# pylint: disable=no-member
+
+
+def sniff_type(head: bytes) -> str:
+    """Detect file type from its first bytes.
+
+    Args:
+        head (bytes): first SNIFF_BYTES bytes of the file.
+
+    Returns:
+        str: file type, empty if unknown.
+    """
+    for signature, file_type in ft_c.PREFIX_SIGNATURES:
+        if head.startswith(signature):
+            return file_type
+    if head[:4] == ft_c.RIFF and head[8:12] == ft_c.WEBP_FORMAT:
+        return ft_c.WEBP
+    if head[4:8] == ft_c.FTYP and head[8:12] in ft_c.HEIF_BRANDS:
+        return ft_c.HEIF
+    return ""
+
+
+def is_supported_image(head: bytes) -> bool:
+    """Check if file is an image type that can be decoded.
+
+    Args:
+        head (bytes): first SNIFF_BYTES bytes of the file.
+
+    Returns:
+        bool: True if supported.
+    """
+    file_type = sniff_type(head)
+    if file_type == ft_c.HEIF:
+        return pillow_heif is not None
+    return file_type in ft_c.DECODED_TYPES
+
+
+def decode_heif(buffer: memoryview) -> np.ndarray:
+    """Decode HEIF image to grayscale.
+
+    Args:
+        buffer (memoryview): encoded image.
+
+    Returns:
+        np.ndarray | None: grayscale image array.
+            None if HEIF support is not installed.
+    """
+    if pillow_heif is None:
+        return None
+    heif_file = pillow_heif.open_heif(bytes(buffer), convert_hdr_to_8bit=True)
+    image = np.asarray(heif_file)
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(
+        image,
+        cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY,
+    )
@@ -0,0 +1,185 @@
+"""Append-only Journal
+
+Records committed keys, with optional values, as JSON lines in a local
+file so a retried run can skip work that was already committed.
+Entries older than the retention period are dropped on load.
+Subclasses may store the lines elsewhere, see esimslib.util.s3_journal.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Iterable, List
+
+from esimslib.util.constants import JournalConst as jr_c
+from esimslib.util.logger import logger
+
+
+def retained_lines(lines: Iterable[str]) -> List[str]:
+    """Journal lines committed within the retention period.
+    Unreadable lines, e.g. partially written, are dropped.
+
+    Args:
+        lines (Iterable[str]): JSON lines.
+
+    Returns:
+        List[str]: retained lines, without line breaks.
+    """
+    expires_before = time.time() - jr_c.SECONDS_PER_DAY * float(
+        os.getenv(jr_c.RETENTION_DAYS, jr_c.DEFAULT_RETENTION_DAYS)
+    )
+    retained = []
+    for line in lines:
+        try:
+            committed_at = json.loads(line).get(jr_c.COMMITTED_AT, 0)
+        except ValueError:
+            continue
+        if committed_at >= expires_before:
+            retained.append(line.rstrip("\n"))
+    return retained
+
+
+class Journal:
+    """Append-only JSON lines journal of committed keys."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize Journal and load committed entries.
+
+        Args:
+            path (str): journal file path.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Load committed entries from the journal.
+        Partially written trailing lines are ignored.
+        """
+        for line in self._read_lines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._entries[entry[jr_c.KEY]] = entry.get(jr_c.VALUE)
+        if self._entries:
+            logger.info("Journal entries loaded: %s", len(self._entries))
+
+    def _read_lines(self) -> Iterable[str]:
+        """Read journal lines, pruning expired ones.
+
+        Returns:
+            Iterable[str]: JSON lines.
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding=jr_c.UTF8) as journal_file:
+            lines = journal_file.readlines()
+        retained = retained_lines(lines)
+        if len(retained) < len(lines):
+            self._rewrite(retained)
+            logger.info(
+                "Journal entries pruned: %s", len(lines) - len(retained)
+            )
+        return retained
+
+    def _rewrite(self, lines: List[str]) -> None:
+        """Replace the journal with the given lines.
+
+        Args:
+            lines (List[str]): JSON lines.
+        """
+        temp_path = f"{self.path}{jr_c.TEMP_SUFFIX}"
+        with open(temp_path, "w", encoding=jr_c.UTF8) as journal_file:
+            journal_file.write("".join(f"{line}\n" for line in lines))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def _append(self, lines: str) -> None:
+        """Append lines to the journal and flush them to disk.
+
+        Args:
+            lines (str): JSON lines.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding=jr_c.UTF8) as journal_file:
+            journal_file.write(lines)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def __contains__(self, key: str) -> bool:
+        """Check if key is committed.
+
+        Args:
+            key (str): entry key.
+
+        Returns:
+            bool: True if committed.
+        """
+        return key in self._entries
+
+    def __len__(self) -> int:
+        """Number of committed entries.
+
+        Returns:
+            int: committed entries count.
+        """
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get committed entry value.
+
+        Args:
+            key (str): entry key.
+            default (Any): value if key is not committed.
+
+        Returns:
+            Any: entry value.
+        """
+        return self._entries.get(key, default)
+
+    def add(self, key: str, value: Any = None) -> None:
+        """Commit a single entry.
+
+        Args:
+            key (str): entry key.
+            value (Any): JSON serializable entry value. default: None.
+        """
+        self.add_many({key: value})
+
+    def add_many(self, entries: Dict[str, Any]) -> None:
+        """Commit entries and flush them to the journal.
+
+        Args:
+            entries (Dict[str, Any]): entries keys and values.
+        """
+        if not entries:
+            return
+        committed_at = time.time()
+        lines = "".join(
+            json.dumps(
+                {
+                    jr_c.KEY: key,
+                    jr_c.VALUE: value,
+                    jr_c.COMMITTED_AT: committed_at,
+                }
+            )
+            + "\n"
+            for key, value in entries.items()
+        )
+        with self._lock:
+            self._append(lines)
+            self._entries.update(entries)
+
+    def add_keys(self, keys: Iterable[str]) -> None:
+        """Commit keys without values.
+
+        Args:
+            keys (Iterable[str]): entries keys.
+        """
+        self.add_many(dict.fromkeys(keys))
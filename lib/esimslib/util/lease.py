@@ -0,0 +1,451 @@
+"""Lease Lock
+
+Single-run lock with an owner ID and an expiry timestamp.
+- Acquired with one create-only write.
+- Renewed by a heartbeat thread during long runs, the lost event is
+  set once the lease is taken over or could not be renewed in time.
+- Taken over immediately once the holder lets it expire, e.g. crashed.
+- Released by its holder only, a lease taken over is left to its
+  new owner.
+  Takeovers, renewals and releases only replace the record they read.
+
+The SSM backend needs ssm:GetParameter and ssm:PutParameter on the
+lease parameters.
+"""
+
+import os
+import json
+import time
+import uuid
+import fcntl
+import socket
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from esimslib.connectors.aws_connector import SSMConnector
+from esimslib.util.constants import LeaseConst as ls_c
+from esimslib.util.logger import logger
+
+
+class LeaseLock(ABC):
+    """Lease lock backend interface."""
+
+    def __init__(
+        self, ttl_seconds: float = None, owner: Optional[str] = None
+    ) -> None:
+        """Initialize LeaseLock.
+
+        Args:
+            ttl_seconds (float): lease duration.
+                default: LEASE_TTL_SECONDS env variable.
+            owner (str | None): owner ID, e.g. Lambda request ID.
+                default: None, host, process and random suffix.
+        """
+        self.ttl_seconds = ttl_seconds or float(
+            os.getenv(ls_c.LEASE_TTL_SECONDS, ls_c.DEFAULT_TTL_SECONDS)
+        )
+        self.owner = owner or ls_c.OWNER_FORMAT.format(
+            socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8]
+        )
+        self.held = False
+        self.lost = threading.Event()
+        self._renewed_at = 0.0
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, name: str, owner: Optional[str] = None) -> "LeaseLock":
+        """Create lease lock for a named resource.
+        Stored on local disk if LEASE_DIR is set, in SSM otherwise.
+
+        Args:
+            name (str): lock name, SSM parameter name for the SSM backend.
+            owner (str | None): owner ID. default: None.
+
+        Returns:
+            LeaseLock: lease lock.
+        """
+        lease_dir = os.getenv(ls_c.LEASE_DIR)
+        if lease_dir:
+            file_name = name.strip(ls_c.PATH_SEPARATOR).replace(
+                ls_c.PATH_SEPARATOR, ls_c.NAME_SEPARATOR
+            )
+            return FileLeaseLock(
+                os.path.join(lease_dir, ls_c.LEASE_FILE.format(file_name)),
+                owner=owner,
+            )
+        return SSMLeaseLock(SSMConnector(), name, owner=owner)
+
+    @abstractmethod
+    def _read(self) -> Optional[str]:
+        """Read stored lease.
+
+        Returns:
+            str | None: lease record, None if free.
+        """
+
+    @abstractmethod
+    def _create(self, record: str) -> bool:
+        """Store lease only if free.
+
+        Args:
+            record (str): lease record.
+
+        Returns:
+            bool: True if stored.
+        """
+
+    @abstractmethod
+    def _replace(self, expected: str, record: str) -> bool:
+        """Overwrite stored lease only if it is still the expected one.
+
+        Args:
+            expected (str): lease record read.
+            record (str): lease record.
+
+        Returns:
+            bool: True if stored.
+        """
+
+    @abstractmethod
+    def _delete(self, expected: str) -> bool:
+        """Free stored lease only if it is still the expected one.
+
+        Args:
+            expected (str): lease record read.
+
+        Returns:
+            bool: True if freed.
+        """
+
+    def _record(self, expires: Optional[float] = None) -> str:
+        """Build lease record.
+
+        Args:
+            expires (float): expiry timestamp.
+                default: None, one TTL from now.
+
+        Returns:
+            str: lease record.
+        """
+        return json.dumps(
+            {
+                ls_c.OWNER: self.owner,
+                ls_c.EXPIRES: (
+                    time.time() + self.ttl_seconds
+                    if expires is None
+                    else expires
+                ),
+            }
+        )
+
+    @staticmethod
+    def _parse(record: Optional[str]) -> dict:
+        """Parse lease record.
+        Unreadable records, e.g. a legacy state value, count as expired.
+
+        Args:
+            record (str | None): lease record, None if free.
+
+        Returns:
+            dict: lease owner and expiry, empty if free.
+        """
+        if record is None:
+            return {}
+        try:
+            lease = json.loads(record)
+            return {
+                ls_c.OWNER: str(lease[ls_c.OWNER]),
+                ls_c.EXPIRES: float(lease[ls_c.EXPIRES]),
+            }
+        except (ValueError, TypeError, KeyError):
+            return {ls_c.OWNER: record, ls_c.EXPIRES: 0.0}
+
+    def current(self) -> dict:
+        """Get current lease.
+
+        Returns:
+            dict: lease owner and expiry, empty if free.
+        """
+        return self._parse(self._read())
+
+    def acquire(self) -> bool:
+        """Acquire lease, taking it over if expired.
+        The expired record is only replaced if no other contender
+        replaced it first.
+
+        Returns:
+            bool: True if acquired.
+        """
+        if not self._create(self._record()):
+            stored = self._read()
+            lease = self._parse(stored)
+            if lease and lease[ls_c.EXPIRES] > time.time():
+                logger.info("Lease held by %s", lease[ls_c.OWNER])
+                return False
+            if stored is None:
+                acquired = self._create(self._record())
+            else:
+                if lease[ls_c.EXPIRES] != ls_c.RELEASED:
+                    logger.warning("Taking over expired lease: %s", lease)
+                acquired = self._replace(stored, self._record())
+            if not acquired:
+                return False
+        self.held = self.current().get(ls_c.OWNER) == self.owner
+        if self.held:
+            self.lost.clear()
+            self._renewed_at = time.time()
+            logger.info("Lease acquired: %s", self.owner)
+        return self.held
+
+    def acquire_within(self, wait_seconds: float) -> bool:
+        """Acquire lease, waiting for its holder to release it.
+
+        Args:
+            wait_seconds (float): maximum wait.
+
+        Returns:
+            bool: True if acquired.
+        """
+        deadline = time.monotonic() + wait_seconds
+        while not self.acquire():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(ls_c.POLL_SECONDS)
+        return True
+
+    def renew(self) -> bool:
+        """Extend held lease by one TTL.
+        Sets the lost event once the lease is no longer held.
+
+        Returns:
+            bool: True if still held.
+        """
+        stored = self._read() if self.held else None
+        if (
+            stored is not None
+            and self._parse(stored).get(ls_c.OWNER) == self.owner
+            and self._replace(stored, self._record())
+        ):
+            self._renewed_at = time.time()
+        else:
+            self._lose()
+        return self.held
+
+    def _lose(self) -> None:
+        """Flag lease as lost."""
+        self.held = False
+        self.lost.set()
+        logger.error("Lease lost: %s", self.owner)
+
+    def _beat(self) -> None:
+        """Renew lease until stopped or lost."""
+        interval = self.ttl_seconds / ls_c.HEARTBEAT_DIVISOR
+        while not self._stop.wait(interval):
+            try:
+                if not self.renew():
+                    return
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Lease renewal failed: %s", exc)
+                # not renewed for a TTL, another owner may take it over
+                if time.time() - self._renewed_at >= self.ttl_seconds:
+                    self._lose()
+                    return
+
+    def start_heartbeat(self) -> None:
+        """Renew held lease in a background thread."""
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+        self._heartbeat.start()
+
+    def release(self) -> None:
+        """Stop heartbeat and free lease if still held.
+        A lease taken over meanwhile is left to its new owner.
+        """
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        stored = self._read() if self.held else None
+        if (
+            stored is not None
+            and self._parse(stored).get(ls_c.OWNER) == self.owner
+            and self._delete(stored)
+        ):
+            logger.info("Lease released: %s", self.owner)
+        self.held = False
+
+
+class SSMLeaseLock(LeaseLock):
+    """Lease lock stored as an SSM parameter.
+    SSM has no conditional overwrite, each overwrite gets the next
+    parameter version, so only the overwrite of the version read wins.
+    Nor has it a conditional delete, release overwrites the lease with
+    an expired one instead.
+    """
+
+    def __init__(
+        self,
+        ssm_connector: SSMConnector,
+        key: str,
+        owner: Optional[str] = None,
+    ) -> None:
+        """Initialize SSMLeaseLock.
+
+        Args:
+            ssm_connector (SSMConnector): SSM Connector.
+            key (str): lease parameter name.
+            owner (str | None): owner ID. default: None.
+        """
+        super().__init__(owner=owner)
+        self.ssm_connector = ssm_connector
+        self.key = key
+
+    def _read(self) -> Optional[str]:
+        """Read stored lease.
+
+        Returns:
+            str | None: lease record, None if free.
+        """
+        return self.ssm_connector.find_parameter(self.key)
+
+    def _create(self, record: str) -> bool:
+        """Store lease only if free.
+
+        Args:
+            record (str): lease record.
+
+        Returns:
+            bool: True if stored.
+        """
+        return self.ssm_connector.create_parameter(self.key, record)
+
+    def _replace(self, expected: str, record: str) -> bool:
+        """Overwrite stored lease only if it is still the expected one.
+
+        Args:
+            expected (str): lease record read.
+            record (str): lease record.
+
+        Returns:
+            bool: True if stored.
+        """
+        stored, version = self.ssm_connector.find_parameter_version(self.key)
+        if stored != expected:
+            return False
+        written = self.ssm_connector.update_parameter(self.key, record)
+        # a concurrent overwrite of the same version got another version
+        return written == version + 1 and self._read() == record
+
+    def _delete(self, expected: str) -> bool:
+        """Free stored lease only if it is still the expected one.
+
+        Args:
+            expected (str): lease record read.
+
+        Returns:
+            bool: True if freed.
+        """
+        return self._replace(expected, self._record(ls_c.RELEASED))
+
+
+class FileLeaseLock(LeaseLock):
+    """Lease lock stored as a local JSON file."""
+
+    def __init__(self, path: str, owner: Optional[str] = None) -> None:
+        """Initialize FileLeaseLock.
+
+        Args:
+            path (str): lease file path.
+            owner (str | None): owner ID. default: None.
+        """
+        super().__init__(owner=owner)
+        self.path = path
+
+    def _read(self) -> Optional[str]:
+        """Read stored lease.
+
+        Returns:
+            str | None: lease record, None if free.
+        """
+        try:
+            with open(self.path, encoding=ls_c.UTF8) as lease_file:
+                return lease_file.read()
+        except FileNotFoundError:
+            return None
+
+    def _create(self, record: str) -> bool:
+        """Store lease only if free.
+
+        Args:
+            record (str): lease record.
+
+        Returns:
+            bool: True if stored.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # link a complete temp file so readers never see a partial lease
+        temp_path = self._write_temp(record)
+        try:
+            os.link(temp_path, self.path)
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(temp_path)
+        return True
+
+    def _write_temp(self, record: str) -> str:
+        """Write lease record to an owner temp file.
+
+        Args:
+            record (str): lease record.
+
+        Returns:
+            str: temp file path.
+        """
+        temp_path = f"{self.path}.{self.owner}{ls_c.TEMP_SUFFIX}"
+        with open(temp_path, "w", encoding=ls_c.UTF8) as lease_file:
+            lease_file.write(record)
+        return temp_path
+
+    def _replace(self, expected: str, record: str) -> bool:
+        """Overwrite stored lease only if it is still the expected one.
+        Replacements are serialized by an exclusive lock file.
+
+        Args:
+            expected (str): lease record read.
+            record (str): lease record.
+
+        Returns:
+            bool: True if stored.
+        """
+        with open(
+            f"{self.path}{ls_c.LOCK_SUFFIX}", "a", encoding=ls_c.UTF8
+        ) as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if self._read() != expected:
+                return False
+            os.replace(self._write_temp(record), self.path)
+        return True
+
+    def _delete(self, expected: str) -> bool:
+        """Remove stored lease only if it is still the expected one.
+        Serialized with replacements by the lock file.
+
+        Args:
+            expected (str): lease record read.
+
+        Returns:
+            bool: True if removed.
+        """
+        with open(
+            f"{self.path}{ls_c.LOCK_SUFFIX}", "a", encoding=ls_c.UTF8
+        ) as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if self._read() != expected:
+                return False
+            os.remove(self.path)
+        return True
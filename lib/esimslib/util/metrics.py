@@ -0,0 +1,296 @@
+"""Stage Metrics
+
+Counters, timers and histograms of the services hot paths, flushed
+at the end of each handler as CloudWatch Embedded Metric Format lines.
+"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from esimslib.util.constants import MetricsConst as mt_c
+
+Entry = Tuple[str, str, object]
+
+
+class Metrics:
+    """Thread safe registry of counters and histograms.
+    Timers are histograms in milliseconds.
+    """
+
+    _shared: Optional["Metrics"] = None
+
+    def __init__(self) -> None:
+        """Initialize Metrics."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Dict[float, int]] = {}
+        self._units: Dict[str, str] = {}
+
+    @classmethod
+    def shared(cls) -> "Metrics":
+        """Get metrics registry shared across the process.
+
+        Returns:
+            Metrics: shared registry.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Increment a counter.
+
+        Args:
+            name (str): metric name.
+            value (float): increment. default: 1.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float, unit: str = mt_c.COUNT) -> None:
+        """Record a histogram value.
+        Values are rounded to a few significant digits so histograms
+        stay compact.
+
+        Args:
+            name (str): metric name.
+            value (float): observed value.
+            unit (str): CloudWatch unit. default: Count.
+        """
+        value = float(f"{value:.{mt_c.SIGNIFICANT_DIGITS}g}")
+        with self._lock:
+            values = self._histograms.setdefault(name, {})
+            values[value] = values.get(value, 0) + 1
+            self._units[name] = unit
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time a block in milliseconds, failed runs included.
+
+        Args:
+            name (str): metric name.
+
+        Yields:
+            None: timed block.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(
+                name,
+                (time.monotonic() - started) * mt_c.MS_PER_SECOND,
+                mt_c.MILLISECONDS,
+            )
+
+    def _entries(self) -> List[Entry]:
+        """Collect metrics entries and reset the registry.
+        Histograms above the values limit are split across entries.
+
+        Returns:
+            List[Tuple[str, str, object]]: metric name, unit and value.
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+            units = dict(self._units)
+        entries: List[Entry] = [
+            (name, mt_c.COUNT, value) for name, value in counters.items()
+        ]
+        for name, values in histograms.items():
+            items = sorted(values.items())
+            for start in range(0, len(items), mt_c.MAX_VALUES):
+                chunk = items[start : start + mt_c.MAX_VALUES]
+                entries.append(
+                    (
+                        name,
+                        units[name],
+                        {
+                            mt_c.VALUES: [value for value, _ in chunk],
+                            mt_c.COUNTS: [count for _, count in chunk],
+                        },
+                    )
+                )
+        return entries
+
+    @staticmethod
+    def _document(entries: List[Entry], service: str) -> dict:
+        """Build an EMF document.
+
+        Args:
+            entries (List[Tuple[str, str, object]]): metrics entries,
+                one per metric name.
+            service (str): service dimension value.
+
+        Returns:
+            dict: EMF document.
+        """
+        document: Dict[str, object] = {
+            mt_c.AWS: {
+                mt_c.TIMESTAMP: int(time.time() * mt_c.MS_PER_SECOND),
+                mt_c.CLOUDWATCH_METRICS: [
+                    {
+                        mt_c.NAMESPACE_KEY: os.getenv(
+                            mt_c.NAMESPACE, mt_c.DEFAULT_NAMESPACE
+                        ),
+                        mt_c.DIMENSIONS: [[mt_c.SERVICE]],
+                        mt_c.METRICS: [
+                            {mt_c.NAME: name, mt_c.UNIT: unit}
+                            for name, unit, _ in entries
+                        ],
+                    }
+                ],
+            },
+            mt_c.SERVICE: service,
+        }
+        document.update({name: value for name, _, value in entries})
+        return document
+
+    def _documents(self, entries: List[Entry], service: str) -> List[dict]:
+        """Pack entries into EMF documents.
+        A document holds a metric name once and a limited count of them.
+
+        Args:
+            entries (List[Tuple[str, str, object]]): metrics entries.
+            service (str): service dimension value.
+
+        Returns:
+            List[dict]: EMF documents.
+        """
+        batches: List[Dict[str, Entry]] = []
+        for entry in entries:
+            batch = next(
+                (
+                    batch
+                    for batch in batches
+                    if entry[0] not in batch and len(batch) < mt_c.MAX_METRICS
+                ),
+                None,
+            )
+            if batch is None:
+                batch = {}
+                batches.append(batch)
+            batch[entry[0]] = entry
+        return [
+            self._document(list(batch.values()), service) for batch in batches
+        ]
+
+    def flush(self, service: str) -> None:
+        """Write metrics as EMF lines to stdout and reset them.
+        Lines bypass the logger, CloudWatch only extracts
+        metrics from plain JSON log lines.
+
+        Args:
+            service (str): service dimension value.
+        """
+        entries = self._entries()
+        if os.getenv(mt_c.ENABLED, mt_c.DEFAULT_ENABLED) == mt_c.DISABLED:
+            return
+        for document in self._documents(entries, service):
+            sys.stdout.write(json.dumps(document) + "\n")
+        sys.stdout.flush()
+
+
+def flushes_metrics(service: str) -> Callable:
+    """Decorator to flush the shared metrics once a handler returns
+    or fails.
+
+    Args:
+        service (str): service dimension value.
+
+    Returns:
+        Callable: decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        """Wrap handler with a metrics flush.
+
+        Args:
+            func (Callable): lambda handler.
+
+        Returns:
+            Callable: flushing handler.
+        """
+
+        @wraps(func)
+        def flushing_handler(*args: tuple, **kwargs: dict) -> object:
+            """Run handler and flush metrics.
+
+            Args:
+                args (tuple): arbitrary tuple of arguments.
+                kwargs (dict): arbitrary dictionary of keyword arguments.
+
+            Returns:
+                object: handler result.
+            """
+            try:
+                return func(*args, **kwargs)
+            finally:
+                Metrics.shared().flush(service)
+
+        return flushing_handler
+
+    return decorator
+
+
+def timed(name: str) -> Callable:
+    """Decorator to time a function or coroutine with the shared metrics.
+
+    Args:
+        name (str): metric name.
+
+    Returns:
+        Callable: decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        """Wrap function in a timer.
+
+        Args:
+            func (Callable): function to time.
+
+        Returns:
+            Callable: timed function.
+        """
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def timed_coroutine(*args: tuple, **kwargs: dict) -> object:
+                """Run timed coroutine.
+
+                Args:
+                    args (tuple): arbitrary tuple of arguments.
+                    kwargs (dict): arbitrary dictionary of keyword arguments.
+
+                Returns:
+                    object: coroutine result.
+                """
+                with Metrics.shared().timer(name):
+                    return await func(*args, **kwargs)
+
+            return timed_coroutine
+
+        @wraps(func)
+        def timed_function(*args: tuple, **kwargs: dict) -> object:
+            """Run timed function.
+
+            Args:
+                args (tuple): arbitrary tuple of arguments.
+                kwargs (dict): arbitrary dictionary of keyword arguments.
+
+            Returns:
+                object: function result.
+            """
+            with Metrics.shared().timer(name):
+                return func(*args, **kwargs)
+
+        return timed_function
+
+    return decorator
@@ -0,0 +1,268 @@
+"""Handler Profiler
+
+On-demand profiling of Lambda handlers, enabled by the PROFILE
+environment variable, a `profile` event flag or for a PROFILE_RATE
+share of invocations.
+- Sampling profiler of every thread, written as collapsed stacks.
+- Deterministic cProfile of the handler thread, written as pstats.
+Profiles are written to a local directory and uploaded to S3.
+"""
+
+import os
+import sys
+import time
+import random
+import cProfile
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from esimslib.connectors.aws_connector import S3Connector
+from esimslib.util.constants import ProfilerConst as pf_c
+from esimslib.util.logger import logger
+
+
+class HandlerProfiler(ABC):
+    """Handler profiler interface."""
+
+    mode = ""
+
+    @abstractmethod
+    def start(self) -> None:
+        """Start profiling."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stop profiling."""
+
+    @abstractmethod
+    def dump(self, path: str) -> None:
+        """Write profile to a file.
+
+        Args:
+            path (str): profile file path.
+        """
+
+
+class DeterministicProfiler(HandlerProfiler):
+    """cProfile of the handler thread.
+    Calls run on executor threads are not profiled.
+    """
+
+    mode = pf_c.DETERMINISTIC
+
+    def __init__(self) -> None:
+        """Initialize DeterministicProfiler."""
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        """Start profiling."""
+        self.profile.enable()
+
+    def stop(self) -> None:
+        """Stop profiling."""
+        self.profile.disable()
+
+    def dump(self, path: str) -> None:
+        """Write pstats profile.
+
+        Args:
+            path (str): profile file path.
+        """
+        self.profile.dump_stats(path)
+
+
+class SamplingProfiler(HandlerProfiler):
+    """Sample stacks of every thread at a fixed interval.
+    Stacks are rooted at their thread name, so executor threads
+    are told apart from the handler thread.
+    """
+
+    mode = pf_c.SAMPLING
+
+    def __init__(self, interval_seconds: float) -> None:
+        """Initialize SamplingProfiler.
+
+        Args:
+            interval_seconds (float): sampling interval.
+        """
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stopped.wait(self.interval_seconds):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the current stack of every other thread."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        # pylint: disable=protected-access
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._thread.ident:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    pf_c.FRAME_FORMAT.format(
+                        code.co_name,
+                        os.path.basename(code.co_filename),
+                        code.co_firstlineno,
+                    )
+                )
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[pf_c.STACK_SEPARATOR.join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        """Start sampling thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling thread."""
+        self._stopped.set()
+        self._thread.join()
+
+    def dump(self, path: str) -> None:
+        """Write collapsed stacks, one `stack count` line per stack.
+
+        Args:
+            path (str): profile file path.
+        """
+        with open(path, "w", encoding=pf_c.UTF8) as profile_file:
+            for stack, count in self.stacks.most_common():
+                profile_file.write(pf_c.LINE_FORMAT.format(stack, count))
+
+
+def profile_mode(event: Any) -> str:
+    """Pick the profiler mode of an invocation.
+    An event flag wins over PROFILE. Without either, a PROFILE_RATE
+    share of invocations is profiled in sampling mode.
+    Flags and variables set to true profile in sampling mode.
+
+    Args:
+        event (Any): lambda trigger event.
+
+    Returns:
+        str: profiler mode, empty if not profiled.
+    """
+    flag = event.get(pf_c.EVENT_FLAG) if isinstance(event, dict) else None
+    if flag is not None:
+        mode = str(flag).lower()
+    else:
+        mode = os.getenv(pf_c.PROFILE, "").lower()
+        rate = float(os.getenv(pf_c.PROFILE_RATE, pf_c.DEFAULT_RATE))
+        if mode in pf_c.OFF and random.SystemRandom().random() < rate:
+            mode = pf_c.SAMPLING
+    if mode in pf_c.OFF:
+        return ""
+    return mode if mode in pf_c.EXTENSIONS else pf_c.SAMPLING
+
+
+def build_profiler(mode: str) -> HandlerProfiler:
+    """Create a profiler.
+
+    Args:
+        mode (str): profiler mode.
+
+    Returns:
+        HandlerProfiler: profiler.
+    """
+    if mode == pf_c.DETERMINISTIC:
+        return DeterministicProfiler()
+    return SamplingProfiler(
+        float(os.getenv(pf_c.PROFILE_INTERVAL_MS, pf_c.DEFAULT_INTERVAL_MS))
+        / pf_c.MS_PER_SECOND
+    )
+
+
+def save_profile(
+    profiler: HandlerProfiler, service: str, request_id: Optional[str]
+) -> None:
+    """Write profile locally and upload it to S3.
+    The local profile is removed once uploaded. Failures are logged,
+    never raised over the handler result, and keep the local profile.
+
+    Args:
+        profiler (HandlerProfiler): stopped profiler.
+        service (str): service name.
+        request_id (str | None): lambda request ID.
+    """
+    name = pf_c.FILE_NAME.format(
+        service,
+        time.strftime("%Y%m%dT%H%M%S", time.gmtime()),
+        request_id or os.getpid(),
+        pf_c.EXTENSIONS[profiler.mode],
+    )
+    path = os.path.join(os.getenv(pf_c.PROFILE_DIR, pf_c.DEFAULT_DIR), name)
+    try:
+        profiler.dump(path)
+        with open(path, "rb") as profile_file:
+            S3Connector().put_data(
+                profile_file.read(),
+                pf_c.KEY_FORMAT.format(
+                    os.getenv(pf_c.PROFILE_PREFIX, pf_c.DEFAULT_PREFIX),
+                    service,
+                    name,
+                ),
+            )
+        os.remove(path)
+        logger.info("Profile uploaded: %s", name)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("Failed to save profile %s: %s", path, exc)
+
+
+def profiled(service: str) -> Callable:
+    """Decorator to profile a Lambda handler on demand.
+
+    Args:
+        service (str): service name, profiles S3 folder.
+
+    Returns:
+        Callable: decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        """Wrap handler with a profiler.
+
+        Args:
+            func (Callable): lambda handler.
+
+        Returns:
+            Callable: profiled handler.
+        """
+
+        @wraps(func)
+        def profiled_handler(event: Any, context: Any) -> object:
+            """Run handler, profiled if enabled.
+
+            Args:
+                event (Any): lambda trigger event.
+                context (Any): lambda event context.
+
+            Returns:
+                object: handler result.
+            """
+            mode = profile_mode(event)
+            if not mode:
+                return func(event, context)
+            profiler = build_profiler(mode)
+            profiler.start()
+            try:
+                return func(event, context)
+            finally:
+                profiler.stop()
+                save_profile(
+                    profiler,
+                    service,
+                    getattr(context, pf_c.REQUEST_ID, None),
+                )
+
+        return profiled_handler
+
+    return decorator
@@ -1,19 +1,22 @@
 """QR Code Processor
 
 Manages all QR code operations.
-- QR Code Detection.
+- Preflight rejection of images without a plausible QR code.
+- QR Code Detection, every symbol in the image.
 - Data extraction.
 - QR SHA generation.
 - QR code generation from text.
 - Image Captioner.
-- Phone number extraction.
+- Phone number extraction, associated to symbols by proximity.
+- Normalized QR artifact generation.
 
 """
 
-from typing import List
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
+import math
 import hashlib
-import requests
+import struct
 import cv2
 import numpy as np
 import pytesseract
@@ -22,25 +25,67 @@ from cached_property import cached_property
 from pyzbar.pyzbar import decode, ZBarSymbol
 
 from esimslib.util.logger import logger
-from esimslib.util.constants import QRCodeConst as qr_c
-
+from esimslib.util.metrics import timed
+from esimslib.util.tracing import set_attributes, traced
+from esimslib.connectors.http_connector import (
+    HTTPConnector,
+    ContentTooLargeError,
+    UnsupportedContentError,
+)
+from esimslib.util.file_type import (
+    decode_heif,
+    is_supported_image,
+    sniff_type,
+)
+from esimslib.util.smdp_matcher import SMDPMatcher
+from esimslib.util.constants import (
+    FileTypeConst as ft_c,
+    MetricsConst as mt_c,
+    QRCodeConst as qr_c,
+)
 
 # pylint: disable=no-member
 
+Box = Tuple[int, int, int, int]
+Phone = Tuple[str, Box]
+
+
+class QRSymbol(NamedTuple):
+    """Decoded QR symbol and its location in the image."""
 
+    data: bytes
+    rect: Box
+    polygon: List[Tuple[int, int]]
+
+
+# pylint: disable=too-many-instance-attributes
 class QRCodeProcessor:
     """QR Code Processor"""
 
-    def __init__(self, url: str) -> None:
+    def __init__(
+        self, url: str, data: bytes = None, cache_key: str = None
+    ) -> None:
         """QR Code Detector
 
         Args:
             url (str): Image URL to detect QR Code.
+                Used as the image source label if data is given.
+            data (bytes): Image content. Skips fetching the url if given.
+                default: None.
+            cache_key (str): stable image cache key e.g. attachment id.
+                default: None.
         """
         self.url = url
+        self._data = data
+        self._cache_key = cache_key
         self._qr_sha: str = ""
         self._qr_code: str = ""
         self._phone_number: str = ""
+        self._qr_polygon: np.ndarray = None
+        self._phone_box: Optional[Box] = None
+        self._symbols: List[QRSymbol] = []
+        self._symbol_index = 0
+        self._symbol_phones: Optional[Dict[int, Phone]] = None
 
     @property
     def qr_code(self) -> str:
@@ -79,6 +124,15 @@ class QRCodeProcessor:
         """
         return self._phone_number
 
+    @property
+    def symbols(self) -> List[QRSymbol]:
+        """QR symbols found by detect_symbols.
+
+        Returns:
+            List[QRSymbol]: symbols in reading order.
+        """
+        return self._symbols
+
     @cached_property
     def image(self) -> np.ndarray:
         """Image
@@ -88,80 +142,531 @@ class QRCodeProcessor:
         """
         return self._read_image()
 
+    def __enter__(self) -> "QRCodeProcessor":
+        """Enter processor context.
+
+        Returns:
+            QRCodeProcessor: processor.
+        """
+        return self
+
+    def __exit__(self, *args: tuple) -> None:
+        """Release image buffers on context exit.
+
+        Args:
+            args (tuple): exception info.
+        """
+        self.release()
+
+    def release(self) -> None:
+        """Release image content and decoded image array.
+        Detection results are kept.
+        """
+        self._data = None
+        self.__dict__.pop(qr_c.IMAGE_ATTR, None)
+
+    @staticmethod
+    def _image_size(buffer: Union[bytes, memoryview]) -> Tuple[int, int]:
+        """Read image width and height from PNG or JPEG header.
+
+        Args:
+            buffer (bytes | memoryview): encoded image.
+
+        Returns:
+            Tuple[int, int]: (width, height), (0, 0) if unknown.
+        """
+        header = bytes(buffer[: qr_c.PNG_HEADER_SIZE])
+        if header.startswith(qr_c.PNG_SIGNATURE):
+            return struct.unpack(">II", header[16:24])
+        if not header.startswith(qr_c.JPEG_SIGNATURE):
+            return 0, 0
+        offset = 2
+        while offset + 9 < len(buffer):
+            if buffer[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = buffer[offset + 1]
+            if marker in qr_c.JPEG_SOF_MARKERS:
+                height, width = struct.unpack(
+                    ">HH", bytes(buffer[offset + 5 : offset + 9])
+                )
+                return width, height
+            if marker == 0xFF or 0xD0 <= marker <= 0xD9:
+                offset += 2 if marker != 0xFF else 1
+                continue
+            (length,) = struct.unpack(
+                ">H", bytes(buffer[offset + 2 : offset + 4])
+            )
+            offset += 2 + length
+        return 0, 0
+
+    @classmethod
+    def _decode_flag(
+        cls,
+        buffer: Union[bytes, memoryview],
+        min_side: int = qr_c.MIN_DECODE_SIDE,
+    ) -> int:
+        """Pick the strongest decode-time reduction that keeps
+        the image shorter side above the minimum decode side.
+
+        Args:
+            buffer (bytes | memoryview): encoded image.
+            min_side (int): minimum decoded shorter side.
+                default: full decode minimum side.
+
+        Returns:
+            int: cv2 imread flag.
+        """
+        shorter_side = min(cls._image_size(buffer))
+        for factor, flag in qr_c.REDUCED_GRAYSCALE_FLAGS:
+            if shorter_side // factor >= min_side:
+                return flag
+        return cv2.IMREAD_GRAYSCALE
+
+    @staticmethod
+    def _reduce(image: np.ndarray, min_side: int) -> np.ndarray:
+        """Reduce a decoded image by the strongest decode-time factor
+        that keeps its shorter side above the minimum side.
+
+        Args:
+            image (np.ndarray): grayscale image array.
+            min_side (int): minimum reduced shorter side.
+
+        Returns:
+            np.ndarray: reduced image array.
+        """
+        shorter_side = min(image.shape[:2])
+        for factor, _ in qr_c.REDUCED_GRAYSCALE_FLAGS:
+            if shorter_side // factor >= min_side:
+                return cv2.resize(
+                    image,
+                    None,
+                    fx=1 / factor,
+                    fy=1 / factor,
+                    interpolation=cv2.INTER_AREA,
+                )
+        return image
+
+    @classmethod
+    def _decode(cls, buffer: Union[bytes, memoryview]) -> np.ndarray:
+        """Decode image from a zero-copy view of the buffer.
+
+        Args:
+            buffer (bytes | memoryview): encoded image.
+
+        Returns:
+            np.ndarray | None: grayscale image array.
+                None if buffer is empty.
+        """
+        if not buffer:
+            return None
+        if sniff_type(bytes(buffer[: ft_c.SNIFF_BYTES])) == ft_c.HEIF:
+            image = decode_heif(buffer)
+            return (
+                None
+                if image is None
+                else cls._reduce(image, qr_c.MIN_DECODE_SIDE)
+            )
+        image = np.frombuffer(buffer, dtype=qr_c.UINT8)
+        return cv2.imdecode(image, cls._decode_flag(buffer))
+
+    def _read_data(self) -> bytes:
+        """Image content, fetched from url once if not given.
+
+        Returns:
+            bytes: encoded image. Empty if too large or not a
+                supported image type.
+        """
+        if self._data is None:
+            try:
+                self._data = HTTPConnector.shared().get_file(
+                    self.url, self._cache_key, accept=is_supported_image
+                )
+            except (ContentTooLargeError, UnsupportedContentError) as exc:
+                logger.warning("Rejected image: %s", exc)
+                self._data = b""
+        return self._data
+
+    @timed(mt_c.QR_DECODE)
+    @traced(qr_c.DECODE_SPAN)
     def _read_image(self) -> np.ndarray:
         """Format Image from url
 
         Returns:
             np.ndarry: Image array from URL
         """
-        try:
-            response = requests.get(self.url, timeout=30)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as exc:
-            logger.error("Failed to read image: %s", exc)
-            raise exc
-        image = np.asarray(bytearray(response.content), dtype=qr_c.UINT8)
-        image = cv2.imdecode(image, cv2.IMREAD_GRAYSCALE)
-        return image
+        data = self._read_data()
+        set_attributes(bytes=len(data))
+        return self._decode(memoryview(data))
 
-    def _detect_qr_fall_back(self) -> bool:
-        """Detect QR Code fall back helper method.
+    @staticmethod
+    def _finder_centers(binary: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find centers of QR finder pattern crossings along rows.
+        Dark, light, dark, light, dark runs in a 1:1:3:1:1 ratio.
+        Runs windows are pruned run by run, the center run first.
+
+        Args:
+            binary (np.ndarray): binary image, dark pixels set to 1.
 
         Returns:
-            bool: True if QR Code is detected, False otherwise.
+            Tuple[np.ndarray, np.ndarray]: crossing centers flat indices
+                and module sizes.
         """
-        _, image = cv2.threshold(
-            self.image,
-            127,
-            255,
-            cv2.THRESH_OTSU,
+        width = binary.shape[1]
+        flat = np.ascontiguousarray(binary).ravel()
+        changes = np.empty(flat.size, dtype=bool)
+        changes[0] = True
+        np.not_equal(flat[1:], flat[:-1], out=changes[1:])
+        # runs do not span rows
+        changes[::width] = True
+        starts = np.flatnonzero(changes)
+        runs = np.diff(np.append(starts, flat.size))
+        size = len(qr_c.FINDER_RATIOS)
+        if runs.size < size:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        totals = np.convolve(runs, np.ones(size, dtype=runs.dtype), "valid")
+        index = np.flatnonzero(flat[starts[: totals.size]] == 1)
+        rows = starts // width
+        index = index[rows[index] == rows[index + size - 1]]
+        modules = sum(qr_c.FINDER_RATIOS)
+        for offset in np.argsort(qr_c.FINDER_RATIOS)[::-1]:
+            expected = totals[index] * qr_c.FINDER_RATIOS[offset]
+            index = index[
+                np.abs(runs[index + offset] * modules - expected)
+                < expected * qr_c.FINDER_TOLERANCE
+            ]
+        middle = index + size // 2
+        return starts[middle] + runs[middle] // 2, totals[index] / modules
+
+    @classmethod
+    def _column_units(
+        cls, binary: np.ndarray, kernel: np.ndarray
+    ) -> np.ndarray:
+        """Module sizes of finder crossings along columns,
+        spread over their neighbourhood.
+
+        Args:
+            binary (np.ndarray): binary image, dark pixels set to 1.
+            kernel (np.ndarray): neighbourhood kernel.
+
+        Returns:
+            np.ndarray: module sizes map, 0 away from crossings.
+        """
+        centers, units = cls._finder_centers(binary.T)
+        columns = np.zeros(binary.shape, dtype=np.float32)
+        columns_x, columns_y = np.divmod(centers, binary.shape[0])
+        columns[columns_y, columns_x] = units
+        return cv2.dilate(columns, kernel)
+
+    @staticmethod
+    def _group_crossings(
+        shape: Tuple[int, int],
+        points: Tuple[np.ndarray, np.ndarray],
+        units: np.ndarray,
+        kernel: np.ndarray,
+    ) -> np.ndarray:
+        """Group neighbouring crossings into finder pattern candidates.
+
+        Args:
+            shape (Tuple[int, int]): image shape.
+            points (Tuple[np.ndarray, np.ndarray]): crossings y and x.
+            units (np.ndarray): crossings module sizes.
+            kernel (np.ndarray): neighbourhood kernel.
+
+        Returns:
+            np.ndarray: candidates x, y and module size rows.
+        """
+        mask = np.zeros(shape, dtype=np.uint8)
+        mask[points] = 1
+        count, labels, _, centroids = cv2.connectedComponentsWithStats(
+            cv2.dilate(mask, kernel)
         )
-        qr_code = decode(image, symbols=[ZBarSymbol.QRCODE])
-        if bool(qr_code):
-            self.qr_code = qr_code[0].data
-        return bool(qr_code)
+        groups = labels[points]
+        means = np.bincount(
+            groups, weights=units, minlength=count
+        ) / np.maximum(np.bincount(groups, minlength=count), 1)
+        return np.column_stack([centroids[1:], means[1:]])
+
+    @classmethod
+    def _finder_candidates(cls, image: np.ndarray) -> np.ndarray:
+        """Locate QR finder pattern candidates.
+        A candidate is crossed along rows and columns
+        with similar module sizes.
 
-    def detect_qr(self) -> bool:
-        """Detect QR Code
+        Args:
+            image (np.ndarray): grayscale image.
 
         Returns:
-            bool: True if QR Code is detected, False otherwise.
+            np.ndarray: candidates x, y and module size rows.
         """
-        try:
-            qr_code = decode(self.image, symbols=[ZBarSymbol.QRCODE])
-            if bool(qr_code):
-                self.qr_code = qr_code[0].data
+        _, binary = cv2.threshold(
+            image, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
+        )
+        kernel = np.ones(qr_c.FINDER_KERNEL, dtype=np.uint8)
+        row_centers, row_units = cls._finder_centers(binary)
+        rows_y, rows_x = np.divmod(row_centers, binary.shape[1])
+        ratio = row_units / np.maximum(
+            cls._column_units(binary, kernel)[rows_y, rows_x],
+            qr_c.MIN_MODULE_SIZE,
+        )
+        crossed = (ratio < qr_c.MAX_MODULE_RATIO) & (
+            ratio > 1 / qr_c.MAX_MODULE_RATIO
+        )
+        return cls._group_crossings(
+            binary.shape,
+            (rows_y[crossed], rows_x[crossed]),
+            row_units[crossed],
+            kernel,
+        )
+
+    @staticmethod
+    def _has_finder_triple(candidates: np.ndarray) -> bool:
+        """Check if three candidates are laid out as QR finder patterns,
+        at the corners of a right isosceles triangle with similar
+        module sizes.
+
+        Args:
+            candidates (np.ndarray): candidates x, y and module size rows.
+
+        Returns:
+            bool: True if a finder patterns triple is found.
+        """
+        points, units = candidates[:, :2], candidates[:, 2]
+        for corner, unit in enumerate(units):
+            vectors = points - points[corner]
+            lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+            similar = np.flatnonzero(
+                (units < unit * qr_c.MAX_MODULE_RATIO)
+                & (units > unit / qr_c.MAX_MODULE_RATIO)
+                & (lengths >= unit * qr_c.MIN_FINDER_DISTANCE)
+            )
+            if similar.size < 2:
+                continue
+            vectors, lengths = vectors[similar], lengths[similar]
+            cosines = (vectors @ vectors.T) / np.outer(lengths, lengths)
+            sides = lengths[:, None] / lengths[None, :]
+            if (
+                (np.abs(cosines) < qr_c.MAX_FINDER_COSINE)
+                & (sides < qr_c.MAX_SIDE_RATIO)
+                & (sides > 1 / qr_c.MAX_SIDE_RATIO)
+            ).any():
                 return True
-        except TypeError:
-            logger.warning("Failed to read image type: %s", self.url)
-            return False
-        return self._detect_qr_fall_back()
+        return False
 
-    def detect_phone_number(self) -> bool:
-        """Detect Phone Number
+    def _preflight_image(self, buffer: memoryview) -> np.ndarray:
+        """Downsampled grayscale image for the preflight.
+        JPEG images are decoded at reduced scale, others are
+        reduced by the same factors from the full decode,
+        which is reused afterwards.
+
+        Args:
+            buffer (memoryview): encoded image.
 
         Returns:
-            bool: True if Phone Number is detected, False otherwise.
+            np.ndarray | None: downsampled image, None if unreadable.
+        """
+        if bytes(buffer[:2]) == qr_c.JPEG_SIGNATURE:
+            flag = self._decode_flag(buffer, qr_c.PREFLIGHT_SIDE)
+            if flag != self._decode_flag(buffer):
+                return cv2.imdecode(
+                    np.frombuffer(buffer, dtype=qr_c.UINT8), flag
+                )
+        image = self.image
+        if image is None:
+            return None
+        return self._reduce(image, qr_c.PREFLIGHT_SIDE)
+
+    def preflight(self) -> str:
+        """Cheap check for a plausible QR code before full decode.
+        - Checks image dimensions from the header.
+        - Checks sharpness on a downsampled image.
+        - Checks QR finder patterns on a downsampled image. Skipped if
+          candidates are too many to check quickly.
+
+        Returns:
+            str: rejection reason, empty if the image is plausible.
+        """
+        buffer = memoryview(self._read_data())
+        width, height = self._image_size(buffer)
+        if width and height and min(width, height) < qr_c.MIN_IMAGE_SIDE:
+            return qr_c.TOO_SMALL
+        image = self._preflight_image(buffer) if buffer else None
+        if image is None:
+            return qr_c.UNREADABLE
+        if cv2.Laplacian(image, cv2.CV_32F).var() < qr_c.MIN_SHARPNESS:
+            return qr_c.BLURRY
+        candidates = self._finder_candidates(image)
+        if len(candidates) <= qr_c.MAX_FINDER_CANDIDATES:
+            if not self._has_finder_triple(candidates):
+                return qr_c.NO_FINDER_PATTERNS
+        return ""
+
+    @staticmethod
+    def _decode_symbols(image: np.ndarray) -> List[QRSymbol]:
+        """Decode all QR symbols, duplicates removed.
+
+        Args:
+            image (np.ndarray): image array.
+
+        Returns:
+            List[QRSymbol]: symbols ordered top to bottom, left to right.
+        """
+        symbols: Dict[bytes, QRSymbol] = {}
+        for decoded in decode(image, symbols=[ZBarSymbol.QRCODE]):
+            symbols.setdefault(
+                decoded.data,
+                QRSymbol(
+                    decoded.data,
+                    tuple(decoded.rect),  # type: ignore
+                    [tuple(point) for point in decoded.polygon],
+                ),
+            )
+        return sorted(
+            symbols.values(),
+            key=lambda symbol: (symbol.rect[1], symbol.rect[0]),
+        )
+
+    def detect_symbols(self) -> int:
+        """Detect every QR symbol in the image.
+        Falls back to a binarized image if none is found.
+
+        Returns:
+            int: number of symbols detected.
         """
         try:
+            symbols = self._decode_symbols(self.image)
+        except TypeError:
+            logger.warning("Failed to read image type: %s", self.url)
+            return 0
+        if not symbols:
             _, image = cv2.threshold(
                 self.image,
-                0,
+                127,
                 255,
-                cv2.THRESH_BINARY + cv2.THRESH_OTSU,
+                cv2.THRESH_OTSU,
             )
-            image_text = pytesseract.image_to_string(image, config=qr_c.PSM)
-            # Find phone numbers in
-            phone_numbers = qr_c.PHONE_PATTERN.findall(image_text)
+            symbols = self._decode_symbols(image)
+        self._symbols = symbols
+        self._symbol_phones = None
+        return len(symbols)
 
-            if not bool(phone_numbers):
-                return False
+    def select_symbol(self, index: int) -> None:
+        """Select the symbol QR code and phone number operate on.
 
-            self._phone_number = phone_numbers[0]
-            return True
-        except TypeError:
-            logger.warning("Failed to read image type: %s", self.url)
+        Args:
+            index (int): symbol index in symbols.
+        """
+        symbol = self._symbols[index]
+        self.qr_code = symbol.data
+        self._qr_polygon = np.array(symbol.polygon, dtype=np.float32)
+        self._symbol_index = index
+        self._phone_number, self._phone_box = "", None
+
+    def detect_qr(self) -> bool:
+        """Detect QR Code
+        The first symbol in reading order is selected.
+
+        Returns:
+            bool: True if QR Code is detected, False otherwise.
+        """
+        if not self.detect_symbols():
             return False
+        self.select_symbol(0)
+        return True
+
+    @timed(mt_c.OCR)
+    @traced(qr_c.OCR_SPAN)
+    def _read_phone_numbers(self) -> List[Phone]:
+        """Read all phone numbers and their boxes.
+
+        Returns:
+            List[Phone]: phone numbers and boxes in OCR order.
+        """
+        _, image = cv2.threshold(
+            self.image,
+            0,
+            255,
+            cv2.THRESH_BINARY + cv2.THRESH_OTSU,
+        )
+        image_data = pytesseract.image_to_data(
+            image,
+            config=qr_c.PSM,
+            output_type=pytesseract.Output.DICT,
+        )
+        phones = []
+        for index, word in enumerate(image_data[qr_c.TEXT]):
+            phone_number = qr_c.PHONE_PATTERN.search(word)
+            if phone_number:
+                box = tuple(image_data[key][index] for key in qr_c.BOX_KEYS)
+                phones.append((phone_number.group(), box))
+        set_attributes(phones=len(phones))
+        return phones  # type: ignore
+
+    @staticmethod
+    def _distance(rect: Box, box: Box) -> float:
+        """Distance from a phone number box center to a symbol.
+
+        Args:
+            rect (Box): symbol bounding box.
+            box (Box): phone number box.
+
+        Returns:
+            float: distance in pixels, 0 if inside the symbol.
+        """
+        left, top, width, height = rect
+        center_x = box[0] + box[2] / 2
+        center_y = box[1] + box[3] / 2
+        return math.hypot(
+            max(left - center_x, 0, center_x - left - width),
+            max(top - center_y, 0, center_y - top - height),
+        )
+
+    def _associate_phones(self, phones: List[Phone]) -> Dict[int, Phone]:
+        """Assign each symbol its closest phone number.
+        Closest pairs are assigned first and a phone number is
+        assigned to a single symbol.
+
+        Args:
+            phones (List[Phone]): phone numbers and boxes.
+
+        Returns:
+            Dict[int, Phone]: phone number by symbol index.
+        """
+        if not self._symbols:
+            return dict(enumerate(phones[:1]))
+        pairs = sorted(
+            (self._distance(symbol.rect, box), symbol_index, phone_index)
+            for symbol_index, symbol in enumerate(self._symbols)
+            for phone_index, (_, box) in enumerate(phones)
+        )
+        symbol_phones: Dict[int, Phone] = {}
+        assigned = set()
+        for _, symbol_index, phone_index in pairs:
+            if symbol_index in symbol_phones or phone_index in assigned:
+                continue
+            symbol_phones[symbol_index] = phones[phone_index]
+            assigned.add(phone_index)
+        return symbol_phones
+
+    def detect_phone_number(self) -> bool:
+        """Detect Phone Number of the selected symbol.
+        The image is read once for all symbols.
+
+        Returns:
+            bool: True if Phone Number is detected, False otherwise.
+        """
+        if self._symbol_phones is None:
+            try:
+                phones = self._read_phone_numbers()
+            except TypeError:
+                logger.warning("Failed to read image type: %s", self.url)
+                return False
+            self._symbol_phones = self._associate_phones(phones)
+        phone = self._symbol_phones.get(self._symbol_index)
+        if phone is None:
+            return False
+        self._phone_number, self._phone_box = phone
+        return True
 
     def validate_qr_code_protocol(self) -> bool:
         """Validate QR Code is an eSIM with the protocol set to LPA.
@@ -174,7 +679,8 @@ class QRCodeProcessor:
         return False
 
     def validate_smdp_domain(self, smdp_domains: List[str]) -> bool:
-        """Validate qr content against the given smdp domain.
+        """Validate qr SM-DP+ address against the given smdp domains.
+        Subdomains of a smdp domain match.
 
         Args:
             smdp_domains (List[str]): list of smdp domains.
@@ -182,6 +688,98 @@ class QRCodeProcessor:
         Returns:
             bool: True if qr content matches smdp domain, False otherwise.
         """
-        if any(v in self._qr_code for v in smdp_domains):
-            return True
-        return False
+        return SMDPMatcher.for_domains(smdp_domains).matches(self._qr_code)
+
+    def _crop_qr_region(self) -> np.ndarray:
+        """Deskew QR region into an upright square.
+
+        Returns:
+            np.ndarray: Deskewed QR region with a quiet zone.
+        """
+        corners = cv2.boxPoints(cv2.minAreaRect(self._qr_polygon))
+        # order corners: top-left, top-right, bottom-right, bottom-left
+        sums = corners.sum(axis=1)
+        diffs = np.diff(corners, axis=1).ravel()
+        source = np.array(
+            [
+                corners[np.argmin(sums)],
+                corners[np.argmin(diffs)],
+                corners[np.argmax(sums)],
+                corners[np.argmax(diffs)],
+            ],
+            dtype=np.float32,
+        )
+        side = int(
+            max(
+                np.linalg.norm(source[0] - source[1]),
+                np.linalg.norm(source[1] - source[2]),
+            )
+        )
+        margin = int(side * qr_c.QUIET_ZONE_RATIO)
+        target = np.array(
+            [
+                [margin, margin],
+                [margin + side, margin],
+                [margin + side, margin + side],
+                [margin, margin + side],
+            ],
+            dtype=np.float32,
+        )
+        size = side + 2 * margin
+        return cv2.warpPerspective(
+            self.image,
+            cv2.getPerspectiveTransform(source, target),
+            (size, size),
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+
+    def _crop_phone_region(self, width: int) -> np.ndarray:
+        """Crop phone number region scaled to the given width.
+
+        Args:
+            width (int): Target width.
+
+        Returns:
+            np.ndarray: Phone number region.
+        """
+        left, top, box_width, box_height = self._phone_box
+        pad = qr_c.PHONE_PADDING
+        region = self.image[
+            max(top - pad, 0) : top + box_height + pad,
+            max(left - pad, 0) : left + box_width + pad,
+        ]
+        height = max(int(region.shape[0] * width / region.shape[1]), 1)
+        return cv2.resize(
+            region, (width, height), interpolation=cv2.INTER_AREA
+        )
+
+    @traced(qr_c.ARTIFACT_SPAN)
+    def build_artifact(self, include_phone: bool = False) -> bytes:
+        """Build normalized QR artifact.
+        - QR region deskewed with a quiet zone.
+        - Phone number region appended below if requested.
+        - Binarized and encoded as an optimized PNG.
+
+        Must be called after a successful detect_qr
+        (and detect_phone_number if include_phone is set).
+
+        Args:
+            include_phone (bool): Append phone number region.
+                default: False.
+
+        Returns:
+            bytes: PNG encoded artifact.
+        """
+        artifact = self._crop_qr_region()
+        if include_phone and self._phone_box is not None:
+            artifact = np.vstack(
+                [artifact, self._crop_phone_region(artifact.shape[1])]
+            )
+        _, artifact = cv2.threshold(
+            artifact,
+            0,
+            255,
+            cv2.THRESH_BINARY + cv2.THRESH_OTSU,
+        )
+        _, encoded = cv2.imencode(qr_c.PNG, artifact, qr_c.PNG_PARAMS)
+        return encoded.tobytes()
@@ -0,0 +1,73 @@
+"""S3 Journal
+
+Journal stored as JSON lines segment objects under an S3 prefix, so
+committed keys survive across Lambda containers. Each commit writes a
+new segment. Segments are compacted on load once there are many, and
+entries older than the retention period are dropped.
+"""
+
+import time
+import uuid
+from typing import Iterable, List
+
+from esimslib.connectors.aws_connector import S3Connector
+from esimslib.util.constants import JournalConst as jr_c
+from esimslib.util.journal import Journal, retained_lines
+
+
+class S3Journal(Journal):
+    """Append-only journal of S3 segment objects."""
+
+    def __init__(self, s3_connector: S3Connector, prefix: str) -> None:
+        """Initialize S3Journal and load committed entries.
+
+        Args:
+            s3_connector (S3Connector): S3 Connector.
+            prefix (str): segments key prefix.
+        """
+        self.s3_connector = s3_connector
+        super().__init__(prefix)
+
+    def _read_lines(self) -> Iterable[str]:
+        """Read journal lines from all segments.
+
+        Returns:
+            Iterable[str]: JSON lines.
+        """
+        keys = self.s3_connector.list_keys(f"{self.path}/")
+        lines: List[str] = []
+        for key in keys:
+            data = self.s3_connector.get_data(key)
+            if data:
+                lines.extend(data.decode(jr_c.UTF8).splitlines())
+        if len(keys) > jr_c.COMPACT_SEGMENTS:
+            lines = self._compact(keys, lines)
+        return lines
+
+    def _compact(self, keys: List[str], lines: List[str]) -> List[str]:
+        """Merge segments into one, dropping expired entries.
+        Segments written meanwhile are not in keys and are kept.
+
+        Args:
+            keys (List[str]): segment keys read.
+            lines (List[str]): segments lines.
+
+        Returns:
+            List[str]: retained lines.
+        """
+        retained = retained_lines(lines)
+        self._append("".join(f"{line}\n" for line in retained))
+        for key in keys:
+            self.s3_connector.delete_data(key)
+        return retained
+
+    def _append(self, lines: str) -> None:
+        """Write lines as a new segment.
+
+        Args:
+            lines (str): JSON lines.
+        """
+        key = jr_c.SEGMENT_KEY.format(
+            self.path, int(time.time() * 1000), uuid.uuid4().hex
+        )
+        self.s3_connector.put_data(lines.encode(jr_c.UTF8), key)
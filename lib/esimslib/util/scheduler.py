@@ -0,0 +1,323 @@
+"""Work Scheduler
+
+Keeps Lambda handlers within their time budget.
+- Estimates per-item cost from observed timings.
+- Stops admitting new items once the remaining budget gets low.
+- Stops admitting new items once cancelled, e.g. its run lease lost.
+- Writes a resume checkpoint of deferred items for the next invocation.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from esimslib.connectors.aws_connector import S3Connector
+from esimslib.util.constants import SchedulerConst as sch_c
+from esimslib.util.logger import logger
+
+
+class CheckpointStore:
+    """Resume checkpoint stored as a local JSON file."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize CheckpointStore.
+
+        Args:
+            path (str): checkpoint file path.
+        """
+        self.path = path
+
+    @classmethod
+    def from_env(cls, name: str) -> "CheckpointStore":
+        """Create checkpoint store for a service.
+        Stored in S3 if CHECKPOINT_PREFIX is set, on local disk otherwise.
+
+        Args:
+            name (str): checkpoint name, e.g. service name.
+
+        Returns:
+            CheckpointStore: checkpoint store.
+        """
+        prefix = os.getenv(sch_c.CHECKPOINT_PREFIX)
+        if prefix:
+            return S3CheckpointStore(
+                S3Connector(), sch_c.CHECKPOINT_KEY.format(prefix, name)
+            )
+        return cls(
+            os.path.join(
+                os.getenv(sch_c.CHECKPOINT_DIR, sch_c.DEFAULT_CHECKPOINT_DIR),
+                sch_c.CHECKPOINT_FILE.format(name),
+            )
+        )
+
+    def load(self) -> dict:
+        """Load checkpoint.
+
+        Returns:
+            dict: checkpoint, empty if none.
+        """
+        try:
+            with open(self.path, encoding=sch_c.UTF8) as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, checkpoint: dict) -> None:
+        """Save checkpoint.
+
+        Args:
+            checkpoint (dict): checkpoint.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}{sch_c.TEMP_SUFFIX}"
+        with open(temp_path, "w", encoding=sch_c.UTF8) as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, self.path)
+
+    def clear(self) -> None:
+        """Remove checkpoint."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class S3CheckpointStore(CheckpointStore):
+    """Resume checkpoint stored as an S3 JSON object."""
+
+    def __init__(self, s3_connector: S3Connector, key: str) -> None:
+        """Initialize S3CheckpointStore.
+
+        Args:
+            s3_connector (S3Connector): S3 Connector.
+            key (str): checkpoint object key.
+        """
+        super().__init__(key)
+        self.s3_connector = s3_connector
+
+    def load(self) -> dict:
+        """Load checkpoint.
+
+        Returns:
+            dict: checkpoint, empty if none.
+        """
+        data = self.s3_connector.get_data(self.path)
+        return json.loads(data) if data else {}
+
+    def save(self, checkpoint: dict) -> None:
+        """Save checkpoint.
+
+        Args:
+            checkpoint (dict): checkpoint.
+        """
+        self.s3_connector.put_data(
+            json.dumps(checkpoint).encode(sch_c.UTF8), self.path
+        )
+
+    def clear(self) -> None:
+        """Remove checkpoint."""
+        self.s3_connector.delete_data(self.path)
+
+
+class WorkScheduler:
+    """Admit work items while the Lambda time budget allows."""
+
+    def __init__(
+        self,
+        context: Any = None,
+        checkpoint_store: CheckpointStore = None,
+        estimates_ms: Dict[str, float] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> None:
+        """Initialize WorkScheduler and load the previous checkpoint.
+
+        Args:
+            context (Any): Lambda context. No time limit if None.
+            checkpoint_store (CheckpointStore): resume checkpoint store.
+                default: None, no checkpoint.
+            estimates_ms (Dict[str, float]): initial cost estimates
+                by item kind in milliseconds. default: None.
+            cancelled (threading.Event | None): once set, no item is
+                admitted, e.g. run lease lost. default: None.
+        """
+        self.context = context
+        self.cancelled = cancelled
+        self.checkpoint_store = checkpoint_store
+        self.safety_margin_ms = float(
+            os.getenv(sch_c.SAFETY_MARGIN_MS, sch_c.DEFAULT_SAFETY_MARGIN_MS)
+        )
+        self._estimates_ms: Dict[str, float] = dict(estimates_ms or {})
+        self._deferred: Dict[str, List[str]] = {}
+        self.checkpoint = checkpoint_store.load() if checkpoint_store else {}
+        if self.checkpoint:
+            logger.info("Resuming from checkpoint: %s", self.checkpoint)
+
+    def remaining_ms(self) -> float:
+        """Remaining invocation time.
+
+        Returns:
+            float: remaining milliseconds, infinite without context.
+        """
+        if self.context is None:
+            return float("inf")
+        return float(self.context.get_remaining_time_in_millis())
+
+    def estimate_ms(self, kind: str) -> float:
+        """Estimated cost of the next item.
+
+        Args:
+            kind (str): item kind.
+
+        Returns:
+            float: estimated milliseconds.
+        """
+        return (
+            self._estimates_ms.get(kind, sch_c.DEFAULT_ESTIMATE_MS)
+            * sch_c.ESTIMATE_FACTOR
+        )
+
+    def observe(self, kind: str, duration_ms: float) -> None:
+        """Update cost estimate with an observed duration.
+
+        Args:
+            kind (str): item kind.
+            duration_ms (float): observed milliseconds.
+        """
+        previous = self._estimates_ms.get(kind)
+        self._estimates_ms[kind] = (
+            duration_ms
+            if previous is None
+            else sch_c.EWMA_ALPHA * duration_ms
+            + (1 - sch_c.EWMA_ALPHA) * previous
+        )
+
+    def admit(self, kind: str) -> bool:
+        """Check if there is enough budget left for another item
+        and the scheduler was not cancelled.
+
+        Args:
+            kind (str): item kind.
+
+        Returns:
+            bool: True if the item can start.
+        """
+        if self.cancelled is not None and self.cancelled.is_set():
+            return False
+        budget_ms = self.remaining_ms() - self.safety_margin_ms
+        return budget_ms > self.estimate_ms(kind)
+
+    @contextmanager
+    def track(self, kind: str) -> Iterator[None]:
+        """Time an item and update its kind estimate.
+
+        Args:
+            kind (str): item kind.
+
+        Yields:
+            None: while the item runs.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(kind, (time.monotonic() - start) * 1000)
+
+    def defer(self, kind: str, key: str) -> None:
+        """Record item left for the next invocation.
+
+        Args:
+            kind (str): item kind.
+            key (str): item key.
+        """
+        self._deferred.setdefault(kind, []).append(key)
+
+    def deferred(self, kind: str) -> List[str]:
+        """Items deferred in this invocation.
+
+        Args:
+            kind (str): item kind.
+
+        Returns:
+            List[str]: deferred items keys.
+        """
+        return self._deferred.get(kind, [])
+
+    def resumed(self, kind: str) -> Set[str]:
+        """Items deferred by the previous invocation.
+
+        Args:
+            kind (str): item kind.
+
+        Returns:
+            Set[str]: resumed items keys.
+        """
+        return set(self.checkpoint.get(kind, []))
+
+    def prioritize(self, kind: str, items: list, key: Callable) -> list:
+        """Order items deferred by the previous invocation first.
+
+        Args:
+            kind (str): item kind.
+            items (list): items to order.
+            key (Callable): item key getter.
+
+        Returns:
+            list: ordered items.
+        """
+        resumed = self.resumed(kind)
+        return sorted(items, key=lambda item: key(item) not in resumed)
+
+    def admit_or_defer(self, kind: str, key: str) -> bool:
+        """Admit item or defer it to the next invocation.
+
+        Args:
+            kind (str): item kind.
+            key (str): item key.
+
+        Returns:
+            bool: True if admitted, False if deferred.
+        """
+        if self.admit(kind):
+            return True
+        self.defer(kind, key)
+        return False
+
+    def iterate(self, kind: str, items: list, key: Callable) -> Iterator[Any]:
+        """Yield items while the budget allows, deferring the rest.
+
+        Args:
+            kind (str): item kind.
+            items (list): items to process.
+            key (Callable): item key getter.
+
+        Yields:
+            Any: admitted item, timed until the next one is requested.
+        """
+        for index, item in enumerate(items):
+            if not self.admit(kind):
+                for skipped in items[index:]:
+                    self.defer(kind, key(skipped))
+                return
+            with self.track(kind):
+                yield item
+
+    def finish(self) -> None:
+        """Write resume checkpoint if any item was deferred,
+        clear it otherwise.
+        """
+        deferred_count = sum(len(keys) for keys in self._deferred.values())
+        if deferred_count:
+            logger.warning(
+                "Time budget low, deferred items: %s", deferred_count
+            )
+        if self.checkpoint_store is None:
+            return
+        if deferred_count:
+            self.checkpoint_store.save(self._deferred)
+        elif self.checkpoint:
+            self.checkpoint_store.clear()
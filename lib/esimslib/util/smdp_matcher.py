@@ -0,0 +1,109 @@
+"""SM-DP+ Domain Matcher
+
+Matches the SM-DP+ address of an LPA activation code against the
+domains allowed for a provider. Domains are normalized once into a
+hash set and an address matches a domain or any of its subdomains.
+"""
+
+import threading
+from typing import Dict, Iterable, Set, Tuple
+
+from esimslib.util.constants import SMDPConst as smdp_c
+
+
+def normalize_domain(domain: str) -> str:
+    """Normalize a domain or address to a lowercase host name.
+
+    Args:
+        domain (str): domain, optionally with scheme, port or path.
+
+    Returns:
+        str: host name.
+    """
+    host = domain.strip().lower()
+    host = host.split(smdp_c.SCHEME_SEPARATOR)[-1]
+    host = host.split(smdp_c.PATH_SEPARATOR)[0]
+    host = host.split(smdp_c.PORT_SEPARATOR)[0]
+    if host.startswith(smdp_c.WILDCARD):
+        host = host[len(smdp_c.WILDCARD) :]
+    return host.strip(smdp_c.LABEL_SEPARATOR)
+
+
+def parse_smdp_address(qr_code: str) -> str:
+    """Parse SM-DP+ address from an LPA activation code.
+    e.g. LPA:1$smdp.example.com$MATCHING-ID
+
+    Args:
+        qr_code (str): QR Code content.
+
+    Returns:
+        str: normalized SM-DP+ address, empty if not an activation code.
+    """
+    if not qr_code.startswith(smdp_c.LPA):
+        return ""
+    fields = qr_code.split(smdp_c.FIELD_SEPARATOR)
+    if len(fields) <= smdp_c.ADDRESS_FIELD:
+        return ""
+    return normalize_domain(fields[smdp_c.ADDRESS_FIELD])
+
+
+class SMDPMatcher:
+    """Allowed SM-DP+ domains of a provider."""
+
+    _cache: Dict[Tuple[str, ...], "SMDPMatcher"] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, domains: Iterable[str]) -> None:
+        """Initialize SMDPMatcher.
+
+        Args:
+            domains (Iterable[str]): allowed SM-DP+ domains.
+        """
+        self.domains: Set[str] = {
+            normalize_domain(domain) for domain in domains
+        } - {""}
+
+    @classmethod
+    def for_domains(cls, domains: Iterable[str]) -> "SMDPMatcher":
+        """Get matcher cached for a provider domains.
+        Providers sharing the same domains share a matcher.
+
+        Args:
+            domains (Iterable[str]): provider SM-DP+ domains.
+
+        Returns:
+            SMDPMatcher: cached matcher.
+        """
+        key = tuple(domains)
+        matcher = cls._cache.get(key)
+        if matcher is None:
+            with cls._cache_lock:
+                matcher = cls._cache.setdefault(key, cls(key))
+        return matcher
+
+    def matches_address(self, address: str) -> bool:
+        """Check if address is an allowed domain or one of its subdomains.
+
+        Args:
+            address (str): normalized SM-DP+ address.
+
+        Returns:
+            bool: True if allowed.
+        """
+        labels = address.split(smdp_c.LABEL_SEPARATOR)
+        return any(
+            smdp_c.LABEL_SEPARATOR.join(labels[index:]) in self.domains
+            for index in range(len(labels))
+        )
+
+    def matches(self, qr_code: str) -> bool:
+        """Check if QR Code SM-DP+ address is allowed.
+
+        Args:
+            qr_code (str): QR Code content.
+
+        Returns:
+            bool: True if allowed.
+        """
+        address = parse_smdp_address(qr_code)
+        return bool(address) and self.matches_address(address)
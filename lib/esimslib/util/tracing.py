@@ -0,0 +1,342 @@
+"""Tracing
+
+Spans of individual connector calls and processing stages, linked
+to their parent span, exported as JSON lines once they end.
+- JsonLinesExporter appends spans to a local file.
+- StdoutExporter writes spans to stdout, opt-in in Lambda.
+
+The current span follows asyncio tasks and calls run on the
+connectors executors.
+"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from esimslib.util.constants import TracingConst as tr_c
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    tr_c.CURRENT_SPAN, default=None
+)
+
+
+class Span:
+    """Timed operation with attributes, child of the span
+    current when it started.
+    """
+
+    def __init__(self, name: str, attributes: dict) -> None:
+        """Initialize Span.
+
+        Args:
+            name (str): span name.
+            attributes (dict): span attributes.
+        """
+        parent = _current_span.get()
+        self.name = name
+        self.trace_id: str = (
+            parent.trace_id
+            if parent
+            else secrets.token_hex(tr_c.TRACE_ID_BYTES)
+        )
+        self.span_id: str = secrets.token_hex(tr_c.SPAN_ID_BYTES)
+        self.parent_id: Optional[str] = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.monotonic()
+
+    def set(self, **attributes: object) -> None:
+        """Set span attributes.
+
+        Args:
+            attributes (object): attributes to set.
+        """
+        self.attributes.update(attributes)
+
+    def record(self, seconds: float = None) -> dict:
+        """Span record to export.
+
+        Args:
+            seconds (float): span duration. default: None,
+                time since the span started.
+
+        Returns:
+            dict: JSON serializable span record.
+        """
+        if seconds is None:
+            seconds = time.monotonic() - self._started
+        return {
+            tr_c.TRACE_ID: self.trace_id,
+            tr_c.SPAN_ID: self.span_id,
+            tr_c.PARENT_ID: self.parent_id,
+            tr_c.NAME: self.name,
+            tr_c.START: self.start,
+            tr_c.DURATION_MS: round(seconds * tr_c.MS_PER_SECOND, 3),
+            tr_c.ATTRIBUTES: self.attributes,
+        }
+
+
+class SpanExporter(ABC):
+    """Span exporter interface."""
+
+    @classmethod
+    def from_env(cls) -> Optional["SpanExporter"]:
+        """Create span exporter from environment.
+        TRACE_EXPORTER picks stdout, file or none. Defaults to none
+        in Lambda, so spans reach the logs only when opted in, and to
+        a TRACE_FILE JSON lines file otherwise.
+
+        Returns:
+            SpanExporter | None: span exporter, None if disabled.
+        """
+        default = tr_c.NONE if os.getenv(tr_c.LAMBDA_FUNCTION) else tr_c.FILE
+        exporter = os.getenv(tr_c.EXPORTER, default)
+        if exporter == tr_c.STDOUT:
+            return StdoutExporter()
+        if exporter == tr_c.FILE:
+            return JsonLinesExporter(
+                os.getenv(tr_c.TRACE_FILE, tr_c.DEFAULT_TRACE_FILE)
+            )
+        return None
+
+    @abstractmethod
+    def export(self, record: dict) -> None:
+        """Export a span record.
+
+        Args:
+            record (dict): span record.
+        """
+
+
+class StdoutExporter(SpanExporter):
+    """Write span records to stdout."""
+
+    def export(self, record: dict) -> None:
+        """Export a span record.
+
+        Args:
+            record (dict): span record.
+        """
+        sys.stdout.write(json.dumps(record, default=str) + "\n")
+
+
+class JsonLinesExporter(SpanExporter):
+    """Append span records to a JSON lines file."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize JsonLinesExporter.
+
+        Args:
+            path (str): JSON lines file path.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: dict) -> None:
+        """Export a span record.
+
+        Args:
+            record (dict): span record.
+        """
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock, open(
+            self.path, "a", encoding=tr_c.UTF8
+        ) as trace_file:
+            trace_file.write(line)
+
+
+class Tracer:
+    """Create spans and export them once they end."""
+
+    _shared: Optional["Tracer"] = None
+
+    def __init__(self, exporter: Optional[SpanExporter]) -> None:
+        """Initialize Tracer.
+
+        Args:
+            exporter (SpanExporter | None): span exporter,
+                None to drop spans.
+        """
+        self.exporter = exporter
+
+    @classmethod
+    def shared(cls) -> "Tracer":
+        """Get tracer shared across the process.
+
+        Returns:
+            Tracer: shared tracer.
+        """
+        if cls._shared is None:
+            cls._shared = cls(SpanExporter.from_env())
+        return cls._shared
+
+    def export(self, span: Span, seconds: float = None) -> None:
+        """Export an ended span.
+
+        Args:
+            span (Span): ended span.
+            seconds (float): span duration. default: None,
+                time since the span started.
+        """
+        if self.exporter is not None:
+            self.exporter.export(span.record(seconds))
+
+    @contextmanager
+    def span(self, name: str, **attributes: object) -> Iterator[Span]:
+        """Run a block in a child span of the current span.
+        Errors are recorded on the span and raised.
+
+        Args:
+            name (str): span name.
+            attributes (object): span attributes.
+
+        Raises:
+            Exception: if the block failed.
+
+        Yields:
+            Span: current span.
+        """
+        span = Span(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as exc:
+            span.set(**{tr_c.ERROR: f"{type(exc).__name__}: {exc}"})
+            raise exc
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # block ended in another context, e.g. an async generator
+                # closed by another task, which never saw the span
+                pass
+            self.export(span)
+
+
+def set_attributes(**attributes: object) -> None:
+    """Set attributes of the current span, if any.
+
+    Args:
+        attributes (object): attributes to set.
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def traced(name: str, *arg_names: str) -> Callable:
+    """Decorator to run a function or coroutine in a span
+    of the shared tracer.
+
+    Args:
+        name (str): span name.
+        arg_names (str): arguments recorded as span attributes.
+
+    Returns:
+        Callable: decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        """Wrap function in a span.
+
+        Args:
+            func (Callable): function to trace.
+
+        Returns:
+            Callable: traced function.
+        """
+        signature = inspect.signature(func)
+
+        def attributes(args: tuple, kwargs: dict) -> dict:
+            """Span attributes from call arguments.
+
+            Args:
+                args (tuple): call positional arguments.
+                kwargs (dict): call keyword arguments.
+
+            Returns:
+                dict: recorded arguments.
+            """
+            if not arg_names:
+                return {}
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            return {
+                arg: arguments[arg] for arg in arg_names if arg in arguments
+            }
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def traced_coroutine(*args: tuple, **kwargs: dict) -> object:
+                """Run coroutine in a span.
+
+                Args:
+                    args (tuple): arbitrary tuple of arguments.
+                    kwargs (dict): arbitrary dictionary of keyword arguments.
+
+                Returns:
+                    object: coroutine result.
+                """
+                with Tracer.shared().span(name, **attributes(args, kwargs)):
+                    return await func(*args, **kwargs)
+
+            return traced_coroutine
+
+        @wraps(func)
+        def traced_function(*args: tuple, **kwargs: dict) -> object:
+            """Run function in a span.
+
+            Args:
+                args (tuple): arbitrary tuple of arguments.
+                kwargs (dict): arbitrary dictionary of keyword arguments.
+
+            Returns:
+                object: function result.
+            """
+            with Tracer.shared().span(name, **attributes(args, kwargs)):
+                return func(*args, **kwargs)
+
+        return traced_function
+
+    return decorator
+
+
+# pylint: disable=unused-argument
+def trace_response(
+    response: requests.Response, *args: tuple, **kwargs: dict
+) -> None:
+    """Requests response hook exporting a span per HTTP request.
+    Retries made by the session adapter are counted on the span.
+    Query strings are not recorded.
+
+    Args:
+        response (requests.Response): received response.
+        args (tuple): arbitrary tuple of arguments.
+        kwargs (dict): arbitrary dictionary of keyword arguments.
+    """
+    url = urlparse(response.url)
+    retries = getattr(response.raw, tr_c.RETRIES, None)
+    span = Span(
+        tr_c.HTTP_SPAN.format(response.request.method),
+        {
+            tr_c.HOST: url.netloc,
+            tr_c.PATH: url.path,
+            tr_c.STATUS: response.status_code,
+            tr_c.RETRIES: len(retries.history) if retries else 0,
+        },
+    )
+    seconds = response.elapsed.total_seconds()
+    span.start -= seconds
+    Tracer.shared().export(span, seconds)
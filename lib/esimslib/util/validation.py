@@ -0,0 +1,324 @@
+"""QR Validation Engine
+
+QR checks shared by ingest and router. Each rule declares its scope,
+its cost and the artifact it needs. Image rules run once per image,
+a cheap preflight on the file bytes before the full decode and QR
+detection, then symbol rules run on every detected symbol. Cheaper
+rules of a scope run first, the first failing rule rejects the image
+or symbol, and decoded image, payload and OCR text are shared across
+rules through the QR Code Processor caches.
+"""
+
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+from esimslib.util.logger import logger
+from esimslib.util.qr_code_processor import QRCodeProcessor
+from esimslib.util.tracing import Tracer
+from esimslib.util.constants import ValidationConst as val_c
+
+
+class Rule(ABC):
+    """QR symbol validation rule.
+    Providers are eSIM Provider records, see esimslib.airtable.
+    """
+
+    name = ""
+    scope = val_c.SYMBOL_SCOPE
+    cost = 0.0
+    artifact = val_c.PAYLOAD
+
+    @property
+    def order(self) -> float:
+        """Rule cost including its artifact.
+
+        Returns:
+            float: ordering cost.
+        """
+        return self.cost + val_c.ARTIFACT_COSTS[self.artifact]
+
+    def applies(
+        self, provider: Any  # pylint: disable=unused-argument
+    ) -> bool:
+        """Check if rule applies to the provider.
+
+        Args:
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if rule must run.
+        """
+        return True
+
+    @abstractmethod
+    def check(self, processor: QRCodeProcessor, provider: Any) -> bool:
+        """Check the image or its selected symbol.
+
+        Args:
+            processor (QRCodeProcessor): processor with a selected symbol,
+                for symbol rules.
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if valid.
+        """
+
+
+class QRPreflightRule(Rule):
+    """Image may hold a QR code, checked before the full decode."""
+
+    name = val_c.QR_PREFLIGHT
+    scope = val_c.IMAGE_SCOPE
+    artifact = val_c.BYTES
+
+    def check(self, processor: QRCodeProcessor, provider: Any) -> bool:
+        """Check the image passes the processor preflight.
+
+        Args:
+            processor (QRCodeProcessor): QR Code Processor.
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if the image may hold a QR code.
+        """
+        reason = processor.preflight()
+        if reason:
+            logger.info("Preflight rejected %s: %s", processor.url, reason)
+        return not reason
+
+
+class QRDetectedRule(Rule):
+    """Image has QR symbols, detected for the symbol rules."""
+
+    name = val_c.QR_DETECTED
+    scope = val_c.IMAGE_SCOPE
+    artifact = val_c.IMAGE
+
+    def check(self, processor: QRCodeProcessor, provider: Any) -> bool:
+        """Check QR symbols are detected in the image.
+
+        Args:
+            processor (QRCodeProcessor): QR Code Processor.
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if at least one symbol is detected.
+        """
+        return bool(processor.detect_symbols())
+
+
+class LPAProtocolRule(Rule):
+    """QR Code content is an eSIM activation code."""
+
+    name = val_c.LPA_PROTOCOL
+    cost = 1.0
+
+    def check(self, processor: QRCodeProcessor, provider: Any) -> bool:
+        """Check QR Code content starts with the LPA prefix.
+
+        Args:
+            processor (QRCodeProcessor): processor with a selected symbol.
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if valid.
+        """
+        return processor.validate_qr_code_protocol()
+
+
+class SMDPDomainRule(Rule):
+    """QR Code SM-DP+ address matches the provider."""
+
+    name = val_c.SMDP_DOMAIN
+    cost = 2.0
+
+    def applies(self, provider: Any) -> bool:
+        """Check provider has SM-DP+ domains.
+
+        Args:
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if rule must run.
+        """
+        return bool(provider.smdp_domain)
+
+    def check(self, processor: QRCodeProcessor, provider: Any) -> bool:
+        """Check QR Code matches a provider SM-DP+ domain.
+
+        Args:
+            processor (QRCodeProcessor): processor with a selected symbol.
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if valid.
+        """
+        return processor.validate_smdp_domain(provider.smdp_domain)
+
+
+class PhoneNumberRule(Rule):
+    """Renewable eSIM image has a phone number next to its QR Code."""
+
+    name = val_c.PHONE_NUMBER
+    cost = 1.0
+    artifact = val_c.OCR_TEXT
+
+    def applies(self, provider: Any) -> bool:
+        """Check provider eSIMs are renewable.
+
+        Args:
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if rule must run.
+        """
+        return bool(provider.renewable)
+
+    def check(self, processor: QRCodeProcessor, provider: Any) -> bool:
+        """Check a phone number is read next to the QR Code.
+
+        Args:
+            processor (QRCodeProcessor): processor with a selected symbol.
+            provider (Any): eSIM provider.
+
+        Returns:
+            bool: True if valid.
+        """
+        return processor.detect_phone_number()
+
+
+class ValidationStats:
+    """Per rule runs, rejections and time."""
+
+    def __init__(self) -> None:
+        """Initialize ValidationStats."""
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, seconds: float, passed: bool) -> None:
+        """Record a rule run.
+
+        Args:
+            name (str): rule name.
+            seconds (float): rule run time.
+            passed (bool): True if the symbol passed the rule.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {val_c.RUNS: 0, val_c.REJECTED: 0, val_c.SECONDS: 0.0}
+            )
+            stats[val_c.RUNS] += 1
+            stats[val_c.REJECTED] += not passed
+            stats[val_c.SECONDS] += seconds
+
+    def report(self) -> None:
+        """Log rules stats and reset them."""
+        with self._lock:
+            stats_items, self._stats = self._stats, {}
+        for name, stats in stats_items.items():
+            logger.info(
+                "Rule %s: runs %d, rejected %d, %.1fms avg",
+                name,
+                stats[val_c.RUNS],
+                stats[val_c.REJECTED],
+                stats[val_c.SECONDS]
+                * val_c.MS_PER_SECOND
+                / max(stats[val_c.RUNS], 1),
+            )
+
+
+class ValidationEngine:
+    """Run validation rules on every QR symbol of an image."""
+
+    _shared: Optional["ValidationEngine"] = None
+
+    def __init__(self, rules: List[Rule] = None) -> None:
+        """Initialize ValidationEngine.
+
+        Args:
+            rules (List[Rule]): image and symbol rules, image rules must
+                include QR detection. default: None, QR preflight unless
+                disabled, QR detected, LPA protocol, SM-DP+ domain and
+                phone number.
+        """
+        if rules is None:
+            rules = [
+                QRDetectedRule(),
+                LPAProtocolRule(),
+                SMDPDomainRule(),
+                PhoneNumberRule(),
+            ]
+            if os.getenv(val_c.PREFLIGHT, val_c.DEFAULT_PREFLIGHT) != "0":
+                rules.append(QRPreflightRule())
+        rules = sorted(rules, key=lambda rule: rule.order)
+        self.image_rules = [
+            rule for rule in rules if rule.scope == val_c.IMAGE_SCOPE
+        ]
+        self.rules = [
+            rule for rule in rules if rule.scope == val_c.SYMBOL_SCOPE
+        ]
+        self.stats = ValidationStats()
+
+    @classmethod
+    def shared(cls) -> "ValidationEngine":
+        """Get engine shared across the process.
+
+        Returns:
+            ValidationEngine: shared engine.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _check(
+        self, rules: List[Rule], processor: QRCodeProcessor, provider: Any
+    ) -> Optional[str]:
+        """Run rules on the image or its selected symbol until one fails.
+
+        Args:
+            rules (List[Rule]): image or symbol rules.
+            processor (QRCodeProcessor): QR Code Processor.
+            provider (Any): eSIM provider.
+
+        Returns:
+            str | None: failed rule name, None if valid.
+        """
+        for rule in rules:
+            if not rule.applies(provider):
+                continue
+            started = time.perf_counter()
+            with Tracer.shared().span(
+                val_c.RULE_SPAN.format(rule.name)
+            ) as span:
+                passed = rule.check(processor, provider)
+                span.set(passed=passed)
+            self.stats.record(rule.name, time.perf_counter() - started, passed)
+            if not passed:
+                return rule.name
+        return None
+
+    def validate(
+        self, processor: QRCodeProcessor, provider: Any
+    ) -> Iterator[Optional[str]]:
+        """Validate every QR symbol of the processor image.
+        Each result is yielded while its symbol is selected, so its
+        QR SHA, phone number and artifact can be read from the processor.
+
+        Args:
+            processor (QRCodeProcessor): QR Code Processor.
+            provider (Any): eSIM provider.
+
+        Yields:
+            str | None: failed rule name per symbol, None if valid.
+                Failed image rule name once if the image has no symbol.
+        """
+        failed_rule = self._check(self.image_rules, processor, provider)
+        if failed_rule:
+            yield failed_rule
+            return
+        for index in range(len(processor.symbols)):
+            processor.select_symbol(index)
+            yield self._check(self.rules, processor, provider)
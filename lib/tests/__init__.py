@@ -0,0 +1 @@
+"""eSIMs Library Tests"""
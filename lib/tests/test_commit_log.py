@@ -0,0 +1,164 @@
+"""Assets Commit Log tests"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from typing import List
+from unittest import mock
+
+from esimslib.airtable.commit_log import CommitLog, idempotency_key
+from esimslib.airtable.constants import CommitLogConst as cl_c
+from esimslib.airtable.models import EsimAsset
+from esimslib.util.journal import Journal
+from esimslib.util.s3_journal import S3Journal
+
+
+class AirTableStub:
+    """EsimAsset.load_records stub recording saved chunks."""
+
+    def __init__(self, fail_on_call: int = 0) -> None:
+        """Initialize AirTableStub.
+
+        Args:
+            fail_on_call (int): call raising an error, 1 based.
+                default: 0, never.
+        """
+        self.chunks: List[List[str]] = []
+        self.fail_on_call = fail_on_call
+        self.calls = 0
+
+    def load_records(self, records: list) -> None:
+        """Save records, giving them record IDs.
+
+        Args:
+            records (list): eSIM assets.
+
+        Raises:
+            ConnectionError: on the failing call.
+        """
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise ConnectionError("AirTable unavailable")
+        for record in records:
+            record.id = f"rec{record.qr_sha}"
+        self.chunks.append([record.qr_sha for record in records])
+
+
+def assets(count: int, start: int = 0) -> List[EsimAsset]:
+    """Build unsaved eSIM assets.
+
+    Args:
+        count (int): assets count.
+        start (int): first asset index.
+
+    Returns:
+        List[EsimAsset]: eSIM assets.
+    """
+    return [
+        EsimAsset(qr_sha=f"sha{index}")
+        for index in range(start, start + count)
+    ]
+
+
+def keys(esims: List[EsimAsset]) -> List[str]:
+    """Idempotency keys of eSIM assets from a single source.
+
+    Args:
+        esims (List[EsimAsset]): eSIM assets.
+
+    Returns:
+        List[str]: idempotency keys.
+    """
+    return [idempotency_key(esim.qr_sha, "/source.png") for esim in esims]
+
+
+class TestCommitLog(unittest.TestCase):
+    """CommitLog.load_assets tests."""
+
+    def setUp(self) -> None:
+        """Create journal directory."""
+        self.journal_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.journal_dir, "router.jsonl")
+
+    def tearDown(self) -> None:
+        """Remove journal directory."""
+        shutil.rmtree(self.journal_dir)
+
+    def load(self, stub: AirTableStub, esims: List[EsimAsset]) -> int:
+        """Insert assets with a commit log reloaded from the journal,
+        as a retried run does.
+
+        Args:
+            stub (AirTableStub): AirTable stub.
+            esims (List[EsimAsset]): eSIM assets.
+
+        Returns:
+            int: inserted assets count.
+        """
+        commit_log = CommitLog(Journal(self.path))
+        with mock.patch.object(EsimAsset, "load_records", stub.load_records):
+            return commit_log.load_assets(esims, keys(esims))
+
+    def test_insert_in_chunks(self) -> None:
+        """Assets are inserted in AirTable batch sized chunks."""
+        stub = AirTableStub()
+        self.assertEqual(self.load(stub, assets(cl_c.CHUNK_SIZE + 1)), 11)
+        self.assertEqual(
+            [len(chunk) for chunk in stub.chunks], [cl_c.CHUNK_SIZE, 1]
+        )
+        journal = Journal(self.path)
+        self.assertEqual(len(journal), cl_c.CHUNK_SIZE + 1)
+        self.assertEqual(
+            journal.get(keys(assets(1))[0]), f"rec{assets(1)[0].qr_sha}"
+        )
+
+    def test_skip_on_replay(self) -> None:
+        """Assets inserted by a previous run are skipped."""
+        self.load(AirTableStub(), assets(3))
+        stub = AirTableStub()
+        self.assertEqual(self.load(stub, assets(5)), 2)
+        self.assertEqual(stub.chunks, [["sha3", "sha4"]])
+        self.assertEqual(self.load(stub, assets(5)), 0)
+        self.assertEqual(stub.calls, 1)
+
+    def test_duplicate_keys(self) -> None:
+        """Assets with the same key are inserted once."""
+        stub = AirTableStub()
+        self.assertEqual(self.load(stub, assets(2) + assets(2)), 2)
+        self.assertEqual(stub.chunks, [["sha0", "sha1"]])
+
+    def test_partial_chunk_failure(self) -> None:
+        """Chunks saved before a failure are skipped on retry."""
+        esims = assets(2 * cl_c.CHUNK_SIZE + 1)
+        with self.assertRaises(ConnectionError):
+            self.load(AirTableStub(fail_on_call=2), esims)
+        self.assertEqual(len(Journal(self.path)), cl_c.CHUNK_SIZE)
+        stub = AirTableStub()
+        self.assertEqual(self.load(stub, esims), cl_c.CHUNK_SIZE + 1)
+        self.assertEqual(stub.chunks[0][0], esims[cl_c.CHUNK_SIZE].qr_sha)
+        self.assertEqual(len(Journal(self.path)), len(esims))
+
+    def test_from_env(self) -> None:
+        """Journal is local by default, in S3 with a prefix and
+        required to be in S3 in Lambda.
+        """
+        with mock.patch.dict(
+            os.environ, {cl_c.COMMIT_LOG_DIR: self.journal_dir}, clear=True
+        ):
+            commit_log = CommitLog.from_env("router")
+        self.assertIsInstance(commit_log.journal, Journal)
+        self.assertEqual(
+            commit_log.journal.path,
+            os.path.join(self.journal_dir, "router.jsonl"),
+        )
+        with mock.patch.dict(
+            os.environ, {cl_c.LAMBDA_FUNCTION: "router"}, clear=True
+        ):
+            with self.assertRaises(ValueError):
+                CommitLog.from_env("router")
+        with mock.patch.dict(
+            os.environ, {cl_c.COMMIT_LOG_PREFIX: "logs"}
+        ), mock.patch("esimslib.airtable.commit_log.S3Connector"):
+            commit_log = CommitLog.from_env("router")
+        self.assertIsInstance(commit_log.journal, S3Journal)
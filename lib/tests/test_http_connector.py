@@ -0,0 +1,128 @@
+"""HTTP Connector disk cache tests"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from typing import List
+
+from esimslib.connectors.constants import HTTPConst as http_c
+from esimslib.connectors.http_connector import DiskCache
+
+ENTRY_BYTES = 4096
+KEYS = 8
+ROUNDS = 200
+THREADS = 8
+
+
+def entry(key: str, version: int) -> bytes:
+    """Content of a cache entry version, its version repeated
+    over ENTRY_BYTES.
+
+    Args:
+        key (str): cache key.
+        version (int): entry version.
+
+    Returns:
+        bytes: entry content.
+    """
+    return (f"{key}:{version};".encode(http_c.UTF8) * ENTRY_BYTES)[
+        :ENTRY_BYTES
+    ]
+
+
+class TestDiskCache(unittest.TestCase):
+    """DiskCache tests."""
+
+    def setUp(self) -> None:
+        """Create cache in a temporary directory."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = DiskCache(self.cache_dir, ENTRY_BYTES * KEYS)
+
+    def tearDown(self) -> None:
+        """Remove cache directory."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_put_get(self) -> None:
+        """Cached content is returned with its metadata."""
+        self.cache.put("key", b"data", {"etag": "v1"})
+        self.assertEqual(self.cache.get("key"), (b"data", {"etag": "v1"}))
+        self.assertEqual(self.cache.get("missing"), (None, {}))
+
+    def test_put_too_large(self) -> None:
+        """Content above the cache size is not cached."""
+        self.cache.put("key", b"x" * (ENTRY_BYTES * KEYS + 1), {})
+        self.assertEqual(self.cache.get("key"), (None, {}))
+
+    def test_evict_least_recently_used(self) -> None:
+        """Least recently used entries are evicted first."""
+        for index in range(KEYS):
+            self.cache.put(str(index), entry(str(index), 0), {})
+            os.utime(
+                self.cache._path(  # pylint: disable=protected-access
+                    str(index), http_c.DATA_EXTENSION
+                ),
+                (index, index),
+            )
+        self.cache.put("new", entry("new", 0), {})
+        self.assertIsNone(self.cache.get("0")[0])
+        self.assertIsNotNone(self.cache.get("new")[0])
+
+    def test_mismatched_metadata(self) -> None:
+        """Content not matching its metadata is a miss."""
+        self.cache.put("key", b"data", {"etag": "v1"})
+        # pylint: disable=protected-access
+        with open(
+            self.cache._path("key", http_c.DATA_EXTENSION), "wb"
+        ) as file:
+            file.write(b"da")
+        self.assertEqual(self.cache.get("key"), (None, {}))
+
+    def test_concurrent_get_put_evict(self) -> None:
+        """Concurrent readers never see torn or mismatched entries and
+        concurrent writers and evictions never fail.
+        """
+        errors: List[BaseException] = []
+        mismatches: List[str] = []
+
+        def run(worker: int) -> None:
+            """Put, get and evict entries of shared keys.
+
+            Args:
+                worker (int): worker index.
+            """
+            try:
+                for round_ in range(ROUNDS):
+                    key = str((worker + round_) % KEYS)
+                    version = worker * ROUNDS + round_
+                    self.cache.put(key, entry(key, version), {"etag": version})
+                    data, metadata = self.cache.get(str(round_ % KEYS))
+                    if data is not None and data != entry(
+                        str(round_ % KEYS), metadata["etag"]
+                    ):
+                        mismatches.append(str(round_ % KEYS))
+                    self.cache.evict()
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [
+            threading.Thread(target=run, args=(worker,))
+            for worker in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(mismatches, [])
+        names = os.listdir(self.cache_dir)
+        self.assertFalse(
+            [name for name in names if name.endswith(http_c.TEMP_EXTENSION)]
+        )
+        size = sum(
+            os.path.getsize(os.path.join(self.cache_dir, name))
+            for name in names
+            if name.endswith(http_c.DATA_EXTENSION)
+        )
+        self.assertLessEqual(size, self.cache.max_bytes)
@@ -0,0 +1,129 @@
+"""Journal tests"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from esimslib.util.constants import JournalConst as jr_c
+from esimslib.util.journal import Journal, retained_lines
+
+
+def line(key: str, value: object, committed_at: float) -> str:
+    """Journal line.
+
+    Args:
+        key (str): entry key.
+        value (object): entry value.
+        committed_at (float): commit timestamp.
+
+    Returns:
+        str: JSON line.
+    """
+    return json.dumps(
+        {jr_c.KEY: key, jr_c.VALUE: value, jr_c.COMMITTED_AT: committed_at}
+    )
+
+
+class TestJournal(unittest.TestCase):
+    """Journal tests."""
+
+    def setUp(self) -> None:
+        """Create journal directory."""
+        self.journal_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.journal_dir, "nested", "keys.jsonl")
+
+    def tearDown(self) -> None:
+        """Remove journal directory."""
+        shutil.rmtree(self.journal_dir)
+
+    def write(self, text: str) -> None:
+        """Write journal file content.
+
+        Args:
+            text (str): journal file content.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding=jr_c.UTF8) as journal_file:
+            journal_file.write(text)
+
+    def read(self) -> str:
+        """Read journal file content.
+
+        Returns:
+            str: journal file content.
+        """
+        with open(self.path, encoding=jr_c.UTF8) as journal_file:
+            return journal_file.read()
+
+    def test_add(self) -> None:
+        """Entries are committed with their values."""
+        journal = Journal(self.path)
+        journal.add("a", 1)
+        journal.add_many({"b": {"id": "rec"}, "c": None})
+        journal.add_keys(["d"])
+        journal.add_many({})
+        self.assertEqual(len(journal), 4)
+        self.assertIn("c", journal)
+        self.assertNotIn("e", journal)
+        self.assertEqual(journal.get("b"), {"id": "rec"})
+        self.assertEqual(journal.get("e", "missing"), "missing")
+
+    def test_reload(self) -> None:
+        """Committed entries are loaded by a new journal."""
+        Journal(self.path).add_many({"a": 1, "b": 2})
+        journal = Journal(self.path)
+        self.assertEqual((journal.get("a"), journal.get("b")), (1, 2))
+        journal.add("a", 3)
+        self.assertEqual(Journal(self.path).get("a"), 3)
+
+    def test_partial_line(self) -> None:
+        """A partially written trailing line is ignored and pruned."""
+        now = time.time()
+        self.write(line("a", 1, now) + "\n" + line("b", 2, now)[:10])
+        journal = Journal(self.path)
+        self.assertIn("a", journal)
+        self.assertNotIn("b", journal)
+        self.assertEqual(self.read(), line("a", 1, now) + "\n")
+
+    def test_prune_expired(self) -> None:
+        """Entries older than the retention period are dropped from
+        memory and from the file.
+        """
+        now = time.time()
+        expired = now - 2 * jr_c.SECONDS_PER_DAY
+        self.write(line("old", 1, expired) + "\n" + line("new", 2, now) + "\n")
+        with mock.patch.dict(os.environ, {jr_c.RETENTION_DAYS: "1"}):
+            journal = Journal(self.path)
+        self.assertNotIn("old", journal)
+        self.assertIn("new", journal)
+        self.assertEqual(self.read(), line("new", 2, now) + "\n")
+        self.assertFalse(os.path.exists(f"{self.path}{jr_c.TEMP_SUFFIX}"))
+
+    def test_retained_lines_unchanged(self) -> None:
+        """A journal without expired lines is not rewritten."""
+        Journal(self.path).add("a", 1)
+        with mock.patch.object(Journal, "_rewrite") as rewrite:
+            Journal(self.path)
+        rewrite.assert_not_called()
+
+    def test_retained_lines(self) -> None:
+        """Retained lines are stripped and unreadable lines dropped."""
+        now = time.time()
+        self.assertEqual(
+            retained_lines([line("a", 1, now) + "\n", "{", line("b", 2, 0)]),
+            [line("a", 1, now)],
+        )
+
+    def test_fsync(self) -> None:
+        """Appended and rewritten lines are flushed to disk."""
+        journal = Journal(self.path)
+        with mock.patch("esimslib.util.journal.os.fsync") as fsync:
+            journal.add("a", 1)
+            self.assertEqual(fsync.call_count, 1)
+            self.write(line("old", 1, 0) + "\n" + self.read())
+            Journal(self.path)
+            self.assertEqual(fsync.call_count, 2)
@@ -0,0 +1,205 @@
+"""Lease Lock tests"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from typing import List
+from unittest import mock
+
+from esimslib.util.constants import LeaseConst as ls_c
+from esimslib.util.lease import FileLeaseLock, LeaseLock
+
+SHORT_TTL = "0.2"
+LONG_TTL = "60"
+CONTENDERS = 8
+TRIALS = 10
+
+
+class TestFileLeaseLock(unittest.TestCase):
+    """LeaseLock tests on the local file backend."""
+
+    def setUp(self) -> None:
+        """Create lease directory."""
+        self.lease_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.lease_dir, "router.json")
+
+    def tearDown(self) -> None:
+        """Remove lease directory."""
+        shutil.rmtree(self.lease_dir)
+
+    def lock(self, owner: str, ttl: str = LONG_TTL) -> FileLeaseLock:
+        """Create a lease lock of the test lease.
+
+        Args:
+            owner (str): owner ID.
+            ttl (str): lease duration in seconds.
+
+        Returns:
+            FileLeaseLock: lease lock.
+        """
+        with mock.patch.dict(os.environ, {ls_c.LEASE_TTL_SECONDS: ttl}):
+            return FileLeaseLock(self.path, owner=owner)
+
+    def expire(self) -> None:
+        """Wait for a short TTL lease to expire."""
+        time.sleep(float(SHORT_TTL) * 1.5)
+
+    def test_from_env(self) -> None:
+        """LEASE_DIR selects the file backend."""
+        with mock.patch.dict(os.environ, {ls_c.LEASE_DIR: self.lease_dir}):
+            lock = LeaseLock.from_env("/esims/router", owner="a")
+        self.assertIsInstance(lock, FileLeaseLock)
+        self.assertEqual(
+            lock.path, os.path.join(self.lease_dir, "esims_router.json")
+        )
+
+    def test_create(self) -> None:
+        """A free lease is acquired."""
+        first = self.lock("a")
+        self.assertTrue(first.acquire())
+        self.assertTrue(first.held)
+        self.assertEqual(first.current()[ls_c.OWNER], "a")
+
+    def test_contention(self) -> None:
+        """A held lease is not acquired by another owner."""
+        first, second = self.lock("a"), self.lock("b")
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertFalse(second.held)
+        self.assertEqual(second.current()[ls_c.OWNER], "a")
+
+    @staticmethod
+    def contend(locks: List[LeaseLock]) -> List[bool]:
+        """Acquire a lease from concurrent threads started together.
+
+        Args:
+            locks (List[LeaseLock]): contenders lease locks.
+
+        Returns:
+            List[bool]: contenders outcomes.
+        """
+        barrier = threading.Barrier(len(locks))
+        acquired: List[bool] = []
+
+        def acquire(lock: LeaseLock) -> None:
+            """Acquire lease once all contenders are ready.
+
+            Args:
+                lock (LeaseLock): contender lease lock.
+            """
+            barrier.wait()
+            acquired.append(lock.acquire())
+
+        threads = [
+            threading.Thread(target=acquire, args=(lock,)) for lock in locks
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return acquired
+
+    def test_concurrent_acquire(self) -> None:
+        """Only one of concurrent contenders acquires the lease."""
+        for trial in range(TRIALS):
+            self.path = os.path.join(self.lease_dir, f"{trial}.json")
+            acquired = self.contend(
+                [self.lock(f"{trial}-{index}") for index in range(CONTENDERS)]
+            )
+            self.assertEqual(acquired.count(True), 1)
+
+    def test_expired_takeover(self) -> None:
+        """An expired lease is taken over."""
+        first, second = self.lock("a", SHORT_TTL), self.lock("b")
+        self.assertTrue(first.acquire())
+        self.expire()
+        self.assertTrue(second.acquire())
+        self.assertEqual(second.current()[ls_c.OWNER], "b")
+
+    def test_concurrent_takeover(self) -> None:
+        """Only one of concurrent contenders takes an expired lease over."""
+        first = self.lock("a", SHORT_TTL)
+        self.assertTrue(first.acquire())
+        self.expire()
+        acquired = self.contend(
+            [self.lock(str(index)) for index in range(CONTENDERS)]
+        )
+        self.assertEqual(acquired.count(True), 1)
+
+    def test_renew(self) -> None:
+        """A held lease is extended."""
+        first = self.lock("a", SHORT_TTL)
+        self.assertTrue(first.acquire())
+        expires = first.current()[ls_c.EXPIRES]
+        time.sleep(0.01)
+        self.assertTrue(first.renew())
+        self.assertGreater(first.current()[ls_c.EXPIRES], expires)
+        self.assertFalse(first.lost.is_set())
+
+    def test_renew_after_takeover(self) -> None:
+        """Renewing a lease taken over sets the lost event."""
+        first, second = self.lock("a", SHORT_TTL), self.lock("b")
+        self.assertTrue(first.acquire())
+        self.expire()
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.renew())
+        self.assertTrue(first.lost.is_set())
+        self.assertFalse(first.held)
+        self.assertEqual(second.current()[ls_c.OWNER], "b")
+
+    def test_heartbeat_keeps_lease(self) -> None:
+        """The heartbeat renews the lease past its TTL."""
+        first, second = self.lock("a", SHORT_TTL), self.lock("b")
+        self.assertTrue(first.acquire())
+        first.start_heartbeat()
+        try:
+            self.expire()
+            self.assertFalse(second.acquire())
+        finally:
+            first.release()
+        self.assertFalse(first.lost.is_set())
+
+    def test_release(self) -> None:
+        """A released lease is free."""
+        first, second = self.lock("a"), self.lock("b")
+        self.assertTrue(first.acquire())
+        first.release()
+        self.assertFalse(first.held)
+        self.assertEqual(first.current(), {})
+        self.assertTrue(second.acquire())
+
+    def test_release_after_takeover(self) -> None:
+        """Releasing a lease taken over keeps the new owner lease."""
+        first, second = self.lock("a", SHORT_TTL), self.lock("b")
+        self.assertTrue(first.acquire())
+        self.expire()
+        self.assertTrue(second.acquire())
+        first.release()
+        self.assertEqual(second.current()[ls_c.OWNER], "b")
+        self.assertTrue(second.renew())
+
+    def test_release_replaced_record(self) -> None:
+        """Release does not remove a record replaced after it was read."""
+        first = self.lock("a")
+        self.assertTrue(first.acquire())
+        stored = first._read()  # pylint: disable=protected-access
+        replaced = self.lock("b")._record()  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        self.assertTrue(first._replace(stored, replaced))
+        self.assertFalse(first._delete(stored))
+        self.assertEqual(first.current()[ls_c.OWNER], "b")
+
+    def test_acquire_within(self) -> None:
+        """A contender waits for the holder to release the lease."""
+        first, second = self.lock("a"), self.lock("b")
+        self.assertTrue(first.acquire())
+        releaser = threading.Timer(0.1, first.release)
+        releaser.start()
+        try:
+            self.assertTrue(second.acquire_within(5.0))
+        finally:
+            releaser.join()
+        self.assertFalse(self.lock("c").acquire_within(0.0))
@@ -0,0 +1,92 @@
+"""AirTable Models tests"""
+
+import os
+import unittest
+from unittest import mock
+
+import requests
+
+from esimslib.airtable import models
+from esimslib.airtable.constants import AirTableConst as air_c
+from esimslib.airtable.rate_limit import LimitedAdapter
+from esimslib.util.tracing import trace_response
+
+
+class TestImport(unittest.TestCase):
+    """Models import tests."""
+
+    def test_import_leaves_sessions(self) -> None:
+        """Importing the models leaves their API sessions as they are."""
+        for model in models.MODELS:
+            session = model.get_api().session
+            self.assertNotIn(
+                trace_response, session.hooks[air_c.RESPONSE_HOOK]
+            )
+            for prefix in air_c.URL_PREFIXES:
+                self.assertNotIsInstance(
+                    session.get_adapter(prefix), LimitedAdapter
+                )
+
+
+class TestInitAPI(unittest.TestCase):
+    """init_api tests on fresh model sessions."""
+
+    def setUp(self) -> None:
+        """Give every model a fresh session."""
+        self.sessions = {model: requests.Session() for model in models.MODELS}
+        for model, session in self.sessions.items():
+            api = mock.Mock(session=session)
+            patch = mock.patch.object(model, "get_api", return_value=api)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def limited(self) -> bool:
+        """Check every model session is rate limited.
+
+        Returns:
+            bool: True if limited, False if none is.
+
+        Raises:
+            AssertionError: if only some sessions are limited.
+        """
+        limited = {
+            isinstance(session.get_adapter(prefix), LimitedAdapter)
+            for session in self.sessions.values()
+            for prefix in air_c.URL_PREFIXES
+        }
+        if len(limited) != 1:
+            raise AssertionError("Sessions partially rate limited")
+        return limited.pop()
+
+    def traced(self) -> int:
+        """Count response hooks tracing requests over model sessions.
+
+        Returns:
+            int: tracing hooks count.
+        """
+        return sum(
+            session.hooks[air_c.RESPONSE_HOOK].count(trace_response)
+            for session in self.sessions.values()
+        )
+
+    def test_init_api(self) -> None:
+        """Sessions are traced and limited once."""
+        with mock.patch.dict(os.environ, {air_c.MAX_REQUESTS_PER_S: "4"}):
+            models.init_api()
+            adapter = self.sessions[models.EsimAsset].get_adapter(
+                air_c.URL_PREFIXES[0]
+            )
+            models.init_api()
+        self.assertTrue(self.limited())
+        self.assertIs(
+            self.sessions[models.EsimAsset].get_adapter(air_c.URL_PREFIXES[0]),
+            adapter,
+        )
+        self.assertEqual(self.traced(), len(models.MODELS))
+
+    def test_limiter_disabled(self) -> None:
+        """A zero request rate leaves sessions unlimited."""
+        with mock.patch.dict(os.environ, {air_c.MAX_REQUESTS_PER_S: "0"}):
+            models.init_api()
+        self.assertFalse(self.limited())
+        self.assertEqual(self.traced(), len(models.MODELS))
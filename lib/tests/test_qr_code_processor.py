@@ -0,0 +1,331 @@
+"""QR Code Processor preflight tests"""
+
+import unittest
+
+import cv2
+import numpy as np
+
+from esimslib.util.qr_code_processor import QRCodeProcessor
+from esimslib.util.constants import QRCodeConst as qr_c
+
+# pylint: disable=no-member,protected-access
+
+LPA_FORMAT = "LPA:1$smdp.example.com${}"
+MODULE_SIDE = 6
+QUIET_MODULES = 4
+PAGE_COLOR = 255
+SEED = 7
+
+
+def render_qr(code: str, module_side: int = MODULE_SIDE) -> np.ndarray:
+    """Render a QR Code with square modules and a quiet zone.
+
+    Args:
+        code (str): QR Code content.
+        module_side (int): module side in pixels.
+
+    Returns:
+        np.ndarray: grayscale QR Code image.
+    """
+    modules = cv2.QRCodeEncoder.create().encode(code)
+    image = cv2.resize(
+        modules,
+        None,
+        fx=module_side,
+        fy=module_side,
+        interpolation=cv2.INTER_NEAREST,
+    )
+    border = QUIET_MODULES * module_side
+    return cv2.copyMakeBorder(
+        image,
+        border,
+        border,
+        border,
+        border,
+        cv2.BORDER_CONSTANT,
+        value=PAGE_COLOR,
+    )
+
+
+def render_sheet(codes: int, module_side: int) -> np.ndarray:
+    """Render a sheet of QR Codes laid out in a row-major grid.
+
+    Args:
+        codes (int): QR Codes count, a square number.
+        module_side (int): module side in pixels.
+
+    Returns:
+        np.ndarray: grayscale sheet image.
+    """
+    images = [
+        render_qr(LPA_FORMAT.format(index), module_side)
+        for index in range(codes)
+    ]
+    side = max(image.shape[0] for image in images)
+    columns = int(np.sqrt(codes))
+    sheet = np.full(
+        (side * columns, side * columns), PAGE_COLOR, dtype=np.uint8
+    )
+    for index, image in enumerate(images):
+        top, left = divmod(index, columns)
+        sheet[
+            top * side : top * side + image.shape[0],
+            left * side : left * side + image.shape[1],
+        ] = image
+    return sheet
+
+
+def photograph(image: np.ndarray) -> np.ndarray:
+    """Make an image look photographed at an angle, with a perspective,
+    dimmed paper and sensor noise.
+
+    Args:
+        image (np.ndarray): grayscale image.
+
+    Returns:
+        np.ndarray: photographed style image.
+    """
+    height, width = image.shape
+    corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    moved = corners + np.float32(
+        [[0.1, 0.05], [-0.05, 0.0], [0.0, 0.0], [0.0, -0.1]]
+    ) * np.float32([width, height])
+    warped = cv2.warpPerspective(
+        image,
+        cv2.getPerspectiveTransform(corners, moved),
+        (width, height),
+        borderMode=cv2.BORDER_REPLICATE,
+    )
+    noise = np.random.default_rng(SEED).normal(0, 4, warped.shape)
+    return np.clip(warped * 0.8 + 30 + noise, 0, 255).astype(np.uint8)
+
+
+def render_text(lines: int = 10) -> np.ndarray:
+    """Render a sharp page of text, without QR Codes.
+
+    Args:
+        lines (int): text lines count.
+
+    Returns:
+        np.ndarray: grayscale page image.
+    """
+    page = np.full((600, 600), PAGE_COLOR, dtype=np.uint8)
+    for line in range(lines):
+        cv2.putText(
+            page,
+            "Activation code 0599 123 456",
+            (20, 50 + line * 55),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            0,
+            2,
+        )
+    return page
+
+
+def encode(image: np.ndarray, extension: str = ".png") -> bytes:
+    """Encode an image.
+
+    Args:
+        image (np.ndarray): grayscale image.
+        extension (str): image format extension.
+
+    Returns:
+        bytes: encoded image.
+    """
+    _, encoded = cv2.imencode(extension, image)
+    return encoded.tobytes()
+
+
+def preflight(data: bytes) -> str:
+    """Preflight an in-memory image.
+
+    Args:
+        data (bytes): encoded image.
+
+    Returns:
+        str: rejection reason, empty if the image is plausible.
+    """
+    return QRCodeProcessor("memory://image", data).preflight()
+
+
+class TestPreflight(unittest.TestCase):
+    """QRCodeProcessor.preflight tests."""
+
+    def test_single_qr_code(self) -> None:
+        """A QR Code page is plausible."""
+        self.assertEqual(
+            preflight(encode(render_qr(LPA_FORMAT.format(1)))), ""
+        )
+
+    def test_multi_qr_sheet(self) -> None:
+        """A sheet of QR Codes is plausible."""
+        self.assertEqual(preflight(encode(render_sheet(4, 5))), "")
+
+    def test_perspective_photo(self) -> None:
+        """A QR Code photographed at an angle is plausible."""
+        photo = photograph(render_qr(LPA_FORMAT.format(2)))
+        self.assertEqual(preflight(encode(photo, ".jpg")), "")
+
+    def test_perspective_photo_of_sheet(self) -> None:
+        """A sheet of QR Codes photographed at an angle is plausible."""
+        photo = photograph(render_sheet(4, 5))
+        self.assertEqual(preflight(encode(photo, ".jpg")), "")
+
+    def test_too_small(self) -> None:
+        """Images smaller than a readable QR Code are rejected."""
+        image = cv2.resize(render_qr(LPA_FORMAT.format(3)), (40, 40))
+        self.assertEqual(preflight(encode(image)), qr_c.TOO_SMALL)
+
+    def test_unreadable(self) -> None:
+        """Undecodable content is rejected."""
+        self.assertEqual(preflight(b"not an image"), qr_c.UNREADABLE)
+        self.assertEqual(preflight(b""), qr_c.UNREADABLE)
+
+    def test_blurry(self) -> None:
+        """Out of focus images are rejected."""
+        image = cv2.GaussianBlur(render_qr(LPA_FORMAT.format(4)), (0, 0), 6)
+        self.assertEqual(preflight(encode(image)), qr_c.BLURRY)
+
+    def test_blank_page(self) -> None:
+        """Blank pages are rejected."""
+        page = np.full((400, 400), PAGE_COLOR, dtype=np.uint8)
+        self.assertEqual(preflight(encode(page)), qr_c.BLURRY)
+
+    def test_no_finder_patterns(self) -> None:
+        """Sharp images without QR finder patterns are rejected."""
+        self.assertEqual(
+            preflight(encode(render_text())), qr_c.NO_FINDER_PATTERNS
+        )
+
+
+class TestFinderCandidates(unittest.TestCase):
+    """QRCodeProcessor._finder_candidates tests."""
+
+    def assert_finder_corners(
+        self, candidates: np.ndarray, module_side: float
+    ) -> None:
+        """Check the three finder patterns of a QR Code are candidates.
+
+        Args:
+            candidates (np.ndarray): candidates x, y and module size rows.
+            module_side (float): expected module size.
+        """
+        points = candidates[:, :2]
+        top_left = points[np.argmin(points.sum(axis=1))]
+        top_right = points[np.argmin(points[:, 1] - points[:, 0])]
+        bottom_left = points[np.argmax(points[:, 1] - points[:, 0])]
+        self.assertAlmostEqual(top_left[1], top_right[1], delta=module_side)
+        self.assertAlmostEqual(top_left[0], bottom_left[0], delta=module_side)
+        self.assertAlmostEqual(
+            top_right[0] - top_left[0],
+            bottom_left[1] - top_left[1],
+            delta=module_side,
+        )
+
+    def test_single_qr_code(self) -> None:
+        """Finder patterns are candidates with the module size."""
+        candidates = QRCodeProcessor._finder_candidates(
+            render_qr(LPA_FORMAT.format(1))
+        )
+        self.assertGreaterEqual(len(candidates), 3)
+        self.assert_finder_corners(candidates, MODULE_SIDE)
+        finders = np.sort(candidates[:, 2])[-3:]
+        np.testing.assert_allclose(finders, MODULE_SIDE, rtol=0.2)
+
+    def test_multi_qr_sheet(self) -> None:
+        """Every QR Code of a sheet has its finder patterns."""
+        candidates = QRCodeProcessor._finder_candidates(render_sheet(4, 5))
+        self.assertGreaterEqual(len(candidates), 12)
+
+    def test_perspective_photo(self) -> None:
+        """Finder patterns are found on a photographed QR Code."""
+        candidates = QRCodeProcessor._finder_candidates(
+            photograph(render_qr(LPA_FORMAT.format(2)))
+        )
+        self.assertGreaterEqual(len(candidates), 3)
+        self.assert_finder_corners(candidates, 2 * MODULE_SIDE)
+
+    def test_no_qr_code(self) -> None:
+        """Text and blank pages have no candidates."""
+        self.assertEqual(
+            len(QRCodeProcessor._finder_candidates(render_text())), 0
+        )
+        page = np.full((400, 400), PAGE_COLOR, dtype=np.uint8)
+        self.assertEqual(len(QRCodeProcessor._finder_candidates(page)), 0)
+
+
+class TestHasFinderTriple(unittest.TestCase):
+    """QRCodeProcessor._has_finder_triple tests."""
+
+    def has_triple(self, rows: list) -> bool:
+        """Check candidates rows for a finder patterns triple.
+
+        Args:
+            rows (list): candidates x, y and module size rows.
+
+        Returns:
+            bool: True if a finder patterns triple is found.
+        """
+        return QRCodeProcessor._has_finder_triple(
+            np.array(rows, dtype=np.float64).reshape(-1, 3)
+        )
+
+    def test_right_isosceles_triple(self) -> None:
+        """Corners of a right isosceles triangle are a triple."""
+        self.assertTrue(self.has_triple([[0, 0, 5], [100, 0, 5], [0, 100, 5]]))
+
+    def test_rotated_triple(self) -> None:
+        """A rotated triple is found."""
+        self.assertTrue(
+            self.has_triple([[0, 0, 5], [71, 71, 5], [-71, 71, 5]])
+        )
+
+    def test_perspective_triple(self) -> None:
+        """A triple skewed by perspective is found."""
+        self.assertTrue(
+            self.has_triple([[0, 0, 5], [110, 8, 5.5], [4, 95, 4.5]])
+        )
+
+    def test_triple_among_distractors(self) -> None:
+        """A triple is found among unrelated candidates."""
+        rows = [[400, 30, 2], [250, 380, 9], [0, 0, 5]]
+        rows += [[100, 0, 5], [330, 330, 20], [0, 100, 5]]
+        self.assertTrue(self.has_triple(rows))
+
+    def test_multi_qr_triples(self) -> None:
+        """Triples of a sheet of QR Codes are found."""
+        rows = [
+            [x + left, y + top, 5]
+            for left in (0, 400)
+            for top in (0, 400)
+            for x, y in ((0, 0), (100, 0), (0, 100))
+        ]
+        self.assertTrue(self.has_triple(rows))
+
+    def test_collinear(self) -> None:
+        """Collinear candidates are not a triple."""
+        self.assertFalse(
+            self.has_triple([[0, 0, 5], [100, 0, 5], [200, 0, 5]])
+        )
+
+    def test_unequal_sides(self) -> None:
+        """A right triangle with unequal sides is not a triple."""
+        self.assertFalse(
+            self.has_triple([[0, 0, 5], [100, 0, 5], [0, 200, 5]])
+        )
+
+    def test_module_size_mismatch(self) -> None:
+        """Candidates of different module sizes are not a triple."""
+        self.assertFalse(
+            self.has_triple([[0, 0, 5], [100, 0, 5], [0, 100, 10]])
+        )
+
+    def test_too_close(self) -> None:
+        """Candidates closer than a QR Code side are not a triple."""
+        self.assertFalse(self.has_triple([[0, 0, 5], [40, 0, 5], [0, 40, 5]]))
+
+    def test_too_few(self) -> None:
+        """Fewer than three candidates are not a triple."""
+        self.assertFalse(self.has_triple([]))
+        self.assertFalse(self.has_triple([[0, 0, 5], [100, 0, 5]]))
@@ -0,0 +1,290 @@
+"""Work Queue Connectors tests"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from typing import Iterator, List
+from unittest import mock
+
+from esimslib.connectors.constants import QueueConst as q_c
+from esimslib.connectors.queue_connector import (
+    LocalDirQueue,
+    MemoryQueue,
+    QueueSendError,
+    SQSQueue,
+    WorkQueue,
+)
+
+MESSAGES = 50
+RECEIVERS = 8
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/0/shards"
+
+
+def drain(queues: List[WorkQueue]) -> List[List[dict]]:
+    """Receive all messages from concurrent receivers started together,
+    one per queue instance.
+
+    Args:
+        queues (List[WorkQueue]): receivers queue instances.
+
+    Returns:
+        List[List[dict]]: messages received by each receiver.
+    """
+    barrier = threading.Barrier(len(queues))
+    received: List[List[dict]] = [[] for _ in queues]
+
+    def receive(index: int) -> None:
+        """Receive small batches until the queue is empty.
+
+        Args:
+            index (int): receiver index.
+        """
+        barrier.wait()
+        while True:
+            messages = queues[index].receive(max_messages=2)
+            if not messages:
+                return
+            received[index].extend(message for _, message in messages)
+
+    threads = [
+        threading.Thread(target=receive, args=(index,))
+        for index in range(len(queues))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return received
+
+
+class TestLocalQueues(unittest.TestCase):
+    """MemoryQueue and LocalDirQueue tests."""
+
+    def setUp(self) -> None:
+        """Create queue directory."""
+        self.queue_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        """Remove queue directory."""
+        shutil.rmtree(self.queue_dir)
+
+    def queues(self) -> Iterator[WorkQueue]:
+        """Empty queue of each local backend.
+
+        Yields:
+            WorkQueue: work queue, within its backend sub test.
+        """
+        for index, queue_cls in enumerate((MemoryQueue, LocalDirQueue)):
+            with self.subTest(queue_cls.__name__):
+                if queue_cls is LocalDirQueue:
+                    yield LocalDirQueue(
+                        os.path.join(self.queue_dir, str(index))
+                    )
+                else:
+                    yield queue_cls()
+
+    def assert_claims(self, received: List[List[dict]]) -> None:
+        """Assert each message was received exactly once.
+
+        Args:
+            received (List[List[dict]]): messages of each receiver.
+        """
+        self.assertEqual(
+            sorted(
+                message["n"] for messages in received for message in messages
+            ),
+            list(range(MESSAGES)),
+        )
+
+    def test_send_receive_ack(self) -> None:
+        """Received messages are hidden, acknowledged ones removed."""
+        for queue in self.queues():
+            queue.send([{"n": 0}, {"n": 1}])
+            first = queue.receive(max_messages=1)
+            self.assertEqual(len(first), 1)
+            queue.ack(first[0][0])
+            queue.ack(first[0][0])
+            second = queue.receive()
+            self.assertEqual(
+                sorted(message["n"] for _, message in first + second), [0, 1]
+            )
+            self.assertEqual(queue.receive(), [])
+
+    def test_delayed(self) -> None:
+        """Delayed messages are not visible before their delay."""
+        for queue in self.queues():
+            queue.send([{"n": 0}], delay_seconds=60)
+            self.assertEqual(queue.receive(), [])
+
+    def test_claim_exclusive(self) -> None:
+        """Concurrent receivers claim each message once."""
+        for queue in self.queues():
+            queue.send([{"n": index} for index in range(MESSAGES)])
+            self.assert_claims(drain([queue] * RECEIVERS))
+
+    def test_claim_exclusive_across_queues(self) -> None:
+        """Receivers sharing a directory claim each message once."""
+        LocalDirQueue(self.queue_dir).send(
+            [{"n": index} for index in range(MESSAGES)]
+        )
+        self.assert_claims(
+            drain([LocalDirQueue(self.queue_dir) for _ in range(RECEIVERS)])
+        )
+        self.assertEqual(
+            os.listdir(os.path.join(self.queue_dir, q_c.PENDING)), []
+        )
+
+    def test_claimed_by_other(self) -> None:
+        """A message claimed by another receiver first is skipped
+        and the next one received.
+        """
+        queue = LocalDirQueue(self.queue_dir)
+        queue.send([{"n": 0}, {"n": 1}])
+        rename = os.rename
+
+        def claim(source: str, destination: str) -> None:
+            """Rename a message, the first one being claimed first
+            by another receiver.
+
+            Args:
+                source (str): pending message path.
+                destination (str): claimed message path.
+
+            Raises:
+                FileNotFoundError: for the first message.
+            """
+            if not claimed:
+                claimed.append(source)
+                os.remove(source)
+                raise FileNotFoundError(source)
+            rename(source, destination)
+
+        claimed: List[str] = []
+        with mock.patch(
+            "esimslib.connectors.queue_connector.os.rename", side_effect=claim
+        ):
+            received = queue.receive()
+        self.assertEqual(len(received), 1)
+        self.assertNotIn(os.path.basename(claimed[0]), received[0][0])
+
+
+class TestSQSQueue(unittest.TestCase):
+    """SQSQueue tests with a stubbed SQS client."""
+
+    def setUp(self) -> None:
+        """Stub SQS client and retry delays."""
+        patches = [
+            mock.patch("esimslib.connectors.queue_connector.boto3"),
+            mock.patch("esimslib.connectors.queue_connector.time.sleep"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.queue = SQSQueue(QUEUE_URL)
+        self.sqs = self.queue.sqs
+
+    def sent(self) -> List[List[str]]:
+        """Message bodies of each send call.
+
+        Returns:
+            List[List[str]]: sent bodies by call.
+        """
+        return [
+            [entry[q_c.MESSAGE_BODY] for entry in call.kwargs["Entries"]]
+            for call in self.sqs.send_message_batch.call_args_list
+        ]
+
+    @staticmethod
+    def failed(*entry_ids: str, sender_fault: bool = False) -> dict:
+        """Send response with failed entries.
+
+        Args:
+            entry_ids (str): failed entry IDs.
+            sender_fault (bool): failures are sender faults.
+
+        Returns:
+            dict: send response.
+        """
+        return {
+            q_c.FAILED: [
+                {
+                    q_c.ID: entry_id,
+                    q_c.CODE: "InternalError",
+                    q_c.SENDER_FAULT: sender_fault,
+                }
+                for entry_id in entry_ids
+            ]
+        }
+
+    def test_send_batches(self) -> None:
+        """Messages are sent in batches of the SQS maximum."""
+        self.sqs.send_message_batch.return_value = {}
+        self.queue.send([{"n": index} for index in range(q_c.MAX_BATCH + 1)])
+        self.assertEqual(
+            [len(bodies) for bodies in self.sent()], [q_c.MAX_BATCH, 1]
+        )
+
+    def test_partial_failure_retried(self) -> None:
+        """Only the failed entries of a batch are sent again."""
+        self.sqs.send_message_batch.side_effect = [self.failed("1"), {}]
+        self.queue.send([{"n": 0}, {"n": 1}, {"n": 2}], delay_seconds=5)
+        self.assertEqual(
+            self.sent(),
+            [['{"n": 0}', '{"n": 1}', '{"n": 2}'], ['{"n": 1}']],
+        )
+        retried = self.sqs.send_message_batch.call_args.kwargs["Entries"]
+        self.assertEqual(retried[0][q_c.DELAY_SECONDS], 5)
+
+    def test_retries_exhausted(self) -> None:
+        """Entries failing every attempt raise QueueSendError."""
+        self.sqs.send_message_batch.return_value = self.failed("0")
+        with self.assertRaises(QueueSendError):
+            self.queue.send([{"n": 0}, {"n": 1}])
+        self.assertEqual(
+            self.sqs.send_message_batch.call_count, q_c.SEND_ATTEMPTS
+        )
+
+    def test_sender_fault(self) -> None:
+        """Entries rejected as sender faults are not retried."""
+        self.sqs.send_message_batch.return_value = self.failed(
+            "0", sender_fault=True
+        )
+        with self.assertRaises(QueueSendError):
+            self.queue.send([{"n": 0}])
+        self.assertEqual(self.sqs.send_message_batch.call_count, 1)
+
+    def test_receive_ack(self) -> None:
+        """Messages are received with their receipt handles and
+        acknowledged by deleting them.
+        """
+        self.sqs.receive_message.return_value = {
+            q_c.MESSAGES: [{q_c.RECEIPT_HANDLE: "r0", q_c.BODY: '{"n": 0}'}]
+        }
+        self.assertEqual(self.queue.receive(), [("r0", {"n": 0})])
+        self.queue.ack("r0")
+        self.sqs.delete_message.assert_called_once_with(
+            QueueUrl=QUEUE_URL, ReceiptHandle="r0"
+        )
+
+
+class TestFromEnv(unittest.TestCase):
+    """WorkQueue.from_env tests."""
+
+    def test_from_env(self) -> None:
+        """SQS is preferred, then a directory, memory in-process only."""
+        queue_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, queue_dir)
+        with mock.patch.dict(
+            os.environ, {q_c.QUEUE_URL: QUEUE_URL, q_c.QUEUE_DIR: queue_dir}
+        ), mock.patch("esimslib.connectors.queue_connector.boto3"):
+            self.assertIsInstance(WorkQueue.from_env(), SQSQueue)
+        with mock.patch.dict(os.environ, {q_c.QUEUE_DIR: queue_dir}):
+            self.assertIsInstance(WorkQueue.from_env(), LocalDirQueue)
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsInstance(
+                WorkQueue.from_env(in_process=True), MemoryQueue
+            )
+            with self.assertRaises(ValueError):
+                WorkQueue.from_env()
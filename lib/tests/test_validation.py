@@ -0,0 +1,129 @@
+"""QR Validation Engine tests"""
+
+import os
+import unittest
+from typing import List
+from unittest import mock
+
+from esimslib.util.constants import ValidationConst as val_c
+from esimslib.util.validation import (
+    LPAProtocolRule,
+    PhoneNumberRule,
+    QRDetectedRule,
+    QRPreflightRule,
+    SMDPDomainRule,
+    ValidationEngine,
+)
+
+
+def processor(symbols: List[str], preflight: str = "") -> mock.Mock:
+    """QRCodeProcessor stub recording the checks order.
+
+    Args:
+        symbols (List[str]): QR codes of the image symbols.
+        preflight (str): preflight rejection reason.
+
+    Returns:
+        mock.Mock: QR Code Processor.
+    """
+    stub = mock.Mock(url="memory://image", symbols=[])
+    stub.preflight.return_value = preflight
+
+    def detect_symbols() -> int:
+        """Detect the image symbols.
+
+        Returns:
+            int: symbols count.
+        """
+        stub.symbols = symbols
+        return len(symbols)
+
+    def select_symbol(index: int) -> None:
+        """Select a symbol.
+
+        Args:
+            index (int): symbol index.
+        """
+        stub.qr_code = symbols[index]
+
+    stub.detect_symbols.side_effect = detect_symbols
+    stub.select_symbol.side_effect = select_symbol
+    stub.validate_qr_code_protocol.side_effect = (
+        lambda: stub.qr_code.startswith("LPA:")
+    )
+    stub.validate_smdp_domain.return_value = True
+    stub.detect_phone_number.return_value = True
+    return stub
+
+
+class TestValidationEngine(unittest.TestCase):
+    """ValidationEngine tests."""
+
+    provider = mock.Mock(smdp_domain=["smdp.example.com"], renewable=True)
+
+    def engine(self, preflight: str = "1") -> ValidationEngine:
+        """Create an engine with the default rules.
+
+        Args:
+            preflight (str): QR preflight env value.
+
+        Returns:
+            ValidationEngine: validation engine.
+        """
+        with mock.patch.dict(os.environ, {val_c.PREFLIGHT: preflight}):
+            return ValidationEngine()
+
+    def test_rules_order(self) -> None:
+        """Image and symbol rules are ordered by cost and artifact."""
+        engine = self.engine()
+        self.assertEqual(
+            [type(rule) for rule in engine.image_rules],
+            [QRPreflightRule, QRDetectedRule],
+        )
+        self.assertEqual(
+            [type(rule) for rule in engine.rules],
+            [LPAProtocolRule, SMDPDomainRule, PhoneNumberRule],
+        )
+        self.assertEqual(
+            [type(rule) for rule in self.engine("0").image_rules],
+            [QRDetectedRule],
+        )
+
+    def test_symbols(self) -> None:
+        """Every symbol is validated once the image rules pass."""
+        stub = processor(["LPA:1$smdp.example.com$a", "WIFI:", "LPA:1$b"])
+        self.assertEqual(
+            list(self.engine().validate(stub, self.provider)),
+            [None, val_c.LPA_PROTOCOL, None],
+        )
+        self.assertEqual(
+            [name for name, *_ in stub.method_calls][:2],
+            ["preflight", "detect_symbols"],
+        )
+        self.assertEqual(stub.detect_phone_number.call_count, 2)
+
+    def test_preflight_rejected(self) -> None:
+        """An image rejected by the preflight is not decoded."""
+        stub = processor(["LPA:1$a"], preflight="blurry")
+        self.assertEqual(
+            list(self.engine().validate(stub, self.provider)),
+            [val_c.QR_PREFLIGHT],
+        )
+        stub.detect_symbols.assert_not_called()
+        stub = processor(["LPA:1$a"], preflight="blurry")
+        self.assertEqual(
+            list(self.engine("0").validate(stub, self.provider)), [None]
+        )
+
+    def test_no_symbol(self) -> None:
+        """An image without symbols fails QR detection once."""
+        engine = self.engine()
+        self.assertEqual(
+            list(engine.validate(processor([]), self.provider)),
+            [val_c.QR_DETECTED],
+        )
+        with self.assertLogs(level="INFO") as logs:
+            engine.stats.report()
+        self.assertIn(
+            f"Rule {val_c.QR_DETECTED}: runs 1, rejected 1", logs.output[1]
+        )